@@ -23,6 +23,12 @@ from app.models.sys_user_balance_log import SysUserBalanceLog
 from app.models.sys_user_group import SysUserGroup
 from app.models.sys_user_rule import SysUserRule
 from app.models.sys_user_score_log import SysUserScoreLog
+from app.models.sys_user_ledger_key import SysUserLedgerKey
+from app.models.sys_tree_closure import SysTreeClosure
+from app.models.sys_analytics_rollup import SysAnalyticsRollup
+from app.models.sys_analytics_watermark import SysAnalyticsWatermark
+from app.models.sys_user_region import SysUserRegion
+from app.models.sys_login_sketch import SysLoginSketch
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -3,7 +3,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
+from app.core.permission import require_permission
+from app.core.auth_cache import auth_cache
 from app.crud.sys_admin import crud_sys_admin
 from app.schemas.sys_admin import SysAdminCreate, SysAdminUpdate
 from app.utils.responses import success_response
@@ -12,12 +14,12 @@ from app.models.sys_admin import SysAdmin as SysAdminModel
 
 # Initialize the API router for sys_admin endpoints
 router = APIRouter(
-    prefix="/admin", tags=["admin"], dependencies=[Depends(get_current_admin)]
+    prefix="/admin", tags=["admin"], dependencies=[Depends(get_current_admin_principal)]
 )
 
 # Set the maximum per_page limit
 MAX_PER_PAGE = 200
-@router.get("/list")
+@router.get("/list", dependencies=[Depends(require_permission("/admin/admin", "view"))])
 def read_sys_admin_list(
     page: int = 1,
     per_page: int = 10,
@@ -64,7 +66,7 @@ def read_sys_admin_list(
             "per_page": response_per_page,
         }
     )
-@router.get("/{id}")
+@router.get("/{id}", dependencies=[Depends(require_permission("/admin/admin", "view"))])
 def read_sys_admin(id: int, db: Session = Depends(get_db)):
     """
     Retrieve a single SysAdmin record by its unique ID.
@@ -85,7 +87,7 @@ def read_sys_admin(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysAdmin not found."))
     # Return the record's data as a dictionary
     return success_response(db_obj.to_dict())
-@router.post("/create")
+@router.post("/create", dependencies=[Depends(require_permission("/admin/admin", "add"))])
 def create_sys_admin(obj_in: SysAdminCreate, db: Session = Depends(get_db)):
     """
     Create a new SysAdmin record.
@@ -100,7 +102,7 @@ def create_sys_admin(obj_in: SysAdminCreate, db: Session = Depends(get_db)):
     ret = crud_sys_admin.create(db, obj_in=obj_in)
     # Return the ID of the inserted record
     return success_response({"insert_id": ret.id})
-@router.put("/update/{id}")
+@router.put("/update/{id}", dependencies=[Depends(require_permission("/admin/admin", "edit"))])
 def update_sys_admin(id: int, obj_in: SysAdminUpdate, db: Session = Depends(get_db)):
     """
     Update an existing SysAdmin record.
@@ -124,9 +126,11 @@ def update_sys_admin(id: int, obj_in: SysAdminUpdate, db: Session = Depends(get_
     updated_obj = crud_sys_admin.update(
         db, db_obj=db_obj, obj_in=obj_in.model_dump(exclude_unset=True)
     )
+    # Drop cached authentication state of the affected accounts
+    auth_cache.invalidate("admin", id)
     # Return the updated record's data as a dictionary
     return success_response(updated_obj.to_dict())
-@router.delete("/delete/{id}")
+@router.delete("/delete/{id}", dependencies=[Depends(require_permission("/admin/admin", "delete"))])
 def delete_sys_admin(id: int, db: Session = Depends(get_db)):
     """
     Delete a SysAdmin record by its unique ID.
@@ -147,5 +151,6 @@ def delete_sys_admin(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysAdmin not found."))
     # Remove the record from the database
     crud_sys_admin.remove(db, id=id)
+    auth_cache.invalidate("admin", id)
     # Return an empty success response
     return success_response({})
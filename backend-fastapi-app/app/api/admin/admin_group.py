@@ -3,7 +3,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
+from app.core.permission import permission_registry, require_permission
+from app.services.menu_service import menu_service
+from app.core.auth_cache import auth_cache
 from app.crud.sys_admin_group import crud_sys_admin_group
 from app.schemas.sys_admin_group import SysAdminGroupCreate, SysAdminGroupUpdate
 from app.utils.responses import success_response
@@ -12,17 +15,18 @@ from app.models.sys_admin_group import SysAdminGroup as SysAdminGroupModel
 
 # Initialize the API router for sys_admin_group endpoints
 router = APIRouter(
-    prefix="/admin/group", tags=["admin_group"], dependencies=[Depends(get_current_admin)]
+    prefix="/admin/group", tags=["admin_group"], dependencies=[Depends(get_current_admin_principal)]
 )
 
 # Set the maximum per_page limit
 MAX_PER_PAGE = 200
-@router.get("/list")
+@router.get("/list", dependencies=[Depends(require_permission("/admin/group", "view"))])
 def read_sys_admin_group_list(
     page: int = 1,
     per_page: int = 10,
     search: Optional[str] = None,
     orderby: Optional[str] = None,  # Sorting field and direction, e.g., "name_asc"
+    subtree_of: Optional[int] = None,  # Only return this node and its descendants
     db: Session = Depends(get_db)
 ):
     """
@@ -33,6 +37,7 @@ def read_sys_admin_group_list(
         per_page (int, optional): Number of records per page. Use -1 to retrieve all records. Defaults to 10.
         search (str, optional): A search string to filter records by relevant fields.
         orderby (str, optional): Sorting rule, e.g., "field_asc" or "field_desc".
+        subtree_of (int, optional): Limit the result to this node and its descendants.
         db (Session): Database session dependency.
 
     Returns:
@@ -49,8 +54,11 @@ def read_sys_admin_group_list(
     page = max(page, 1)
     
     # Retrieve paginated records with search and sorting
-    items = crud_sys_admin_group.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby)
-    total = crud_sys_admin_group.get_total(db, search=search)
+    # Restrict to one subtree through the closure index instead of loading the whole table
+    base_query = crud_sys_admin_group.subtree_query(db, subtree_of) if subtree_of else None
+
+    items = crud_sys_admin_group.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby, base_query=base_query)
+    total = crud_sys_admin_group.get_total(db, search=search, base_query=base_query)
     
     response_page = page
     response_per_page = per_page
@@ -64,7 +72,7 @@ def read_sys_admin_group_list(
             "per_page": response_per_page,
         }
     )
-@router.get("/{id}")
+@router.get("/{id}", dependencies=[Depends(require_permission("/admin/group", "view"))])
 def read_sys_admin_group(id: int, db: Session = Depends(get_db)):
     """
     Retrieve a single SysAdminGroup record by its unique ID.
@@ -85,7 +93,7 @@ def read_sys_admin_group(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysAdminGroup not found."))
     # Return the record's data as a dictionary
     return success_response(db_obj.to_dict())
-@router.post("/create")
+@router.post("/create", dependencies=[Depends(require_permission("/admin/group", "add"))])
 def create_sys_admin_group(obj_in: SysAdminGroupCreate, db: Session = Depends(get_db)):
     """
     Create a new SysAdminGroup record.
@@ -98,9 +106,11 @@ def create_sys_admin_group(obj_in: SysAdminGroupCreate, db: Session = Depends(ge
         JSON response containing the ID of the newly created record.
     """
     ret = crud_sys_admin_group.create(db, obj_in=obj_in)
+    permission_registry.invalidate()
+    menu_service.invalidate("admin")
     # Return the ID of the inserted record
     return success_response({"insert_id": ret.id})
-@router.put("/update/{id}")
+@router.put("/update/{id}", dependencies=[Depends(require_permission("/admin/group", "edit"))])
 def update_sys_admin_group(id: int, obj_in: SysAdminGroupUpdate, db: Session = Depends(get_db)):
     """
     Update an existing SysAdminGroup record.
@@ -124,9 +134,13 @@ def update_sys_admin_group(id: int, obj_in: SysAdminGroupUpdate, db: Session = D
     updated_obj = crud_sys_admin_group.update(
         db, db_obj=db_obj, obj_in=obj_in.model_dump(exclude_unset=True)
     )
+    # Drop cached authentication state of the affected accounts
+    auth_cache.invalidate_group("admin", id)
+    permission_registry.invalidate()
+    menu_service.invalidate("admin")
     # Return the updated record's data as a dictionary
     return success_response(updated_obj.to_dict())
-@router.delete("/delete/{id}")
+@router.delete("/delete/{id}", dependencies=[Depends(require_permission("/admin/group", "delete"))])
 def delete_sys_admin_group(id: int, db: Session = Depends(get_db)):
     """
     Delete a SysAdminGroup record by its unique ID.
@@ -147,5 +161,8 @@ def delete_sys_admin_group(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysAdminGroup not found."))
     # Remove the record from the database
     crud_sys_admin_group.remove(db, id=id)
+    auth_cache.invalidate_group("admin", id)
+    permission_registry.invalidate()
+    menu_service.invalidate("admin")
     # Return an empty success response
     return success_response({})
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_admin_log import crud_sys_admin_log
 from app.schemas.sys_admin_log import SysAdminLogCreate, SysAdminLogUpdate
 from app.utils.responses import success_response
@@ -12,7 +12,7 @@ from app.models.sys_admin_log import SysAdminLog as SysAdminLogModel
 
 # Initialize the API router for sys_admin_log endpoints
 router = APIRouter(
-    prefix="/admin/log", tags=["admin_log"], dependencies=[Depends(get_current_admin)]
+    prefix="/admin/log", tags=["admin_log"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
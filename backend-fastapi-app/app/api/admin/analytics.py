@@ -1,24 +1,39 @@
 """
 分析数据API模块
 提供系统分析数据的查询和统计功能，包括用户行为、访问趋势、来源分析等
-支持缓存机制提升性能，并将统计结果持久化到数据库
+支持缓存机制提升性能，统计结果由 analytics_snapshot_service 在后台合并写入数据库
+概览、趋势、访问、来源和月度登录数据读取 analytics_rollup_service 维护的预聚合计数，不扫描原始表，
+时间段的划分与补齐由 app.services.timeseries 统一处理
+历史月份的登录用户数和活跃用户数读取 login_activity_service 维护的 HyperLogLog 草图
+/adhoc 即席分析在 columnar_service 导出的列式快照上执行，不访问数据库
 """
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List, Optional
-import httpx
-import re
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from sqlalchemy.exc import OperationalError, InternalError
 
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
-from app.models.sys_user import SysUser
-from app.models.sys_admin_log import SysAdminLog
-from app.models.sys_analytics_summary import SysAnalyticsSummary
-from app.crud.sys_analytics_summary import crud_sys_analytics_summary
-from app.schemas.sys_analytics_summary import SysAnalyticsSummaryCreate
+from app.core.geoip import geoip
+from app.core.permission import require_permission
+from app.core.security import get_current_admin_principal
+from app.services.user_region_service import user_region_service
+from app.services.analytics_snapshot_service import DAILY, MONTHLY, REGIONAL, analytics_snapshot_service
+from app.services.columnar_service import columnar_service
+from app.services.dashboard_service import dashboard_service
+from app.services.login_activity_service import USER, login_activity_service
+from app.services.analytics_rollup_service import (
+    ALL,
+    ALL_BUCKET,
+    DAY,
+    HOUR,
+    LAST_LOGIN,
+    REGISTER,
+    USERS,
+    VISIT,
+    analytics_rollup_service,
+)
+from app.services import timeseries
+from app.services.timeseries import local_now
 from app.utils.responses import success_response
 from app.core.cache import (
     get_cached_data_sync,
@@ -60,6 +75,7 @@ def get_cache_expire_time(endpoint: str, params: Dict) -> int:
         "overview": 300,           # 概览数据：5分钟
         "sources": 1800,           # 来源数据：30分钟
         "monthly-logins": 3600,    # 月度登录数据：1小时
+        "active-users": 300,       # 活跃用户数据：5分钟
         "default": 600             # 默认：10分钟
     }
     
@@ -127,68 +143,6 @@ def clear_analytics_cache_sync():
         logger.error(f"AnalyticsCache: Failed to clear cache synchronously: {e}")
 
 
-def query_ip_location(ip_address: str) -> Optional[str]:
-    """
-    使用百度API查询IP地址的地理位置信息
-    
-    Args:
-        ip_address: 要查询的IP地址
-        
-    Returns:
-        省份名称，如果查询失败则返回None
-    """
-    try:
-        # 百度IP查询API
-        url = f"http://opendata.baidu.com/api.php"
-        params = {
-            "query": ip_address,
-            "co": "",
-            "resource_id": "6006",
-            "oe": "utf8"
-        }
-        
-        # 使用httpx发送请求
-        with httpx.Client(timeout=10.0) as client:
-            response = client.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # 检查API响应状态
-            if data.get("status") == "0" and data.get("data"):
-                location_info = data["data"][0].get("location", "")
-                
-                # 从位置信息中提取省份
-                # 格式示例: "广东省广州市 移动" 或 "美国"
-                if location_info:
-                    # 提取省份（第一个中文字符串）
-                    match = re.search(r'^([\u4e00-\u9fa5]+省|[\u4e00-\u9fa5]+市|[\u4e00-\u9fa5]+自治区|[\u4e00-\u9fa5]+)', location_info)
-                    if match:
-                        province = match.group(1)
-                        # 如果是单个中文字符（如"美国"），直接返回
-                        if len(province) <= 3:
-                            return province
-                        # 如果是中国省份，确保格式正确
-                        elif province.endswith(('省', '市', '自治区')):
-                            return province
-                
-                logger.warning(f"IP查询API返回的位置信息格式异常: {location_info}")
-                return None
-            else:
-                logger.warning(f"IP查询API返回错误状态: {data.get('status')}")
-                return None
-                
-    except httpx.RequestError as e:
-        logger.error(f"IP查询请求失败: {e}")
-        return None
-    except httpx.HTTPStatusError as e:
-        logger.error(f"IP查询HTTP错误: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"IP查询发生未知错误: {e}")
-        return None
-
-
 def extract_province_from_ip(ip_address: str) -> str:
     """
     从IP地址提取省份信息，支持本地IP和特殊IP的处理
@@ -199,74 +153,71 @@ def extract_province_from_ip(ip_address: str) -> str:
     Returns:
         省份名称，如果无法确定则返回"未知地区"
     """
-    if not ip_address:
-        return "未知地区"
-    
-    # 处理本地IP和特殊IP
-    if ip_address in ["127.0.0.1", "localhost", "::1"]:
-        return "本地访问"
-    
-    # 检查是否为内网IP
-    if ip_address.startswith(("10.", "172.", "192.168.")):
-        return "内网访问"
-    
-    # 使用百度API查询IP地理位置
-    province = query_ip_location(ip_address)
-    
-    if province:
-        return province
-    else:
-        return "未知地区"
-
-
-def save_analytics_summary_to_db(db: Session, summary_type: str, data: Dict, summary_date: Optional[datetime] = None):
-    """
-    将分析统计结果持久化保存到 sys_analytics_summary 数据表
-    
-    Args:
-        db: 数据库会话对象
-        summary_type: 汇总类型，支持'daily'（日汇总）、'monthly'（月汇总）、'regional'（地区汇总）
-        data: 包含统计指标的分析数据字典
-        summary_date: 汇总日期，用于标识统计的时间范围
-    """
-    try:
-        # 生成唯一ID
-        summary_id = f"{summary_type}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # 准备创建数据
-        create_data = {
-            "id": summary_id,
-            "summary_type": summary_type,
-            "summary_date": summary_date.date() if summary_date else None,
-            "summary_year": summary_date.year if summary_date else None,
-            "summary_month": summary_date.month if summary_date else None,
-            "total_users": data.get("total_users"),
-            "new_users": data.get("new_users"),
-            "active_users": data.get("active_users"),
-            "total_logins": data.get("total_logins"),
-            "total_visits": data.get("total_visits"),
-            "user_group_distribution": data.get("user_group_distribution"),
-            "action_distribution": data.get("action_distribution")
-        }
-        
-        # 创建记录
-        summary_obj = SysAnalyticsSummaryCreate(**create_data)
-        crud_sys_analytics_summary.create(db, summary_obj)
-        
-        logger.info(f"AnalyticsSummary: Saved {summary_type} summary to database with ID: {summary_id}")
-        
-    except Exception as e:
-        logger.error(f"AnalyticsSummary: Failed to save {summary_type} summary to database: {e}")
+    return geoip.resolve(ip_address)
 
 
 # 初始化分析数据API路由
 router = APIRouter(
     prefix="/analytics", 
     tags=["analytics"],
-    dependencies=[Depends(get_current_admin)]
+    dependencies=[Depends(get_current_admin_principal)]
 )
 
 
+def overview_panel(db: Session):
+    """概览面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {}
+    
+    # 尝试从缓存获取数据
+    cached_data = get_cached_analytics_data_sync("overview", cache_params)
+    if cached_data:
+        return cached_data
+    
+    today = datetime.combine(local_now().date(), datetime.min.time())
+    seven_days_ago = today - timedelta(days=7)
+
+    # 从预聚合计数读取，每项只读取固定数量的汇总行
+    total_users = analytics_rollup_service.value(db, USERS, ALL, ALL_BUCKET)
+    today_registered_users = analytics_rollup_service.value(db, REGISTER, DAY, today)
+    today_logged_in_users = analytics_rollup_service.value(db, LAST_LOGIN, DAY, today)
+    active_users_last_7_days = analytics_rollup_service.total(
+        db, LAST_LOGIN, DAY, seven_days_ago, today + timedelta(days=1)
+    )
+
+    overview_data = [
+        {
+            "totalValue": total_users,
+            "value": total_users,
+        },
+        {
+            "totalValue": total_users,
+            "value": today_registered_users,
+        },
+        {
+            "totalValue": total_users,
+            "value": today_logged_in_users,
+        },
+        {
+            "totalValue": total_users,
+            "value": active_users_last_7_days,
+        },
+    ]
+
+    # 缓存结果
+    cache_analytics_data_sync("overview", cache_params, overview_data)
+
+    # 将概览数据合并到汇总快照（后台写入数据库）
+    summary_data = {
+        "total_users": total_users,
+        "new_users": today_registered_users,
+        "active_users": active_users_last_7_days,
+        "total_logins": today_logged_in_users
+    }
+    analytics_snapshot_service.record(DAILY, summary_data)
+
+    return overview_data
+
+
 @router.get("/overview")
 def get_analytics_overview(db: Session = Depends(get_db)):
     """
@@ -279,72 +230,47 @@ def get_analytics_overview(db: Session = Depends(get_db)):
     Returns:
         JSON响应，包含概览统计数据的数组，每个元素包含totalValue和value字段
     """
-    cache_params = {}
+    try:
+        return success_response(overview_panel(db))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取分析数据失败: {str(e)}")
+
+
+def trends_panel(db: Session, days: int = 30, granularity: str = "day"):
+    """趋势面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {"days": days, "granularity": granularity}
     
     # 尝试从缓存获取数据
-    cached_data = get_cached_analytics_data_sync("overview", cache_params)
+    cached_data = get_cached_analytics_data_sync("trends", cache_params)
     if cached_data:
-        return success_response(cached_data)
+        return cached_data
     
-    try:
-        today = datetime.now().date()
-        seven_days_ago = today - timedelta(days=7)
-        
-        # 批量查询所有统计数据
-        total_users = db.query(SysUser).count()
-        
-        today_registered_users = db.query(SysUser).filter(
-            func.date(SysUser.created_at) == today
-        ).count()
-        
-        today_logged_in_users = db.query(SysUser).filter(
-            func.date(SysUser.login_time) == today
-        ).count()
-        
-        active_users_last_7_days = db.query(SysUser).filter(
-            SysUser.login_time >= seven_days_ago
-        ).count()
-        
-        overview_data = [
-            {
-                "totalValue": total_users,
-                "value": total_users,
-            },
-            {
-                "totalValue": total_users,
-                "value": today_registered_users,
-            },
-            {
-                "totalValue": total_users,
-                "value": today_logged_in_users,
-            },
-            {
-                "totalValue": total_users,
-                "value": active_users_last_7_days,
-            },
-        ]
-        
-        # 缓存结果
-        cache_analytics_data_sync("overview", cache_params, overview_data)
-        
-        # 将概览数据保存到数据库
-        summary_data = {
-            "total_users": total_users,
-            "new_users": today_registered_users,
-            "active_users": active_users_last_7_days,
-            "total_logins": today_logged_in_users
+    # 最近 days 天（包含当天），按粒度归并并补齐
+    range_start, range_end = timeseries.last_buckets(timeseries.DAY, days)
+    user_trends = analytics_rollup_service.timeline(db, REGISTER, granularity, range_start, range_end)
+    visit_trends = analytics_rollup_service.timeline(db, VISIT, granularity, range_start, range_end)
+
+    trends_data = {
+        "userTrends": user_trends.records(),
+        "visitTrends": visit_trends.records(),
+        "dateRange": {
+            "start": range_start.strftime("%Y-%m-%d"),
+            "end": (range_end - timedelta(days=1)).strftime("%Y-%m-%d")
         }
-        save_analytics_summary_to_db(db, "daily", summary_data, datetime.now())
-        
-        return success_response(overview_data)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取分析数据失败: {str(e)}")
+    }
+
+    # 缓存结果
+    cache_analytics_data_sync("trends", cache_params, trends_data)
+
+    # 趋势合计随 days 变化，不写入日汇总快照（否则会覆盖概览写入的用户总数）
+
+    return trends_data
 
 
 @router.get("/trends")
 def get_analytics_trends(
     days: int = Query(30, ge=1, le=365),
+    granularity: str = Query("day", regex="^(day|week|month)$"),
     db: Session = Depends(get_db)
 ):
     """
@@ -353,105 +279,72 @@ def get_analytics_trends(
     
     Args:
         days (int): 查询天数范围，最小1天，最大365天
+        granularity (str): 统计粒度，支持'day'（天）、'week'（周）、'month'（月）
         db (Session): 数据库会话对象
         
     Returns:
         JSON响应，包含用户趋势、访问趋势和时间范围信息
     """
-    cache_params = {"days": days}
-    
-    # 尝试从缓存获取数据
-    cached_data = get_cached_analytics_data_sync("trends", cache_params)
-    if cached_data:
-        return success_response(cached_data)
-    
     try:
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=days - 1)
-        
-        # 批量查询用户注册趋势（单次查询）
-        user_trends_query = db.query(
-            func.date(SysUser.created_at).label('date'),
-            func.count(SysUser.id).label('count')
-        ).filter(
-            and_(
-                SysUser.created_at >= start_date,
-                SysUser.created_at <= end_date
-            )
-        ).group_by(func.date(SysUser.created_at)).all()
-        
-        # 构建日期到计数的映射
-        user_trends_map = {
-            row.date.strftime("%Y-%m-%d"): int(row.count) if row.count is not None else 0
-            for row in user_trends_query
-        }
-        
-        # 生成完整的日期范围数据
-        user_trends = []
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            count = user_trends_map.get(date_str, 0)
-            user_trends.append({
-                "date": date_str,
-                "count": count
-            })
-            current_date += timedelta(days=1)
-        
-        # 批量查询访问趋势（单次查询）
-        visit_trends_query = db.query(
-            func.date(SysAdminLog.created_at).label('date'),
-            func.count(SysAdminLog.id).label('count')
-        ).filter(
-            and_(
-                SysAdminLog.created_at >= start_date,
-                SysAdminLog.created_at <= end_date
-            )
-        ).group_by(func.date(SysAdminLog.created_at)).all()
-        
-        # 构建日期到计数的映射
-        visit_trends_map = {
-            row.date.strftime("%Y-%m-%d"): int(row.count) if row.count is not None else 0
-            for row in visit_trends_query
-        }
-        
-        # 生成完整的日期范围数据
-        visit_trends = []
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime("%Y-%m-%d")
-            count = visit_trends_map.get(date_str, 0)
-            visit_trends.append({
-                "date": date_str,
-                "count": count
-            })
-            current_date += timedelta(days=1)
-        
-        trends_data = {
-            "userTrends": user_trends,
-            "visitTrends": visit_trends,
-            "dateRange": {
-                "start": start_date.strftime("%Y-%m-%d"),
-                "end": end_date.strftime("%Y-%m-%d")
-            }
-        }
-        
-        # 缓存结果
-        cache_analytics_data_sync("trends", cache_params, trends_data)
-        
-        # 将趋势数据保存到数据库
-        summary_data = {
-            "total_users": sum(user_trends_map.values()),
-            "total_visits": sum(visit_trends_map.values())
-        }
-        save_analytics_summary_to_db(db, "daily", summary_data, datetime.now())
-        
-        return success_response(trends_data)
-        
+        return success_response(trends_panel(db, days, granularity))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取趋势数据失败: {str(e)}")
 
 
+def visits_panel(db: Session, period: str = "month"):
+    """访问面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {"period": period}
+    
+    # 尝试从缓存获取数据
+    cached_data = get_cached_analytics_data_sync("visits", cache_params)
+    if cached_data:
+        return cached_data
+    
+    # 月、周按天统计最近 31 / 8 天，日按小时统计最近 25 个整点（均包含当前时间段）
+    granularity, bucket_count = {
+        "month": (DAY, 31),
+        "week": (DAY, 8),
+        "day": (HOUR, 25),
+    }[period]
+    start_date, end_date = timeseries.last_buckets(granularity, bucket_count)
+
+    # 按时间段的访问数（补齐没有访问的时间段）
+    visits_by_time = analytics_rollup_service.timeline(db, VISIT, granularity, start_date, end_date)
+    visits_data = visits_by_time.records(key="time")
+    total_visits_count = visits_by_time.total
+
+    # 按操作类型的访问数（没有标题的访问只计入总数）
+    visits_by_action = analytics_rollup_service.breakdown(db, VISIT, granularity, start_date, end_date)
+
+    action_data = []
+    action_distribution = {}
+    for title, count in sorted(visits_by_action.items(), key=lambda item: item[1], reverse=True):
+        action_data.append({
+            "action": title,
+            "count": count
+        })
+        action_distribution[title] = count
+
+    result = {
+        "visitsByTime": visits_data,
+        "visitsByAction": action_data,
+        "period": period,
+        "totalVisits": total_visits_count
+    }
+
+    # 缓存结果
+    cache_analytics_data_sync("visits", cache_params, result)
+
+    # 将访问数据合并到汇总快照（后台写入数据库）
+    summary_data = {
+        "total_visits": total_visits_count,
+        "action_distribution": action_distribution
+    }
+    analytics_snapshot_service.record(DAILY, summary_data)
+
+    return result
+
+
 @router.get("/visits")
 def get_analytics_visits(
     period: str = Query("month", regex="^(month|week|day)$"),
@@ -468,89 +361,59 @@ def get_analytics_visits(
     Returns:
         JSON响应，包含按时间分组的访问数据、按操作类型分组的访问数据和总访问次数
     """
-    cache_params = {"period": period}
+    try:
+        return success_response(visits_panel(db, period))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取访问数据失败: {str(e)}")
+
+
+def sources_panel(db: Session):
+    """来源面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {}
     
     # 尝试从缓存获取数据
-    cached_data = get_cached_analytics_data_sync("visits", cache_params)
+    cached_data = get_cached_analytics_data_sync("sources", cache_params)
     if cached_data:
-        return success_response(cached_data)
+        return cached_data
     
-    try:
-        end_date = datetime.now()
-        
-        if period == "month":
-            start_date = end_date - timedelta(days=30)
-            group_format = "%Y-%m-%d"
-        elif period == "week":
-            start_date = end_date - timedelta(days=7)
-            group_format = "%Y-%m-%d"
-        else:  # day
-            start_date = end_date - timedelta(hours=24)
-            group_format = "%Y-%m-%d %H:00"
-        
-        # 按时间分组查询访问数据
-        visits_by_time = db.query(
-            func.date_format(SysAdminLog.created_at, group_format).label('time_group'),
-            func.count(SysAdminLog.id).label('count')
-        ).filter(
-            and_(
-                SysAdminLog.created_at >= start_date,
-                SysAdminLog.created_at <= end_date
-            )
-        ).group_by('time_group').all()
-        
-        visits_data = []
-        total_visits_count = 0
-        for visit in visits_by_time:
-            visit_count = int(visit.count) if visit.count is not None else 0
-            visits_data.append({
-                "time": visit.time_group,
-                "count": visit_count
-            })
-            total_visits_count += visit_count
-        
-        # 按操作类型查询访问数据
-        visits_by_action = db.query(
-            SysAdminLog.title,
-            func.count(SysAdminLog.id).label('count')
-        ).filter(
-            and_(
-                SysAdminLog.created_at >= start_date,
-                SysAdminLog.created_at <= end_date
-            )
-        ).group_by(SysAdminLog.title).all()
-        
-        action_data = []
-        action_distribution = {}
-        for action in visits_by_action:
-            if action.title:  # 只包含有值的操作
-                action_data.append({
-                    "action": action.title,
-                    "count": action.count
-                })
-                action_distribution[action.title] = action.count
-        
-        result = {
-            "visitsByTime": visits_data,
-            "visitsByAction": action_data,
-            "period": period,
-            "totalVisits": total_visits_count
-        }
-        
-        # 缓存结果
-        cache_analytics_data_sync("visits", cache_params, result)
-        
-        # 将访问数据保存到数据库
-        summary_data = {
-            "total_visits": total_visits_count,
-            "action_distribution": action_distribution
-        }
-        save_analytics_summary_to_db(db, "daily", summary_data, datetime.now())
-        
-        return success_response(result)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取访问数据失败: {str(e)}")
+    # 按平台的用户数（预聚合计数）
+    user_sources = analytics_rollup_service.breakdown(db, USERS, ALL)
+
+    source_data = []
+    platform_distribution = {}
+    for platform, count in user_sources.items():
+        platform_name = platform if platform else "other"
+        # 将平台名称转换为中文显示
+        platform_name_cn = {
+            "ios": "iOS",
+            "mac": "macOS", 
+            "android": "Android",
+            "web": "Web",
+            "pc": "PC",
+            "other": "其他"
+        }.get(platform_name, platform_name)
+
+        source_data.append({
+            "source": platform_name_cn,
+            "count": count
+        })
+        platform_distribution[platform_name_cn] = count
+
+
+    result = {
+        "userSources": source_data
+    }
+
+    # 缓存结果
+    cache_analytics_data_sync("sources", cache_params, result)
+
+    # 将来源数据合并到汇总快照（后台写入数据库）
+    summary_data = {
+        "user_group_distribution": platform_distribution
+    }
+    analytics_snapshot_service.record(DAILY, summary_data)
+
+    return result
 
 
 @router.get("/sources")
@@ -567,60 +430,47 @@ def get_analytics_sources(
     Returns:
         JSON响应，包含用户来源数据和操作来源数据
     """
-    cache_params = {}
-    
-    # 尝试从缓存获取数据
-    cached_data = get_cached_analytics_data_sync("sources", cache_params)
-    if cached_data:
-        return success_response(cached_data)
-    
     try:
-        # 查询用户来源（按平台）
-        user_sources = db.query(
-            SysUser.platform,
-            func.count(SysUser.id).label('count')
-        ).group_by(SysUser.platform).all()
-        
-        source_data = []
-        platform_distribution = {}
-        for source in user_sources:
-            platform_name = source.platform if source.platform else "other"
-            # 将平台名称转换为中文显示
-            platform_name_cn = {
-                "ios": "iOS",
-                "mac": "macOS", 
-                "android": "Android",
-                "web": "Web",
-                "pc": "PC",
-                "other": "其他"
-            }.get(platform_name, platform_name)
-            
-            source_data.append({
-                "source": platform_name_cn,
-                "count": source.count
-            })
-            platform_distribution[platform_name_cn] = source.count
-        
-        
-        result = {
-            "userSources": source_data
-        }
-        
-        # 缓存结果
-        cache_analytics_data_sync("sources", cache_params, result)
-        
-        # 将来源数据保存到数据库
-        summary_data = {
-            "user_group_distribution": platform_distribution
-        }
-        save_analytics_summary_to_db(db, "daily", summary_data, datetime.now())
-        
-        return success_response(result)
-        
+        return success_response(sources_panel(db))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取来源数据失败: {str(e)}")
 
 
+def monthly_logins_panel(db: Session, months: int = 12):
+    """月度登录面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {"months": months}
+    
+    # 尝试从缓存获取数据
+    cached_data = get_cached_analytics_data_sync("monthly-logins", cache_params)
+    if cached_data:
+        return cached_data
+    
+    # 最后登录时间只能反映用户最近一次登录所在的月份，开始记录登录草图之后的月份改用草图中的唯一登录用户数
+    month_start, month_end = timeseries.last_buckets(timeseries.MONTH, months)
+    series = analytics_rollup_service.timeline(db, LAST_LOGIN, timeseries.MONTH, month_start, month_end)
+    recorded_since = login_activity_service.recorded_since(db, USER)
+    if recorded_since is not None:
+        buckets = [bucket.date() for bucket, _ in series.items()]
+        counts = login_activity_service.counts(db, USER, timeseries.MONTH, [month for month in buckets if month >= recorded_since])
+        for index, bucket in enumerate(buckets):
+            if bucket in counts:
+                # 开始记录的月份草图不完整，取两者中较大的值
+                count = counts[bucket]
+                series.values[index] = count if bucket > recorded_since else max(count, int(series.values[index]))
+    monthly_logins = series.records(key="month")
+
+    # 缓存结果
+    cache_analytics_data_sync("monthly-logins", cache_params, monthly_logins)
+
+    # 将月度登录数据合并到汇总快照（后台写入数据库）
+    summary_data = {
+        "total_logins": sum(login["count"] for login in monthly_logins)
+    }
+    analytics_snapshot_service.record(MONTHLY, summary_data)
+
+    return monthly_logins
+
+
 @router.get("/monthly-logins")
 def get_monthly_login_stats(
     months: int = Query(12, ge=1, le=24),
@@ -637,159 +487,253 @@ def get_monthly_login_stats(
     Returns:
         JSON响应，包含按月分组的登录统计数据数组
     """
-    cache_params = {"months": months}
+    try:
+        return success_response(monthly_logins_panel(db, months))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取月度登录数据失败: {str(e)}")
+
+
+def active_users_panel(db: Session, kind: str = USER):
+    """活跃用户面板数据（带缓存），供单独的接口和 /dashboard 共用"""
+    cache_params = {"kind": kind}
     
     # 尝试从缓存获取数据
-    cached_data = get_cached_analytics_data_sync("monthly-logins", cache_params)
+    cached_data = get_cached_analytics_data_sync("active-users", cache_params)
     if cached_data:
-        return success_response(cached_data)
+        return cached_data
     
-    try:
-        end_date = datetime.now()
-        monthly_logins = []
-        
-        for i in range(months):
-            # 计算月份开始和结束
-            target_month = end_date.month - i
-            target_year = end_date.year
-            
-            if target_month <= 0:
-                target_month += 12
-                target_year -= 1
-            
-            month_start = datetime(target_year, target_month, 1)
-            if target_month == 12:
-                month_end = datetime(target_year + 1, 1, 1) - timedelta(days=1)
-            else:
-                month_end = datetime(target_year, target_month + 1, 1) - timedelta(days=1)
-            
-            # 统计唯一登录用户数
-            login_count = db.query(SysUser.id).filter(
-                and_(
-                    SysUser.login_time >= month_start,
-                    SysUser.login_time <= month_end,
-                    SysUser.login_time.isnot(None)
-                )
-            ).distinct().count()
-            
-            monthly_logins.append({
-                "month": f"{target_year}-{target_month:02d}",
-                "count": login_count or 0
-            })
-        
-        # 按时间顺序排序
-        monthly_logins.reverse()
-        
-        # 缓存结果
-        cache_analytics_data_sync("monthly-logins", cache_params, monthly_logins)
-        
-        # 将月度登录数据保存到数据库
-        summary_data = {
-            "total_logins": sum(login["count"] for login in monthly_logins)
-        }
-        save_analytics_summary_to_db(db, "monthly", summary_data, datetime.now())
-        
-        return success_response(monthly_logins)
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"获取月度登录数据失败: {str(e)}")
+    # 合并窗口内的日草图，耗时与用户数无关
+    active_users = login_activity_service.active_users(db, kind)
 
+    # 缓存结果
+    cache_analytics_data_sync("active-users", cache_params, active_users)
 
-@router.get("/regions")
-def get_analytics_regions(
+    return active_users
+
+
+@router.get("/active-users")
+def get_active_users(
+    kind: str = Query(USER, regex="^(user|admin)$"),
     db: Session = Depends(get_db)
 ):
     """
-    获取用户地区分布真实数据
-    根据用户的IP地址通过百度API查询真实的地理位置信息，统计用户地区分布
+    获取活跃用户统计数据
+    按登录成功记录的 HyperLogLog 草图统计去重登录用户数（标准误差约 0.8%）
     
     Args:
+        kind (str): 用户类型，user 为前台用户，admin 为管理员
         db (Session): 数据库会话对象
         
     Returns:
-        JSON响应，包含地区名称和用户数量的数组
+        JSON响应，包含最近1/7/30天（dau/wau/mau）和本周、本月（thisWeek/thisMonth）的活跃用户数
     """
+    try:
+        return success_response(active_users_panel(db, kind))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取活跃用户数据失败: {str(e)}")
+
+
+def regions_panel(db: Session):
+    """地区面板数据（带缓存），供单独的接口和 /dashboard 共用"""
     cache_params = {}
     
     # 尝试从缓存获取数据
     cached_data = get_cached_analytics_data_sync("regions", cache_params)
     if cached_data:
-        return success_response(cached_data)
+        return cached_data
     
-    try:
-        # 查询所有用户的IP地址
-        users_with_ip = db.query(SysUser.join_ip).filter(SysUser.join_ip.isnot(None)).all()
-        
-        # 如果没有用户或没有IP数据，返回空数组
-        if not users_with_ip:
-            return success_response([])
-        
-        # 统计各地区用户数量
-        region_counts = {}
-        
-        for user in users_with_ip:
-            ip_address = user.join_ip
-            if ip_address:
-                # 从IP地址提取省份信息
-                province = extract_province_from_ip(ip_address)
-                
-                # 统计各地区用户数量
-                if province in region_counts:
-                    region_counts[province] += 1
-                else:
-                    region_counts[province] = 1
+    # 读取已保存的用户注册地区，一次 GROUP BY（存量用户由后台任务补齐，进度见 /regions/backfill）
+    region_data = user_region_service.region_counts(db)
+
+    # 缓存结果
+    cache_analytics_data_sync("regions", cache_params, region_data)
+
+    # 将地区数据合并到汇总快照（后台写入数据库）
+    region_distribution = {item["region"]: item["count"] for item in region_data}
+    summary_data = {
+        "total_users": sum(region_distribution.values()),
+        "user_group_distribution": region_distribution
+    }
+    analytics_snapshot_service.record(REGIONAL, summary_data)
+
+    return region_data
+
+
+@router.get("/regions")
+def get_analytics_regions(
+    db: Session = Depends(get_db)
+):
+    """
+    获取用户地区分布真实数据
+    按用户注册时解析并保存的地区（sys_user_region）统计用户地区分布
+    
+    Args:
+        db (Session): 数据库会话对象
         
-        # 转换为前端需要的格式
-        region_data = []
-        for region, count in region_counts.items():
-            region_data.append({
-                "region": region,
-                "count": count
-            })
+    Returns:
+        JSON响应，包含地区名称和用户数量的数组
+    """
+    try:
+        return success_response(regions_panel(db))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取地区数据失败: {str(e)}")
+
+
+@router.get("/regions/backfill")
+def get_region_backfill_progress(db: Session = Depends(get_db)):
+    """
+    获取用户注册地区补齐进度
+    
+    Args:
+        db (Session): 数据库会话对象
         
-        # 按用户数量降序排序
-        region_data.sort(key=lambda x: x["count"], reverse=True)
+    Returns:
+        JSON响应，包含有注册IP的用户数、已解析用户数、待处理用户数、完成百分比和本进程补齐任务的状态
+    """
+    return success_response(user_region_service.progress(db))
+
+
+@router.post("/regions/backfill", dependencies=[Depends(require_permission("/dashboard/analytics", "edit"))])
+async def start_region_backfill(full: bool = Query(False)):
+    """
+    启动用户注册地区补齐任务
+    
+    Args:
+        full (bool): 重新加载地区库并重新解析全部用户（更换地区库后使用），默认只处理缺失或过期的记录
         
-        # 缓存结果
-        cache_analytics_data_sync("regions", cache_params, region_data)
+    Returns:
+        JSON响应，started 表示是否启动了新任务（已有任务在运行时为 False）
+    """
+    started = user_region_service.start_backfill(full=full)
+    if started:
+        delete_cached_pattern_sync("analytics:regions:*")
+    return success_response({"started": started})
+
+
+@router.get("/adhoc", dependencies=[Depends(require_permission("/dashboard/analytics", "view"))])
+def get_adhoc_tables():
+    """
+    获取可以即席分析的表及其列式快照信息
+    
+    Returns:
+        JSON响应，包含各表的快照行数、生成时间（UTC）、列类型和可用的分组键
+    """
+    return success_response(columnar_service.tables())
+
+
+@router.post("/adhoc/snapshot", dependencies=[Depends(require_permission("/dashboard/analytics", "edit"))])
+async def start_adhoc_snapshot(full: bool = Query(False)):
+    """
+    立即导出一次列式快照
+    
+    Args:
+        full (bool): 只追加的日志表也全量重建（已归档的日志会从快照中移除），默认只追加新行
         
-        # 将地区数据保存到数据库
-        region_distribution = {item["region"]: item["count"] for item in region_data}
-        summary_data = {
-            "total_users": len(users_with_ip),
-            "user_group_distribution": region_distribution
-        }
-        save_analytics_summary_to_db(db, "regional", summary_data, datetime.now())
+    Returns:
+        JSON响应，started 表示是否启动了新任务（已有任务在运行时为 False）
+    """
+    return success_response({"started": columnar_service.start_build(full=full)})
+
+
+@router.get("/adhoc/{table}", dependencies=[Depends(require_permission("/dashboard/analytics", "view"))])
+def query_adhoc(
+    table: str,
+    group_by: str = Query("", description="逗号分隔的分组列，可以使用 hour、weekday、day、week、month"),
+    conditions: List[str] = Query([], alias="filter", description="列:值，可以重复；字符串值以 * 结尾时按前缀匹配"),
+    start: Optional[date] = Query(None),
+    end: Optional[date] = Query(None),
+    distinct: Optional[str] = Query(None),
+    value: Optional[str] = Query(None),
+    percentiles: str = Query(""),
+    sort: str = Query("count", regex="^(count|key)$"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    在列式快照上执行即席分析（过滤、分组计数、去重计数、平均值和分位数）
+    数据截至快照生成时间，查询不访问数据库
+    
+    Args:
+        table (str): 表名，sys_admin_log 或 sys_user
+        group_by (str): 分组列
+        conditions (List[str]): 过滤条件（参数名 filter），同一列的多个值为“或”，不同列为“与”
+        start (date): 开始日期（包含），按表的时间列过滤
+        end (date): 结束日期（包含）
+        distinct (str): 统计各组该列的不同值个数
+        value (str): 数值列，统计各组的平均值和分位数
+        percentiles (str): 逗号分隔的分位数（0-100）；未指定 value 时计算各组行数的分位数
+        sort (str): count 按行数降序，key 按分组键升序
+        limit (int): 最多返回的分组数
         
-        return success_response(region_data)
+    Returns:
+        JSON响应，包含快照信息、匹配行数、分组数和各组统计结果
+    """
+    filters: Dict[str, List[str]] = {}
+    for item in conditions:
+        name, separator, filter_value = item.partition(":")
+        if not separator:
+            raise HTTPException(status_code=400, detail=f"过滤条件格式应为 列:值: {item}")
+        filters.setdefault(name.strip(), []).append(filter_value)
+    try:
+        result = columnar_service.query(
+            table,
+            group_by=[name.strip() for name in group_by.split(",") if name.strip()],
+            filters=filters,
+            start=start,
+            end=end,
+            distinct=distinct,
+            value=value,
+            percentiles=[float(item) for item in percentiles.split(",") if item.strip()],
+            sort=sort,
+            limit=limit,
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return success_response(result)
+
+
+# /dashboard 可以返回的面板，名称与单独的接口一致
+DASHBOARD_PANELS = ("overview", "trends", "visits", "sources", "monthly-logins", "active-users", "regions")
+
+
+@router.get("/dashboard")
+async def get_analytics_dashboard(
+    panels: str = Query(",".join(DASHBOARD_PANELS)),
+    days: int = Query(30, ge=1, le=365),
+    granularity: str = Query("day", regex="^(day|week|month)$"),
+    period: str = Query("month", regex="^(month|week|day)$"),
+    months: int = Query(12, ge=1, le=24),
+):
+    """
+    一次请求获取多个分析面板
+    各面板并发计算、分别缓存（与单独的接口共用缓存），超时或失败的面板数据为 null，不影响其他面板
+    
+    Args:
+        panels (str): 逗号分隔的面板名称，默认全部面板
+        days (int): trends 面板的天数范围
+        granularity (str): trends 面板的统计粒度
+        period (str): visits 面板的时间周期
+        months (int): monthly-logins 面板的月数范围
         
-    except Exception as e:
-        logger.error(f"获取地区数据失败: {str(e)}")
-        # 如果IP查询失败，返回模拟数据作为降级方案
-        try:
-            total_users = db.query(SysUser).count()
-            if total_users == 0:
-                return success_response([])
-            
-            # 生成模拟数据作为降级方案
-            common_regions = [
-                "广东省", "北京市", "上海市", "浙江省", "江苏省",
-                "四川省", "山东省", "湖北省", "河南省", "其他地区"
-            ]
-            
-            region_data = []
-            base_count = max(1, total_users // len(common_regions))
-            
-            for i, region in enumerate(common_regions):
-                weight = len(common_regions) - i
-                region_count = max(1, base_count * weight // 2)
-                region_data.append({
-                    "region": region,
-                    "count": region_count
-                })
-            
-            logger.warning("使用模拟地区数据作为降级方案")
-            return success_response(region_data)
-            
-        except Exception as fallback_error:
-            raise HTTPException(status_code=500, detail=f"获取地区数据失败: {str(e)}")
+    Returns:
+        JSON响应，panels 为 {面板名称: 面板数据}，errors 为 {面板名称: 错误信息}
+    """
+    names = list(dict.fromkeys(name.strip() for name in panels.split(",") if name.strip()))
+    if not names:
+        raise HTTPException(status_code=400, detail="至少需要指定一个面板")
+    unknown = [name for name in names if name not in DASHBOARD_PANELS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的面板: {', '.join(unknown)}")
+    
+    builders = {
+        "overview": overview_panel,
+        "trends": lambda db: trends_panel(db, days, granularity),
+        "visits": lambda db: visits_panel(db, period),
+        "sources": sources_panel,
+        "monthly-logins": lambda db: monthly_logins_panel(db, months),
+        "active-users": active_users_panel,
+        "regions": regions_panel,
+    }
+    data, errors = await dashboard_service.compute({name: builders[name] for name in names})
+    return success_response({"panels": data, "errors": errors})
@@ -11,13 +11,13 @@ from app.schemas.sys_general_config import (
 from app.utils.responses import success_response
 from app.utils.response_handlers import ErrorCode
 from app.models.sys_general_config import SysGeneralConfig as SysGeneralConfigModel
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 
 # Initialize the API router for sys_general_config endpoints
 router = APIRouter(
     prefix="/admin/config",
     tags=["admin_config"],
-    dependencies=[Depends(get_current_admin)],
+    dependencies=[Depends(get_current_admin_principal)],
 )
 
 
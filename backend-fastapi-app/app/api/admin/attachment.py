@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_attachment import crud_sys_attachment
 from app.crud.sys_attachment_category import crud_sys_attachment_category
 from app.schemas.sys_attachment import SysAttachmentCreate, SysAttachmentUpdate
@@ -13,7 +13,7 @@ from app.models.sys_attachment import SysAttachment as SysAttachmentModel
 
 # Initialize the API router for sys_attachment endpoints
 router = APIRouter(
-    prefix="/attachment", tags=["attachment"], dependencies=[Depends(get_current_admin)]
+    prefix="/attachment", tags=["attachment"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
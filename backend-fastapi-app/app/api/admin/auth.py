@@ -1,4 +1,4 @@
-from typing import Annotated, Dict, List
+from typing import Annotated
 from fastapi import APIRouter, HTTPException, status, Request, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_babel import _
@@ -6,20 +6,27 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from app.models.sys_admin_group import SysAdminGroup
-from app.models.sys_admin_rule import SysAdminRule
 from app.models.sys_admin_log import SysAdminLog
 from app.models.sys_admin import SysAdmin
 from app.dependencies.database import get_db
 from app.crud.sys_auth_admin import crud_sys_auth_admin
-from app.crud.sys_admin_rule import crud_sys_admin_rule
 from app.crud.sys_admin_log import crud_sys_admin_log
 from app.core.security import (
+    Principal,
     decode_access_token,
     get_current_admin,
+    get_current_admin_principal,
+    revoke_token,
     verify_password,
     create_access_token,
 )
 from app.core.captcha import verify_captcha
+from app.core.login_throttle import login_throttle
+from app.core.token_revocation import revocation_store
+from app.core.permission import PermissionIndex, get_current_admin_permissions
+from app.services.login_activity_service import ADMIN, login_activity_service
+from app.services.menu_service import menu_service
+from app.services.password_service import password_service
 from app.core.config import settings
 from app.utils.log_utils import logger
 from app.utils.responses import success_response
@@ -95,45 +102,13 @@ def handle_successful_login(admin, username: str, client_ip: str, db: Session):
     access_token = create_access_token(
         data={"sub": admin.id}, expires_delta=access_token_expires
     )
-    admin.token = access_token
     db.commit()
+    login_activity_service.record(ADMIN, admin.id, admin.login_at)
 
     logger.info(f"User {username} logged in successfully from IP: {client_ip}")
     return access_token
 
 
-def transform_items(items: List[SysAdminRule]) -> List[Dict]:
-    def build_tree(parent_id: int) -> List[Dict]:
-        children = []
-        for item in items:
-            if item.parent_id == parent_id:
-                child = {
-                    "id": item.id,
-                    "name": item.name,
-                    "path": f"/admin{item.path}",
-                    "component": item.component,
-                    "meta": item.meta,
-                }
-                child_children = build_tree(item.id)
-                if child_children:
-                    child["children"] = child_children
-                children.append(child)
-        return children
-
-    result = []
-    for item in (item for item in items if item.parent_id == 0):
-        layout = {
-            "id": item.id,
-            "meta": item.meta,
-            "name": item.name,
-            "path": f"/admin{item.path}",
-            "redirect": item.redirect if item.redirect else None,
-            "children": build_tree(item.id),
-        }
-        result.append(layout)
-    return result
-
-
 # Routes
 @router.post("/login", response_model=TokenResponse)
 async def login(
@@ -166,15 +141,18 @@ async def login(
         #         detail="验证码错误"
         #     )
 
+    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+    await login_throttle.check("admin", login_data.username, client_ip)
+
     admin = crud_sys_auth_admin.get_by_name(db, username=login_data.username)
-    if not admin or not admin.check_password(login_data.password):
-        client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+    if not admin or not await password_service.check_and_upgrade(admin, login_data.password):
+        await login_throttle.record_failure("admin", login_data.username, client_ip)
         handle_failed_login(admin, login_data.username, client_ip, db)
 
-    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
     access_token = handle_successful_login(
         admin, login_data.username, client_ip, db
     )
+    await login_throttle.reset("admin", login_data.username)
     return success_response({"access_token": access_token})
 
 
@@ -184,15 +162,18 @@ async def login_form(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db),
 ):
+    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+    await login_throttle.check("admin", form_data.username, client_ip)
+
     admin = crud_sys_auth_admin.get_by_name(db, username=form_data.username)
-    if not admin or not admin.check_password(form_data.password):
-        client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
+    if not admin or not await password_service.check_and_upgrade(admin, form_data.password):
+        await login_throttle.record_failure("admin", form_data.username, client_ip)
         handle_failed_login(admin, form_data.username, client_ip, db)
 
-    client_ip = getattr(request.client, 'host', 'unknown') if request.client else 'unknown'
     access_token = handle_successful_login(
         admin, form_data.username, client_ip, db
     )
+    await login_throttle.reset("admin", form_data.username)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -232,20 +213,18 @@ async def update_profile(
 
 @router.get("/access_code")
 async def get_access_codes(
-    admin: SysAdmin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    permissions: PermissionIndex = Depends(get_current_admin_permissions),
 ):
-    group = db.query(SysAdminGroup).filter(SysAdminGroup.id == admin.group_id).first()
-    return success_response(group.access if group else [])
+    return success_response(list(permissions.access))
 
 
 @router.get("/all_router")
 async def get_all_router(
-    admin: SysAdmin = Depends(get_current_admin), db: Session = Depends(get_db)
+    request: Request,
+    principal: Principal = Depends(get_current_admin_principal),
 ):
-    group = db.query(SysAdminGroup).filter(SysAdminGroup.id == admin.group_id).first()
-    items = crud_sys_admin_rule.get_all(db)
-    return success_response(transform_items(items))
+    entry = await menu_service.get("admin", principal.group_id)
+    return menu_service.response(entry, request.headers.get("if-none-match"))
 
 
 @router.post("/refresh_token", response_model=TokenResponse)
@@ -278,6 +257,15 @@ async def refresh_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # 只接受可吊销（带 jti）且未吊销的 token，已登出或已刷新过的 token 不能再换取新 token
+    jti = payload.get("jti")
+    if not jti or await revocation_store.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     admin = db.query(SysAdmin).filter(SysAdmin.id == user_id).first()
     if not admin:
         raise HTTPException(
@@ -289,21 +277,22 @@ async def refresh_token(
         data={"sub": admin.id},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
+    # 轮换：新 token 签发后吊销旧 token
+    revoke_token(payload)
 
     return success_response({"access_token": access_token})
 
 
 @router.post("/logout")
 async def logout(
-    admin: SysAdmin = Depends(get_current_admin),
-    db: Session = Depends(get_db),
+    request: Request,
+    principal: Principal = Depends(get_current_admin_principal),
 ):
     """
     用户登出
     """
-    # 清除用户的 token
-    admin.token = None
-    db.commit()
-    
-    logger.info(f"User {admin.username} logged out successfully")
+    # 吊销当前 token（按 jti 写入吊销表，不写数据库）
+    revoke_token(request.state.token_claims)
+
+    logger.info(f"User {principal.username} logged out successfully")
     return success_response({"message": "Logout successful"})
@@ -5,7 +5,7 @@
 from typing import Dict
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 from app.utils.responses import success_response
 from app.core.cache import delete_cached_pattern_sync
 from app.utils.log_utils import logger
@@ -27,7 +27,7 @@ def clear_analytics_cache_sync():
 router = APIRouter(
     prefix="/cache", 
     tags=["cache"],
-    dependencies=[Depends(get_current_admin)] 
+    dependencies=[Depends(get_current_admin_principal)] 
 )
 
 
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_general_category import crud_sys_general_category
 from app.schemas.sys_general_category import SysGeneralCategoryCreate, SysGeneralCategoryUpdate
 from app.utils.responses import success_response
@@ -12,7 +12,7 @@ from app.models.sys_general_category import SysGeneralCategory as SysGeneralCate
 
 # Initialize the API router for sys_general_category endpoints
 router = APIRouter(
-    prefix="/general/category", tags=["general_category"], dependencies=[Depends(get_current_admin)]
+    prefix="/general/category", tags=["general_category"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -23,6 +23,7 @@ def read_sys_general_category_list(
     per_page: int = 10,
     search: Optional[str] = None,
     orderby: Optional[str] = None,  # Sorting field and direction, e.g., "name_asc"
+    subtree_of: Optional[int] = None,  # Only return this node and its descendants
     db: Session = Depends(get_db)
 ):
     """
@@ -33,6 +34,7 @@ def read_sys_general_category_list(
         per_page (int, optional): Number of records per page. Use -1 to retrieve all records. Defaults to 10.
         search (str, optional): A search string to filter records by relevant fields.
         orderby (str, optional): Sorting rule, e.g., "field_asc" or "field_desc".
+        subtree_of (int, optional): Limit the result to this node and its descendants.
         db (Session): Database session dependency.
 
     Returns:
@@ -49,8 +51,11 @@ def read_sys_general_category_list(
     page = max(page, 1)
     
     # Retrieve paginated records with search and sorting
-    items = crud_sys_general_category.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby)
-    total = crud_sys_general_category.get_total(db, search=search)
+    # Restrict to one subtree through the closure index instead of loading the whole table
+    base_query = crud_sys_general_category.subtree_query(db, subtree_of) if subtree_of else None
+
+    items = crud_sys_general_category.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby, base_query=base_query)
+    total = crud_sys_general_category.get_total(db, search=search, base_query=base_query)
     
     response_page = page
     response_per_page = per_page
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_general_config import crud_sys_general_config
 from app.schemas.sys_general_config import SysGeneralConfigCreate, SysGeneralConfigUpdate
 from app.utils.responses import success_response
@@ -12,7 +12,7 @@ from app.models.sys_general_config import SysGeneralConfig as SysGeneralConfigMo
 
 # Initialize the API router for sys_general_config endpoints
 router = APIRouter(
-    prefix="/general/config", tags=["general_config"], dependencies=[Depends(get_current_admin)]
+    prefix="/general/config", tags=["general_config"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -0,0 +1,133 @@
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.dependencies.database import get_db
+from app.core.config import settings
+from app.core.permission import PermissionIndex, get_current_admin_permissions, require_permission
+from app.core.security import Principal, get_current_admin_principal
+from app.services.log_archive_service import log_archive_service
+from app.utils.responses import success_response
+from app.utils.response_handlers import ErrorCode
+
+# Initialize the API router for log archive endpoints
+router = APIRouter(
+    prefix="/log/archive", tags=["log_archive"], dependencies=[Depends(get_current_admin_principal)]
+)
+
+ArchiveTable = Literal['sys_admin_log', 'sys_user_balance_log', 'sys_user_score_log', 'sys_notification']
+
+# Set the maximum per_page limit
+MAX_PER_PAGE = 100
+
+# Rule paths guarding each archivable table; notifications only require a login, like their own API
+_ARCHIVE_RESOURCES = {
+    'sys_admin_log': "/admin/log",
+    'sys_user_balance_log': "/user/balance/log",
+    'sys_user_score_log': "/user/score/log",
+}
+_VIEW_PERMISSIONS = {table: require_permission(resource, "view") for table, resource in _ARCHIVE_RESOURCES.items()}
+_EDIT_PERMISSIONS = [require_permission(resource, "edit") for resource in _ARCHIVE_RESOURCES.values()]
+
+
+async def require_archive_view(
+    table: ArchiveTable,
+    principal: Principal = Depends(get_current_admin_principal),
+    index: PermissionIndex = Depends(get_current_admin_permissions),
+) -> Principal:
+    """
+    Check the view permission of the log table addressed by the query.
+
+    Args:
+        table (str): The archivable table name.
+        principal (Principal): The current admin.
+        index (PermissionIndex): Permission index of the admin's group.
+
+    Returns:
+        The current admin principal.
+    """
+    checker = _VIEW_PERMISSIONS.get(table)
+    if checker is None:
+        return principal
+    return await checker(principal=principal, index=index)
+
+
+async def require_archive_edit(
+    principal: Principal = Depends(get_current_admin_principal),
+    index: PermissionIndex = Depends(get_current_admin_permissions),
+) -> Principal:
+    """
+    Check the edit permission of every log table, since a run removes rows from all of them.
+
+    Args:
+        principal (Principal): The current admin.
+        index (PermissionIndex): Permission index of the admin's group.
+
+    Returns:
+        The current admin principal.
+    """
+    for checker in _EDIT_PERMISSIONS:
+        await checker(principal=principal, index=index)
+    return principal
+
+
+@router.get("/files", dependencies=[Depends(require_archive_view)])
+def read_log_archive_files(table: ArchiveTable):
+    """
+    List the archive files of a log table.
+
+    Args:
+        table (str): The archivable table name.
+
+    Returns:
+        JSON response containing the archived months with their id ranges and file sizes.
+    """
+    return success_response(log_archive_service.list_archives(table))
+
+
+@router.get("/query", dependencies=[Depends(require_archive_view)])
+def query_log_archive(
+    table: ArchiveTable,
+    start_month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    end_month: str = Query(..., pattern=r"^\d{4}-\d{2}$"),
+    page: int = 1,
+    per_page: int = 10,
+    search: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Query a month range of a log table, including months already moved to archive files.
+
+    Args:
+        table (str): The archivable table name.
+        start_month (str): First month of the range (inclusive), "YYYY-MM".
+        end_month (str): Last month of the range (inclusive), "YYYY-MM".
+        page (int, optional): The page number to retrieve. Defaults to 1.
+        per_page (int, optional): Number of records per page. Defaults to 10.
+        search (str, optional): A search string to filter records by relevant fields.
+        db (Session): Database session dependency.
+
+    Returns:
+        JSON response containing the list of records, total count, current page, and records per page.
+    """
+    per_page = min(per_page, MAX_PER_PAGE)
+    return success_response(
+        log_archive_service.query_range(
+            db, table, start_month, end_month, search=search, page=page, per_page=per_page
+        )
+    )
+
+
+@router.post("/run", dependencies=[Depends(require_archive_edit)])
+def run_log_archiver():
+    """
+    Run the log archiver immediately instead of waiting for the scheduled run.
+
+    Returns:
+        JSON response containing the number of archived rows per table.
+    """
+    if not settings.LOG_ARCHIVE_ENABLED:
+        raise HTTPException(
+            status_code=ErrorCode.BAD_REQUEST.value,
+            detail="Log archiving is disabled, set LOG_ARCHIVE_ENABLED to enable it.",
+        )
+    return success_response(log_archive_service.run_archiver())
@@ -7,7 +7,7 @@ from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 from app.dependencies.database import get_db
 from app.crud.sys_notification import crud_sys_notification
 from app.models.sys_notification import SysNotification
@@ -19,7 +19,7 @@ from app.utils.log_utils import logger
 router = APIRouter(
     prefix="/notifications", 
     tags=["notifications"],
-    dependencies=[Depends(get_current_admin)] 
+    dependencies=[Depends(get_current_admin_principal)] 
 )
 
 
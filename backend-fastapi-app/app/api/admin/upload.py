@@ -14,10 +14,10 @@ from app.core.config import settings
 from app.schemas.sys_admin import SysAdmin
 from app.core.security import get_current_admin
 from app.utils.log_utils import logger
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 
 router = APIRouter(
-    prefix="/upload", tags=["upload"], dependencies=[Depends(get_current_admin)]
+    prefix="/upload", tags=["upload"], dependencies=[Depends(get_current_admin_principal)]
 )
 
 # 在全局创建一个 Uploader 实例
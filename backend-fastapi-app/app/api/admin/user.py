@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
+from app.core.auth_cache import auth_cache
 from app.crud.sys_user import crud_sys_user
 from app.schemas.sys_user import SysUserCreate, SysUserUpdate
 from app.utils.responses import success_response
@@ -12,7 +13,7 @@ from app.models.sys_user import SysUser as SysUserModel
 
 # Initialize the API router for sys_user endpoints
 router = APIRouter(
-    prefix="/user", tags=["user"], dependencies=[Depends(get_current_admin)]
+    prefix="/user", tags=["user"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -124,6 +125,8 @@ def update_sys_user(id: int, obj_in: SysUserUpdate, db: Session = Depends(get_db
     updated_obj = crud_sys_user.update(
         db, db_obj=db_obj, obj_in=obj_in.model_dump(exclude_unset=True)
     )
+    # Drop cached authentication state of the affected accounts
+    auth_cache.invalidate("user", id)
     # Return the updated record's data as a dictionary
     return success_response(updated_obj.to_dict())
 @router.delete("/delete/{id}")
@@ -147,5 +150,6 @@ def delete_sys_user(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysUser not found."))
     # Remove the record from the database
     crud_sys_user.remove(db, id=id)
+    auth_cache.invalidate("user", id)
     # Return an empty success response
     return success_response({})
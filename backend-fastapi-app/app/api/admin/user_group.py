@@ -3,16 +3,18 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
+from app.core.auth_cache import auth_cache
 from app.crud.sys_user_group import crud_sys_user_group
 from app.schemas.sys_user_group import SysUserGroupCreate, SysUserGroupUpdate
+from app.services.menu_service import menu_service
 from app.utils.responses import success_response
 from app.utils.response_handlers import ErrorCode
 from app.models.sys_user_group import SysUserGroup as SysUserGroupModel
 
 # Initialize the API router for sys_user_group endpoints
 router = APIRouter(
-    prefix="/user/group", tags=["user_group"], dependencies=[Depends(get_current_admin)]
+    prefix="/user/group", tags=["user_group"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -110,6 +112,7 @@ def create_sys_user_group(obj_in: SysUserGroupCreate, db: Session = Depends(get_
         JSON response containing the ID of the newly created record.
     """
     ret = crud_sys_user_group.create(db, obj_in=obj_in)
+    menu_service.invalidate("user")
     # Return the ID of the inserted record
     return success_response({"insert_id": ret.id})
 @router.put("/update/{id}")
@@ -136,6 +139,9 @@ def update_sys_user_group(id: int, obj_in: SysUserGroupUpdate, db: Session = Dep
     updated_obj = crud_sys_user_group.update(
         db, db_obj=db_obj, obj_in=obj_in.model_dump(exclude_unset=True)
     )
+    menu_service.invalidate("user")
+    # Drop cached authentication state of the affected accounts
+    auth_cache.invalidate_group("user", id)
     # Return the updated record's data as a dictionary
     return success_response(updated_obj.to_dict())
 @router.delete("/delete/{id}")
@@ -159,5 +165,7 @@ def delete_sys_user_group(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysUserGroup not found."))
     # Remove the record from the database
     crud_sys_user_group.remove(db, id=id)
+    menu_service.invalidate("user")
+    auth_cache.invalidate_group("user", id)
     # Return an empty success response
     return success_response({})
@@ -0,0 +1,109 @@
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.dependencies.database import get_db
+from app.core.permission import PermissionIndex, get_current_admin_permissions, require_permission
+from app.core.security import Principal, get_current_admin_principal
+from app.services.ledger_service import LedgerAdjustment, LedgerError, LedgerUserNotFound, ledger_service
+from app.utils.responses import success_response
+from app.utils.response_handlers import ErrorCode
+
+# Initialize the API router for user ledger endpoints
+router = APIRouter(
+    prefix="/user/ledger", tags=["user_ledger"], dependencies=[Depends(get_current_admin_principal)]
+)
+
+# Set the maximum number of adjustments per batch request
+MAX_BATCH_SIZE = 10000
+
+# Adjusting a ledger requires the "add" permission on its log rule
+_LEDGER_PERMISSIONS = {
+    'balance': require_permission("/user/balance/log", "add"),
+    'score': require_permission("/user/score/log", "add"),
+}
+
+
+async def require_ledger_permission(
+    ledger: Literal['balance', 'score'],
+    principal: Principal = Depends(get_current_admin_principal),
+    index: PermissionIndex = Depends(get_current_admin_permissions),
+) -> Principal:
+    """
+    Check the permission of the ledger addressed by the path.
+
+    Args:
+        ledger (str): Ledger type, "balance" or "score".
+        principal (Principal): The current admin.
+        index (PermissionIndex): Permission index of the admin's group.
+
+    Returns:
+        The current admin principal.
+    """
+    return await _LEDGER_PERMISSIONS[ledger](principal=principal, index=index)
+
+
+def _apply(db: Session, ledger: str, items: List[LedgerAdjustment]) -> List[dict]:
+    """Apply adjustments and map ledger errors to HTTP errors."""
+    try:
+        return ledger_service.apply_batch(db, ledger, items)
+    except LedgerUserNotFound as e:
+        raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=str(e))
+    except LedgerError as e:
+        raise HTTPException(status_code=ErrorCode.BAD_REQUEST.value, detail=str(e))
+    except IntegrityError:
+        raise HTTPException(
+            status_code=ErrorCode.CONFLICT.value,
+            detail="Idempotency key is being applied by a concurrent request, retry later.",
+        )
+
+
+class LedgerBatchInput(BaseModel):
+    items: List[LedgerAdjustment] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+@router.post("/{ledger}/apply", dependencies=[Depends(require_ledger_permission)])
+def apply_user_ledger(
+    ledger: Literal['balance', 'score'],
+    obj_in: LedgerAdjustment,
+    db: Session = Depends(get_db),
+):
+    """
+    Atomically apply a single balance or score adjustment to a user.
+
+    Args:
+        ledger (str): Ledger type, "balance" or "score".
+        obj_in (LedgerAdjustment): The adjustment, with an optional idempotency key.
+        db (Session): Database session dependency.
+
+    Returns:
+        JSON response containing the before/after values of the adjustment.
+    """
+    result = _apply(db, ledger, [obj_in])[0]
+    return success_response(result)
+
+
+@router.post("/{ledger}/batch", dependencies=[Depends(require_ledger_permission)])
+def apply_user_ledger_batch(
+    ledger: Literal['balance', 'score'],
+    obj_in: LedgerBatchInput,
+    db: Session = Depends(get_db),
+):
+    """
+    Apply a batch of balance or score adjustments in a single transaction.
+
+    Args:
+        ledger (str): Ledger type, "balance" or "score".
+        obj_in (LedgerBatchInput): The adjustments to apply, in order.
+        db (Session): Database session dependency.
+
+    Returns:
+        JSON response containing per-item results and the number applied.
+    """
+    results = _apply(db, ledger, obj_in.items)
+    return success_response({
+        "items": results,
+        "applied": sum(1 for item in results if not item["duplicate"]),
+        "total": len(results),
+    })
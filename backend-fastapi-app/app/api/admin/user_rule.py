@@ -3,16 +3,17 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_user_rule import crud_sys_user_rule
 from app.schemas.sys_user_rule import SysUserRuleCreate, SysUserRuleUpdate
+from app.services.menu_service import menu_service
 from app.utils.responses import success_response
 from app.utils.response_handlers import ErrorCode
 from app.models.sys_user_rule import SysUserRule as SysUserRuleModel
 
 # Initialize the API router for sys_user_rule endpoints
 router = APIRouter(
-    prefix="/user/rule", tags=["user_rule"], dependencies=[Depends(get_current_admin)]
+    prefix="/user/rule", tags=["user_rule"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -23,6 +24,7 @@ def read_sys_user_rule_list(
     per_page: int = 10,
     search: Optional[str] = None,
     orderby: Optional[str] = None,  # Sorting field and direction, e.g., "name_asc"
+    subtree_of: Optional[int] = None,  # Only return this node and its descendants
     db: Session = Depends(get_db)
 ):
     """
@@ -33,6 +35,7 @@ def read_sys_user_rule_list(
         per_page (int, optional): Number of records per page. Use -1 to retrieve all records. Defaults to 10.
         search (str, optional): A search string to filter records by relevant fields.
         orderby (str, optional): Sorting rule, e.g., "field_asc" or "field_desc".
+        subtree_of (int, optional): Limit the result to this node and its descendants.
         db (Session): Database session dependency.
 
     Returns:
@@ -49,8 +52,11 @@ def read_sys_user_rule_list(
     page = max(page, 1)
     
     # Retrieve paginated records with search and sorting
-    items = crud_sys_user_rule.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby)
-    total = crud_sys_user_rule.get_total(db, search=search)
+    # Restrict to one subtree through the closure index instead of loading the whole table
+    base_query = crud_sys_user_rule.subtree_query(db, subtree_of) if subtree_of else None
+
+    items = crud_sys_user_rule.get_multi(db, page=page, per_page=per_page, search=search, orderby=orderby, base_query=base_query)
+    total = crud_sys_user_rule.get_total(db, search=search, base_query=base_query)
     
     response_page = page
     response_per_page = per_page
@@ -98,6 +104,7 @@ def create_sys_user_rule(obj_in: SysUserRuleCreate, db: Session = Depends(get_db
         JSON response containing the ID of the newly created record.
     """
     ret = crud_sys_user_rule.create(db, obj_in=obj_in)
+    menu_service.invalidate("user")
     # Return the ID of the inserted record
     return success_response({"insert_id": ret.id})
 @router.put("/update/{id}")
@@ -124,6 +131,7 @@ def update_sys_user_rule(id: int, obj_in: SysUserRuleUpdate, db: Session = Depen
     updated_obj = crud_sys_user_rule.update(
         db, db_obj=db_obj, obj_in=obj_in.model_dump(exclude_unset=True)
     )
+    menu_service.invalidate("user")
     # Return the updated record's data as a dictionary
     return success_response(updated_obj.to_dict())
 @router.delete("/delete/{id}")
@@ -147,5 +155,6 @@ def delete_sys_user_rule(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=ErrorCode.NOT_FOUND.value, detail=_("SysUserRule not found."))
     # Remove the record from the database
     crud_sys_user_rule.remove(db, id=id)
+    menu_service.invalidate("user")
     # Return an empty success response
     return success_response({})
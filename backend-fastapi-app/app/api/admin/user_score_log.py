@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.route_permission import authorize_admin_route
 from app.crud.sys_user_score_log import crud_sys_user_score_log
 from app.schemas.sys_user_score_log import SysUserScoreLogCreate, SysUserScoreLogUpdate
 from app.utils.responses import success_response
@@ -12,7 +12,7 @@ from app.models.sys_user_score_log import SysUserScoreLog as SysUserScoreLogMode
 
 # Initialize the API router for sys_user_score_log endpoints
 router = APIRouter(
-    prefix="/user/score/log", tags=["user_score_log"], dependencies=[Depends(get_current_admin)]
+    prefix="/user/score/log", tags=["user_score_log"], dependencies=[Depends(authorize_admin_route)]
 )
 
 # Set the maximum per_page limit
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.sql import text
 from app.dependencies.database import get_db, DatabaseConnectionError
+from app.core.security import get_current_admin_principal
 from sqlalchemy.orm import Session
 import time
 
@@ -61,3 +62,13 @@ async def check_connection_pool():
             "connection_pool": "error",
             "error": str(e)
         }
+
+@router.get("/health/password-hashing", dependencies=[Depends(get_current_admin_principal)])
+async def check_password_hashing():
+    """查看 bcrypt 线程池的排队和耗时统计（只对已登录的管理员开放）"""
+    from app.services.password_service import password_service
+    stats = password_service.stats()
+    return {
+        "status": "busy" if stats["pending"] >= stats["max_pending"] else "healthy",
+        **stats
+    }
@@ -1,6 +1,6 @@
 # Standard library imports
 from datetime import datetime, timedelta, timezone
-from typing import Annotated, Dict, List, Literal
+from typing import Annotated, Literal
 
 # Third-party imports
 from fastapi import APIRouter, HTTPException, status, Request, Depends
@@ -12,18 +12,23 @@ from sqlalchemy.orm import Session
 # Local application imports
 from app.core.captcha import verify_captcha
 from app.core.config import settings
+from app.core.login_throttle import login_throttle
 from app.core.security import (
+    Principal,
     decode_access_token,
     get_current_user,
+    get_current_user_principal,
+    revoke_token,
     verify_password,
     create_access_token,
 )
 from app.crud.sys_auth_user import crud_sys_auth_user
-from app.crud.sys_user_rule import crud_sys_user_rule
 from app.dependencies.database import get_db
-from app.models.sys_user_group import SysUserGroup
-from app.models.sys_user_rule import SysUserRule
 from app.schemas.sys_user import SysUser, SysUserCreate
+from app.services.analytics_rollup_service import analytics_rollup_service
+from app.services.login_activity_service import USER, login_activity_service
+from app.services.menu_service import menu_service
+from app.services.password_service import password_service
 from app.utils.log_utils import logger
 from app.utils.responses import success_response
 
@@ -99,18 +104,22 @@ async def login(
         TokenResponse: 包含access_token的响应
 
     Raises:
-        HTTPException: 用户名或密码错误时抛出401异常
+        HTTPException: 用户名或密码错误时抛出401异常，登录失败过于频繁时抛出429异常
     """
     client_ip = str(getattr(request.client, "host",
                     "127.0.0.1"))  # type: ignore
+    await login_throttle.check("user", login_data.username, client_ip)
     user = crud_sys_auth_user.get_by_name(db, username=login_data.username)
 
-    if not user or not user.check_password(login_data.password):
+    if not user or not await password_service.check_and_upgrade(user, login_data.password):
+        await login_throttle.record_failure("user", login_data.username, client_ip)
         if user:
+            last_login, login_time = user.login_time, datetime.now(timezone.utc)
             user.login_failure += 1
-            user.login_time = datetime.now(timezone.utc)
+            user.login_time = login_time
             user.login_ip = client_ip
             db.commit()
+            analytics_rollup_service.record_login(last_login, login_time, user.platform, success=False)
             logger.warning(
                 f"Failed login attempt for user: {login_data.username} from IP: {client_ip}. Failure count: {user.login_failure}"
             )
@@ -126,8 +135,9 @@ async def login(
         )
 
     # 登录成功处理
+    last_login, login_time = user.login_time, datetime.now(timezone.utc)
     user.login_failure = 0
-    user.login_time = datetime.now(timezone.utc)
+    user.login_time = login_time
     user.login_ip = client_ip
 
     access_token_expires = timedelta(
@@ -135,12 +145,14 @@ async def login(
     access_token = create_access_token(
         data={"sub": user.id}, expires_delta=access_token_expires
     )
-    user.token = access_token
     db.commit()
+    analytics_rollup_service.record_login(last_login, login_time, user.platform)
+    login_activity_service.record(USER, user.id, login_time)
 
     logger.info(
         f"User {login_data.username} logged in successfully from IP: {client_ip}"
     )
+    await login_throttle.reset("user", login_data.username)
 
     return success_response({"access_token": access_token})
 
@@ -162,20 +174,24 @@ async def login_form(
         TokenForm: 包含access_token和token_type的响应
 
     Raises:
-        HTTPException: 用户名或密码错误时抛出401异常
+        HTTPException: 用户名或密码错误时抛出401异常，登录失败过于频繁时抛出429异常
     """
     client_ip = request.client.host
     logger.info(
         f"Login attempt from IP: {client_ip} with username: {form_data.username}")
 
+    await login_throttle.check("user", form_data.username, client_ip)
     user = crud_sys_auth_user.get_by_name(db, username=form_data.username)
 
-    if not user or not user.check_password(form_data.password):
+    if not user or not await password_service.check_and_upgrade(user, form_data.password):
+        await login_throttle.record_failure("user", form_data.username, client_ip)
         if user:
+            last_login, login_time = user.login_time, datetime.now(timezone.utc)
             user.login_failure += 1
-            user.login_time = datetime.now(timezone.utc)
+            user.login_time = login_time
             user.login_ip = client_ip
             db.commit()
+            analytics_rollup_service.record_login(last_login, login_time, user.platform, success=False)
             logger.warning(
                 f"Failed login attempt for user: {form_data.username} from IP: {client_ip}. Failure count: {user.login_failure}"
             )
@@ -191,8 +207,9 @@ async def login_form(
         )
 
     # 登录成功处理
+    last_login, login_time = user.login_time, datetime.now(timezone.utc)
     user.login_failure = 0
-    user.login_time = datetime.now(timezone.utc)
+    user.login_time = login_time
     user.login_ip = client_ip
 
     access_token_expires = timedelta(
@@ -200,12 +217,14 @@ async def login_form(
     access_token = create_access_token(
         data={"sub": user.id}, expires_delta=access_token_expires
     )
-    user.token = access_token
     db.commit()
+    analytics_rollup_service.record_login(last_login, login_time, user.platform)
+    login_activity_service.record(USER, user.id, login_time)
 
     logger.info(
         f"User {form_data.username} logged in successfully from IP: {client_ip}"
     )
+    await login_throttle.reset("user", form_data.username)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -237,6 +256,7 @@ async def sms_login(
     access_token = create_access_token(
         data={"sub": user.id}, expires_delta=access_token_expires
     )
+    login_activity_service.record(USER, user.id)
 
     return success_response({
         "access_token": access_token,
@@ -283,6 +303,7 @@ async def qr_login(
     access_token = create_access_token(
         data={"sub": user.id}, expires_delta=access_token_expires
     )
+    login_activity_service.record(USER, user.id)
 
     return success_response({
         "access_token": access_token,
@@ -305,6 +326,7 @@ async def get_qr_code():
 @router.post("/register", response_model=TokenResponse)
 async def register(
     register_data: RegisterInput,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     # 检查用户名是否已存在
@@ -328,10 +350,13 @@ async def register(
         gender="male",
         score=0,
         platform=register_data.platform,
+        join_ip=str(getattr(request.client, "host", "127.0.0.1")),
         created_at=datetime.now(timezone.utc),
         updated_at=datetime.now(timezone.utc)
     )
-    user = crud_sys_auth_user.create(db, user_data)
+    password_hash = await password_service.hash(register_data.password)
+    user = crud_sys_auth_user.create(db, user_data, password_hash=password_hash)
+    analytics_rollup_service.notify()
 
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -368,7 +393,7 @@ async def forgot_password(
             detail="用户不存在"
         )
 
-    user.set_password(forgot_data.new_password)
+    await password_service.set_password(user, forgot_data.new_password)
     db.commit()
 
     return success_response({"message": "密码重置成功"})
@@ -406,13 +431,15 @@ async def social_login(
             created_at=datetime.now(timezone.utc),
             updated_at=datetime.now(timezone.utc)
         )
-        user = crud_sys_auth_user.create(db, user_data)
+        password_hash = await password_service.hash(user_data.password)
+        user = crud_sys_auth_user.create(db, user_data, password_hash=password_hash)
 
     access_token_expires = timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.id}, expires_delta=access_token_expires
     )
+    login_activity_service.record(USER, user.id)
 
     return success_response({
         "access_token": access_token,
@@ -461,46 +488,15 @@ async def update_profile(
 
 @router.get("/all_router")
 async def get_all_router(
-    current_user: SysUser = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    request: Request,
+    principal: Principal = Depends(get_current_user_principal),
 ):
-    group = db.query(SysUserGroup).filter(
-        SysUserGroup.id == current_user.user_group_id).first()
-    items = crud_sys_user_rule.get_all(db)
-    return success_response(transform_items(items))
-
-
-
-def transform_items(items: List[SysUserRule]) -> List[Dict]:
-    def build_tree(parent_id: int) -> List[Dict]:
-        children = []
-        for item in items:
-            if item.parent_id == parent_id:
-                child = {
-                    "id": item.id,
-                    "name": item.name,
-                    "path": f"/admin{item.path}",
-                    "component": item.component,
-                    "meta": item.meta,
-                }
-                child_children = build_tree(item.id)
-                if child_children:
-                    child["children"] = child_children
-                children.append(child)
-        return children
-
-    result = []
-    for item in (item for item in items if item.parent_id == 0):
-        layout = {
-            "id": item.id,
-            "meta": item.meta,
-            "name": item.name,
-            "path": f"/admin{item.path}",
-            "redirect": item.redirect if item.redirect else None,
-            "children": build_tree(item.id),
-        }
-        result.append(layout)
-    return result
+    """当前用户所在分组的前端路由（菜单）
+
+    菜单按分组预先生成并缓存，客户端携带 If-None-Match 且内容未变化时返回 304
+    """
+    entry = await menu_service.get("user", principal.group_id)
+    return menu_service.response(entry, request.headers.get("if-none-match"))
 
 
 @router.post("/logout")
@@ -538,15 +534,10 @@ async def logout(
                 detail="无效的用户ID"
             )
 
-        # 获取用户并清除令牌
-        user = crud_sys_auth_user.get(db, id=user_id)
-        if user and user.token:
-            user.token = None
-            db.commit()
-            logger.info(f"User {user.username} logged out successfully")
-            return success_response({"message": "登出成功"})
-
-        return success_response({"message": "用户未登录或已登出"})
+        # 吊销当前 token（按 jti 写入吊销表，不写数据库）
+        revoke_token(payload)
+        logger.info(f"User {user_id} logged out successfully")
+        return success_response({"message": "登出成功"})
 
     except HTTPException:
         raise
@@ -0,0 +1,138 @@
+# app/core/auth_cache.py
+"""
+已验证 token 与身份快照缓存
+
+以 token 的 SHA-256 摘要为键，缓存 JWT 校验后的 claims 和身份快照（Principal），
+有效期到 token 过期为止，常见情况下认证不需要任何 JWT 校验和数据库查询。
+
+失效机制：管理员/用户被修改、删除、登出或所在分组变化时，为对应的主体或分组记录一个失效时间戳，
+早于该时间戳缓存的条目一律作废。时间戳同时写入 cache_manager，
+其他 worker 最多在 AUTH_CACHE_SYNC_INTERVAL 秒内感知到失效；多 worker 部署必须使用 Redis 缓存（见 check_shared_cache）。
+本地只保留最近用到的 AUTH_CACHE_SIZE 个时间戳，淘汰后从 cache_manager 重新读取。
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from app.core.cache import cache_manager, run_cache_coroutine
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+
+class _Entry(NamedTuple):
+    principal: Any
+    claims: Dict
+    expires_at: float
+    cached_at: float
+
+
+def _epoch_key(scope: str, id: int) -> str:
+    return f"auth:epoch:{scope}:{id}"
+
+
+class AuthCache:
+    """有界 LRU 的 token -> (claims, Principal) 缓存"""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 失效时间戳的有界 LRU：scope:id -> (timestamp, 最近一次从共享缓存读取的时间)
+        self._epochs: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize or settings.AUTH_CACHE_SIZE
+
+    @staticmethod
+    def digest(kind: str, token: str) -> str:
+        return f"{kind}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    def _remember_epoch(self, key: str, epoch: float, checked_at: float) -> float:
+        with self._lock:
+            previous = self._epochs.get(key)
+            # 本 worker 刚发布、共享缓存尚未写入的时间戳不能被旧值覆盖
+            if previous is not None:
+                epoch = max(epoch, previous[0])
+            self._epochs[key] = (epoch, checked_at)
+            self._epochs.move_to_end(key)
+            while len(self._epochs) > self.maxsize:
+                self._epochs.popitem(last=False)
+        return epoch
+
+    async def _epoch(self, scope: str, id: int) -> float:
+        key = _epoch_key(scope, id)
+        now = time.time()
+        with self._lock:
+            cached = self._epochs.get(key)
+            if cached is not None:
+                self._epochs.move_to_end(key)
+        if cached is not None and now - cached[1] < settings.AUTH_CACHE_SYNC_INTERVAL:
+            return cached[0]
+        value = await cache_manager.get(key)
+        return self._remember_epoch(key, float(value) if value else 0.0, now)
+
+    async def get(self, kind: str, token: str) -> Optional[Tuple[Any, Dict]]:
+        """
+        查询已验证的 token
+
+        Args:
+            kind: "admin" 或 "user"
+            token: 原始 JWT
+
+        Returns:
+            (Principal 快照, claims)；未缓存、已过期或已失效时返回 None
+        """
+        digest = self.digest(kind, token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self.discard(kind, token)
+            return None
+        principal = entry.principal
+        if (await self._epoch(kind, principal.id) >= entry.cached_at
+                or await self._epoch(f"{kind}_group", principal.group_id) >= entry.cached_at):
+            self.discard(kind, token)
+            return None
+        return principal, entry.claims
+
+    def put(self, kind: str, token: str, claims: Dict, principal: Any) -> None:
+        """缓存一个刚验证通过的 token"""
+        expires_at = float(claims.get("exp") or time.time() + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+        entry = _Entry(principal, claims, expires_at, time.time())
+        digest = self.digest(kind, token)
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, kind: str, token: str) -> None:
+        with self._lock:
+            self._entries.pop(self.digest(kind, token), None)
+
+    def _invalidate(self, scope: str, id: int) -> None:
+        key = _epoch_key(scope, id)
+        now = time.time()
+        self._remember_epoch(key, now, now)
+        try:
+            run_cache_coroutine(cache_manager.set(key, now, expire=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60))
+        except Exception as e:
+            logger.warning(f"AuthCache: failed to publish invalidation {key}: {e}")
+
+    def invalidate(self, kind: str, id: int) -> None:
+        """使某个管理员/用户的全部缓存 token 失效（修改、删除、登出时调用）"""
+        self._invalidate(kind, id)
+
+    def invalidate_group(self, kind: str, group_id: int) -> None:
+        """使某个分组下全部管理员/用户的缓存 token 失效"""
+        self._invalidate(f"{kind}_group", group_id)
+
+
+auth_cache = AuthCache()
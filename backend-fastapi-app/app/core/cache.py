@@ -56,6 +56,19 @@ class SimpleCache:
         except Exception as e:
             logger.warning(f"SimpleCache: Failed to delete key {key}: {e}")
     
+    async def incr(self, key: str, expire: int = 300) -> int:
+        """计数加一并返回新值，键不存在或已过期时从 1 开始并设置过期时间"""
+        try:
+            if key in self._cache and time.time() < self._expire_times.get(key, 0):
+                self._cache[key] = int(self._cache[key]) + 1
+            else:
+                self._cache[key] = 1
+                self._expire_times[key] = time.time() + expire
+            return self._cache[key]
+        except Exception as e:
+            logger.warning(f"SimpleCache: Failed to incr key {key}: {e}")
+            return 0
+    
     async def delete_pattern(self, pattern: str):
         """按模式删除缓存数据"""
         try:
@@ -116,6 +129,19 @@ class RedisCache:
         except Exception as e:
             logger.warning(f"RedisCache: Failed to delete key {key}: {e}")
     
+    async def incr(self, key: str, expire: int = 300) -> int:
+        """计数加一并返回新值（INCR 原子递增，同时刷新过期时间）"""
+        try:
+            client = await self.get_client()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, expire)
+                value, _ = await pipe.execute()
+            return int(value)
+        except Exception as e:
+            logger.warning(f"RedisCache: Failed to incr key {key}: {e}")
+            return 0
+    
     async def delete_pattern(self, pattern: str):
         """按模式删除缓存数据"""
         try:
@@ -163,6 +189,11 @@ class CacheManager:
         cache = await self._get_cache()
         await cache.delete(key)
     
+    async def incr(self, key: str, expire: int = 300) -> int:
+        """计数加一并返回新值"""
+        cache = await self._get_cache()
+        return await cache.incr(key, expire)
+    
     async def delete_pattern(self, pattern: str):
         """按模式删除缓存数据"""
         cache = await self._get_cache()
@@ -207,6 +238,25 @@ def delete_cached_pattern_sync(pattern: str):
         logger.warning(f"Failed to delete cached pattern synchronously: {e}")
 
 
+def run_cache_coroutine(coro) -> None:
+    """
+    在同步代码中执行缓存写入（不等待结果）
+
+    事件循环线程内投递为任务；FastAPI 线程池中回到事件循环执行，避免 Redis 客户端跨事件循环；
+    其他情况（脚本、后台线程）直接运行
+    """
+    try:
+        asyncio.get_running_loop().create_task(coro)
+        return
+    except RuntimeError:
+        pass
+    try:
+        from anyio import from_thread
+        from_thread.run(lambda: coro)
+    except RuntimeError:
+        asyncio.run(coro)
+
+
 # 保留原有的 get_redis 函数用于向后兼容
 async def get_redis():
     """获取Redis客户端连接（向后兼容）"""
@@ -0,0 +1,179 @@
+# app/core/columnar.py
+"""
+列式快照文件
+
+一个表的快照是一个目录，每列一个 .npy 文件，读取时以只读方式 mmap，多个 worker 进程共享同一份页缓存：
+
+    <表目录>/CURRENT                 当前版本的目录名
+    <表目录>/<版本>/manifest.json    行数、生成时间、水位和各列类型
+    <表目录>/<版本>/<列>.npy         列数据
+    <表目录>/<版本>/<列>.dict.json   字典编码列的字典（字符串列表）
+
+列类型：
+    int    int64
+    float  float64，空值为 NaN
+    time   datetime64[s]（UTC），空值为 NaT
+    dict   int32 字典序号，空值为 -1
+
+新版本写入临时目录后重命名，再替换 CURRENT，读取方看到的总是完整的版本；只保留当前和上一个版本。
+"""
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+INT = "int"
+FLOAT = "float"
+TIME = "time"
+DICT = "dict"
+
+DTYPES = {INT: np.int64, FLOAT: np.float64, TIME: "datetime64[s]", DICT: np.int32}
+
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+
+
+class DictionaryEncoder:
+    """字符串列的字典编码，追加写入时沿用已有字典，已有值的序号不变"""
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = list(values)
+        self._codes: Dict[str, int] = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, items: Iterable[Optional[str]]) -> np.ndarray:
+        codes = self._codes
+        result = []
+        for item in items:
+            if item is None:
+                result.append(-1)
+                continue
+            code = codes.get(item)
+            if code is None:
+                code = codes[item] = len(self.values)
+                self.values.append(item)
+            result.append(code)
+        return np.array(result, dtype=np.int32)
+
+
+def to_array(kind: str, items: Sequence) -> np.ndarray:
+    """把一批 Python 值（可能含 None）转换为对应类型的列数据（字典编码列使用 DictionaryEncoder）"""
+    if kind == INT:
+        return np.array([item or 0 for item in items], dtype=np.int64)
+    if kind == FLOAT:
+        return np.array([np.nan if item is None else float(item) for item in items], dtype=np.float64)
+    if kind == TIME:
+        return np.array([
+            None if item is None else (item.astimezone(timezone.utc).replace(tzinfo=None) if item.tzinfo else item)
+            for item in items
+        ], dtype="datetime64[s]")
+    raise ValueError(f"Columnar: unsupported column kind {kind}")
+
+
+class ColumnarSnapshot:
+    """mmap 打开的一个快照版本，只读"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.table: str = manifest["table"]
+        self.rows: int = manifest["rows"]
+        self.built_at: str = manifest["built_at"]
+        self.watermark: int = manifest["watermark"]
+        self.kinds: Dict[str, str] = manifest["columns"]
+        # 空文件无法 mmap，没有数据行时直接读入
+        mmap_mode = "r" if self.rows else None
+        self._columns = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in self.kinds
+        }
+        self._dictionaries: Dict[str, List[str]] = {}
+        for name, kind in self.kinds.items():
+            if kind == DICT:
+                with open(os.path.join(path, f"{name}.dict.json"), encoding="utf-8") as f:
+                    self._dictionaries[name] = json.load(f)
+
+    def column(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def dictionary(self, name: str) -> List[str]:
+        return self._dictionaries[name]
+
+    def info(self) -> Dict:
+        return {"table": self.table, "rows": self.rows, "built_at": self.built_at, "columns": dict(self.kinds)}
+
+
+def write_snapshot(table_dir: str, table: str, columns: Dict[str, np.ndarray], kinds: Dict[str, str],
+                   dictionaries: Dict[str, List[str]], watermark: int) -> str:
+    """
+    写入一个新版本并设为当前版本
+
+    Args:
+        table_dir: 表目录
+        table: 表名
+        columns: {列名: 列数据}，长度必须相同
+        kinds: {列名: 列类型}
+        dictionaries: {字典编码列名: 字典}
+        watermark: 已包含的最大主键
+
+    Returns:
+        新版本的目录
+    """
+    rows = {len(values) for values in columns.values()}
+    if len(rows) > 1:
+        raise ValueError(f"Columnar: column lengths differ for {table}: {sorted(rows)}")
+    os.makedirs(table_dir, exist_ok=True)
+    built_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    version = built_at.strftime("%Y%m%d%H%M%S%f")
+    path = os.path.join(table_dir, version)
+    tmp_path = f"{path}.tmp"
+    os.makedirs(tmp_path)
+    try:
+        for name, kind in kinds.items():
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(columns[name], dtype=DTYPES[kind]))
+            if kind == DICT:
+                with open(os.path.join(tmp_path, f"{name}.dict.json"), "w", encoding="utf-8") as f:
+                    json.dump(dictionaries[name], f, ensure_ascii=False)
+        with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({
+                "table": table,
+                "rows": rows.pop() if rows else 0,
+                "built_at": built_at.isoformat(timespec="seconds"),
+                "watermark": watermark,
+                "columns": kinds,
+            }, f, ensure_ascii=False)
+        os.rename(tmp_path, path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    previous = current_version(table_dir)
+    current_tmp = os.path.join(table_dir, f"{CURRENT}.tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(current_tmp, os.path.join(table_dir, CURRENT))
+
+    # 其他进程可能仍在读取上一个版本，更早的版本删除
+    for name in os.listdir(table_dir):
+        if name not in (version, previous, CURRENT) and os.path.isdir(os.path.join(table_dir, name)):
+            shutil.rmtree(os.path.join(table_dir, name), ignore_errors=True)
+    return path
+
+
+def current_version(table_dir: str) -> Optional[str]:
+    """当前版本的目录名，尚未生成快照时返回 None"""
+    try:
+        with open(os.path.join(table_dir, CURRENT), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_snapshot(table_dir: str) -> Optional[ColumnarSnapshot]:
+    """打开当前版本，尚未生成快照时返回 None"""
+    version = current_version(table_dir)
+    if version is None:
+        return None
+    return ColumnarSnapshot(os.path.join(table_dir, version))
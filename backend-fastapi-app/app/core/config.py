@@ -17,6 +17,21 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your_secret_key_here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7天
+    AUTH_CACHE_SIZE: int = 10000  # 已验证 token 缓存条数上限
+    AUTH_CACHE_SYNC_INTERVAL: int = 5  # 多 worker 间认证缓存失效的最大同步延迟（秒）
+    PASSWORD_BCRYPT_ROUNDS: int = 12  # bcrypt cost，登录成功时自动把旧哈希升级到该值
+    PASSWORD_HASH_WORKERS: int = 2  # bcrypt 专用线程数
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 排队 + 执行中的 bcrypt 任务上限，超出返回 503
+    LOGIN_THROTTLE_ENABLED: bool = True  # 登录失败限流开关
+    LOGIN_THROTTLE_WINDOW: int = 300  # 失败计数滑动窗口（秒）
+    LOGIN_THROTTLE_IP_LIMIT: int = 20  # 单个 IP 窗口内失败次数上限
+    LOGIN_THROTTLE_USERNAME_LIMIT: int = 10  # 单个用户名窗口内失败次数上限
+    LOGIN_THROTTLE_GLOBAL_LIMIT: int = 1000  # 全局窗口内失败次数上限，超出后拒绝已有失败记录的 IP
+    LOGIN_THROTTLE_DELAY_AFTER: int = 3  # 失败多少次后开始逐次延迟
+    LOGIN_THROTTLE_DELAY_BASE: float = 0.5  # 首次延迟（秒），之后每次失败翻倍
+    LOGIN_THROTTLE_DELAY_MAX: float = 8.0  # 单次延迟上限（秒）
+    MENU_CACHE_TTL: int = 86400  # 分组菜单缓存有效期（秒），缓存键包含规则表和分组表版本，表变化后不再命中旧菜单
+    HIERARCHY_INDEX_ENABLED: bool = True  # 为层级表维护闭包索引（sys_tree_closure），子树/祖先查询直接走 SQL
     
     REDIS_URL: RedisURL = "redis://localhost:6379/0"
     
@@ -56,7 +71,56 @@ class Settings(BaseSettings):
     # ----------------------------------------
     CACHE_TYPE: str = "simple"  # "simple" 或 "redis"
     REDIS_URL: RedisURL = "redis://localhost:6379/0"
-    
+    WEB_CONCURRENCY: int = 1  # worker 进程数，与 uvicorn 读取同一个环境变量；大于 1 时必须使用 redis 缓存
+
+    # ----------------------------------------
+    # 日志归档配置
+    # ----------------------------------------
+    LOG_ARCHIVE_ENABLED: bool = False  # 归档会从数据库中移除冷数据，需显式开启
+    LOG_ARCHIVE_DIR: str = "./archive"
+    LOG_HOT_MONTHS: int = 3  # 数据库中保留的月份数（含当月），更早的数据归档到本地文件
+    LOG_ARCHIVE_INTERVAL: int = 86400  # 归档任务运行间隔（秒）
+    LOG_ARCHIVE_DELETE_UNPARTITIONED: bool = False  # 未按 log_partitions.sql 分区的表是否也导出后逐行删除
+
+    # ----------------------------------------
+    # 操作日志异步写入配置
+    # ----------------------------------------
+    AUDIT_LOG_BATCH_SIZE: int = 200  # 单批最多写入条数
+    AUDIT_LOG_FLUSH_INTERVAL: float = 1.0  # 攒批最长等待时间（秒）
+    AUDIT_LOG_QUEUE_SIZE: int = 10000  # 内存队列上限，超出后写入本地 spool
+    AUDIT_SPOOL_DIR: str = "./spool/audit"  # 数据库不可用时审计日志的本地落盘目录
+    AUDIT_SPOOL_SEGMENT_SIZE: int = 16 * 1024 * 1024  # 单个 spool 段文件大小上限
+    AUDIT_SPOOL_REPLAY_INTERVAL: int = 30  # spool 回放检查间隔（秒）
+
+    # ----------------------------------------
+    # 分析数据预聚合配置
+    # ----------------------------------------
+    ANALYTICS_ROLLUP_ENABLED: bool = True  # 后台增量汇总注册、登录、访问计数到 sys_analytics_rollup
+    ANALYTICS_ROLLUP_INTERVAL: int = 60  # 增量汇总任务运行间隔（秒）
+    ANALYTICS_ROLLUP_BATCH_SIZE: int = 5000  # 每批读取的新增行数
+    ANALYTICS_ROLLUP_SETTLE_SECONDS: int = 5  # 只汇总写入超过该秒数的行，避免漏掉尚未提交的较小 id
+    ANALYTICS_ROLLUP_RECONCILE_INTERVAL: int = 3600  # 用户数和最后登录分布的校准间隔（秒）
+    ANALYTICS_ROLLUP_HOURLY_RETENTION_DAYS: int = 30  # 小时粒度计数保留天数
+    ANALYTICS_SNAPSHOT_FLUSH_INTERVAL: int = 30  # 汇总快照从进程内缓冲写入 sys_analytics_summary 的间隔（秒）
+    ANALYTICS_DASHBOARD_CONCURRENCY: int = 4  # /analytics/dashboard 同时计算的面板数（占用的数据库连接数）
+    ANALYTICS_DASHBOARD_PANEL_TIMEOUT: float = 10  # 单个面板的超时时间（秒），超时的面板返回空数据
+    LOGIN_ACTIVITY_FLUSH_INTERVAL: int = 10  # 登录用户草图从进程内写入 sys_login_sketch 的间隔（秒）
+    LOGIN_ACTIVITY_DAY_RETENTION: int = 400  # 日草图保留天数（周、月草图不清理）
+    COLUMNAR_SNAPSHOT_ENABLED: bool = True  # 定时把 sys_admin_log、sys_user 导出为列式快照，供 /analytics/adhoc 查询
+    COLUMNAR_SNAPSHOT_DIR: str = "./data/columnar"  # 列式快照目录
+    COLUMNAR_SNAPSHOT_INTERVAL: int = 3600  # 导出间隔（秒）
+    COLUMNAR_SNAPSHOT_BATCH_SIZE: int = 20000  # 导出时每批读取的行数
+    COLUMNAR_SNAPSHOT_SETTLE_SECONDS: int = 5  # 只追加的表只导出写入超过该秒数的行，避免漏掉尚未提交的较小 id
+
+    # ----------------------------------------
+    # IP 地区库配置
+    # ----------------------------------------
+    GEOIP_DB_PATH: str = "./data/geoip.dat"  # 离线地区库文件，由 geoip_build.py 导入
+    GEOIP_CACHE_SIZE: int = 65536  # 进程内缓存的地址查询结果数
+    USER_REGION_BACKFILL_ENABLED: bool = True  # 启动后为没有地区记录的存量用户补齐注册地区
+    USER_REGION_BACKFILL_RATE: int = 2000  # 补齐任务每秒最多解析的用户数
+    USER_REGION_BACKFILL_BATCH_SIZE: int = 500  # 补齐任务每批处理的用户数
+
     # ----------------------------------------
     # Swagger UI 配置
     # ----------------------------------------
@@ -47,6 +47,22 @@ def check_environment() -> bool:
     return True
 
 
+def check_shared_cache() -> None:
+    """
+    检查多 worker 部署的缓存配置
+
+    认证缓存失效、token 吊销、登录限流计数和权限版本号都保存在 cache_manager 中，
+    simple 缓存只在单个进程内可见，worker 数大于 1 时必须使用 Redis，否则拒绝启动。
+    worker 数只从 WEB_CONCURRENCY 读取，部署时应通过该变量而不是 uvicorn 的 --workers 参数设置
+    """
+    from app.core.config import settings
+    if settings.WEB_CONCURRENCY > 1 and settings.CACHE_TYPE.lower() != "redis":
+        message = (f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} 需要 CACHE_TYPE=redis，"
+                   f"simple 缓存无法在多个 worker 之间共享认证状态")
+        logger.error(message)
+        raise RuntimeError(message)
+
+
 def is_application_installed() -> bool:
     """
     检查应用是否已安装
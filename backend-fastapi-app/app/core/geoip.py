@@ -0,0 +1,280 @@
+# app/core/geoip.py
+"""
+离线 IP 归属地查询
+
+地区库是按起始地址排序、互不重叠的 IPv4 区间表，存为一个二进制文件（由 geoip_build.py 从 CSV / ip2region 文本导入）：
+
+    头部    MAGIC(4) 版本(uint32) 区间数 n(uint32) 地区数 m(uint32)
+    starts  n 个 uint32，区间起始地址，升序
+    ends    n 个 uint32，区间结束地址（含）
+    regions n 个 uint32，区间对应的地区序号
+    names   m 个地区名称，UTF-8，以 \\n 分隔
+
+文件以只读方式 mmap，starts 直接作为 uint32 数组用 bisect 二分查找，不需要把整个库读入内存，
+多个 worker 进程共享同一份页缓存。回环、内网等保留地址不查库，直接返回固定名称；
+查询结果经过 LRU 缓存，resolve_many() 对一批地址去重后统一查找。
+"""
+import bisect
+import ipaddress
+import mmap
+import os
+import socket
+import struct
+import sys
+import threading
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+MAGIC = b"ZGEO"
+VERSION = 1
+HEADER = struct.Struct("<4sIII")
+
+UNKNOWN = "未知地区"
+LOCAL = "本地访问"
+PRIVATE = "内网访问"
+
+
+class GeoIPDatabase:
+    """mmap 打开的区间表，构建后只读"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, name_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"不是有效的地区库文件: {path}")
+        offset = HEADER.size
+        size = count * 4
+        self._starts = self._uint32_array(offset, count)
+        self._ends = self._uint32_array(offset + size, count)
+        self._regions = self._uint32_array(offset + size * 2, count)
+        names = bytes(self._mmap[offset + size * 3:]).decode("utf-8")
+        self.names: Tuple[str, ...] = tuple(names.split("\n")) if name_count else ()
+        self.size = count
+
+    def _uint32_array(self, offset: int, count: int):
+        view = memoryview(self._mmap)[offset:offset + count * 4]
+        if sys.byteorder == "little":
+            return view.cast("I")
+        # 文件按小端存储，大端机器上复制一份并转换字节序
+        values = array("I", view.tobytes())
+        values.byteswap()
+        return values
+
+    def lookup(self, value: int) -> Optional[str]:
+        """按整数形式的 IPv4 地址查找地区，不在任何区间内时返回 None"""
+        index = bisect.bisect_right(self._starts, value) - 1
+        if index < 0 or value > self._ends[index]:
+            return None
+        return self.names[self._regions[index]]
+
+    def lookup_sorted(self, values: List[int]) -> List[Optional[str]]:
+        """按升序的一批地址查找地区，每次只在上一个结果之后的区间中二分"""
+        results: List[Optional[str]] = []
+        low = 0
+        for value in values:
+            index = bisect.bisect_right(self._starts, value, low) - 1
+            if index < 0 or value > self._ends[index]:
+                results.append(None)
+            else:
+                results.append(self.names[self._regions[index]])
+            low = max(index, 0)
+        return results
+
+    def close(self) -> None:
+        for values in (self._starts, self._ends, self._regions):
+            if isinstance(values, memoryview):
+                values.release()
+        self._mmap.close()
+
+
+def build_database(ranges: Iterable[Tuple[int, int, str]], path: str) -> int:
+    """
+    把 (起始地址, 结束地址, 地区) 区间写成地区库文件
+
+    区间会按起始地址排序，重叠部分以先出现的区间为准，相邻且地区相同的区间合并。
+    写入临时文件后替换，运行中的进程在 reload() 之前继续使用旧文件。
+
+    Returns:
+        写入的区间数
+    """
+    merged: List[List] = []
+    for start, end, region in sorted(ranges, key=lambda item: item[0]):
+        region = (region or "").strip().replace("\n", " ")
+        if not region or end < start:
+            continue
+        if merged and start <= merged[-1][1]:
+            # 与上一个区间重叠，只保留未覆盖的部分
+            start = merged[-1][1] + 1
+            if start > end:
+                continue
+        if merged and merged[-1][2] == region and start == merged[-1][1] + 1:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end, region])
+
+    names: Dict[str, int] = {}
+    starts, ends, regions = array("I"), array("I"), array("I")
+    for start, end, region in merged:
+        starts.append(start)
+        ends.append(end)
+        regions.append(names.setdefault(region, len(names)))
+    if sys.byteorder != "little":
+        for values in (starts, ends, regions):
+            values.byteswap()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(merged), len(names)))
+        for values in (starts, ends, regions):
+            f.write(values.tobytes())
+        f.write("\n".join(names).encode("utf-8"))
+    os.replace(tmp_path, path)
+    return len(merged)
+
+
+# 不查库的 IPv4 保留地址（与 ipaddress 的 is_loopback / is_private / is_link_local 一致），按起始地址排序
+RESERVED_V4 = sorted(
+    (int(network.network_address), int(network.broadcast_address), name)
+    for network, name in (
+        (ipaddress.ip_network(cidr), LOCAL if cidr.startswith("127.") else PRIVATE)
+        for cidr in (
+            "0.0.0.0/8", "10.0.0.0/8", "127.0.0.0/8", "169.254.0.0/16", "172.16.0.0/12", "192.0.0.0/29",
+            "192.0.0.170/31", "192.0.2.0/24", "192.168.0.0/16", "198.18.0.0/15", "198.51.100.0/24",
+            "203.0.113.0/24", "240.0.0.0/4",
+        )
+    )
+)
+_RESERVED_STARTS = [start for start, _, _ in RESERVED_V4]
+_IPV4 = struct.Struct("!I")
+
+
+def _reserved_v4(value: int) -> Optional[str]:
+    index = bisect.bisect_right(_RESERVED_STARTS, value) - 1
+    if index >= 0 and value <= RESERVED_V4[index][1]:
+        return RESERVED_V4[index][2]
+    return None
+
+
+def _reserved_v6(address) -> Optional[str]:
+    if address.is_loopback:
+        return LOCAL
+    if address.is_private or address.is_link_local:
+        return PRIVATE
+    return None
+
+
+class GeoIPResolver:
+    """地区查询入口：保留地址判断 + 地区库 + LRU 缓存"""
+
+    def __init__(self):
+        self._db: Optional[GeoIPDatabase] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._cached = lru_cache(maxsize=settings.GEOIP_CACHE_SIZE)(self._resolve)
+
+    def _database(self) -> Optional[GeoIPDatabase]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._db = self._open(settings.GEOIP_DB_PATH)
+                    self._loaded = True
+        return self._db
+
+    @staticmethod
+    def _open(path: str) -> Optional[GeoIPDatabase]:
+        if not os.path.exists(path):
+            logger.warning(f"GeoIP: database {path} not found, public addresses resolve to {UNKNOWN}")
+            return None
+        try:
+            database = GeoIPDatabase(path)
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"GeoIP: failed to open {path}: {e}")
+            return None
+        logger.info(f"GeoIP: loaded {database.size} ranges, {len(database.names)} regions from {path}")
+        return database
+
+    def reload(self) -> None:
+        """
+        重新打开地区库文件（导入新库后调用）
+
+        旧文件不主动关闭：其他线程可能正在查询，最后一个引用释放时 mmap 随之关闭
+        """
+        with self._lock:
+            self._db = self._open(settings.GEOIP_DB_PATH)
+            self._loaded = True
+            self._cached.cache_clear()
+
+    @staticmethod
+    def _parse(ip: str) -> Tuple[Optional[int], Optional[str]]:
+        """返回 (IPv4 整数地址, 无需查库的结果)"""
+        ip = (ip or "").strip()
+        try:
+            # 绝大多数是 IPv4，inet_pton 只接受标准点分形式
+            value = _IPV4.unpack(socket.inet_pton(socket.AF_INET, ip))[0]
+        except OSError:
+            if not ip:
+                return None, UNKNOWN
+            if ip == "localhost":
+                return None, LOCAL
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                return None, UNKNOWN
+            if address.version == 4 or address.ipv4_mapped is None:
+                return None, _reserved_v6(address) or UNKNOWN
+            value = int(address.ipv4_mapped)
+        reserved = _reserved_v4(value)
+        if reserved:
+            return None, reserved
+        return value, None
+
+    def _resolve(self, ip: str) -> str:
+        value, fixed = self._parse(ip)
+        if fixed is not None:
+            return fixed
+        database = self._database()
+        return (database.lookup(value) if database else None) or UNKNOWN
+
+    def resolve(self, ip: Optional[str]) -> str:
+        """查询单个地址的地区，无法确定时返回“未知地区”"""
+        return self._cached(ip or "")
+
+    def resolve_many(self, ips: Iterable[Optional[str]]) -> Dict[str, str]:
+        """
+        批量查询地区
+
+        Returns:
+            去重后的 {地址: 地区}
+        """
+        results: Dict[str, str] = {}
+        pending: List[Tuple[int, str]] = []
+        for ip in ips:
+            ip = ip or ""
+            if ip in results:
+                continue
+            value, fixed = self._parse(ip)
+            if fixed is not None:
+                results[ip] = fixed
+            else:
+                results[ip] = UNKNOWN
+                pending.append((value, ip))
+        database = self._database()
+        if database is not None and pending:
+            pending.sort()
+            regions = database.lookup_sorted([value for value, _ in pending])
+            for (_, ip), region in zip(pending, regions):
+                if region:
+                    results[ip] = region
+        return results
+
+
+geoip = GeoIPResolver()
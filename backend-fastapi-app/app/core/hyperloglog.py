@@ -0,0 +1,86 @@
+# app/core/hyperloglog.py
+"""
+HyperLogLog 基数估计
+
+固定 2^14 个寄存器（每个 1 字节，标准误差约 0.81%），与 Redis 的 PFADD / PFMERGE / PFCOUNT 语义相同：
+
+- add() 加入元素，同一元素重复加入不改变结果；
+- merge() 按寄存器取最大值，合并后的草图等价于对两个集合的并集计数，因此日草图可以合并为任意时间窗口；
+- count() 的耗时和内存与元素数量无关。
+
+to_bytes() 输出 zlib 压缩后的寄存器，用户较少时只有几百字节。
+"""
+import hashlib
+import zlib
+from typing import Iterable, Optional
+
+import numpy as np
+
+PRECISION = 14
+REGISTERS = 1 << PRECISION
+_VALUE_BITS = 64 - PRECISION
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+def _hash(item) -> int:
+    return int.from_bytes(hashlib.blake2b(str(item).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """单个 HyperLogLog 草图"""
+
+    __slots__ = ("registers",)
+
+    def __init__(self, registers: Optional[np.ndarray] = None):
+        self.registers = np.zeros(REGISTERS, dtype=np.uint8) if registers is None else registers
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        registers = np.frombuffer(zlib.decompress(data), dtype=np.uint8).copy()
+        if len(registers) != REGISTERS:
+            raise ValueError(f"HyperLogLog: expected {REGISTERS} registers, got {len(registers)}")
+        return cls(registers)
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(self.registers.tobytes(), 6)
+
+    def add(self, item) -> bool:
+        """加入一个元素，返回草图是否发生变化"""
+        value = _hash(item)
+        index = value >> _VALUE_BITS
+        # 剩余位中第一个 1 出现的位置（从 1 开始），全 0 时为 _VALUE_BITS + 1
+        rank = _VALUE_BITS - (value & _VALUE_MASK).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def update(self, items: Iterable) -> None:
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """合并另一个草图（原地），返回自身"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"]) -> "HyperLogLog":
+        result = cls()
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def count(self) -> int:
+        """估计的不同元素个数"""
+        estimate = _ALPHA * REGISTERS * REGISTERS / float(np.ldexp(1.0, -self.registers.astype(np.int32)).sum())
+        if estimate <= 2.5 * REGISTERS:
+            # 小基数时使用线性计数
+            zeros = int(REGISTERS - np.count_nonzero(self.registers))
+            if zeros:
+                return int(round(REGISTERS * np.log(REGISTERS / zeros)))
+        return int(round(estimate))
+
+    def __bool__(self) -> bool:
+        return bool(self.registers.any())
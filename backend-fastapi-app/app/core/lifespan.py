@@ -3,8 +3,9 @@
 """
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from app.utils.log_utils import logger
-from app.core.environment import check_environment, is_application_installed
+from app.core.environment import check_environment, check_shared_cache, is_application_installed
 from app.core.router_loader import load_installation_routes, load_install_routes
 from app.core.initialization import initialize_application
 
@@ -16,6 +17,7 @@ async def lifespan(app: FastAPI):
     
     # 检查环境配置
     check_environment()
+    check_shared_cache()
     
     # 加载安装检查路由
     load_installation_routes(app)
@@ -36,6 +38,38 @@ async def lifespan(app: FastAPI):
                 # 执行完整初始化
                 init_success = initialize_application(app)
                 app.state.db_available = init_success
+
+                # 启动操作日志写入任务、日志归档定时任务、分析数据汇总任务、汇总快照写入任务、登录草图写入任务、列式快照导出任务和用户地区补齐任务
+                if init_success:
+                    from app.services.audit_log_service import audit_log_service
+                    from app.services.log_archive_service import log_archive_service
+                    from app.services.analytics_rollup_service import analytics_rollup_service
+                    from app.services.analytics_snapshot_service import analytics_snapshot_service
+                    from app.services.login_activity_service import login_activity_service
+                    from app.services.columnar_service import columnar_service
+                    from app.services.user_region_service import user_region_service
+                    audit_log_service.start()
+                    log_archive_service.start_scheduler()
+                    analytics_rollup_service.start_scheduler()
+                    analytics_snapshot_service.start_scheduler()
+                    login_activity_service.start_scheduler()
+                    columnar_service.start_scheduler()
+                    user_region_service.start_scheduler()
+
+                    # 预生成各分组的菜单缓存
+                    from app.services.menu_service import menu_service
+                    for kind in ("admin", "user"):
+                        try:
+                            await menu_service.rebuild(kind)
+                        except Exception as e:
+                            logger.warning(f"菜单缓存预生成失败（{kind}）: {e}")
+
+                    # 检查层级表的闭包索引，首次部署或维护失败后从邻接表重建
+                    from app.services.hierarchy_service import hierarchy_service
+                    try:
+                        await run_in_threadpool(hierarchy_service.warm_up)
+                    except Exception as e:
+                        logger.warning(f"层级索引检查失败: {e}")
             else:
                 logger.error("数据库引擎未初始化")
                 app.state.db_available = False
@@ -47,3 +81,24 @@ async def lifespan(app: FastAPI):
     yield  # 应用运行阶段
 
     logger.info("应用关闭中...")
+
+    if is_installed:
+        from app.services.audit_log_service import audit_log_service
+        from app.services.log_archive_service import log_archive_service
+        from app.services.analytics_rollup_service import analytics_rollup_service
+        from app.services.analytics_snapshot_service import analytics_snapshot_service
+        from app.services.login_activity_service import login_activity_service
+        from app.services.columnar_service import columnar_service
+        from app.services.user_region_service import user_region_service
+        await audit_log_service.stop()
+        await log_archive_service.stop_scheduler()
+        await analytics_rollup_service.stop_scheduler()
+        await analytics_snapshot_service.stop_scheduler()
+        await login_activity_service.stop_scheduler()
+        await columnar_service.stop_scheduler()
+        await user_region_service.stop_scheduler()
+
+    from app.services.password_service import password_service
+    password_service.shutdown()
+    from app.services.dashboard_service import dashboard_service
+    dashboard_service.shutdown()
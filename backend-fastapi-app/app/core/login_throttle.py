@@ -0,0 +1,119 @@
+# app/core/login_throttle.py
+"""
+登录限流
+
+按 IP、用户名和全局三个维度统计登录失败次数（滑动窗口），在查询数据库和 bcrypt 校验之前拦截：
+
+- 失败次数达到 LOGIN_THROTTLE_DELAY_AFTER 后，每次尝试先等待一段指数增长的时间（不占用 CPU）；
+- 单个 IP 或用户名在窗口内失败次数达到上限时直接返回 429；
+- 全局失败次数超过上限（撞库攻击）时，窗口内已有失败记录的 IP 一律返回 429，没有失败记录的正常用户不受影响。
+
+计数保存在 cache_manager 中，阈值对整个部署生效；simple 缓存的计数只在单个进程内，
+多 worker 时实际阈值会变成 worker 数倍，因此多 worker 部署要求 CACHE_TYPE=redis（启动时由 check_shared_cache 检查）。
+滑动窗口用相邻两个固定窗口近似：
+当前窗口计数 + 上一窗口计数 × 上一窗口仍在滑动窗口内的比例。
+"""
+import asyncio
+import hashlib
+import time
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.cache import cache_manager
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+
+def _username_id(username: str) -> str:
+    # 用户名由客户端提交，摘要后作为键，避免超长或含特殊字符的键
+    return hashlib.sha256((username or "").strip().lower().encode()).hexdigest()[:32]
+
+
+class LoginThrottle:
+    """基于滑动窗口失败计数的登录限流器"""
+
+    @staticmethod
+    def _keys(kind: str, scope: str, id: str, now: float) -> Tuple[str, str]:
+        bucket = int(now // settings.LOGIN_THROTTLE_WINDOW)
+        prefix = f"login:fail:{kind}:{scope}:{id}"
+        return f"{prefix}:{bucket}", f"{prefix}:{bucket - 1}"
+
+    async def _count(self, kind: str, scope: str, id: str, now: float) -> float:
+        current_key, previous_key = self._keys(kind, scope, id, now)
+        current, previous = await asyncio.gather(cache_manager.get(current_key), cache_manager.get(previous_key))
+        window = settings.LOGIN_THROTTLE_WINDOW
+        weight = 1 - (now % window) / window
+        return int(current or 0) + int(previous or 0) * weight
+
+    async def _incr(self, kind: str, scope: str, id: str, now: float) -> None:
+        current_key, _ = self._keys(kind, scope, id, now)
+        await cache_manager.incr(current_key, expire=settings.LOGIN_THROTTLE_WINDOW * 2)
+
+    @staticmethod
+    def _reject():
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="登录尝试过于频繁，请稍后再试",
+            headers={"Retry-After": str(settings.LOGIN_THROTTLE_WINDOW)},
+        )
+
+    async def check(self, kind: str, username: str, ip: str) -> None:
+        """
+        登录前检查，必须在查询账号和校验密码之前调用
+
+        Args:
+            kind: "admin" 或 "user"
+            username: 提交的用户名
+            ip: 客户端 IP
+
+        Raises:
+            HTTPException: 超过限流阈值时返回 429
+        """
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        now = time.time()
+        ip_failures, user_failures, global_failures = await asyncio.gather(
+            self._count(kind, "ip", ip, now),
+            self._count(kind, "username", _username_id(username), now),
+            self._count(kind, "global", "all", now),
+        )
+        if ip_failures >= settings.LOGIN_THROTTLE_IP_LIMIT:
+            logger.warning(f"LoginThrottle: rejected {kind} login from IP {ip} ({ip_failures:.0f} failures)")
+            self._reject()
+        if user_failures >= settings.LOGIN_THROTTLE_USERNAME_LIMIT:
+            logger.warning(f"LoginThrottle: rejected {kind} login for {username!r} ({user_failures:.0f} failures)")
+            self._reject()
+        if global_failures >= settings.LOGIN_THROTTLE_GLOBAL_LIMIT and ip_failures >= 1:
+            logger.warning(f"LoginThrottle: rejected {kind} login from IP {ip} during global failure surge "
+                           f"({global_failures:.0f} failures)")
+            self._reject()
+
+        failures = max(ip_failures, user_failures)
+        if failures >= settings.LOGIN_THROTTLE_DELAY_AFTER:
+            delay = min(
+                settings.LOGIN_THROTTLE_DELAY_BASE * 2 ** int(failures - settings.LOGIN_THROTTLE_DELAY_AFTER),
+                settings.LOGIN_THROTTLE_DELAY_MAX,
+            )
+            await asyncio.sleep(delay)
+
+    async def record_failure(self, kind: str, username: str, ip: str) -> None:
+        """记录一次登录失败（用户名不存在也计入）"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        now = time.time()
+        await asyncio.gather(
+            self._incr(kind, "ip", ip, now),
+            self._incr(kind, "username", _username_id(username), now),
+            self._incr(kind, "global", "all", now),
+        )
+
+    async def reset(self, kind: str, username: str) -> None:
+        """登录成功后清除该用户名的失败计数（IP 与全局计数保留）"""
+        if not settings.LOGIN_THROTTLE_ENABLED:
+            return
+        for key in self._keys(kind, "username", _username_id(username), time.time()):
+            await cache_manager.delete(key)
+
+
+login_throttle = LoginThrottle()
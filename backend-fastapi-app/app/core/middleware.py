@@ -1,14 +1,19 @@
 # backend-fastapi-app/app/core/middleware.py
 
 import json
-from typing import Callable, Awaitable
-from fastapi import Request, HTTPException
-from requests import Session
-from starlette.middleware.base import BaseHTTPMiddleware
-from app.crud.sys_admin_log import crud_sys_admin_log
-from app.schemas.sys_admin_log import SysAdminLogCreate
-from app.core.security import get_current_admin
-from app.dependencies.database import get_db
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.audit_log_service import audit_log_service
+from app.utils.log_utils import logger
+
+# 只记录这些方法的请求
+LOGGED_METHODS = {"POST", "PUT", "DELETE"}
+# 不记录日志删除接口、认证接口和文件上传接口
+EXCLUDED_PREFIXES = ("/api/admin/admin/log/delete/", "/api/admin/auth", "/api/admin/upload")
+# 请求体最多缓存的字节数（sys_admin_log.content 为 TEXT），超出部分不解析
+MAX_LOGGED_BODY = 65535
+
 
 def filter_sensitive_data(data: dict) -> dict:
     """递归过滤敏感数据"""
@@ -18,61 +23,83 @@ def filter_sensitive_data(data: dict) -> dict:
         return [filter_sensitive_data(item) for item in data]
     return data
 
-class AdminLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Awaitable]):
-        admin = None
-        auth_header = request.headers.get("authorization")
-        
-        if auth_header and auth_header.startswith("Bearer "):
-            token = auth_header[len("Bearer "):]
-            db = next(get_db())
-            try:
-                admin = get_current_admin(token=token, db=db)
-                if not admin:
-                    raise HTTPException(status_code=401, detail="Invalid credentials")
-                request.state.admin = admin  # 存入 request 状态
-            except Exception as e:
-                print(f"Error in auth: {e}")
-                raise e
-            finally:
-                db.close()
-        
-        # 仅记录 POST、PUT、DELETE 请求日志，并排除日志删除接口和文件上传接口
-        if (request.method in {"POST", "PUT", "DELETE"} and 
-            not request.url.path.startswith("/api/admin/admin/log/delete/") and 
-            not request.url.path.startswith("/api/admin/auth") and
-            not request.url.path.startswith("/api/admin/upload")):
-            try:
-                body_bytes = await request.body()
-                body_text = body_bytes.decode() if body_bytes else ""
-                params = json.loads(body_text) if body_text else {}
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                params = {}
-
-            filtered_params = filter_sensitive_data(params)
-            admin_obj = getattr(request.state, "admin", None)
-            admin_id = admin_obj.id if admin_obj else 1
-            username = admin_obj.username if admin_obj else "unknown"
-            
-            log_data = SysAdminLogCreate(
-                id=None,  # id 是可选的，设为 None
-                admin_id=admin_id,
-                username=username,
+
+class AdminLoggingMiddleware:
+    """
+    记录管理员写操作的纯 ASGI 中间件
+
+    只对需要记录的请求在调用应用之前预读请求体（仅 JSON）并原样重放给应用，
+    请求处理完成后再解析并入队；其余请求直接透传，不做任何额外工作。
+    操作人取自 get_current_admin 写入的 request.state.principal，中间件本身不再解析 token。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in LOGGED_METHODS \
+                or scope["path"].startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # 预先创建 state，保证路由依赖写入的 request.state 与这里读取的是同一个 dict
+        state = scope.setdefault("state", {})
+        headers = Headers(scope=scope)
+        content_type = headers.get("content-type", "")
+        body = b""
+        if not content_type or "json" in content_type:
+            receive, body = await self._tee(receive)
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._log(scope, headers, body, state.get("principal"))
+
+    @staticmethod
+    async def _tee(receive: Receive):
+        """
+        在调用应用之前预读请求体，返回 (重放已读消息的 receive, 请求体)
+
+        最多缓存 MAX_LOGGED_BODY 字节，超出时停止预读，剩余部分由应用照常从原 receive 读取，请求体按空记录
+        """
+        messages = []
+        size = 0
+        while size <= MAX_LOGGED_BODY:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(
+            message.get("body", b"") for message in messages if message["type"] == "http.request"
+        ) if size <= MAX_LOGGED_BODY else b""
+
+        async def replay() -> Message:
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return replay, body
+
+    def _log(self, scope: Scope, headers: Headers, body: bytes, principal):
+        try:
+            params = json.loads(body) if body else {}
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            params = {}
+
+        request = Request(scope)
+        # 只入队，由后台任务批量写入数据库；日志异常不能影响请求本身
+        try:
+            audit_log_service.enqueue(
+                admin_id=principal.id if principal else 1,
+                username=principal.username if principal else "unknown",
                 url=str(request.url),
-                title=request.method,
-                content=json.dumps(filtered_params, ensure_ascii=False),
-                useragent=request.headers.get("user-agent", ""),  
+                title=scope["method"],
+                content=json.dumps(filter_sensitive_data(params), ensure_ascii=False),
+                useragent=headers.get("user-agent", ""),
                 ip=request.client.host if request.client else "",
             )
-
-            db = next(get_db())
-            try:
-                crud_sys_admin_log.create(db, log_data)
-            except Exception as e:
-                print(f"Error in log creation: {e}")
-                raise e
-            finally:
-                db.close()
-
-        response = await call_next(request)
-        return response
+        except Exception as e:
+            logger.error(f"Error in audit log enqueue: {e}")
@@ -0,0 +1,200 @@
+# app/core/permission.py
+"""
+管理员分组权限索引
+
+把 SysAdminGroup.rules / access（JSON 列表）和 SysAdminRule.permission 编译为每个分组一份的只读索引：
+规则 id 集合、(资源, 操作) 集合和前端权限码，首次使用时构建并缓存在进程内，之后鉴权只是一次集合查找。
+
+资源使用规则的 path（如 "/admin/group"），操作是 permission 中值为 true 的键（view / add / edit / delete 等）；
+rules 包含 "all" 的分组拥有全部权限。
+
+规则或分组变化时调用 invalidate()：更新版本号并写入 cache_manager，
+其他 worker 最多在 AUTH_CACHE_SYNC_INTERVAL 秒内丢弃旧索引。版本号必须对所有 worker 可见，
+多 worker 部署要求 CACHE_TYPE=redis（启动时由 check_shared_cache 检查）。
+"""
+import ast
+import json
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, FrozenSet, NamedTuple, Tuple
+
+from fastapi import Depends, HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import cache_manager, run_cache_coroutine
+from app.core.config import settings
+from app.core.security import Principal, get_current_admin_principal
+from app.models.sys_admin_group import SysAdminGroup
+from app.models.sys_admin_rule import SysAdminRule
+from app.utils.log_utils import logger
+
+VERSION_KEY = "auth:permission:version"
+SUPER_RULE = "all"
+
+
+class PermissionIndex(NamedTuple):
+    """单个分组编译后的权限"""
+    group_id: int
+    is_super: bool
+    rule_ids: FrozenSet[int]
+    permissions: FrozenSet[Tuple[str, str]]
+    access: Tuple
+
+    def allows(self, resource: str, action: str) -> bool:
+        return self.is_super or (resource, action) in self.permissions
+
+    def has_rule(self, rule_id: int) -> bool:
+        return self.is_super or rule_id in self.rule_ids
+
+
+@lru_cache(maxsize=1024)
+def _parse_permission_text(value: str) -> Dict:
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        # 兼容以 Python 字面量保存的旧数据（如 "{'view': True}"），只解析字面量，不执行代码
+        try:
+            parsed = ast.literal_eval(value)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def parse_permission(value) -> Dict:
+    """
+    把规则的 permission 列解析为字典，无法解析时返回空字典
+
+    字符串的解析结果会被缓存并在调用方之间共享，只能读取不能修改
+    """
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value:
+        return _parse_permission_text(value)
+    return {}
+
+
+def _rule_ids(values) -> Tuple[bool, FrozenSet[int]]:
+    is_super = False
+    ids = set()
+    for value in values or []:
+        if value == SUPER_RULE:
+            is_super = True
+            continue
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return is_super, frozenset(ids)
+
+
+def compile_group(group_id: int, rules, access, group_status: str, rule_rows) -> PermissionIndex:
+    """
+    编译一个分组的权限索引
+
+    Args:
+        rules: 分组的 rules 列
+        access: 分组的 access 列
+        group_status: 分组状态，非 normal 的分组没有任何权限
+        rule_rows: (id, path, permission, status) 元组序列
+    """
+    if group_status != "normal":
+        return PermissionIndex(group_id, False, frozenset(), frozenset(), ())
+    is_super, rule_ids = _rule_ids(rules)
+    permissions = set()
+    for rule_id, path, permission, rule_status in rule_rows:
+        if rule_status != "normal" or not (is_super or rule_id in rule_ids):
+            continue
+        for action, enabled in parse_permission(permission).items():
+            if enabled:
+                permissions.add((path, action))
+    return PermissionIndex(group_id, is_super, rule_ids, frozenset(permissions), tuple(access or ()))
+
+
+def _load_index(group_id: int) -> PermissionIndex:
+    from app.dependencies import database
+    if database.SessionLocal is None:
+        raise database.DatabaseConnectionError("数据库不可用")
+    db = database.SessionLocal()
+    try:
+        group = db.query(SysAdminGroup.rules, SysAdminGroup.access, SysAdminGroup.status).filter(
+            SysAdminGroup.id == group_id
+        ).first()
+        if group is None:
+            return PermissionIndex(group_id, False, frozenset(), frozenset(), ())
+        rule_rows = db.query(
+            SysAdminRule.id, SysAdminRule.path, SysAdminRule.permission, SysAdminRule.status
+        ).all()
+    finally:
+        db.close()
+    return compile_group(group_id, group.rules, group.access, group.status, rule_rows)
+
+
+class PermissionRegistry:
+    """分组 id -> PermissionIndex 的进程内缓存"""
+
+    def __init__(self):
+        self._indexes: Dict[int, PermissionIndex] = {}
+        self._lock = threading.Lock()
+        self._version = 0.0
+        self._checked_at = 0.0
+
+    async def _sync_version(self) -> None:
+        now = time.time()
+        if now - self._checked_at < settings.AUTH_CACHE_SYNC_INTERVAL:
+            return
+        self._checked_at = now
+        remote = float(await cache_manager.get(VERSION_KEY) or 0.0)
+        if remote > self._version:
+            with self._lock:
+                self._version = remote
+                self._indexes.clear()
+
+    async def get(self, group_id: int) -> PermissionIndex:
+        """获取分组的权限索引，未缓存时从数据库构建"""
+        await self._sync_version()
+        index = self._indexes.get(group_id)
+        if index is None:
+            index = await run_in_threadpool(_load_index, group_id)
+            with self._lock:
+                self._indexes[group_id] = index
+        return index
+
+    def invalidate(self) -> None:
+        """规则或分组变化后丢弃全部索引（本进程立即生效，其他 worker 通过版本号同步）"""
+        now = time.time()
+        with self._lock:
+            self._version = now
+            self._indexes.clear()
+        try:
+            run_cache_coroutine(cache_manager.set(VERSION_KEY, now, expire=86400 * 30))
+        except Exception as e:
+            logger.warning(f"PermissionRegistry: failed to publish invalidation: {e}")
+
+
+permission_registry = PermissionRegistry()
+
+
+async def get_current_admin_permissions(
+    principal: Principal = Depends(get_current_admin_principal),
+) -> PermissionIndex:
+    """当前管理员所在分组的权限索引"""
+    return await permission_registry.get(principal.group_id)
+
+
+def require_permission(resource: str, action: str):
+    """
+    路由级权限依赖
+
+    用法：@router.put("/update/{id}", dependencies=[Depends(require_permission("/admin/group", "edit"))])
+    """
+    async def checker(
+        principal: Principal = Depends(get_current_admin_principal),
+        index: PermissionIndex = Depends(get_current_admin_permissions),
+    ) -> Principal:
+        if not index.allows(resource, action):
+            logger.warning(f"Permission denied: admin {principal.username} -> {resource}:{action}")
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限执行该操作")
+        return principal
+
+    return checker
@@ -0,0 +1,285 @@
+# app/core/route_permission.py
+"""
+接口路径权限前缀树
+
+把 sys_admin_rule 编译为按路径段组织的前缀树，把 (HTTP 方法, 接口路径) 映射到规则：
+
+- 规则 permission 中声明的操作按 CRUD 路由约定展开为接口，如 /admin/group 的 edit
+  对应 PUT /api/admin/admin/group/update/{id}；没有路由约定的操作（ajax、install 等）不参与匹配；
+- 规则 path 是前端菜单路由，与接口前缀不同的规则在 RULE_API_PATHS 中登记对应的接口前缀；
+- rule_type 为 action 的规则，其 path 本身就是接口，任意方法都需要拥有该规则；
+- {id}、:id 形式的路径段是参数，匹配任意一段，字面量优先。
+
+只有 status 为 normal 的规则参与编译；使用 authorize_admin_route 的接口默认拒绝，
+没有匹配到任何规则的接口只有超级管理员可以访问。
+sys_user_rule 是前台菜单，路径不对应 /api/user 下的接口，因此不参与编译。
+
+规则变化时调用 invalidate()：本进程立即重新编译并整体替换前缀树（请求只读取替换前或替换后的完整版本），
+其他 worker 通过 cache_manager 中的版本号在 AUTH_CACHE_SYNC_INTERVAL 秒内重新编译。
+"""
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import cache_manager, run_cache_coroutine
+from app.core.config import settings
+from app.core.permission import PermissionIndex, get_current_admin_permissions, parse_permission
+from app.core.security import Principal, get_current_admin_principal
+from app.models.sys_admin_rule import SysAdminRule
+from app.utils.log_utils import logger
+
+VERSION_KEY = "auth:route:version"
+ANY_METHOD = "*"
+
+# 每棵前缀树缓存的 (方法, 路径) 匹配结果数，写满后清空重新积累
+MEMO_SIZE = 4096
+_MISS = object()
+
+# 规则表和接口前缀（与 router_loader 挂载的 /api/admin 一致）
+SOURCES = {
+    "admin": (SysAdminRule, "/api/admin"),
+}
+
+# 菜单路径与接口前缀不一致的规则：规则 path -> 接口前缀（不含 /api/admin）
+RULE_API_PATHS: Dict[str, str] = {
+    "/attachment/attachment": "/attachment",
+}
+
+# 操作 -> 资源路径下的 (方法, 子路径)
+ACTION_ROUTES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "view": (("GET", ""), ("GET", "/list"), ("GET", "/{id}")),
+    "add": (("POST", "/create"),),
+    "edit": (("PUT", "/update/{id}"),),
+    "delete": (("DELETE", "/delete/{id}"),),
+}
+
+
+class RouteTarget(NamedTuple):
+    """接口对应的规则；action 为 None 时只要求拥有该规则"""
+    rule_id: int
+    resource: str
+    action: Optional[str]
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith("{") or segment.startswith(":")
+
+
+class _Node:
+    __slots__ = ("children", "param", "methods")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.methods: Dict[str, Tuple[RouteTarget, ...]] = {}
+
+
+class PathTrie:
+    """
+    路径段前缀树，构建完成后只读
+
+    prefix 是所有接口共同的前缀（如 /api/admin），匹配时先整体比较，不逐段走；
+    重复出现的 (方法, 路径) 直接从 _memo 返回。前缀树整体替换时 _memo 随旧树一起丢弃
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix.rstrip("/")
+        self._root = _Node()
+        self._memo: Dict[Tuple[str, str], Optional[Tuple[RouteTarget, ...]]] = {}
+        self.size = 0
+
+    def insert(self, method: str, pattern: str, target: RouteTarget) -> None:
+        """插入接口，pattern 不含 prefix"""
+        node = self._root
+        for segment in pattern.strip("/").split("/"):
+            if not segment:
+                continue
+            if _is_param(segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _Node()
+                node = child
+        method = method.upper()
+        node.methods[method] = node.methods.get(method, ()) + (target,)
+        self.size += 1
+
+    def match(self, method: str, path: str) -> Optional[Tuple[RouteTarget, ...]]:
+        """返回匹配到的规则，没有规则约束该接口时返回 None"""
+        targets = self._memo.get((method, path), _MISS)
+        if targets is _MISS:
+            targets = self._walk(method, path)
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[(method, path)] = targets
+        return targets
+
+    def _walk(self, method: str, path: str) -> Optional[Tuple[RouteTarget, ...]]:
+        rest = path[len(self.prefix):]
+        if not path.startswith(self.prefix) or (rest and rest[0] != "/"):
+            return None
+        segments = rest.strip("/").split("/")
+        # 快速路径：逐段优先走字面量，没有字面量子节点时走参数节点，绝大多数请求一次走完；
+        # 只有途中放弃过参数分支时才需要回溯
+        node = self._root
+        branched = False
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.param
+                if child is None:
+                    break
+            elif node.param is not None:
+                branched = True
+            node = child
+        else:
+            targets = node.methods.get(method) or node.methods.get(ANY_METHOD)
+            if targets:
+                return targets
+        return self._backtrack(method, segments) if branched else None
+
+    def _backtrack(self, method: str, segments: List[str]) -> Optional[Tuple[RouteTarget, ...]]:
+        # 字面量分支走不通时回溯到参数分支：参数分支先入栈、后出栈
+        count = len(segments)
+        stack = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == count:
+                targets = node.methods.get(method) or node.methods.get(ANY_METHOD)
+                if targets:
+                    return targets
+                continue
+            if node.param is not None:
+                stack.append((node.param, depth + 1))
+            child = node.children.get(segments[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+        return None
+
+
+def compile_routes(rule_rows, prefix: str) -> PathTrie:
+    """
+    编译一端的接口前缀树
+
+    Args:
+        rule_rows: (id, rule_type, path, permission, status) 元组序列
+        prefix: 接口前缀，如 /api/admin
+    """
+    trie = PathTrie(prefix)
+    for rule_id, rule_type, path, permission, rule_status in rule_rows:
+        if rule_status != "normal" or not path:
+            continue
+        resource = "/" + path.strip("/")
+        api_path = RULE_API_PATHS.get(resource, resource)
+        if rule_type == "action":
+            trie.insert(ANY_METHOD, api_path, RouteTarget(rule_id, resource, None))
+        for action in parse_permission(permission):
+            for method, suffix in ACTION_ROUTES.get(action, ()):
+                trie.insert(method, api_path + suffix, RouteTarget(rule_id, resource, action))
+    return trie
+
+
+def _load_tries() -> Dict[str, PathTrie]:
+    from app.dependencies import database
+    if database.SessionLocal is None:
+        raise database.DatabaseConnectionError("数据库不可用")
+    db = database.SessionLocal()
+    try:
+        rows = {
+            kind: db.query(model.id, model.rule_type, model.path, model.permission, model.status).all()
+            for kind, (model, _prefix) in SOURCES.items()
+        }
+    finally:
+        db.close()
+    return {kind: compile_routes(rows[kind], SOURCES[kind][1]) for kind in SOURCES}
+
+
+class RouteRegistry:
+    """当前生效的接口前缀树，整体替换"""
+
+    def __init__(self):
+        self._tries: Optional[Dict[str, PathTrie]] = None
+        self._lock = threading.Lock()
+        self._version = 0.0
+        self._checked_at = 0.0
+
+    def rebuild(self) -> None:
+        """从数据库重新编译并替换前缀树（同步，在线程池中调用）"""
+        tries = _load_tries()
+        with self._lock:
+            self._tries = tries
+        logger.info(
+            "RouteRegistry: compiled "
+            + ", ".join(f"{kind} {trie.size} routes" for kind, trie in tries.items())
+        )
+
+    async def _sync_version(self) -> None:
+        now = time.time()
+        if self._tries is not None and now - self._checked_at < settings.AUTH_CACHE_SYNC_INTERVAL:
+            return
+        self._checked_at = now
+        remote = float(await cache_manager.get(VERSION_KEY) or 0.0)
+        if self._tries is None or remote > self._version:
+            self._version = max(self._version, remote)
+            await run_in_threadpool(self.rebuild)
+
+    async def match(self, kind: str, method: str, path: str) -> Optional[Tuple[RouteTarget, ...]]:
+        """匹配接口对应的规则"""
+        await self._sync_version()
+        return self._tries[kind].match(method, path)
+
+    def invalidate(self) -> None:
+        """规则变化后重新编译（本进程立即生效，其他 worker 通过版本号同步）"""
+        now = time.time()
+        self._version = now
+        try:
+            self.rebuild()
+        except Exception as e:
+            # 编译失败时保留旧版本，下次同步时重试
+            self._checked_at = 0.0
+            logger.warning(f"RouteRegistry: rebuild failed: {e}")
+        try:
+            run_cache_coroutine(cache_manager.set(VERSION_KEY, now, expire=86400 * 30))
+        except Exception as e:
+            logger.warning(f"RouteRegistry: failed to publish invalidation: {e}")
+
+
+route_registry = RouteRegistry()
+
+
+def route_allowed(index: PermissionIndex, targets: Optional[Tuple[RouteTarget, ...]]) -> bool:
+    """拥有任意一个匹配规则即可访问；没有匹配规则的接口只允许超级管理员访问"""
+    if index.is_super:
+        return True
+    if not targets:
+        return False
+    for target in targets:
+        if target.action is None:
+            if index.has_rule(target.rule_id):
+                return True
+        elif index.allows(target.resource, target.action):
+            return True
+    return False
+
+
+async def authorize_admin_route(
+    request: Request,
+    principal: Principal = Depends(get_current_admin_principal),
+    index: PermissionIndex = Depends(get_current_admin_permissions),
+) -> Principal:
+    """
+    按请求的方法和路径鉴权的路由依赖
+
+    用法：APIRouter(prefix="/general/category", dependencies=[Depends(authorize_admin_route)])
+    """
+    targets = await route_registry.match("admin", request.method, request.scope["path"])
+    if not route_allowed(index, targets):
+        logger.warning(f"Permission denied: admin {principal.username} -> {request.method} {request.scope['path']}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="没有权限执行该操作")
+    return principal
@@ -1,10 +1,14 @@
-from typing import Annotated
+import uuid
+from typing import Annotated, Dict, NamedTuple, Optional, Tuple
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+from app.core.auth_cache import auth_cache
 from app.core.config import settings
+from app.core.token_revocation import revocation_store
 from app.models.sys_admin import SysAdmin
 from app.models.sys_user import SysUser
 from app.dependencies.database import get_db
@@ -38,6 +42,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode.update(
         {"exp": expire, "sub": str(data.get("sub"))}
     )  # 确保sub是字符串类型
+    to_encode.setdefault("jti", uuid.uuid4().hex)  # 用于吊销单个 token
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -50,56 +55,147 @@ def decode_access_token(token: str):
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        logger.info(f"Decoded payload: {payload}")  # 日志记录解码结果
+        logger.debug(f"Decoded payload: {payload}")  # 日志记录解码结果
         return payload
     except JWTError as e:
         logger.error(f"JWTError: {str(e)}")
         return None
 
 
-# 获取当前登录的 SysAdmin
-def get_current_admin(
-    token: Annotated[str, Depends(oauth2_admin_scheme)], db: Session = Depends(get_db)
-) -> SysAdmin:
-    credentials_exception = HTTPException(
+def revoke_token(claims: Dict) -> bool:
+    """
+    吊销一个已校验的 token（登出时调用），不写数据库
+
+    Returns:
+        bool: token 带有 jti 并已吊销时返回 True；旧版没有 jti 的 token 只能等待自然过期
+    """
+    jti = claims.get("jti")
+    if not jti:
+        return False
+    revocation_store.revoke(jti, float(claims.get("exp", 0)))
+    return True
+
+
+class Principal(NamedTuple):
+    """当前请求身份的只读快照，不依赖数据库会话（会话关闭或提交后 ORM 对象的属性可能已过期）"""
+    id: int
+    username: str
+    group_id: int
+    status: str
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _load_principal(kind: str, subject_id) -> Optional[Principal]:
+    """缓存未命中时从数据库读取身份快照（只查询需要的列）"""
+    from app.dependencies import database
+    if database.SessionLocal is None:
+        raise database.DatabaseConnectionError("数据库不可用")
+    if kind == "admin":
+        columns = (SysAdmin.id, SysAdmin.username, SysAdmin.group_id, SysAdmin.status)
+    else:
+        columns = (SysUser.id, SysUser.username, SysUser.user_group_id, SysUser.status)
+    db = database.SessionLocal()
+    try:
+        row = db.query(*columns).filter(columns[0] == subject_id).first()
+    finally:
+        db.close()
+    return Principal(*row) if row else None
+
+
+async def _resolve_principal(kind: str, token: str) -> Tuple[Principal, Dict]:
+    """校验 token 并返回 (身份快照, claims)，优先使用 auth_cache"""
+    cached = await auth_cache.get(kind, token)
+    if cached is not None:
+        jti = cached[1].get("jti")
+        if jti and await revocation_store.is_revoked(jti):
+            auth_cache.discard(kind, token)
+            raise _credentials_exception()
+        return cached
+
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
-    admin_id: int = payload.get("sub")
-    if admin_id is None:
-        raise credentials_exception
-    admin = db.query(SysAdmin).filter(SysAdmin.id == admin_id).first()
+        raise _credentials_exception()
+    subject_id = payload.get("sub")
+    if subject_id is None:
+        raise _credentials_exception()
+    if payload.get("jti") and await revocation_store.is_revoked(payload["jti"]):
+        raise _credentials_exception()
+    principal = await run_in_threadpool(_load_principal, kind, subject_id)
+    if principal is None:
+        logger.error("未能登录成功")
+        raise _credentials_exception()
+    auth_cache.put(kind, token, payload, principal)
+    return principal, payload
+
+
+# 获取当前登录管理员的身份快照
+# 常见情况下只查 auth_cache，不做 JWT 校验和数据库查询；路由级鉴权依赖使用它
+async def get_current_admin_principal(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_admin_scheme)],
+) -> Principal:
+    principal = getattr(request.state, "principal", None)
+    if principal is None:
+        principal, request.state.token_claims = await _resolve_principal("admin", token)
+        request.state.principal = principal
+    return principal
+
+
+# 获取当前登录的 SysAdmin
+# 解析结果保存在 request.state.admin（ORM 对象）和 request.state.principal（快照），
+# 同一请求内的其他依赖、中间件和处理函数直接复用
+def get_current_admin(
+    request: Request,
+    principal: Principal = Depends(get_current_admin_principal),
+    db: Session = Depends(get_db),
+) -> SysAdmin:
+    admin = getattr(request.state, "admin", None)
+    if admin is not None:
+        return admin
+
+    admin = db.get(SysAdmin, principal.id)
     if admin is None:
         logger.error("未能登录成功")
-        raise credentials_exception
-    logger.error(f"登录成功:{admin}")
+        auth_cache.invalidate("admin", principal.id)
+        raise _credentials_exception()
+    request.state.admin = admin
     return admin
 
 
+# 获取当前登录用户的身份快照
+async def get_current_user_principal(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_admin_scheme)],
+) -> Principal:
+    principal = getattr(request.state, "user_principal", None)
+    if principal is None:
+        principal, request.state.token_claims = await _resolve_principal("user", token)
+        request.state.user_principal = principal
+    return principal
+
+
 # 获取当前登录的 SysUser
+# 解析结果保存在 request.state.user，同一请求内复用
 def get_current_user(
-    token: Annotated[str, Depends(oauth2_admin_scheme)], db: Session = Depends(get_db)
-) -> SysAdmin:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    user_id: int = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
-    user = db.query(SysUser).filter(SysUser.id == user_id).first()
+    request: Request,
+    principal: Principal = Depends(get_current_user_principal),
+    db: Session = Depends(get_db),
+) -> SysUser:
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+
+    user = db.get(SysUser, principal.id)
     if user is None:
         logger.error("未能登录成功")
-        raise credentials_exception
-    logger.error(f"登录成功:{user}")
+        auth_cache.invalidate("user", principal.id)
+        raise _credentials_exception()
+    request.state.user = user
     return user
@@ -0,0 +1,84 @@
+# app/core/token_revocation.py
+"""
+基于 jti 的 token 吊销表
+
+登出时把 token 的 jti 写入缓存后端（键 auth:revoked:<jti>，TTL 为 token 剩余有效期），
+校验 token 时按 jti 查询，不再读写 sys_admin.token / sys_user.token。
+本 worker 吊销的 jti 立即生效；其他 worker 的未吊销查询结果最多缓存 AUTH_CACHE_SYNC_INTERVAL 秒。
+吊销记录必须对所有 worker 可见，多 worker 部署要求 CACHE_TYPE=redis（启动时由 check_shared_cache 检查）。
+登出和刷新 token 都会吊销旧 token 的 jti。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from app.core.cache import cache_manager, run_cache_coroutine
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+
+def _revoked_key(jti: str) -> str:
+    return f"auth:revoked:{jti}"
+
+
+class TokenRevocationStore:
+    """jti 吊销表：本地已吊销集合 + 未吊销结果的短期缓存，权威数据在 cache_manager 中"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 已吊销的 jti -> token 过期时间
+        self._revoked: Dict[str, float] = {}
+        # 最近确认未吊销的 jti -> 确认时间
+        self._checked: "OrderedDict[str, float]" = OrderedDict()
+
+    def _prune(self, now: float) -> None:
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+
+    async def is_revoked(self, jti: str) -> bool:
+        now = time.time()
+        with self._lock:
+            exp = self._revoked.get(jti)
+            if exp is not None:
+                return exp > now
+            checked_at = self._checked.get(jti)
+        if checked_at is not None and now - checked_at < settings.AUTH_CACHE_SYNC_INTERVAL:
+            return False
+
+        revoked_until = await cache_manager.get(_revoked_key(jti))
+        with self._lock:
+            if revoked_until:
+                self._revoked[jti] = float(revoked_until)
+                self._checked.pop(jti, None)
+                return True
+            self._checked[jti] = now
+            self._checked.move_to_end(jti)
+            while len(self._checked) > settings.AUTH_CACHE_SIZE:
+                self._checked.popitem(last=False)
+        return False
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        吊销一个 token
+
+        Args:
+            jti: token 的 jti claim
+            expires_at: token 的过期时间（exp claim），吊销记录保留到此时为止
+        """
+        now = time.time()
+        ttl = int(expires_at - now) + 1
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._prune(now)
+            self._revoked[jti] = float(expires_at)
+            self._checked.pop(jti, None)
+        try:
+            run_cache_coroutine(cache_manager.set(_revoked_key(jti), float(expires_at), expire=ttl))
+        except Exception as e:
+            logger.warning(f"TokenRevocation: failed to publish revocation of {jti}: {e}")
+
+
+revocation_store = TokenRevocationStore()
@@ -1,6 +1,31 @@
 import copy
+from collections import defaultdict
+
+
+def _id_set(ids):
+    """
+    把选中/禁用 ID 参数（列表或逗号分隔字符串）转换为字符串集合，供 O(1) 判断。
+
+    :param ids: ID 列表或逗号分隔的字符串
+    :return: 字符串形式的 ID 集合
+    """
+    if isinstance(ids, (list, tuple, set)):
+        return {str(i) for i in ids}
+    if isinstance(ids, str):
+        return set(ids.split(','))
+    return {str(ids)}
+
 
 class Tree:
+    """
+    树形数据工具。
+
+    init 时一次性建立 id -> 节点、父 ID -> 子节点的索引，之后的查询不再扫描整个 self.arr；
+    遍历全部改为迭代实现（不受递归深度限制，遇到环也不会死循环），
+    后代和祖先列表按 ID 缓存，HTML 渲染先收集片段再 join。
+    数据变化后需要重新调用 init。
+    """
+
     def __init__(self, options=None):
         """
         初始化 Tree 类的实例，设置默认配置，并合并传入的配置选项。
@@ -15,7 +40,8 @@ class Tree:
         self.nbsp = "&nbsp;"  # HTML 空格符
         self.pidname = 'pid'  # 父节点的字段名称
         self.options = dict(copy.deepcopy(self.config), **options) if options else self.config  # 深拷贝配置
-    
+        self._indexed = None  # 已建立索引的 arr 对象
+
     @staticmethod
     def instance(options=None):
         """
@@ -27,10 +53,10 @@ class Tree:
         if not Tree.instance:
             Tree.instance = Tree(options)
         return Tree.instance
-    
+
     def init(self, arr=None, pidname=None, nbsp=None):
         """
-        初始化树结构数据以及相关设置。
+        初始化树结构数据以及相关设置，并建立索引。
 
         :param arr: 树结构数据数组
         :param pidname: 父节点字段名称
@@ -43,8 +69,80 @@ class Tree:
             self.pidname = pidname
         if nbsp:
             self.nbsp = nbsp
+        self._build_index()
         return self
-    
+
+    def _build_index(self):
+        """
+        建立索引：
+        _nodes:        id -> 第一个具有该 id 的节点
+        _child:        父 ID -> {id: 节点}（与 getChild 的精确匹配语义一致）
+        _child_str:    str(父 ID) -> [(位置, 节点)]（与 getChildren 的字符串匹配语义一致）
+        _self_str:     str(id) -> [(位置, 节点)]
+        """
+        self._nodes = {}
+        self._child = defaultdict(dict)
+        self._child_str = defaultdict(list)
+        self._self_str = defaultdict(list)
+        for position, value in enumerate(self.arr):
+            if 'id' not in value:  # 跳过没有 ID 的节点
+                continue
+            node_id = value['id']
+            pid = value[self.pidname]
+            self._nodes.setdefault(node_id, value)
+            self._child[pid][node_id] = value
+            self._child_str[str(pid)].append((position, value))
+            self._self_str[str(node_id)].append((position, value))
+        self._descendants = {}  # str(id) -> 后代节点元组（先序）
+        self._ancestors = {}  # id -> 祖先节点元组（由近到远）
+        self._indexed = (self.arr, self.pidname)
+
+    def _ensure_index(self):
+        if self._indexed is None or self._indexed[0] is not self.arr or self._indexed[1] != self.pidname:
+            self._build_index()
+
+    def _descendants_of(self, myid):
+        """按先序返回 myid 的全部后代（字符串匹配父 ID），结果缓存"""
+        key = str(myid)
+        cached = self._descendants.get(key)
+        if cached is not None:
+            return cached
+        result = []
+        seen = set()
+        stack = [iter(self._child_str.get(key, ()))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            value = item[1]
+            if id(value) in seen:  # 数据中存在环
+                continue
+            seen.add(id(value))
+            result.append(value)
+            stack.append(iter(self._child_str.get(str(value['id']), ())))
+        cached = self._descendants[key] = tuple(result)
+        return cached
+
+    def _ancestors_of(self, myid):
+        """返回 myid 的全部祖先（由近到远），结果缓存"""
+        cached = self._ancestors.get(myid)
+        if cached is not None:
+            return cached
+        result = []
+        seen = {myid}
+        value = self._nodes.get(myid)
+        pid = value[self.pidname] if value is not None else 0
+        while pid and pid not in seen:
+            seen.add(pid)
+            parent = self._nodes.get(pid)
+            if parent is None:
+                break
+            result.append(parent)
+            pid = parent[self.pidname]
+        cached = self._ancestors[myid] = tuple(result)
+        return cached
+
     def getChild(self, myid):
         """
         获取指定 ID 的所有直接子节点。
@@ -52,33 +150,32 @@ class Tree:
         :param myid: 需要查找的节点 ID
         :return: 一个包含所有直接子节点的字典，以节点 ID 为键，节点内容为值
         """
-        newarr = {}  # 存储找到的子节点
-        for value in self.arr:
-            if 'id' not in value:  # 跳过没有 ID 的节点
-                continue
-            if value[self.pidname] == myid:  # 如果节点的父 ID 等于传入的 ID
-                newarr[value['id']] = value  # 将此节点添加到结果字典中
-        return newarr  # 返回找到的子节点
-    
+        self._ensure_index()
+        return dict(self._child.get(myid, {}))
+
     def getChildren(self, myid, withself=False):
         """
-        获取指定 ID 的所有子节点，支持递归获取，并可选择包含自身节点。
+        获取指定 ID 的所有子节点（含所有后代），并可选择包含自身节点。
 
         :param myid: 需要查找的节点 ID
         :param withself: 是否包含自身节点，默认为 False
         :return: 包含所有子节点的列表
         """
-        newarr = []  # 存储子节点的列表
-        for value in self.arr:
-            if 'id' not in value:  # 跳过没有 ID 的节点
-                continue
-            if str(value[self.pidname]) == str(myid):  # 匹配父节点 ID
-                newarr.append(value)  # 添加子节点
-                newarr.extend(self.getChildren(value['id']))  # 递归添加子节点
-            elif withself and str(value['id']) == str(myid):  # 如果包含自身，则添加
-                newarr.append(value)
-        return newarr  # 返回子节点列表
-    
+        self._ensure_index()
+        key = str(myid)
+        direct = self._child_str.get(key, [])
+        if not withself:
+            return list(self._descendants_of(myid))
+
+        # 自身节点按其在 arr 中的位置与直接子节点交错排列（与逐项扫描的结果一致）
+        selves = [item for item in self._self_str.get(key, []) if str(item[1][self.pidname]) != key]
+        newarr = []
+        for _, value in sorted(direct + selves, key=lambda item: item[0]):
+            newarr.append(value)
+            if str(value[self.pidname]) == key:
+                newarr.extend(self._descendants_of(value['id']))
+        return newarr
+
     def getChildrenIds(self, myid, withself=False):
         """
         获取指定 ID 的所有子节点的 ID。
@@ -87,9 +184,8 @@ class Tree:
         :param withself: 是否包含自身节点，默认为 False
         :return: 包含所有子节点 ID 的列表
         """
-        childrenlist = self.getChildren(myid, withself)  # 获取所有子节点
-        return [value['id'] for value in childrenlist]  # 返回子节点 ID 列表
-    
+        return [value['id'] for value in self.getChildren(myid, withself)]
+
     def getParent(self, myid):
         """
         获取指定 ID 的直接父节点。
@@ -97,44 +193,24 @@ class Tree:
         :param myid: 需要查找的节点 ID
         :return: 父节点的列表（最多包含一个父节点）
         """
-        pid = 0  # 初始化父 ID
-        newarr = []  # 存储父节点的列表
-        for value in self.arr:
-            if 'id' not in value:  # 跳过没有 ID 的节点
-                continue
-            if value['id'] == myid:  # 匹配当前节点 ID
-                pid = value[self.pidname]  # 获取父 ID
-                break
-        if pid:  # 如果找到父节点 ID
-            for value in self.arr:
-                if value['id'] == pid:  # 匹配父节点 ID
-                    newarr.append(value)  # 添加父节点到列表
-                    break
-        return newarr  # 返回父节点
-    
+        self._ensure_index()
+        ancestors = self._ancestors_of(myid)
+        return [ancestors[0]] if ancestors else []
+
     def getParents(self, myid, withself=False):
         """
-        获取指定 ID 的所有父节点，支持递归获取，并可选择包含自身节点。
+        获取指定 ID 的所有父节点（由近到远），并可选择包含自身节点。
 
         :param myid: 需要查找的节点 ID
         :param withself: 是否包含自身节点，默认为 False
         :return: 包含所有父节点的列表
         """
-        pid = 0  # 初始化父 ID
-        newarr = []  # 存储父节点的列表
-        for value in self.arr:
-            if 'id' not in value:  # 跳过没有 ID 的节点
-                continue
-            if value['id'] == myid:  # 匹配当前节点 ID
-                if withself:
-                    newarr.append(value)  # 如果包含自身，则添加自身节点
-                pid = value[self.pidname]  # 获取父节点 ID
-                break
-        if pid:  # 如果找到父节点 ID
-            arr = self.getParents(pid, True)  # 递归获取所有父节点
-            newarr.extend(arr)  # 合并父节点列表
-        return newarr  # 返回父节点列表
-    
+        self._ensure_index()
+        newarr = list(self._ancestors_of(myid))
+        if withself and myid in self._nodes:
+            newarr.insert(0, self._nodes[myid])
+        return newarr
+
     def getParentsIds(self, myid, withself=False):
         """
         获取指定 ID 的所有父节点的 ID。
@@ -143,9 +219,37 @@ class Tree:
         :param withself: 是否包含自身节点，默认为 False
         :return: 包含所有父节点 ID 的列表
         """
-        parentlist = self.getParents(myid, withself)  # 获取所有父节点
-        return [value['id'] for value in parentlist]  # 返回父节点 ID 列表
-    
+        return [value['id'] for value in self.getParents(myid, withself)]
+
+    def _walk(self, myid, itemprefix):
+        """
+        按先序迭代遍历 myid 下的子树。
+
+        :return: 生成 (节点, 前缀符号 spacer, 父节点) 元组，顶层节点的父节点为 None
+        """
+        self._ensure_index()
+        seen = set()
+        stack = [(iter(list(self._child.get(myid, {}).values())), itemprefix, None)]
+        while stack:
+            children, prefix, parent = stack[-1]
+            value = next(children, None)
+            if value is None:
+                stack.pop()
+                continue
+            if id(value) in seen:  # 数据中存在环
+                continue
+            seen.add(id(value))
+            is_last = not children.__length_hint__()
+            if is_last:  # 如果是最后一个子节点
+                j = self.icon[2]
+                k = self.nbsp if prefix else ''
+            else:
+                j = self.icon[1]
+                k = self.icon[0] if prefix else ''
+            spacer = prefix + j if prefix else ''  # 生成前缀符号
+            yield value, spacer, parent
+            stack.append((iter(list(self._child.get(value['id'], {}).values())), prefix + k + self.nbsp, value))
+
     def getTree(self, myid, itemtpl="<option value=@id @selected @disabled>@spacer@name</option>", selectedids='', disabledids='', itemprefix='', toptpl=''):
         """
         根据指定 ID 生成树形结构的 HTML 字符串。
@@ -158,31 +262,47 @@ class Tree:
         :param toptpl: 顶层节点的特殊模板
         :return: 树形结构的 HTML 字符串
         """
-        ret = ''  # 初始化返回字符串
-        number = 1  # 当前处理的节点序号
-        childs = self.getChild(myid)  # 获取子节点
-        if childs:
-            total = len(childs)  # 子节点总数
-            for value in childs.values():
-                id = value['id']
-                j = k = ''  # 初始化符号变量
-                if number == total:  # 如果是最后一个子节点
-                    j += self.icon[2]  # 使用特殊符号
-                    k = self.nbsp if itemprefix else ''
-                else:
-                    j += self.icon[1]
-                    k = self.icon[0] if itemprefix else ''
-                spacer = itemprefix + j if itemprefix else ''  # 生成前缀符号
-                selected = 'selected' if str(id) in (selectedids if isinstance(selectedids, list) else selectedids.split(',')) else ''  # 判断是否选中
-                disabled = 'disabled' if str(id) in (disabledids if isinstance(disabledids, list) else disabledids.split(',')) else ''  # 判断是否禁用
-                value.update({'selected': selected, 'disabled': disabled, 'spacer': spacer})  # 更新节点信息
-                value = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
-                nstr = (toptpl if (str(value[f"@{self.pidname}"]) == "0" or self.getChild(id)) and toptpl else itemtpl).replace("@{", "{").format(**value)  # 根据条件选择模板
-                ret += nstr  # 拼接字符串
-                ret += self.getTree(id, itemtpl, selectedids, disabledids, itemprefix + k + self.nbsp, toptpl)  # 递归生成子树
-                number += 1
-        return ret  # 返回树形结构字符串
-    
+        selected_set = _id_set(selectedids)
+        disabled_set = _id_set(disabledids)
+        itemtpl = itemtpl.replace("@{", "{")
+        toptpl = toptpl.replace("@{", "{") if toptpl else toptpl
+        parts = []
+        for value, spacer, _ in self._walk(myid, itemprefix):
+            id = value['id']
+            selected = 'selected' if str(id) in selected_set else ''  # 判断是否选中
+            disabled = 'disabled' if str(id) in disabled_set else ''  # 判断是否禁用
+            value.update({'selected': selected, 'disabled': disabled, 'spacer': spacer})  # 更新节点信息
+            fields = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
+            use_top = toptpl and (str(value[self.pidname]) == "0" or self._child.get(id))
+            parts.append((toptpl if use_top else itemtpl).format(**fields))  # 根据条件选择模板
+        return ''.join(parts)  # 返回树形结构字符串
+
+    def _render_nested(self, myid, render):
+        """
+        自底向上渲染嵌套结构（getTreeUl / getTreeMenu 共用）。
+
+        :param render: 回调 render(节点, 子节点 HTML, 层级) -> 节点 HTML
+        :return: myid 下全部子节点的 HTML
+        """
+        self._ensure_index()
+        seen = set()
+        # 栈元素: (子节点迭代器, 已渲染片段, 所属节点, 层级)
+        stack = [(iter(list(self._child.get(myid, {}).values())), [], None, 0)]
+        while True:
+            children, parts, owner, level = stack[-1]
+            value = next(children, None)
+            if value is not None:
+                if id(value) in seen:  # 数据中存在环
+                    continue
+                seen.add(id(value))
+                stack.append((iter(list(self._child.get(value['id'], {}).values())), [], value, level + 1))
+                continue
+            stack.pop()
+            childdata = ''.join(parts)
+            if owner is None:
+                return childdata
+            stack[-1][1].append(render(owner, childdata, level - 1))
+
     def getTreeUl(self, myid, itemtpl, selectedids='', disabledids='', wraptag='ul', wrapattr=''):
         """
         根据指定 ID 生成树形结构的 HTML 列表（使用 ul 标签）。
@@ -195,22 +315,22 @@ class Tree:
         :param wrapattr: 包裹标签的 HTML 属性
         :return: 树形结构的 HTML 列表
         """
-        str = ''  # 初始化返回字符串
-        childs = self.getChild(myid)  # 获取子节点
-        if childs:
-            for value in childs.values():
-                id = value['id']
-                del value['child']  # 删除 child 字段
-                selected = 'selected' if str(id) in (selectedids if isinstance(selectedids, list) else selectedids.split(',')) else ''  # 判断是否选中
-                disabled = 'disabled' if str(id) in (disabledids if isinstance(disabledids, list) else disabledids.split(',')) else ''  # 判断是否禁用
-                value.update({'selected': selected, 'disabled': disabled})  # 更新节点信息
-                value = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
-                nstr = itemtpl.format(**value)  # 格式化生成节点
-                childdata = self.getTreeUl(id, itemtpl, selectedids, disabledids, wraptag, wrapattr)  # 递归获取子节点
-                childlist = f"<{wraptag} {wrapattr}>{childdata}</{wraptag}>" if childdata else ""  # 包裹子节点
-                str += nstr.replace("@{childlist}", childlist)  # 拼接子节点
-        return str  # 返回树形结构
-    
+        selected_set = _id_set(selectedids)
+        disabled_set = _id_set(disabledids)
+
+        def render(value, childdata, level):
+            id = value['id']
+            value.pop('child', None)  # 删除 child 字段
+            selected = 'selected' if str(id) in selected_set else ''  # 判断是否选中
+            disabled = 'disabled' if str(id) in disabled_set else ''  # 判断是否禁用
+            value.update({'selected': selected, 'disabled': disabled})  # 更新节点信息
+            fields = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
+            nstr = itemtpl.format(**fields)  # 格式化生成节点
+            childlist = f"<{wraptag} {wrapattr}>{childdata}</{wraptag}>" if childdata else ""  # 包裹子节点
+            return nstr.replace("@{childlist}", childlist)
+
+        return self._render_nested(myid, render)
+
     def getTreeMenu(self, myid, itemtpl, selectedids='', disabledids='', wraptag='ul', wrapattr='', deeplevel=0):
         """
         根据指定 ID 生成树形结构的菜单 HTML。
@@ -224,34 +344,34 @@ class Tree:
         :param deeplevel: 当前节点的层级深度
         :return: 树形结构的菜单 HTML 字符串
         """
-        str = ''  # 初始化返回字符串
-        childs = self.getChild(myid)  # 获取子节点
-        if childs:
-            for value in childs.values():
-                id = value['id']
-                del value['child']  # 删除 child 字段
-                selected = 'selected' if str(id) in (selectedids if isinstance(selectedids, list) else selectedids.split(',')) else ''  # 判断是否选中
-                disabled = 'disabled' if str(id) in (disabledids if isinstance(disabledids, list) else disabledids.split(',')) else ''  # 判断是否禁用
-                value.update({'selected': selected, 'disabled': disabled})  # 更新节点信息
-                value = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
-                bakvalue = {k: value[k] for k in value.keys() if k in ['@url', '@caret', '@class']}  # 备份部分键值对
-                value = {k: value[k] for k in value.keys() if k not in bakvalue}  # 更新剩余键值对
-                nstr = itemtpl.format(**value)  # 格式化生成节点
-                value.update(bakvalue)  # 恢复备份的键值对
-                childdata = self.getTreeMenu(id, itemtpl, selectedids, disabledids, wraptag, wrapattr, deeplevel + 1)  # 递归获取子节点
-                childlist = f"<{wraptag} {wrapattr}>{childdata}</{wraptag}>" if childdata else ""  # 包裹子节点
-                childlist = childlist.replace("@class", 'last' if childlist else '')  # 替换 class 属性
-                value.update({
-                    "@childlist": childlist,
-                    "@url": "javascript:;" if childdata or value.get('@url') is None else value['@url'],  # 判断是否有子节点
-                    "@addtabs": ("" if childdata or value.get('@url') is None else (('&' if '?' in value['@url'] else '?') + "ref=addtabs")),  # 添加额外参数
-                    "@caret": "<i class=\"fa fa-angle-left\"></i>" if childdata and (not value.get('@badge') or not value['@badge']) else '',  # 处理 caret 图标
-                    "@badge": value['@badge'] if '@badge' in value else '',  # 处理 badge
-                    "@class": (f" active" if value['selected'] else '') + (f" disabled" if value['disabled'] else '') + (f" treeview{' treeview-open' if True else ''}" if childdata else '')  # 处理 class 属性
-                })
-                str += nstr.format(**value)  # 拼接字符串
-        return str  # 返回树形菜单 HTML
-    
+        selected_set = _id_set(selectedids)
+        disabled_set = _id_set(disabledids)
+
+        def render(value, childdata, level):
+            id = value['id']
+            value.pop('child', None)  # 删除 child 字段
+            selected = 'selected' if str(id) in selected_set else ''  # 判断是否选中
+            disabled = 'disabled' if str(id) in disabled_set else ''  # 判断是否禁用
+            value.update({'selected': selected, 'disabled': disabled})  # 更新节点信息
+            fields = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
+            bakvalue = {k: fields[k] for k in fields.keys() if k in ['@url', '@caret', '@class']}  # 备份部分键值对
+            fields = {k: fields[k] for k in fields.keys() if k not in bakvalue}  # 更新剩余键值对
+            nstr = itemtpl.format(**fields)  # 格式化生成节点
+            fields.update(bakvalue)  # 恢复备份的键值对
+            childlist = f"<{wraptag} {wrapattr}>{childdata}</{wraptag}>" if childdata else ""  # 包裹子节点
+            childlist = childlist.replace("@class", 'last' if childlist else '')  # 替换 class 属性
+            fields.update({
+                "@childlist": childlist,
+                "@url": "javascript:;" if childdata or fields.get('@url') is None else fields['@url'],  # 判断是否有子节点
+                "@addtabs": ("" if childdata or fields.get('@url') is None else (('&' if '?' in fields['@url'] else '?') + "ref=addtabs")),  # 添加额外参数
+                "@caret": "<i class=\"fa fa-angle-left\"></i>" if childdata and (not fields.get('@badge') or not fields['@badge']) else '',  # 处理 caret 图标
+                "@badge": fields['@badge'] if '@badge' in fields else '',  # 处理 badge
+                "@class": (" active" if selected else '') + (" disabled" if disabled else '') + (" treeview treeview-open" if childdata else '')  # 处理 class 属性
+            })
+            return nstr.format(**fields)
+
+        return self._render_nested(myid, render)
+
     def getTreeSpecial(self, myid, itemtpl1, itemtpl2, selectedids=0, disabledids=0, itemprefix=''):
         """
         根据指定 ID 生成特殊格式的树形结构 HTML。
@@ -264,60 +384,34 @@ class Tree:
         :param itemprefix: 树形结构的前缀符号
         :return: 树形结构的 HTML 字符串
         """
-        ret = ''  # 初始化返回字符串
-        number = 1  # 当前处理的节点序号
-        childs = self.getChild(myid)  # 获取子节点
-        if childs:
-            total = len(childs)  # 子节点总数
-            for id, value in childs.items():
-                j = k = ''  # 初始化符号变量
-                if number == total:  # 如果是最后一个子节点
-                    j += self.icon[2]  # 使用特殊符号
-                    k = self.nbsp if itemprefix else ''
-                else:
-                    j += self.icon[1]
-                    k = self.icon[0] if itemprefix else ''
-                spacer = itemprefix + j if itemprefix else ''  # 生成前缀符号
-                selected = 'selected' if str(id) in (selectedids if isinstance(selectedids, list) else selectedids.split(',')) else ''  # 判断是否选中
-                disabled = 'disabled' if str(id) in (disabledids if isinstance(disabledids, list) else disabledids.split(',')) else ''  # 判断是否禁用
-                value.update({'selected': selected, 'disabled': disabled, 'spacer': spacer})  # 更新节点信息
-                value = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
-                nstr = (itemtpl1 if "@disabled" not in value or not value[f"@disabled"] else itemtpl2).format(**value)  # 根据条件选择模板
-                ret += nstr  # 拼接字符串
-                ret += self.getTreeSpecial(id, itemtpl1, itemtpl2, selectedids, disabledids, itemprefix + k + self.nbsp)  # 递归生成子树
-                number += 1
-        return ret  # 返回树形结构 HTML
-    
+        selected_set = _id_set(selectedids)
+        disabled_set = _id_set(disabledids)
+        parts = []
+        for value, spacer, _ in self._walk(myid, itemprefix):
+            id = value['id']
+            selected = 'selected' if str(id) in selected_set else ''  # 判断是否选中
+            disabled = 'disabled' if str(id) in disabled_set else ''  # 判断是否禁用
+            value.update({'selected': selected, 'disabled': disabled, 'spacer': spacer})  # 更新节点信息
+            fields = {f"@{key}": value[key] for key in value}  # 格式化模板占位符
+            parts.append((itemtpl1 if not fields["@disabled"] else itemtpl2).format(**fields))  # 根据条件选择模板
+        return ''.join(parts)  # 返回树形结构 HTML
+
     def getTreeArray(self, myid, itemprefix=''):
         """
         生成树形结构的数组表示形式。
 
         :param myid: 需要生成树形结构的起始节点 ID
         :param itemprefix: 树形结构的前缀符号
-        :return: 树形结构的数组
+        :return: 树形结构的数组，每个节点的 childlist 为其子节点数组
         """
-        childs = self.getChild(myid)  # 获取子节点
-        n = 0  # 初始化计数器
         data = []  # 存储树形结构的数组
-        number = 1  # 当前处理的节点序号
-        if childs:
-            total = len(childs)  # 子节点总数
-            for _, value in childs.items():
-                j = k = ''  # 初始化符号变量
-                if number == total:  # 如果是最后一个子节点
-                    j += self.icon[2]  # 使用特殊符号
-                    k = self.nbsp if itemprefix else ''
-                else:
-                    j += self.icon[1]
-                    k = self.icon[0] if itemprefix else ''
-                spacer = itemprefix + j if itemprefix else ''  # 生成前缀符号
-                value['spacer'] = spacer  # 更新节点信息
-                data.append(value)  # 添加节点到数组
-                data[n]['childlist'] = self.getTreeArray(value['id'], itemprefix + k + self.nbsp)  # 递归生成子节点
-                n += 1
-                number += 1
+        lists = {}  # 节点对象 -> 其 childlist
+        for value, spacer, parent in self._walk(myid, itemprefix):
+            value['spacer'] = spacer  # 更新节点信息
+            value['childlist'] = lists[id(value)] = []
+            (data if parent is None else lists[id(parent)]).append(value)
         return data  # 返回树形结构的数组
-    
+
     def getTreeList(self, data=None, field='name'):
         """
         将树形结构数据转换为列表形式，并按指定字段格式化。
@@ -327,20 +421,24 @@ class Tree:
         :return: 格式化后的树形结构列表
         """
         arr = []  # 初始化返回数组
-        for value in data:
-            childlist = value['childlist']  # 获取子节点列表
-            del value['childlist']  # 删除子节点列表字段
+        stack = [iter(data or [])]
+        while stack:
+            value = next(stack[-1], None)
+            if value is None:
+                stack.pop()
+                continue
+            childlist = value.pop('childlist')  # 删除子节点列表字段
             value[field] = value['spacer'] + ' ' + value[field]  # 格式化节点名称
             value['haschild'] = 1 if childlist else 0  # 判断是否有子节点
             if value['id']:
                 arr.append(value)  # 添加节点到返回数组
             if childlist:
-                arr.extend(self.getTreeList(childlist, field))  # 递归处理子节点
+                stack.append(iter(childlist))  # 继续处理子节点
         return arr  # 返回格式化后的树形结构列表
 
-    
-    
-    
+
+
+
     # options = {
     #     'pidname': 'pid',
     #     'nbsp': '&nbsp;&nbsp;&nbsp;&nbsp;',
@@ -360,4 +458,4 @@ class Tree:
     #         } for rule in admin_rule_list]
     # tree = Tree(options)
     # tree.init(data)
-    # admin_rule_tree_list = tree.getTreeList(tree.getTreeArray(0),field='title')
\ No newline at end of file
+    # admin_rule_tree_list = tree.getTreeList(tree.getTreeArray(0),field='title')
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session, Query
 from sqlalchemy import and_, or_
 from app.models.sys_admin_group import SysAdminGroup
 from app.schemas.sys_admin_group import SysAdminGroupCreate, SysAdminGroupUpdate
+from app.services.hierarchy_service import hierarchy_service
 from app.utils.log_utils import logger
 
 
@@ -120,6 +121,7 @@ class CRUDSysAdminGroup:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_create(db, db_obj)
             return db_obj
         except Exception:
             db.rollback()
@@ -146,12 +148,17 @@ class CRUDSysAdminGroup:
                     if existing:
                         raise ValueError(_(f"Duplicate value for name: '{new_name}'"))
 
+            old_parent_id = hierarchy_service.parent_of(db_obj)
+            if update_data.get('pid') is not None:
+                hierarchy_service.check_move(db, db_obj, update_data['pid'])
+
             for field, value in update_data.items():
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, value)
             
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_update(db, db_obj, old_parent_id)
             return db_obj
         except Exception:
             db.rollback()
@@ -165,6 +172,7 @@ class CRUDSysAdminGroup:
             if obj:
                 db.delete(obj)
                 db.commit()
+                hierarchy_service.on_delete(db, SysAdminGroup, id)
             return obj
         except Exception:
             db.rollback()
@@ -172,6 +180,18 @@ class CRUDSysAdminGroup:
             raise
 
 
+    def get_subtree(self, db: Session, id: int, include_self: bool = True) -> List[SysAdminGroup]:
+        """Get a SysAdminGroup node and all of its descendants (resolved in SQL via the closure index)"""
+        return hierarchy_service.get_subtree(db, SysAdminGroup, id, include_self)
+
+    def get_ancestors(self, db: Session, id: int, include_self: bool = False) -> List[SysAdminGroup]:
+        """Get the ancestors of a SysAdminGroup node, ordered from the root down"""
+        return hierarchy_service.get_ancestors(db, SysAdminGroup, id, include_self)
+
+    def subtree_query(self, db: Session, id: int) -> Query:
+        """Base query limited to one subtree, usable with get_multi/get_total"""
+        return hierarchy_service.subtree_query(db, SysAdminGroup, id)
+
 # Helper class for chainable query building
 class QueryBuilderSysAdminGroup:
     def __init__(self, db: Session, query: Query, crud_base: CRUDSysAdminGroup):
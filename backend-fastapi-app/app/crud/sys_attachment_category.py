@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session, Query
 from sqlalchemy import and_, or_
 from app.models.sys_attachment_category import SysAttachmentCategory
 from app.schemas.sys_attachment_category import SysAttachmentCategoryCreate, SysAttachmentCategoryUpdate
+from app.services.hierarchy_service import hierarchy_service
 from app.utils.log_utils import logger
 
 class CRUDSysAttachmentCategory:
@@ -119,6 +120,7 @@ class CRUDSysAttachmentCategory:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_create(db, db_obj)
             return db_obj
         except Exception:
             db.rollback()
@@ -145,12 +147,17 @@ class CRUDSysAttachmentCategory:
                     if existing:
                         raise ValueError(_(f"Duplicate value for name: '{new_name}'"))
 
+            old_parent_id = hierarchy_service.parent_of(db_obj)
+            if update_data.get('pid') is not None:
+                hierarchy_service.check_move(db, db_obj, update_data['pid'])
+
             for field, value in update_data.items():
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, value)
             
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_update(db, db_obj, old_parent_id)
             return db_obj
         except Exception:
             db.rollback()
@@ -164,6 +171,7 @@ class CRUDSysAttachmentCategory:
             if obj:
                 db.delete(obj)
                 db.commit()
+                hierarchy_service.on_delete(db, SysAttachmentCategory, id)
             return obj
         except Exception:
             db.rollback()
@@ -171,6 +179,18 @@ class CRUDSysAttachmentCategory:
             raise
 
 
+    def get_subtree(self, db: Session, id: int, include_self: bool = True) -> List[SysAttachmentCategory]:
+        """Get a SysAttachmentCategory node and all of its descendants (resolved in SQL via the closure index)"""
+        return hierarchy_service.get_subtree(db, SysAttachmentCategory, id, include_self)
+
+    def get_ancestors(self, db: Session, id: int, include_self: bool = False) -> List[SysAttachmentCategory]:
+        """Get the ancestors of a SysAttachmentCategory node, ordered from the root down"""
+        return hierarchy_service.get_ancestors(db, SysAttachmentCategory, id, include_self)
+
+    def subtree_query(self, db: Session, id: int) -> Query:
+        """Base query limited to one subtree, usable with get_multi/get_total"""
+        return hierarchy_service.subtree_query(db, SysAttachmentCategory, id)
+
 # Helper class for chainable query building
 class QueryBuilderSysAttachmentCategory:
     def __init__(self, db: Session, query: Query, crud_base: CRUDSysAttachmentCategory):
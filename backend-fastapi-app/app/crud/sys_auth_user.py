@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from app.models.sys_user import SysUser
 from app.schemas.sys_user import SysUserCreate
+from app.services.user_region_service import user_region_service
 from app.utils.log_utils import logger
 
 class CRUDSysAuthUser:
@@ -21,10 +22,11 @@ class CRUDSysAuthUser:
         db.refresh(db_obj)
         return db_obj
     
-    def create(self, db: Session, obj_in: SysUserCreate) -> SysUser:
+    def create(self, db: Session, obj_in: SysUserCreate, password_hash: Optional[str] = None) -> SysUser:
+        """创建用户；password_hash 为调用方预先计算好的 bcrypt 哈希（见 password_service）"""
         db_obj = SysUser()
         db_obj.username = str(obj_in.username)
-        db_obj._password = str(obj_in.password)
+        db_obj._password = password_hash or str(obj_in.password)
         db_obj.user_group_id = int(1)
         db_obj.status = 'normal'
         db_obj.level = int(0)
@@ -36,9 +38,13 @@ class CRUDSysAuthUser:
             db_obj.email = str(obj_in.email)
         if hasattr(obj_in, 'mobile') and obj_in.mobile:
             db_obj.mobile = str(obj_in.mobile)
+        if getattr(obj_in, 'join_ip', None):
+            db_obj.join_ip = str(obj_in.join_ip)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        if db_obj.join_ip:
+            user_region_service.assign(db, db_obj)
         return db_obj
     
 crud_sys_auth_user = CRUDSysAuthUser()
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session, Query
 from sqlalchemy import and_, or_
 from app.models.sys_general_category import SysGeneralCategory
 from app.schemas.sys_general_category import SysGeneralCategoryCreate, SysGeneralCategoryUpdate
+from app.services.hierarchy_service import hierarchy_service
 from app.utils.log_utils import logger
 
 class CRUDSysGeneralCategory:
@@ -119,6 +120,7 @@ class CRUDSysGeneralCategory:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_create(db, db_obj)
             return db_obj
         except Exception:
             db.rollback()
@@ -145,12 +147,17 @@ class CRUDSysGeneralCategory:
                     if existing:
                         raise ValueError(_(f"Duplicate value for name: '{new_name}'"))
 
+            old_parent_id = hierarchy_service.parent_of(db_obj)
+            if update_data.get('pid') is not None:
+                hierarchy_service.check_move(db, db_obj, update_data['pid'])
+
             for field, value in update_data.items():
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, value)
             
             db.commit()
             db.refresh(db_obj)
+            hierarchy_service.on_update(db, db_obj, old_parent_id)
             return db_obj
         except Exception:
             db.rollback()
@@ -164,6 +171,7 @@ class CRUDSysGeneralCategory:
             if obj:
                 db.delete(obj)
                 db.commit()
+                hierarchy_service.on_delete(db, SysGeneralCategory, id)
             return obj
         except Exception:
             db.rollback()
@@ -171,6 +179,18 @@ class CRUDSysGeneralCategory:
             raise
 
 
+    def get_subtree(self, db: Session, id: int, include_self: bool = True) -> List[SysGeneralCategory]:
+        """Get a SysGeneralCategory node and all of its descendants (resolved in SQL via the closure index)"""
+        return hierarchy_service.get_subtree(db, SysGeneralCategory, id, include_self)
+
+    def get_ancestors(self, db: Session, id: int, include_self: bool = False) -> List[SysGeneralCategory]:
+        """Get the ancestors of a SysGeneralCategory node, ordered from the root down"""
+        return hierarchy_service.get_ancestors(db, SysGeneralCategory, id, include_self)
+
+    def subtree_query(self, db: Session, id: int) -> Query:
+        """Base query limited to one subtree, usable with get_multi/get_total"""
+        return hierarchy_service.subtree_query(db, SysGeneralCategory, id)
+
 # Helper class for chainable query building
 class QueryBuilderSysGeneralCategory:
     def __init__(self, db: Session, query: Query, crud_base: CRUDSysGeneralCategory):
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session, Query
 from sqlalchemy import and_, or_
 from app.models.sys_user import SysUser
 from app.schemas.sys_user import SysUserCreate, SysUserUpdate
+from app.services.user_region_service import user_region_service
 from app.utils.log_utils import logger
 
 
@@ -136,6 +137,8 @@ class CRUDSysUser:
             db.add(db_obj)
             db.commit()
             db.refresh(db_obj)
+            if db_obj.join_ip:
+                user_region_service.assign(db, db_obj)
             return db_obj
         except Exception:
             db.rollback()
@@ -189,12 +192,15 @@ class CRUDSysUser:
                     if existing:
                         raise ValueError(_(f"Duplicate value for email: '{new_email}'"))
 
+            join_ip = db_obj.join_ip
             for field, value in update_data.items():
                 if hasattr(db_obj, field):
                     setattr(db_obj, field, value)
             
             db.commit()
             db.refresh(db_obj)
+            if db_obj.join_ip != join_ip:
+                user_region_service.assign(db, db_obj)
             return db_obj
         except Exception:
             db.rollback()
@@ -206,6 +212,7 @@ class CRUDSysUser:
         try:
             obj = self.get(db, id) # Use self.get for consistency
             if obj:
+                user_region_service.discard(db, id)
                 db.delete(obj)
                 db.commit()
             return obj
@@ -1,22 +1,24 @@
 # app/middleware/i18n_middleware.py
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi_babel import Babel
 from app.utils.log_utils import logger
 
-class I18nMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, babel: Babel):
-        super().__init__(app)
+class I18nMiddleware:
+    """根据 Accept-Language 设置当前语言环境（纯 ASGI 中间件）"""
+
+    def __init__(self, app: ASGIApp, babel: Babel):
+        self.app = app
         self.babel = babel
 
-    async def dispatch(self, request: Request, call_next):
-        # 从请求头中获取 'Accept-Language'
-        accept_language = request.headers.get('Accept-Language', self.babel.config.BABEL_DEFAULT_LOCALE)
-        
-        # 设置当前的语言环境
-        self.babel.locale = accept_language
-        logger.info(f"Locale set to {accept_language} for request {request.url}")
-        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            # 从请求头中获取 'Accept-Language'
+            accept_language = Headers(scope=scope).get('Accept-Language', self.babel.config.BABEL_DEFAULT_LOCALE)
+
+            # 设置当前的语言环境
+            self.babel.locale = accept_language
+            logger.debug(f"Locale set to {accept_language} for request {scope['path']}")
+
         # 继续处理请求
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
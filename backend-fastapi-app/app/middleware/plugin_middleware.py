@@ -1,35 +1,52 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import JSONResponse
-from sqlalchemy.orm import Session
-from app.dependencies.database import get_db
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.models.sys_plugin import SysPlugin
-from fastapi import Depends
 from app.utils.log_utils import logger
 from app.core.config import settings
-class PluginMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, get_db):
-        super().__init__(app)
 
+
+class PluginMiddleware:
+    """
+    插件路由启用检查（纯 ASGI 中间件）
+
+    只有 /api/v1/<plugin_uuid>/... 形式的插件路由才会查询数据库，其余请求直接透传
+    """
+
+    def __init__(self, app: ASGIApp, get_db):
+        self.app = app
         self.get_db = get_db
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
-        if path.startswith("/api/v1/plugins/"):
-            return await call_next(request)
+    def _plugin_enabled(self, plugin_uuid: str) -> bool:
+        db = next(self.get_db())
+        try:
+            plugin = db.query(SysPlugin).filter(SysPlugin.uuid == plugin_uuid).first()
+            return bool(plugin and plugin.enabled)
+        finally:
+            db.close()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if not path.startswith("/api/v1/") or path.startswith("/api/v1/plugins/"):
+            await self.app(scope, receive, send)
+            return
 
         # 检查是否请求的是某个插件的路由
         parts = path.strip("/").split("/")
-        arrow_routes = settings.ARROW_ROUTES
-        if len(parts) >= 2 and parts[0] == "api" and parts[1] == "v1":
-            if len(parts) >= 3 and parts[2] in arrow_routes:
-                # 非插件路由，不处理
-                return await call_next(request)
-            if len(parts) >= 4:
-                plugin_uuid = parts[2]
-                # 检查插件是否启用
-                async with self.get_db() as db:
-                    plugin = db.query(SysPlugin).filter(SysPlugin.uuid == plugin_uuid).first()
-                    if not plugin or not plugin.enabled:
-                        return JSONResponse(status_code=404, content={"detail": "Plugin not found or not enabled."})
-        return await call_next(request)
+        if len(parts) >= 3 and parts[2] in settings.ARROW_ROUTES:
+            # 非插件路由，不处理
+            await self.app(scope, receive, send)
+            return
+        if len(parts) >= 4:
+            plugin_uuid = parts[2]
+            # 检查插件是否启用
+            if not await run_in_threadpool(self._plugin_enabled, plugin_uuid):
+                logger.warning(f"Plugin not found or not enabled: {plugin_uuid}")
+                response = JSONResponse(status_code=404, content={"detail": "Plugin not found or not enabled."})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -7,6 +7,7 @@ from sqlalchemy import String, text, Enum
 from sqlalchemy.orm import validates, Mapped, mapped_column
 from .mixins import TimestampMixin
 from app.models import Base
+from app.core.config import settings
 from fastapi_babel import _
 
 logger = logging.getLogger(__name__)
@@ -128,7 +129,7 @@ class SysAdmin(TimestampMixin, Base):
             return
         if len(pw) < 8:
             raise ValueError(_("Password must be at least 8 characters"))
-        pw_hash = bcrypt.hashpw(pw.encode('utf8'), bcrypt.gensalt())
+        pw_hash = bcrypt.hashpw(pw.encode('utf8'), bcrypt.gensalt(settings.PASSWORD_BCRYPT_ROUNDS))
         self._password = pw_hash.decode('utf8')
 
     def check_password(self, pw: str) -> bool:
@@ -2,7 +2,7 @@ import re
 import logging
 from typing import Literal, Optional
 from datetime import date, datetime
-from sqlalchemy import String, text, TEXT
+from sqlalchemy import String, text, TEXT, UniqueConstraint
 from sqlalchemy.orm import validates, Mapped, mapped_column
 from .mixins import TimestampMixin
 from app.models import Base
@@ -14,7 +14,9 @@ logger = logging.getLogger(__name__)
 
 class SysAdminLog(TimestampMixin, Base):
     __tablename__ = 'sys_admin_log'
-    __table_args__ = ()
+    __table_args__ = (
+        UniqueConstraint('event_id', 'created_at', name='uk_event_id'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     admin_id: Mapped[int] = mapped_column()
@@ -60,13 +62,14 @@ class SysAdminLog(TimestampMixin, Base):
         return value
                     
     useragent: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    event_id: Mapped[Optional[str]] = mapped_column(String(32), nullable=True)
 
     def __repr__(self):
         return f'<SysAdminLog(id={self.id})>'
 
     @classmethod
     def from_dict(cls, data: dict) -> 'SysAdminLog':
-        valid_keys = {'username', 'url', 'useragent', 'ip', 'title', 'admin_id', 'content', 'id'}
+        valid_keys = {'username', 'url', 'useragent', 'ip', 'title', 'admin_id', 'content', 'event_id', 'id'}
         filtered_data = {key: value for key, value in data.items() if key in valid_keys}
         return cls(**filtered_data)
     
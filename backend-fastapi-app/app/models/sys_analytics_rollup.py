@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models import Base
+
+
+class SysAnalyticsRollup(Base):
+    """
+    分析数据预聚合计数
+
+    每一行是 metric 在 granularity（hour / day / all）粒度、bucket 时间段内、dimension 维度上的计数，
+    bucket 为 settings.TIMEZONE 下的本地时间；dimension 为空字符串表示该指标的总数。
+    由 analytics_rollup_service 增量维护
+    """
+    __tablename__ = 'sys_analytics_rollup'
+
+    metric: Mapped[str] = mapped_column(String(32), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    dimension: Mapped[str] = mapped_column(String(100), primary_key=True, default='')
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SysAnalyticsRollup({self.metric}/{self.granularity} {self.bucket} {self.dimension!r}: {self.value})>'
+
+    def to_dict(self) -> dict:
+        result_dict = {}
+        for column in self.__table__.columns:
+            result_dict[column.key] = getattr(self, column.key, None)
+        return result_dict
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models import Base
+
+
+class SysAnalyticsWatermark(Base):
+    """
+    分析数据增量汇总进度
+
+    source 为源表名，last_id 之前（含）的行已计入 sys_analytics_rollup
+    """
+    __tablename__ = 'sys_analytics_watermark'
+
+    source: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SysAnalyticsWatermark({self.source}: {self.last_id})>'
+
+    def to_dict(self) -> dict:
+        result_dict = {}
+        for column in self.__table__.columns:
+            result_dict[column.key] = getattr(self, column.key, None)
+        return result_dict
@@ -0,0 +1,25 @@
+from datetime import date, datetime
+
+from sqlalchemy import DATE, DateTime, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models import Base
+
+
+class SysLoginSketch(Base):
+    """
+    登录用户 HyperLogLog 草图
+
+    由 login_activity_service 按 (用户类型, 粒度, 时间段) 合并写入，registers 为 zlib 压缩后的寄存器，
+    用于统计任意时间窗口内登录过的去重用户数
+    """
+    __tablename__ = 'sys_login_sketch'
+    __table_args__ = ()
+
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket: Mapped[date] = mapped_column(DATE, primary_key=True)
+    registers: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SysLoginSketch({self.kind} {self.granularity} {self.bucket})>'
@@ -0,0 +1,30 @@
+from sqlalchemy import String, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models import Base
+
+
+class SysTreeClosure(Base):
+    """
+    层级表的闭包表索引
+
+    每一行表示 tree 表中 ancestor_id 是 descendant_id 的祖先（depth 为相隔层数，0 表示节点自身），
+    由 hierarchy_service 在节点新增、移动、删除时维护
+    """
+    __tablename__ = 'sys_tree_closure'
+    __table_args__ = (
+        Index('idx_tree_descendant', 'tree', 'descendant_id', 'depth'),
+    )
+
+    tree: Mapped[str] = mapped_column(String(64), primary_key=True)
+    ancestor_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    descendant_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<SysTreeClosure({self.tree}: {self.ancestor_id} -> {self.descendant_id})>'
+
+    def to_dict(self) -> dict:
+        result_dict = {}
+        for column in self.__table__.columns:
+            result_dict[column.key] = getattr(self, column.key, None)
+        return result_dict
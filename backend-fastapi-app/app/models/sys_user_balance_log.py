@@ -18,9 +18,9 @@ class SysUserBalanceLog(TimestampMixin, Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column()
-    balance: Mapped[float] = mapped_column(DECIMAL(10, 0))
-    before: Mapped[float] = mapped_column(DECIMAL(10, 0))
-    after: Mapped[float] = mapped_column(DECIMAL(10, 0))
+    balance: Mapped[float] = mapped_column(DECIMAL(10, 2))
+    before: Mapped[float] = mapped_column(DECIMAL(10, 2))
+    after: Mapped[float] = mapped_column(DECIMAL(10, 2))
     memo: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
     def __repr__(self):
@@ -0,0 +1,32 @@
+import logging
+from typing import Literal
+from sqlalchemy import String, Integer, UniqueConstraint, Enum
+from sqlalchemy.orm import Mapped, mapped_column
+from .mixins import TimestampMixin
+from app.models import Base
+
+logger = logging.getLogger(__name__)
+
+# ENUM definitions
+LedgerEnum = Enum('balance', 'score', name="ledger_enum", create_constraint=True)
+
+class SysUserLedgerKey(TimestampMixin, Base):
+    __tablename__ = 'sys_user_ledger_key'
+    __table_args__ = (
+        UniqueConstraint('idempotency_key', name='uk_idempotency_key'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    idempotency_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    ledger: Mapped[Literal['balance', 'score']] = mapped_column(LedgerEnum, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<SysUserLedgerKey(id={self.id})>'
+
+    def to_dict(self) -> dict:
+        result_dict = {}
+        for column in self.__table__.columns:
+            value = getattr(self, column.key, None)
+            result_dict[column.key] = value
+        return result_dict
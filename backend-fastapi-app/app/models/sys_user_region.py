@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.models import Base
+
+
+class SysUserRegion(Base):
+    """
+    用户注册地区
+
+    由 user_region_service 在用户创建或 join_ip 变化时按离线地区库解析写入，存量用户由后台任务补齐；
+    join_ip 与 sys_user 当前值不一致的记录视为过期
+    """
+    __tablename__ = 'sys_user_region'
+    __table_args__ = (
+        Index('idx_user_region_region', 'region'),
+    )
+
+    user_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    join_ip: Mapped[str] = mapped_column(String(50), nullable=False)
+    region: Mapped[str] = mapped_column(String(64), nullable=False)
+    resolved_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SysUserRegion({self.user_id}: {self.join_ip} -> {self.region})>'
+
+    def to_dict(self) -> dict:
+        result_dict = {}
+        for column in self.__table__.columns:
+            result_dict[column.key] = getattr(self, column.key, None)
+        return result_dict
@@ -38,7 +38,7 @@ import logging
 from pathlib import Path
 from app.utils.responses import success_response
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 from app.utils.log_utils import logger
 
 from .code_generators.model_generator import generate_model_code
@@ -228,7 +228,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi_babel import _
 from sqlalchemy.orm import Session
 from app.dependencies.database import get_db
-from app.core.security import get_current_admin
+from app.core.security import get_current_admin_principal
 from app.crud.{table.name} import crud_{table.name}
 from app.schemas.{table.name} import {class_name}Create, {class_name}Update
 from app.utils.responses import success_response
@@ -237,7 +237,7 @@ from app.models.{table.name} import {class_name} as {class_name}Model
 
 # Initialize the API router for {table.name} endpoints
 router = APIRouter(
-    prefix="/{table.name.removeprefix('sys_').replace('_', '/')}", tags=["{table.name.removeprefix('sys_')}"], dependencies=[Depends(get_current_admin)]
+    prefix="/{table.name.removeprefix('sys_').replace('_', '/')}", tags=["{table.name.removeprefix('sys_')}"], dependencies=[Depends(get_current_admin_principal)]
 )
 
 # Set the maximum per_page limit
@@ -408,7 +408,7 @@ def register(api_router: APIRouter):
         router,
         prefix="/plugins/generator",
         tags=["generator"],
-        dependencies=[Depends(get_current_admin)],
+        dependencies=[Depends(get_current_admin_principal)],
     )
     logger.info("Generator plugin routes registered.")
 
@@ -0,0 +1,459 @@
+"""
+分析数据预聚合服务
+
+分析接口原来每次缓存未命中都扫描 sys_user / sys_admin_log 原始表。这里把需要的计数预先汇总到
+sys_analytics_rollup，接口只读取固定数量的汇总行，耗时与历史数据量无关：
+
+- register：用户注册数，hour / day 粒度，维度为平台；
+- visit：后台访问数（sys_admin_log），hour / day 粒度，维度为操作标题；
+- login：登录成功次数，hour / day 粒度，维度为平台；
+- users：用户总数，all 粒度，维度为平台；
+- last_login：按最后登录时间（sys_user.login_time）所在日期统计的用户数，day 粒度。
+  每个用户只计入一天，任意日期区间内的值相加即为该区间内登录过的去重用户数。
+
+注册和访问由后台任务按 id 水位线增量汇总：每次只读取 sys_analytics_watermark 记录的 id 之后的新行，
+计数和水位线在同一事务中提交。登录在请求中调用 record_login() 计入进程内缓冲，由后台任务批量累加。
+last_login 只由 record_login() 增量维护，增量汇总新用户时不再计入（否则注册后、汇总前登录的用户会被计两次）。
+users 和 last_login 是状态量，后台任务按 ANALYTICS_ROLLUP_RECONCILE_INTERVAL 从 sys_user 重新校准，
+修正并发登录、直接修改数据库等造成的偏差。
+"""
+import asyncio
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sys_admin_log import SysAdminLog
+from app.models.sys_analytics_rollup import SysAnalyticsRollup
+from app.models.sys_analytics_watermark import SysAnalyticsWatermark
+from app.models.sys_user import SysUser
+from app.services import timeseries
+from app.services.timeseries import TimeSeries, local_now, to_local
+from app.utils.log_utils import logger
+
+# 指标
+REGISTER = "register"
+VISIT = "visit"
+LOGIN = "login"
+USERS = "users"
+LAST_LOGIN = "last_login"
+
+# 粒度
+HOUR = "hour"
+DAY = "day"
+ALL = "all"
+
+TOTAL = ""  # 指标总数所在的维度
+ALL_BUCKET = datetime(1970, 1, 1)  # all 粒度的固定时间段
+DIMENSION_LENGTH = 100
+LAST_LOGIN_WINDOW_DAYS = 35  # 例行校准时重算的最后登录日期范围，更早的日期只在进程首次校准时重算
+
+ROLLUP_INITIAL_DELAY = 5  # 应用启动后首次运行的延迟（秒）
+ROLLUP_LOCK_NAME = "zayum_analytics_rollup"  # 多进程部署时用于互斥的 MySQL 命名锁
+
+_table = SysAnalyticsRollup.__table__
+_KEY_COLUMNS = ("metric", "granularity", "bucket", "dimension")
+
+Key = Tuple[str, str, datetime, str]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _dimension(value: Optional[str]) -> str:
+    return (value or "")[:DIMENSION_LENGTH]
+
+
+def _count_event(counts: Counter, metric: str, at: datetime, dimension: Optional[str], amount: int = 1) -> None:
+    """按 hour / day 粒度计入一次事件，总数和维度各一行"""
+    local = to_local(at)
+    dimension = _dimension(dimension)
+    for granularity, bucket in ((HOUR, _hour(local)), (DAY, _day(local))):
+        counts[(metric, granularity, bucket, TOTAL)] += amount
+        if dimension:
+            counts[(metric, granularity, bucket, dimension)] += amount
+
+
+def _upsert(conn: Connection, counts: Dict[Key, int], increment: bool) -> None:
+    """
+    写入汇总行，increment 为 True 时累加到已有值，否则覆盖
+
+    MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite / PostgreSQL 使用 ON CONFLICT DO UPDATE
+    """
+    if not counts:
+        return
+    now = _utc_now()
+    rows = [
+        {"metric": m, "granularity": g, "bucket": b, "dimension": d, "value": v, "updated_at": now}
+        for (m, g, b, d), v in counts.items()
+        if v or not increment
+    ]
+    if not rows:
+        return
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(_table)
+        new = stmt.inserted
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(_table)
+        new = stmt.excluded
+    values = {
+        "value": _table.c.value + new.value if increment else new.value,
+        "updated_at": new.updated_at,
+    }
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(**values)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=list(_KEY_COLUMNS), set_=values)
+    conn.execute(stmt, rows)
+
+
+def _read_watermark(conn: Connection, source: str) -> int:
+    return conn.scalar(
+        select(SysAnalyticsWatermark.last_id).where(SysAnalyticsWatermark.source == source)
+    ) or 0
+
+
+def _write_watermark(conn: Connection, source: str, last_id: int) -> None:
+    table = SysAnalyticsWatermark.__table__
+    now = _utc_now()
+    updated = conn.execute(
+        table.update().where(table.c.source == source).values(last_id=last_id, updated_at=now)
+    ).rowcount
+    if not updated:
+        conn.execute(table.insert().values(source=source, last_id=last_id, updated_at=now))
+
+
+def _count_users(rows, counts: Counter) -> int:
+    last_id = 0
+    for row_id, created_at, platform in rows:
+        platform = platform or "other"
+        if created_at is not None:
+            _count_event(counts, REGISTER, created_at, platform)
+        counts[(USERS, ALL, ALL_BUCKET, TOTAL)] += 1
+        counts[(USERS, ALL, ALL_BUCKET, platform)] += 1
+        last_id = row_id
+    return last_id
+
+
+def _count_visits(rows, counts: Counter) -> int:
+    last_id = 0
+    for row_id, created_at, title in rows:
+        if created_at is not None:
+            _count_event(counts, VISIT, created_at, title)
+        last_id = row_id
+    return last_id
+
+
+# 增量汇总的源表：表名 -> (读取的列, 计数函数)
+SOURCES = {
+    "sys_user": ((SysUser.id, SysUser.created_at, SysUser.platform), _count_users),
+    "sys_admin_log": ((SysAdminLog.id, SysAdminLog.created_at, SysAdminLog.title), _count_visits),
+}
+
+
+class AnalyticsRollupService:
+    """预聚合计数的维护与查询"""
+
+    def __init__(self):
+        self._pending: Counter = Counter()
+        self._pending_lock = threading.Lock()
+        self._reconciled_at = 0.0
+        self._full_reconciled = False
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ----------------------------------------
+    # 写入事件
+    # ----------------------------------------
+    def record_login(self, previous: Optional[datetime], current: datetime, platform: Optional[str],
+                     success: bool = True) -> None:
+        """
+        记录一次登录（只写入进程内缓冲，由后台任务批量累加）
+
+        Args:
+            previous: 本次登录前的 login_time
+            current: 本次写入的 login_time
+            platform: 用户平台
+            success: 登录是否成功；失败的登录只更新最后登录分布（与 login_time 字段保持一致）
+        """
+        counts: Counter = Counter()
+        if success:
+            _count_event(counts, LOGIN, current, platform or "other")
+        current_day = _day(to_local(current))
+        previous_day = _day(to_local(previous)) if previous is not None else None
+        if previous_day != current_day:
+            counts[(LAST_LOGIN, DAY, current_day, TOTAL)] += 1
+            if previous_day is not None:
+                counts[(LAST_LOGIN, DAY, previous_day, TOTAL)] -= 1
+        with self._pending_lock:
+            self._pending.update(counts)
+
+    def notify(self) -> None:
+        """源表有新行时提前唤醒后台任务（可在任意线程调用）"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+
+    def flush_pending(self, engine: Engine) -> int:
+        """把缓冲的登录计数累加到汇总表，返回写入的行数"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+        try:
+            with engine.connect() as conn, conn.begin():
+                _upsert(conn, pending, increment=True)
+        except Exception:
+            # 写入失败时放回缓冲，下次重试
+            with self._pending_lock:
+                self._pending.update(pending)
+            raise
+        return len(pending)
+
+    # ----------------------------------------
+    # 增量汇总
+    # ----------------------------------------
+    def catch_up(self, engine: Engine, source: str) -> int:
+        """汇总源表水位线之后的新行，返回处理的行数"""
+        columns, count_rows = SOURCES[source]
+        id_column, created_column = columns[0], columns[1]
+        batch_size = max(settings.ANALYTICS_ROLLUP_BATCH_SIZE, 1)
+        processed = 0
+        while True:
+            cutoff = _utc_now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_SETTLE_SECONDS)
+            with engine.connect() as conn, conn.begin():
+                last_id = _read_watermark(conn, source)
+                rows = conn.execute(
+                    select(*columns)
+                    .where(id_column > last_id, created_column <= cutoff)
+                    .order_by(id_column)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return processed
+                counts: Counter = Counter()
+                new_last_id = count_rows(rows, counts)
+                _upsert(conn, counts, increment=True)
+                _write_watermark(conn, source, new_last_id)
+            processed += len(rows)
+            if len(rows) < batch_size:
+                return processed
+
+    def reconcile(self, engine: Engine, full: bool = False) -> None:
+        """
+        从 sys_user 重新计算 users 和 last_login
+
+        users 只统计水位线之内的用户，之后的用户由增量汇总计入；last_login 不参与增量汇总，
+        按全部用户重算，默认只重算最近 LAST_LOGIN_WINDOW_DAYS 天，full 为 True 时重算全部日期
+        """
+        with engine.connect() as conn, conn.begin():
+            last_id = _read_watermark(conn, "sys_user")
+            users: Counter = Counter()
+            for platform, count in conn.execute(
+                select(SysUser.platform, func.count(SysUser.id))
+                .where(SysUser.id <= last_id)
+                .group_by(SysUser.platform)
+            ):
+                users[(USERS, ALL, ALL_BUCKET, platform or "other")] += count
+                users[(USERS, ALL, ALL_BUCKET, TOTAL)] += count
+            conn.execute(delete(_table).where(_table.c.metric == USERS))
+            _upsert(conn, users, increment=False)
+
+            window_start = None if full else _day(local_now()) - timedelta(days=LAST_LOGIN_WINDOW_DAYS)
+            # 一次分组查询按本地日期统计
+            logins = {
+                (LAST_LOGIN, DAY, day, TOTAL): count
+                for day, count in timeseries.aggregate(
+                    conn, SysUser.login_time, granularity=timeseries.DAY, start=window_start
+                ).items(skip_empty=True)
+            }
+            stale = delete(_table).where(_table.c.metric == LAST_LOGIN)
+            if window_start is not None:
+                stale = stale.where(_table.c.bucket >= window_start)
+            conn.execute(stale)
+            _upsert(conn, logins, increment=False)
+
+    def prune(self, engine: Engine) -> int:
+        """删除超出保留期的小时粒度计数"""
+        cutoff = _hour(local_now()) - timedelta(days=settings.ANALYTICS_ROLLUP_HOURLY_RETENTION_DAYS)
+        with engine.connect() as conn, conn.begin():
+            return conn.execute(
+                delete(_table).where(_table.c.granularity == HOUR, _table.c.bucket < cutoff)
+            ).rowcount
+
+    def run(self, engine: Optional[Engine] = None) -> Dict[str, int]:
+        """
+        执行一次汇总：累加登录缓冲、汇总各源表新行，到期时校准状态量
+
+        登录缓冲在每个进程中各自累加；其余步骤多进程部署时通过 MySQL 命名锁保证同一时间只有一个进程执行
+        """
+        if engine is None:
+            from app.dependencies.database import engine
+        if engine is None:
+            return {}
+
+        results: Dict[str, int] = {"login": self.flush_pending(engine)}
+        with engine.connect() as lock_conn:
+            use_lock = lock_conn.dialect.name == "mysql"
+            if use_lock and not lock_conn.scalar(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": ROLLUP_LOCK_NAME}
+            ):
+                return results
+            try:
+                for source in SOURCES:
+                    try:
+                        results[source] = self.catch_up(engine, source)
+                    except Exception as e:
+                        logger.error(f"AnalyticsRollup: failed to catch up {source}: {e}")
+                now = _utc_now().timestamp()
+                if not self._full_reconciled or now - self._reconciled_at >= settings.ANALYTICS_ROLLUP_RECONCILE_INTERVAL:
+                    self.reconcile(engine, full=not self._full_reconciled)
+                    self.prune(engine)
+                    self._full_reconciled = True
+                    self._reconciled_at = now
+            finally:
+                if use_lock:
+                    lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": ROLLUP_LOCK_NAME})
+        return results
+
+    # ----------------------------------------
+    # 查询
+    # ----------------------------------------
+    @staticmethod
+    def series(db: Session, metric: str, granularity: str, start: datetime, end: datetime,
+               dimension: str = TOTAL) -> Dict[datetime, int]:
+        """[start, end) 内各时间段的计数，没有计数的时间段不返回"""
+        rows = db.query(SysAnalyticsRollup.bucket, SysAnalyticsRollup.value).filter(
+            SysAnalyticsRollup.metric == metric,
+            SysAnalyticsRollup.granularity == granularity,
+            SysAnalyticsRollup.dimension == dimension,
+            SysAnalyticsRollup.bucket >= start,
+            SysAnalyticsRollup.bucket < end,
+        ).all()
+        return {bucket: int(value) for bucket, value in rows if value}
+
+    def timeline(self, db: Session, metric: str, granularity: str, start: datetime, end: datetime,
+                 dimension: str = TOTAL) -> TimeSeries:
+        """
+        [start, end) 内按 hour / day / week / month 补齐的时间序列
+
+        hour 读取小时计数（受 ANALYTICS_ROLLUP_HOURLY_RETENTION_DAYS 限制），其余粒度由天计数归并
+        """
+        source = HOUR if granularity == timeseries.HOUR else DAY
+        counts = self.series(db, metric, source, start, end, dimension)
+        return timeseries.accumulate(
+            np.array(list(counts), dtype="datetime64[s]"),
+            np.array(list(counts.values()), dtype=np.int64),
+            granularity, start, end,
+        )
+
+    @staticmethod
+    def value(db: Session, metric: str, granularity: str, bucket: datetime, dimension: str = TOTAL) -> int:
+        """单个时间段的计数"""
+        value = db.query(SysAnalyticsRollup.value).filter(
+            SysAnalyticsRollup.metric == metric,
+            SysAnalyticsRollup.granularity == granularity,
+            SysAnalyticsRollup.bucket == bucket,
+            SysAnalyticsRollup.dimension == dimension,
+        ).scalar()
+        return int(value or 0)
+
+    def total(self, db: Session, metric: str, granularity: str, start: datetime, end: datetime,
+              dimension: str = TOTAL) -> int:
+        """[start, end) 内的计数合计"""
+        return sum(self.series(db, metric, granularity, start, end, dimension).values())
+
+    @staticmethod
+    def breakdown(db: Session, metric: str, granularity: str,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, int]:
+        """按维度汇总的计数（不含总数行），start / end 为空时不限时间"""
+        query = db.query(SysAnalyticsRollup.dimension, func.sum(SysAnalyticsRollup.value)).filter(
+            SysAnalyticsRollup.metric == metric,
+            SysAnalyticsRollup.granularity == granularity,
+            SysAnalyticsRollup.dimension != TOTAL,
+        )
+        if start is not None:
+            query = query.filter(SysAnalyticsRollup.bucket >= start)
+        if end is not None:
+            query = query.filter(SysAnalyticsRollup.bucket < end)
+        rows = query.group_by(SysAnalyticsRollup.dimension).all()
+        return {dimension: int(value) for dimension, value in rows if value}
+
+    # ----------------------------------------
+    # 定时任务
+    # ----------------------------------------
+    async def _scheduler(self) -> None:
+        await asyncio.sleep(ROLLUP_INITIAL_DELAY)
+        while True:
+            self._wakeup.clear()
+            try:
+                results = await asyncio.to_thread(self.run)
+                if any(results.values()):
+                    logger.debug(f"AnalyticsRollup: {results}")
+            except Exception as e:
+                logger.error(f"AnalyticsRollup: run failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.ANALYTICS_ROLLUP_INTERVAL)
+                # 合并短时间内的多次唤醒
+                await asyncio.sleep(1)
+            except asyncio.TimeoutError:
+                pass
+
+    def start_scheduler(self) -> None:
+        """在事件循环中启动后台汇总任务"""
+        if not settings.ANALYTICS_ROLLUP_ENABLED or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._scheduler())
+        logger.info("AnalyticsRollup: scheduled")
+
+    async def stop_scheduler(self) -> None:
+        """停止后台任务，并写入尚未累加的登录计数"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        try:
+            await asyncio.to_thread(self._flush_on_shutdown)
+        except Exception as e:
+            logger.warning(f"AnalyticsRollup: failed to flush pending logins: {e}")
+
+    def _flush_on_shutdown(self) -> None:
+        from app.dependencies.database import engine
+        if engine is not None:
+            self.flush_pending(engine)
+
+
+analytics_rollup_service = AnalyticsRollupService()
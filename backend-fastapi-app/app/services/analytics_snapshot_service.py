@@ -0,0 +1,166 @@
+"""
+分析汇总快照写入服务
+
+分析接口原来每次缓存未命中都以时间戳为 id 调用 CRUD create 写入 sys_analytics_summary：先做多次唯一性查询再插入，
+一次看板刷新写入多行，并发刷新时 id 冲突。这里改为每个 (汇总类型, 周期) 只保留一行：
+
+- 接口调用 record() 把本次得到的指标合并到进程内缓冲，不访问数据库；
+- 后台任务按 ANALYTICS_SNAPSHOT_FLUSH_INTERVAL 把缓冲批量 upsert 到 sys_analytics_summary，
+  id 由类型和周期确定（如 daily_2026-10-19、monthly_2026-10），重复写入只更新本次带有的指标，
+  其余指标保持原值（多个接口各自写入的部分指标合并为同一行）。
+"""
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import JSON, func, null
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.models.sys_analytics_summary import SysAnalyticsSummary
+from app.services.timeseries import local_now
+from app.utils.log_utils import logger
+
+DAILY = "daily"
+MONTHLY = "monthly"
+REGIONAL = "regional"
+
+# 可以部分写入的指标列
+METRIC_COLUMNS = (
+    "total_users", "new_users", "active_users", "total_logins", "total_visits",
+    "user_group_distribution", "action_distribution",
+)
+
+_table = SysAnalyticsSummary.__table__
+
+# 缺少的指标写入 SQL NULL，由 COALESCE 保留原值（JSON 列的 None 会被写成 JSON null，需要用 null()）
+_MISSING = {column: null() if isinstance(_table.c[column].type, JSON) else None for column in METRIC_COLUMNS}
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _period(summary_type: str, at: datetime) -> Dict:
+    """汇总类型对应的周期列和行 id：月汇总按年月，日汇总和地区汇总按日期"""
+    if summary_type == MONTHLY:
+        return {
+            "id": f"{MONTHLY}_{at:%Y-%m}",
+            "summary_type": MONTHLY,
+            "summary_year": at.year,
+            "summary_month": at.month,
+        }
+    return {"id": f"{summary_type}_{at:%Y-%m-%d}", "summary_type": summary_type, "summary_date": at.date()}
+
+
+def _upsert(conn: Connection, rows) -> None:
+    """
+    按 id 写入快照，已存在时只更新非空的指标
+
+    MySQL 使用 INSERT ... ON DUPLICATE KEY UPDATE，SQLite / PostgreSQL 使用 ON CONFLICT DO UPDATE
+    """
+    dialect = conn.dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        stmt = dialect_insert(_table)
+        new = stmt.inserted
+    else:
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(_table)
+        new = stmt.excluded
+    values = {column: func.coalesce(new[column], _table.c[column]) for column in METRIC_COLUMNS}
+    values["updated_at"] = new.updated_at
+    if dialect == "mysql":
+        stmt = stmt.on_duplicate_key_update(**values)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=["id"], set_=values)
+    conn.execute(stmt, rows)
+
+
+class AnalyticsSnapshotService:
+    """汇总快照的缓冲与批量写入"""
+
+    def __init__(self):
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, summary_type: str, data: Dict, at: Optional[datetime] = None) -> None:
+        """
+        合并一次快照到缓冲（不访问数据库，可以在请求中调用）
+
+        Args:
+            summary_type: 汇总类型，'daily'、'monthly' 或 'regional'
+            data: 指标，只使用 METRIC_COLUMNS 中的键，值为 None 的指标不覆盖已有值
+            at: 快照所属时间（TIMEZONE 本地时间），默认当前时间
+        """
+        row = _period(summary_type, at or local_now())
+        metrics = {key: data[key] for key in METRIC_COLUMNS if data.get(key) is not None}
+        with self._lock:
+            pending = self._pending.setdefault(row["id"], row)
+            pending.update(metrics)
+
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """把缓冲的快照写入数据库，返回写入的行数"""
+        if engine is None:
+            from app.dependencies.database import engine
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or engine is None:
+            return 0
+        now = _utc_now()
+        # 同一语句中各行的列必须一致
+        rows = [
+            {"summary_date": None, "summary_year": None, "summary_month": None,
+             **_MISSING, **row, "created_at": now, "updated_at": now}
+            for row in pending.values()
+        ]
+        try:
+            with engine.connect() as conn, conn.begin():
+                _upsert(conn, rows)
+        except Exception:
+            # 写入失败时合并回缓冲（期间新记录的指标优先），下次重试
+            with self._lock:
+                for key, row in pending.items():
+                    self._pending[key] = {**row, **self._pending.get(key, {})}
+            raise
+        return len(rows)
+
+    # ----------------------------------------
+    # 定时任务
+    # ----------------------------------------
+    async def _scheduler(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ANALYTICS_SNAPSHOT_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"AnalyticsSnapshot: flush failed: {e}")
+
+    def start_scheduler(self) -> None:
+        """在事件循环中启动后台写入任务"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._scheduler())
+
+    async def stop_scheduler(self) -> None:
+        """停止后台任务，并写入缓冲中剩余的快照"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning(f"AnalyticsSnapshot: failed to flush pending snapshots: {e}")
+
+
+analytics_snapshot_service = AnalyticsSnapshotService()
@@ -0,0 +1,228 @@
+"""
+管理员操作日志异步批量写入服务
+
+请求路径上只把日志记录放入进程内有界队列（不做数据库操作），
+后台任务按条数或时间间隔攒批，在线程池中一次 executemany 写入 sys_admin_log。
+数据库不可用或队列已满时日志转入本地 spool（见 audit_spool.py），数据库恢复后再回放，
+保证日志写入永远不会拖慢、阻塞请求，也不会因数据库故障丢失。
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.sys_admin_log import SysAdminLog
+from app.services.analytics_rollup_service import analytics_rollup_service
+from app.services.audit_spool import AuditSpool
+from app.utils.log_utils import logger
+
+# 与 sys_admin_log 列长度保持一致，入队时截断，避免整批写入因单条超长失败
+_COLUMN_LIMITS = {'username': 30, 'url': 1500, 'title': 100, 'ip': 50}
+
+
+class AuditLogService:
+    """进程内审计日志队列及其后台写入任务"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[Dict] = []
+        self._inflight: Optional[asyncio.Future] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._spool = AuditSpool()
+        self._db_healthy = True
+        self._closing = False
+        self._dropped = 0
+        self._last_drop_warning = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(
+        self,
+        admin_id: int,
+        username: str,
+        url: str,
+        title: Optional[str],
+        content: str,
+        ip: str,
+        useragent: Optional[str] = None,
+    ) -> bool:
+        """
+        非阻塞地提交一条管理员操作日志
+
+        Returns:
+            bool: 是否成功入队；写入任务未启动时返回 False，队列已满时转入本地 spool 并返回 False
+        """
+        if not self.running:
+            return False
+        now = datetime.now(timezone.utc)
+        row = {
+            'event_id': uuid.uuid4().hex,
+            'admin_id': admin_id,
+            'username': username,
+            'url': url,
+            'title': title,
+            'content': content,
+            'ip': ip,
+            'useragent': useragent,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for key, limit in _COLUMN_LIMITS.items():
+            if row[key] and len(row[key]) > limit:
+                row[key] = row[key][:limit]
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except asyncio.QueueFull:
+            pass
+        # 队列已满：追加到 spool 的页缓存（不 fsync），由后台任务批量落盘
+        try:
+            self._spool.append([row], sync=False)
+        except OSError as e:
+            self._on_drop(e)
+        return False
+
+    def _on_drop(self, error: Exception) -> None:
+        """记录被丢弃的日志数，并限频输出告警"""
+        self._dropped += 1
+        now = time.monotonic()
+        if now - self._last_drop_warning >= 10:
+            self._last_drop_warning = now
+            logger.error(f"AuditLog: spool unavailable ({error}), {self._dropped} entries dropped so far")
+
+    def _write_batch(self, batch: List[Dict], engine: Optional[Engine] = None) -> None:
+        """在工作线程中批量写入一批日志，按 event_id 去重，可安全重复写入"""
+        if engine is None:
+            from app.dependencies.database import engine
+        statement = (
+            insert(SysAdminLog.__table__)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+        with engine.begin() as conn:
+            conn.execute(statement, batch)
+
+    async def _collect(self) -> None:
+        """
+        等待第一条日志，然后在 AUDIT_LOG_FLUSH_INTERVAL 内攒满最多 AUDIT_LOG_BATCH_SIZE 条
+
+        已取出的日志放在 self._batch 中，任务被取消时由 stop() 负责写入
+        """
+        self._batch.append(await self._queue.get())
+        deadline = time.monotonic() + settings.AUDIT_LOG_FLUSH_INTERVAL
+        while len(self._batch) < settings.AUDIT_LOG_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    def _drain_nowait(self) -> List[Dict]:
+        batch = []
+        while not self._queue.empty() and len(batch) < settings.AUDIT_LOG_BATCH_SIZE:
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Dict]) -> None:
+        """写入一批日志；数据库异常时改写入 spool，之后的批次直接进 spool 直到回放成功"""
+        if self._db_healthy:
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+                analytics_rollup_service.notify()
+                return
+            except Exception as e:
+                self._db_healthy = False
+                logger.error(f"AuditLog: failed to write {len(batch)} entries, spooling: {e}")
+        try:
+            await asyncio.to_thread(self._spool.append, batch)
+        except OSError as e:
+            self._dropped += len(batch)
+            logger.error(f"AuditLog: failed to spool {len(batch)} entries: {e}")
+
+    async def _replay(self) -> None:
+        """落盘 spool 中的溢出记录，并把已有的段回放到数据库"""
+        if self._spool.dirty:
+            await asyncio.to_thread(self._spool.sync)
+        if not self._spool.has_pending():
+            return
+        try:
+            count = await asyncio.to_thread(
+                self._spool.replay, self._write_batch, settings.AUDIT_LOG_BATCH_SIZE
+            )
+            self._db_healthy = True
+            if count:
+                logger.info(f"AuditLog: replayed {count} spooled entries")
+        except Exception as e:
+            self._db_healthy = False
+            logger.warning(f"AuditLog: spool replay failed, will retry: {e}")
+
+    async def _replayer(self) -> None:
+        while True:
+            await self._replay()
+            await asyncio.sleep(settings.AUDIT_SPOOL_REPLAY_INTERVAL)
+
+    async def _worker(self) -> None:
+        # 除了 cancel 之外再检查 _closing：Python 3.11 的 wait_for 在内部 future 恰好完成时会吞掉取消
+        while not self._closing:
+            await self._collect()
+            batch, self._batch = self._batch, []
+            # shield: 停止时正在写入的批次继续完成，由 stop() 等待
+            self._inflight = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._inflight)
+
+    def start(self) -> None:
+        """在事件循环中启动后台写入任务"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.AUDIT_LOG_QUEUE_SIZE)
+        self._closing = False
+        self._task = asyncio.create_task(self._worker())
+        self._replay_task = asyncio.create_task(self._replayer())
+        logger.info("AuditLog: writer started")
+
+    async def stop(self) -> None:
+        """停止后台写入任务，并把队列中剩余的日志全部写入"""
+        if self._task is None:
+            return
+        self._closing = True
+        self._replay_task.cancel()
+        try:
+            await self._replay_task
+        except asyncio.CancelledError:
+            pass
+        self._replay_task = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._inflight is not None and not self._inflight.done():
+            await self._inflight
+        self._inflight = None
+
+        pending = len(self._batch)
+        if self._batch:
+            batch, self._batch = self._batch, []
+            await self._flush(batch)
+        while True:
+            batch = self._drain_nowait()
+            if not batch:
+                break
+            pending += len(batch)
+            await self._flush(batch)
+        self._spool.close()
+        logger.info(f"AuditLog: writer stopped, flushed {pending} pending entries")
+
+
+audit_log_service = AuditLogService()
@@ -0,0 +1,161 @@
+"""
+审计日志本地落盘队列（spool）
+
+数据库不可用或写入队列已满时，审计日志以 NDJSON 追加写入本地分段文件，
+数据库恢复后由 replay() 按段批量回放到 sys_admin_log。
+每条记录带 event_id，回放使用 INSERT IGNORE，重复回放不会产生重复日志。
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+_SEGMENT_PREFIX = "seg-"
+_SEGMENT_SUFFIX = ".ndjson"
+
+
+def _encode(row: Dict) -> bytes:
+    data = {k: (v.isoformat() if isinstance(v, datetime) else v) for k, v in row.items()}
+    return (json.dumps(data, ensure_ascii=False, separators=(',', ':')) + "\n").encode()
+
+
+def _decode(line: bytes) -> Optional[Dict]:
+    """解析一行记录；进程崩溃时末尾可能残留半行，直接跳过"""
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None
+    for key in ('created_at', 'updated_at'):
+        if row.get(key):
+            row[key] = datetime.fromisoformat(row[key])
+    return row
+
+
+class AuditSpool:
+    """
+    只追加的分段日志文件
+
+    当前段写满 AUDIT_SPOOL_SEGMENT_SIZE 后滚动到新段；回放前会先封存当前段，
+    只有已封存的段才会被读取和删除，因此写入和回放互不干扰。
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._dirty = False
+
+    @property
+    def directory(self) -> str:
+        return self._directory or settings.AUDIT_SPOOL_DIR
+
+    def _segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+
+    def _open_segment(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if not self._seq:
+            segments = self._segments()
+            self._seq = int(segments[-1][len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]) if segments else 0
+        self._seq += 1
+        path = os.path.join(self.directory, f"{_SEGMENT_PREFIX}{self._seq:010d}{_SEGMENT_SUFFIX}")
+        self._file = open(path, "ab")
+
+    def _close_segment(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._dirty = False
+
+    def append(self, rows: List[Dict], sync: bool = True) -> None:
+        """
+        追加一批记录
+
+        Args:
+            rows: 审计日志行
+            sync: 是否立即 fsync；请求路径上传 False，由后台任务调用 sync() 批量落盘
+        """
+        payload = b"".join(_encode(row) for row in rows)
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(payload)
+            self._dirty = True
+            if sync:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._dirty = False
+            if self._file.tell() >= settings.AUDIT_SPOOL_SEGMENT_SIZE:
+                self._close_segment()
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def sync(self) -> None:
+        """把尚未落盘的追加内容 fsync 到磁盘"""
+        with self._lock:
+            if self._file is not None and self._dirty:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._dirty = False
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return self._file is not None or bool(self._segments())
+
+    def _read_segment(self, path: str) -> Iterator[Dict]:
+        with open(path, "rb") as f:
+            for line in f:
+                row = _decode(line)
+                if row is not None:
+                    yield row
+
+    def replay(self, write_batch, batch_size: int) -> int:
+        """
+        把已封存的段依次回放到数据库
+
+        Args:
+            write_batch: 批量写入函数，需按 event_id 幂等（INSERT IGNORE）
+            batch_size: 单批写入条数
+
+        Returns:
+            int: 回放的记录数；写入失败时抛出异常，未回放完的段保留到下次
+        """
+        with self._lock:
+            self._close_segment()
+            segments = self._segments()
+
+        replayed = 0
+        for name in segments:
+            path = os.path.join(self.directory, name)
+            batch = []
+            for row in self._read_segment(path):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    write_batch(batch)
+                    replayed += len(batch)
+                    batch = []
+            if batch:
+                write_batch(batch)
+                replayed += len(batch)
+            os.remove(path)
+            logger.info(f"AuditSpool: replayed segment {name}")
+        return replayed
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
@@ -0,0 +1,519 @@
+"""
+列式快照与即席分析服务
+
+按管理员、URL、时段等维度的探索性统计如果直接用 ORM 在主库上逐行查询，会长时间占用数据库。
+这里由后台任务按 COLUMNAR_SNAPSHOT_INTERVAL 把 sys_admin_log 和 sys_user 的常用列导出为列式快照
+（见 app.core.columnar），字符串列做字典编码；即席查询只读取 mmap 的列数组，用 NumPy 向量化完成过滤、
+分组计数、去重计数和分位数，不访问数据库。
+
+- 只追加的表（sys_admin_log）每次只读取水位之后的新行追加到上一版本，已归档的日志保留在快照中；
+  只读取写入超过 COLUMNAR_SNAPSHOT_SETTLE_SECONDS 秒的行，避免水位越过尚未提交的较小 id；
+  其余表每次全量导出。手动触发时可以指定全量重建；
+- 多进程部署时通过 MySQL 命名锁保证同一时间只有一个进程导出，各进程在查询时发现新版本后重新打开；
+- 时间列按 UTC 保存，按日期过滤和按小时、星期、日、周、月分组时按 TIMEZONE 本地时间计算。
+"""
+import asyncio
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+
+from app.core import columnar
+from app.core.columnar import DICT, FLOAT, INT, TIME, ColumnarSnapshot, DictionaryEncoder
+from app.core.config import settings
+from app.models.sys_admin_log import SysAdminLog
+from app.models.sys_user import SysUser
+from app.services import timeseries
+from app.services.timeseries import WEEK, day_bounds, utc_to_local
+from app.utils.log_utils import logger
+
+SNAPSHOT_INITIAL_DELAY = 120  # 应用启动后首次导出的延迟（秒）
+SNAPSHOT_LOCK_NAME = "zayum_columnar_snapshot"  # 多进程部署时用于互斥的 MySQL 命名锁
+MAX_LIMIT = 1000  # 单次查询最多返回的分组数
+DENSE_GROUPS = 1 << 24  # 组合分组数不超过该值时用 bincount 计数，否则排序去重
+
+
+def _url_path(url: Optional[str]) -> Optional[str]:
+    """URL 只保留路径部分，查询参数不同的同一接口归为一组"""
+    if url is None:
+        return None
+    return urlsplit(url).path or "/"
+
+
+class SnapshotTable:
+    """
+    导出到快照的表
+
+    Args:
+        model: 模型类，按主键 id 分批读取
+        columns: [(快照列名, 类型, 模型列, 值转换函数)]
+        time_column: 按日期过滤和按时段分组使用的时间列
+        append_only: 只追加的表增量导出
+    """
+
+    def __init__(self, model, columns: Sequence[Tuple[str, str, object, Optional[Callable]]],
+                 time_column: str, append_only: bool = False):
+        self.model = model
+        self.columns = columns
+        self.kinds = {name: kind for name, kind, _, _ in columns}
+        self.time_column = time_column
+        self.append_only = append_only
+
+
+SNAPSHOT_TABLES = {
+    'sys_admin_log': SnapshotTable(SysAdminLog, [
+        ("id", INT, SysAdminLog.id, None),
+        ("admin_id", INT, SysAdminLog.admin_id, None),
+        ("username", DICT, SysAdminLog.username, None),
+        ("path", DICT, SysAdminLog.url, _url_path),
+        ("title", DICT, SysAdminLog.title, None),
+        ("ip", DICT, SysAdminLog.ip, None),
+        ("created_at", TIME, SysAdminLog.created_at, None),
+    ], time_column="created_at", append_only=True),
+    'sys_user': SnapshotTable(SysUser, [
+        ("id", INT, SysUser.id, None),
+        ("user_group_id", INT, SysUser.user_group_id, None),
+        ("level", INT, SysUser.level, None),
+        ("score", INT, SysUser.score, None),
+        ("balance", FLOAT, SysUser.balance, None),
+        ("successions", INT, SysUser.successions, None),
+        ("gender", DICT, SysUser.gender, None),
+        ("status", DICT, SysUser.status, None),
+        ("platform", DICT, SysUser.platform, None),
+        ("created_at", TIME, SysUser.created_at, None),
+        ("login_time", TIME, SysUser.login_time, None),
+    ], time_column="created_at"),
+}
+
+# 按时间列派生的分组键
+TIME_PARTS = ("hour", "weekday", "day", "week", "month")
+
+
+class ColumnarService:
+    """列式快照的导出与查询"""
+
+    def __init__(self):
+        self._snapshots: Dict[str, Tuple[Optional[str], Optional[ColumnarSnapshot]]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._build_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _table_dir(table: str) -> str:
+        return os.path.join(settings.COLUMNAR_SNAPSHOT_DIR, table)
+
+    # ----------------------------------------
+    # 导出
+    # ----------------------------------------
+    def build_table(self, engine: Engine, table: str, full: bool = False) -> int:
+        """
+        导出一张表的新快照版本
+
+        Args:
+            engine: 数据库引擎
+            table: 表名
+            full: 只追加的表也全量重建
+
+        Returns:
+            本次读取的行数（增量导出没有新行时不生成新版本）
+        """
+        spec = SNAPSHOT_TABLES[table]
+        previous = None
+        if spec.append_only and not full:
+            previous = self.snapshot(table)
+
+        encoders = {
+            name: DictionaryEncoder(previous.dictionary(name) if previous else ())
+            for name, kind in spec.kinds.items() if kind == DICT
+        }
+        chunks: Dict[str, List[np.ndarray]] = {name: [] for name in spec.kinds}
+        after_id = previous.watermark if previous else 0
+        statement = select(*(column for _, _, column, _ in spec.columns))
+        if spec.append_only:
+            # 水位按 id 推进，较小 id 的事务可能晚于较大 id 提交，只读取写入时间早于截止时间的行
+            cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+                seconds=settings.COLUMNAR_SNAPSHOT_SETTLE_SECONDS
+            )
+            time_column = next(column for name, _, column, _ in spec.columns if name == spec.time_column)
+            statement = statement.where(time_column <= cutoff)
+        batch_size = max(settings.COLUMNAR_SNAPSHOT_BATCH_SIZE, 1)
+        read = 0
+        with engine.connect() as conn:
+            while True:
+                rows = conn.execute(
+                    statement.where(spec.model.id > after_id).order_by(spec.model.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                for index, (name, kind, _, convert) in enumerate(spec.columns):
+                    values = [row[index] for row in rows]
+                    if convert is not None:
+                        values = [convert(value) for value in values]
+                    chunks[name].append(
+                        encoders[name].encode(values) if kind == DICT else columnar.to_array(kind, values)
+                    )
+                read += len(rows)
+                after_id = rows[-1][0]
+        if previous is not None and not read:
+            return 0
+
+        columns = {}
+        for name, kind in spec.kinds.items():
+            parts = chunks[name]
+            if previous is not None:
+                parts.insert(0, previous.column(name))
+            columns[name] = np.concatenate(parts) if parts else np.array([], dtype=columnar.DTYPES[kind])
+        columnar.write_snapshot(
+            self._table_dir(table), table, columns, spec.kinds,
+            {name: encoder.values for name, encoder in encoders.items()}, after_id,
+        )
+        return read
+
+    def run_snapshot(self, engine: Optional[Engine] = None, full: bool = False) -> Dict[str, int]:
+        """
+        导出所有表，多进程部署时通过 MySQL 命名锁保证同一时间只有一个进程执行
+
+        Returns:
+            每张表读取的行数
+        """
+        if engine is None:
+            from app.dependencies.database import engine
+        if engine is None:
+            return {}
+
+        results: Dict[str, int] = {}
+        with engine.connect() as lock_conn:
+            use_lock = lock_conn.dialect.name == "mysql"
+            if use_lock and not lock_conn.scalar(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": SNAPSHOT_LOCK_NAME}
+            ):
+                logger.info("Columnar: another worker is building snapshots, skipped")
+                return results
+            try:
+                for table in SNAPSHOT_TABLES:
+                    try:
+                        results[table] = self.build_table(engine, table, full)
+                    except Exception as e:
+                        logger.error(f"Columnar: failed to snapshot {table}: {e}")
+            finally:
+                if use_lock:
+                    lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": SNAPSHOT_LOCK_NAME})
+        return results
+
+    # ----------------------------------------
+    # 读取
+    # ----------------------------------------
+    def snapshot(self, table: str) -> Optional[ColumnarSnapshot]:
+        """表的当前快照版本，其他进程生成新版本后重新打开"""
+        if table not in SNAPSHOT_TABLES:
+            raise ValueError(f"未知的表: {table}")
+        version = columnar.current_version(self._table_dir(table))
+        with self._lock:
+            cached_version, cached = self._snapshots.get(table, (None, None))
+            if cached is not None and cached_version == version:
+                return cached
+            snapshot = columnar.open_snapshot(self._table_dir(table)) if version else None
+            self._snapshots[table] = (version, snapshot)
+            return snapshot
+
+    def tables(self) -> List[Dict]:
+        """各表的快照信息，尚未生成快照的表 rows 为 None"""
+        result = []
+        for table, spec in SNAPSHOT_TABLES.items():
+            snapshot = self.snapshot(table)
+            info = snapshot.info() if snapshot else {"table": table, "rows": None, "built_at": None, "columns": spec.kinds}
+            info["group_by"] = [*spec.kinds, *TIME_PARTS]
+            result.append(info)
+        return result
+
+    # ----------------------------------------
+    # 查询
+    # ----------------------------------------
+    @staticmethod
+    def _match(snapshot: ColumnarSnapshot, name: str, values: Sequence[str]) -> np.ndarray:
+        """列等于任一给定值的行；字典编码列的值以 * 结尾时按前缀匹配"""
+        column = snapshot.column(name)
+        kind = snapshot.kinds[name]
+        if kind == DICT:
+            dictionary = snapshot.dictionary(name)
+            lookup = {value: code for code, value in enumerate(dictionary)}
+            codes = [lookup[value] for value in values if not value.endswith("*") and value in lookup]
+            prefixes = tuple(value[:-1] for value in values if value.endswith("*"))
+            if prefixes and dictionary:
+                matched = np.char.startswith(np.array(dictionary, dtype=str), prefixes[0])
+                for prefix in prefixes[1:]:
+                    matched |= np.char.startswith(np.array(dictionary, dtype=str), prefix)
+                codes.extend(np.flatnonzero(matched).tolist())
+            return np.isin(column, np.array(codes, dtype=np.int32))
+        if kind in (INT, FLOAT):
+            try:
+                numbers = [float(value) for value in values]
+            except ValueError:
+                raise ValueError(f"列 {name} 的过滤值必须是数字")
+            return np.isin(column, np.array(numbers, dtype=column.dtype))
+        raise ValueError(f"时间列 {name} 请使用 start / end 过滤")
+
+    @staticmethod
+    def _key(snapshot: ColumnarSnapshot, name: str, local_times: Optional[np.ndarray],
+             rows: np.ndarray) -> Tuple[np.ndarray, Callable[[np.ndarray], list]]:
+        """
+        分组键：返回 (每行的组序号, 组序号到键值的转换函数)
+
+        字典编码列使用按字符串排序后的字典序号（空值为 0，其余从 1 开始），小时和星期使用 0-23 / 0-6，其余列排序去重
+        """
+        if name in ("hour", "weekday"):
+            days = local_times.astype("datetime64[D]")
+            if name == "hour":
+                index = ((local_times - days).astype("timedelta64[h]").astype(np.int64))
+            else:
+                # 1970-01-01 是周四，星期一为 0
+                index = (days.astype(np.int64) + 3) % 7
+            return index, lambda keys: keys.tolist()
+        if name in ("day", "week", "month"):
+            # 时间段连续编号（以最早的时间段为 0），不需要排序去重
+            buckets = timeseries.floor(local_times, name)
+            step = 7 if name == WEEK else 1
+            first = buckets.min() if len(buckets) else np.datetime64(0, "D")
+            index = (buckets - first).astype(np.int64) // step
+            return index, lambda keys: np.datetime_as_string(first + keys * step).tolist()
+
+        column = snapshot.column(name)[rows]
+        kind = snapshot.kinds[name]
+        if kind == DICT:
+            # 字典序号换成按字符串排序后的序号，按键排序时与字符串顺序一致
+            dictionary = snapshot.dictionary(name)
+            order = sorted(range(len(dictionary)), key=dictionary.__getitem__)
+            labels = [dictionary[code] for code in order]
+            rank = np.zeros(len(dictionary) + 1, dtype=np.int64)
+            rank[np.array(order, dtype=np.int64) + 1] = np.arange(1, len(dictionary) + 1)
+            return rank[column.astype(np.int64) + 1], lambda keys: [labels[key - 1] if key else None for key in keys.tolist()]
+        unique, index = np.unique(column, return_inverse=True)
+        if kind == TIME:
+            return index, lambda keys: [None if np.isnat(value) else str(value) for value in unique[keys]]
+        return index, lambda keys: unique[keys].tolist()
+
+    @staticmethod
+    def _percentiles(values: np.ndarray, groups: np.ndarray, group_count: int,
+                     percentiles: Sequence[float]) -> Dict[float, np.ndarray]:
+        """各组数值的分位数（线性插值，忽略 NaN），一次排序完成所有组"""
+        valid = ~np.isnan(values)
+        values, groups = values[valid], groups[valid]
+        order = np.lexsort((values, groups))
+        values, groups = values[order], groups[order]
+        sizes = np.bincount(groups, minlength=group_count)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        result = {}
+        for percentile in percentiles:
+            position = starts + (sizes - 1).clip(min=0) * (percentile / 100)
+            lower = np.floor(position).astype(np.int64)
+            upper = np.minimum(lower + 1, starts + sizes - 1)
+            if len(values):
+                lower_values = values[np.minimum(lower, len(values) - 1)]
+                upper_values = values[np.clip(upper, 0, len(values) - 1)]
+                estimate = lower_values + (upper_values - lower_values) * (position - lower)
+            else:
+                estimate = np.zeros(group_count)
+            result[percentile] = np.where(sizes > 0, estimate, np.nan)
+        return result
+
+    def query(self, table: str, group_by: Sequence[str] = (), filters: Optional[Dict[str, List[str]]] = None,
+              start: Optional[date] = None, end: Optional[date] = None, distinct: Optional[str] = None,
+              value: Optional[str] = None, percentiles: Sequence[float] = (), sort: str = "count",
+              limit: int = 100) -> Dict:
+        """
+        在快照上执行过滤、分组统计
+
+        Args:
+            table: 表名
+            group_by: 分组列，可以是快照中的列或按时间列派生的 hour / weekday / day / week / month
+            filters: {列名: [值]}，同一列的多个值为“或”，不同列为“与”
+            start: 开始日期（本地时间，包含）
+            end: 结束日期（本地时间，包含）
+            distinct: 统计各组该列的不同值个数
+            value: 数值列，统计各组的平均值和分位数
+            percentiles: 分位数（0-100）；未指定 value 时计算各组行数的分位数
+            sort: count 按行数降序，key 按分组键升序
+            limit: 最多返回的分组数
+
+        Returns:
+            快照信息、匹配行数和各组统计结果
+
+        Raises:
+            ValueError: 表或列不存在、参数无效
+            LookupError: 快照尚未生成
+        """
+        spec = SNAPSHOT_TABLES.get(table)
+        if spec is None:
+            raise ValueError(f"未知的表: {table}")
+        snapshot = self.snapshot(table)
+        if snapshot is None:
+            raise LookupError(f"{table} 的快照尚未生成")
+        for name in [*group_by, *(filters or {}), *filter(None, (distinct, value))]:
+            if name not in snapshot.kinds and not (name in TIME_PARTS and name in group_by):
+                raise ValueError(f"未知的列: {name}")
+        if value is not None and snapshot.kinds[value] not in (INT, FLOAT):
+            raise ValueError(f"列 {value} 不是数值列")
+        if any(not 0 <= percentile <= 100 for percentile in percentiles):
+            raise ValueError("分位数必须在 0 到 100 之间")
+        if sort not in ("count", "key"):
+            raise ValueError("sort 只能是 count 或 key")
+        limit = min(max(limit, 1), MAX_LIMIT)
+
+        # 过滤
+        mask = np.ones(snapshot.rows, dtype=bool)
+        times = snapshot.column(spec.time_column)
+        if start is not None:
+            mask &= times >= np.datetime64(day_bounds(start)[0], "s")
+        if end is not None:
+            mask &= times < np.datetime64(day_bounds(end)[1], "s")
+        for name, values in (filters or {}).items():
+            mask &= self._match(snapshot, name, values)
+        rows = np.flatnonzero(mask)
+
+        # 分组：各键的组序号按混合进制合并为一个组序号
+        local_times = None
+        if any(name in TIME_PARTS for name in group_by):
+            local_times = times[rows]
+            valid = ~np.isnat(local_times)
+            rows, local_times = rows[valid], utc_to_local(local_times[valid])
+        keys = [self._key(snapshot, name, local_times, rows) for name in group_by]
+        combined = np.zeros(len(rows), dtype=np.int64)
+        sizes = []
+        for index, _ in keys:
+            size = int(index.max()) + 1 if len(index) else 1
+            sizes.append(size)
+            combined = combined * size + index
+        total = float(np.prod(sizes, dtype=np.float64)) if sizes else 1
+        if total >= 2 ** 62:
+            raise ValueError("分组键组合过多，请减少分组列")
+        total = int(total)
+        if total <= DENSE_GROUPS:
+            counts = np.bincount(combined, minlength=total)
+            group_ids = np.flatnonzero(counts)
+            counts = counts[group_ids]
+            if distinct is not None or value is not None:
+                lookup = np.zeros(total, dtype=np.int64)
+                lookup[group_ids] = np.arange(len(group_ids))
+                inverse = lookup[combined]
+        else:
+            group_ids, inverse, counts = np.unique(combined, return_inverse=True, return_counts=True)
+
+        stats: Dict[str, np.ndarray] = {"count": counts}
+        if distinct is not None:
+            # (组, 值) 排序后相邻不同的对即为去重后的对，按组计数
+            column = snapshot.column(distinct)[rows]
+            if snapshot.kinds[distinct] == DICT:
+                distinct_index = column.astype(np.int64) + 1
+                width = len(snapshot.dictionary(distinct)) + 1
+            else:
+                _, distinct_index = np.unique(column, return_inverse=True)
+                width = int(distinct_index.max()) + 1 if len(rows) else 1
+            pairs = np.sort(inverse * width + distinct_index)
+            first = np.ones(len(pairs), dtype=bool)
+            first[1:] = pairs[1:] != pairs[:-1]
+            stats["distinct"] = np.bincount(pairs[first] // width, minlength=len(group_ids))
+        percentile_summary = None
+        if value is not None:
+            values = snapshot.column(value)[rows].astype(np.float64)
+            valid = ~np.isnan(values)
+            sums = np.bincount(inverse[valid], weights=values[valid], minlength=len(group_ids))
+            valid_counts = np.bincount(inverse[valid], minlength=len(group_ids))
+            with np.errstate(invalid="ignore", divide="ignore"):
+                stats["avg"] = sums / valid_counts
+            for percentile, result in self._percentiles(values, inverse, len(group_ids), percentiles).items():
+                stats[f"p{percentile:g}"] = result
+        elif percentiles and len(counts):
+            percentile_summary = {
+                f"p{percentile:g}": float(result)
+                for percentile, result in zip(percentiles, np.percentile(counts, percentiles))
+            }
+
+        # 排序和截取
+        if sort == "count":
+            order = np.argsort(-counts, kind="stable")[:limit]
+        else:
+            order = np.arange(min(len(group_ids), limit))
+        selected = group_ids[order]
+        labels = {}
+        for name, size, (_, decode) in reversed(list(zip(group_by, sizes, keys))):
+            labels[name] = decode(selected % size)
+            selected = selected // size
+        groups = []
+        for position, group in enumerate(order.tolist()):
+            item = {name: labels[name][position] for name in group_by}
+            for stat, values in stats.items():
+                number = values[group]
+                item[stat] = int(number) if stat in ("count", "distinct") else (None if np.isnan(number) else round(float(number), 4))
+            groups.append(item)
+
+        result = {
+            "snapshot": {"rows": snapshot.rows, "built_at": snapshot.built_at},
+            "matched": int(len(rows)),
+            "group_count": int(len(group_ids)),
+            "groups": groups,
+        }
+        if percentile_summary is not None:
+            result["percentiles"] = percentile_summary
+        return result
+
+    # ----------------------------------------
+    # 定时任务
+    # ----------------------------------------
+    async def _run(self, full: bool = False) -> None:
+        try:
+            results = await asyncio.to_thread(self.run_snapshot, None, full)
+            logger.info(f"Columnar: snapshot finished {results}")
+        except Exception as e:
+            logger.error(f"Columnar: snapshot failed: {e}")
+
+    async def _scheduler(self) -> None:
+        await asyncio.sleep(SNAPSHOT_INITIAL_DELAY)
+        while True:
+            await self._run()
+            await asyncio.sleep(settings.COLUMNAR_SNAPSHOT_INTERVAL)
+
+    @property
+    def building(self) -> bool:
+        return self._build_task is not None and not self._build_task.done()
+
+    def start_build(self, full: bool = False) -> bool:
+        """
+        在事件循环中立即导出一次
+
+        Args:
+            full: 只追加的表也全量重建
+
+        Returns:
+            是否启动了新任务（已有手动任务在运行时返回 False）
+        """
+        if self.building:
+            return False
+        self._build_task = asyncio.create_task(self._run(full))
+        return True
+
+    def start_scheduler(self) -> None:
+        """在事件循环中启动定时导出任务"""
+        if not settings.COLUMNAR_SNAPSHOT_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._scheduler())
+
+    async def stop_scheduler(self) -> None:
+        """停止定时导出任务"""
+        for task in (self._task, self._build_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._build_task = None
+
+
+columnar_service = ColumnarService()
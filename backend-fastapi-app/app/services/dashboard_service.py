@@ -0,0 +1,90 @@
+"""
+分析看板并发计算服务
+
+/analytics/dashboard 一次请求返回多个面板。各面板在专用线程池中并发计算，每个面板使用独立的数据库会话
+（连接池中的不同连接），线程数即同时占用的连接数上限（ANALYTICS_DASHBOARD_CONCURRENCY）。
+单个面板（含排队时间）超过 ANALYTICS_DASHBOARD_PANEL_TIMEOUT 秒或出错时只影响该面板，其余面板照常返回；
+超时的面板在后台继续执行，完成后写入缓存，下一次请求直接命中。
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+Panel = Callable[[Session], Any]
+
+
+class DashboardService:
+    """看板面板的并发计算"""
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(settings.ANALYTICS_DASHBOARD_CONCURRENCY, 1), thread_name_prefix="dashboard"
+                )
+            return self._executor
+
+    @staticmethod
+    def _run_panel(panel: Panel) -> Any:
+        from app.dependencies import database
+        if database.SessionLocal is None:
+            raise database.DatabaseConnectionError("数据库不可用")
+        db = database.SessionLocal()
+        try:
+            return panel(db)
+        finally:
+            db.close()
+
+    async def _run(self, panel: Panel) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._get_executor(), self._run_panel, panel)
+        # 超时后面板的结果无人等待，在这里取出异常避免 "exception was never retrieved" 警告
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        # 超时后不等待工作线程，线程池仍然限制同时执行的面板数
+        return await asyncio.wait_for(asyncio.shield(future), timeout=settings.ANALYTICS_DASHBOARD_PANEL_TIMEOUT)
+
+    async def compute(self, panels: Dict[str, Panel]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        并发计算多个面板
+
+        Args:
+            panels: {面板名: 接收数据库会话、返回面板数据的函数}
+
+        Returns:
+            (各面板数据, 失败面板的错误信息)，失败或超时的面板数据为 None
+        """
+        names = list(panels)
+        results = await asyncio.gather(*(self._run(panels[name]) for name in names), return_exceptions=True)
+        data: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, asyncio.TimeoutError):
+                data[name] = None
+                errors[name] = "timeout"
+                logger.warning(f"Dashboard: panel {name} timed out")
+            elif isinstance(result, Exception):
+                data[name] = None
+                errors[name] = str(result)
+                logger.error(f"Dashboard: panel {name} failed: {result}")
+            else:
+                data[name] = result
+        return data, errors
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+dashboard_service = DashboardService()
@@ -0,0 +1,277 @@
+"""
+层级表闭包索引服务
+
+sys_admin_rule、sys_user_rule、sys_general_category、sys_attachment_category、sys_admin_group
+都是 parent_id / pid 邻接表，取子树或祖先需要把整张表读到 Python 中。
+这里在 sys_tree_closure 中为每个节点维护它与所有祖先的关系，子树、祖先查询都可以直接用 SQL 完成：
+
+- 节点新增、移动（父节点变化）、删除时由 CRUD 调用 on_create / on_update / on_delete 增量维护，
+  每次维护在独立连接的事务中完成；
+- 启动时检查每张表的自身记录数与源表行数是否一致，不一致（首次部署、维护失败）时从邻接表全量重建；
+- 维护失败只记录日志并重建该表的索引，不影响业务写入。
+"""
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Type
+
+from sqlalchemy import and_, delete, func, insert, literal, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.models.sys_admin_group import SysAdminGroup
+from app.models.sys_admin_rule import SysAdminRule
+from app.models.sys_attachment_category import SysAttachmentCategory
+from app.models.sys_general_category import SysGeneralCategory
+from app.models.sys_tree_closure import SysTreeClosure
+from app.models.sys_user_rule import SysUserRule
+from app.utils.log_utils import logger
+
+# 层级表 -> 父节点字段
+PARENT_FIELDS: Dict[type, str] = {
+    SysAdminRule: "parent_id",
+    SysUserRule: "parent_id",
+    SysGeneralCategory: "pid",
+    SysAttachmentCategory: "pid",
+    SysAdminGroup: "pid",
+}
+
+ISOLATION_LEVEL = "READ COMMITTED"
+
+# 单条 INSERT / IN 列表的最大行数
+CHUNK_SIZE = 1000
+
+
+def _chunks(items: List, size: int = CHUNK_SIZE) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class HierarchyService:
+    """基于闭包表的层级查询与维护"""
+
+    @staticmethod
+    def _tree(model: Type) -> str:
+        return model.__tablename__
+
+    @staticmethod
+    def parent_of(obj) -> int:
+        """节点的父 ID（None 视为根节点 0）"""
+        field = PARENT_FIELDS.get(type(obj))
+        return (getattr(obj, field, None) or 0) if field else 0
+
+    @contextmanager
+    def _transaction(self, db: Session) -> Iterator[Connection]:
+        """连接池在驱动层开启了 autocommit，闭包表维护在独立连接上显式开启事务"""
+        with db.get_bind().connect() as conn:
+            conn = conn.execution_options(isolation_level=ISOLATION_LEVEL)
+            with conn.begin():
+                yield conn
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def descendants_select(self, model: Type, id: int, include_self: bool = True, max_depth: Optional[int] = None):
+        """id 的全部后代 ID 的子查询，可用于 model.id.in_(...)"""
+        conditions = [SysTreeClosure.tree == self._tree(model), SysTreeClosure.ancestor_id == id]
+        if not include_self:
+            conditions.append(SysTreeClosure.depth > 0)
+        if max_depth is not None:
+            conditions.append(SysTreeClosure.depth <= max_depth)
+        return select(SysTreeClosure.descendant_id).where(*conditions)
+
+    def ancestors_select(self, model: Type, id: int, include_self: bool = False):
+        """id 的全部祖先 ID 的子查询"""
+        conditions = [SysTreeClosure.tree == self._tree(model), SysTreeClosure.descendant_id == id]
+        if not include_self:
+            conditions.append(SysTreeClosure.depth > 0)
+        return select(SysTreeClosure.ancestor_id).where(*conditions)
+
+    def subtree_query(self, db: Session, model: Type, id: int, include_self: bool = True,
+                      max_depth: Optional[int] = None) -> Query:
+        """id 子树中全部节点的查询，可作为 CRUD 的 base_query"""
+        return db.query(model).filter(model.id.in_(self.descendants_select(model, id, include_self, max_depth)))
+
+    def get_subtree(self, db: Session, model: Type, id: int, include_self: bool = True) -> List:
+        """id 子树中的全部节点"""
+        return self.subtree_query(db, model, id, include_self).all()
+
+    def get_ancestors(self, db: Session, model: Type, id: int, include_self: bool = False) -> List:
+        """id 的全部祖先，从根节点到父节点排序"""
+        tree = self._tree(model)
+        return (
+            db.query(model)
+            .join(SysTreeClosure, and_(SysTreeClosure.tree == tree, SysTreeClosure.ancestor_id == model.id))
+            .filter(SysTreeClosure.descendant_id == id, SysTreeClosure.depth >= (0 if include_self else 1))
+            .order_by(SysTreeClosure.depth.desc())
+            .all()
+        )
+
+    def delete_subtree(self, db: Session, model: Type, id: int) -> int:
+        """删除 id 及其全部后代，返回删除的节点数"""
+        tree = self._tree(model)
+        with self._transaction(db) as conn:
+            ids = conn.execute(self.descendants_select(model, id)).scalars().all()
+            for chunk in _chunks(ids):
+                conn.execute(delete(model).where(model.id.in_(chunk)))
+                conn.execute(delete(SysTreeClosure).where(
+                    SysTreeClosure.tree == tree,
+                    SysTreeClosure.descendant_id.in_(chunk),
+                ))
+        return len(ids)
+
+    # ------------------------------------------------------------------
+    # 增量维护
+    # ------------------------------------------------------------------
+
+    def _insert_links(self, conn: Connection, tree: str, id: int, parent_id: int) -> None:
+        """为新节点写入自身记录和指向父节点全部祖先的记录"""
+        conn.execute(insert(SysTreeClosure).values(tree=tree, ancestor_id=id, descendant_id=id, depth=0))
+        if parent_id:
+            conn.execute(insert(SysTreeClosure).from_select(
+                ["tree", "ancestor_id", "descendant_id", "depth"],
+                select(literal(tree), SysTreeClosure.ancestor_id, literal(id), SysTreeClosure.depth + 1).where(
+                    SysTreeClosure.tree == tree, SysTreeClosure.descendant_id == parent_id
+                ),
+            ))
+
+    def _detach(self, conn: Connection, tree: str, id: int) -> List[int]:
+        """断开 id 子树与 id 的祖先之间的关系，返回子树节点 ID"""
+        subtree = conn.execute(select(SysTreeClosure.descendant_id).where(
+            SysTreeClosure.tree == tree, SysTreeClosure.ancestor_id == id
+        )).scalars().all()
+        ancestors = conn.execute(select(SysTreeClosure.ancestor_id).where(
+            SysTreeClosure.tree == tree, SysTreeClosure.descendant_id == id, SysTreeClosure.depth > 0
+        )).scalars().all()
+        if ancestors:
+            for chunk in _chunks(subtree):
+                conn.execute(delete(SysTreeClosure).where(
+                    SysTreeClosure.tree == tree,
+                    SysTreeClosure.descendant_id.in_(chunk),
+                    SysTreeClosure.ancestor_id.in_(ancestors),
+                ))
+        return subtree
+
+    def _maintain(self, db: Session, model: Type, action: str, operation, *args) -> None:
+        """在事务中执行一次增量维护，失败时重建该表的索引"""
+        if not settings.HIERARCHY_INDEX_ENABLED:
+            return
+        try:
+            with self._transaction(db) as conn:
+                operation(conn, self._tree(model), *args)
+        except Exception as e:
+            logger.error(f"HierarchyService: failed to {action} in {self._tree(model)}: {e}; rebuilding index")
+            try:
+                self.rebuild(db, model)
+            except Exception as rebuild_error:
+                logger.error(f"HierarchyService: rebuild of {self._tree(model)} failed: {rebuild_error}")
+
+    def on_create(self, db: Session, obj) -> None:
+        """节点新增后调用"""
+        self._maintain(db, type(obj), "index new node", self._insert_links, obj.id, self.parent_of(obj))
+
+    def check_move(self, db: Session, obj, new_parent_id: int) -> None:
+        """
+        检查把节点移动到 new_parent_id 下是否会形成环
+
+        Raises:
+            ValueError: new_parent_id 是节点自身或其后代
+        """
+        if not settings.HIERARCHY_INDEX_ENABLED or not new_parent_id:
+            return
+        model = type(obj)
+        if new_parent_id == obj.id or db.execute(
+            self.descendants_select(model, obj.id, include_self=False).where(SysTreeClosure.descendant_id == new_parent_id)
+        ).first():
+            raise ValueError(f"Cannot move {model.__tablename__} {obj.id} under its own descendant {new_parent_id}")
+
+    def _move(self, conn: Connection, tree: str, id: int, new_parent_id: int) -> None:
+        subtree = self._detach(conn, tree, id)
+        if not new_parent_id or not subtree:
+            return
+        # 新父节点的每个祖先（含自身）× 子树中每个节点
+        parent_links = conn.execute(select(SysTreeClosure.ancestor_id, SysTreeClosure.depth).where(
+            SysTreeClosure.tree == tree, SysTreeClosure.descendant_id == new_parent_id
+        )).all()
+        subtree_links = conn.execute(select(SysTreeClosure.descendant_id, SysTreeClosure.depth).where(
+            SysTreeClosure.tree == tree, SysTreeClosure.ancestor_id == id
+        )).all()
+        rows = [
+            {"tree": tree, "ancestor_id": ancestor, "descendant_id": descendant, "depth": up + down + 1}
+            for ancestor, up in parent_links
+            for descendant, down in subtree_links
+        ]
+        for chunk in _chunks(rows):
+            conn.execute(insert(SysTreeClosure), chunk)
+
+    def on_update(self, db: Session, obj, old_parent_id: int) -> None:
+        """节点更新后调用，父节点发生变化时移动整棵子树"""
+        new_parent_id = self.parent_of(obj)
+        if new_parent_id != old_parent_id:
+            self._maintain(db, type(obj), "move node", self._move, obj.id, new_parent_id)
+
+    def _remove(self, conn: Connection, tree: str, id: int) -> None:
+        # 子节点在邻接表中成为孤儿，索引中同样与被删节点的祖先断开
+        self._detach(conn, tree, id)
+        conn.execute(delete(SysTreeClosure).where(
+            SysTreeClosure.tree == tree,
+            (SysTreeClosure.ancestor_id == id) | (SysTreeClosure.descendant_id == id),
+        ))
+
+    def on_delete(self, db: Session, model: Type, id: int) -> None:
+        """节点删除后调用（删除提交后对象已分离，由调用方传入模型和 ID）"""
+        self._maintain(db, model, "remove node", self._remove, id)
+
+    # ------------------------------------------------------------------
+    # 全量重建
+    # ------------------------------------------------------------------
+
+    def rebuild(self, db: Session, model: Type) -> int:
+        """从邻接表全量重建一张表的闭包索引，返回写入的记录数"""
+        tree = self._tree(model)
+        parent_column = getattr(model, PARENT_FIELDS[model])
+        with self._transaction(db) as conn:
+            parents = {id: pid or 0 for id, pid in conn.execute(select(model.id, parent_column)).all()}
+            rows = []
+            for node_id in parents:
+                rows.append({"tree": tree, "ancestor_id": node_id, "descendant_id": node_id, "depth": 0})
+                seen = {node_id}
+                ancestor, depth = parents[node_id], 1
+                # 父节点不存在的孤儿节点只保留自身记录；遇到环时停止
+                while ancestor in parents and ancestor not in seen:
+                    seen.add(ancestor)
+                    rows.append({"tree": tree, "ancestor_id": ancestor, "descendant_id": node_id, "depth": depth})
+                    ancestor, depth = parents[ancestor], depth + 1
+            conn.execute(delete(SysTreeClosure).where(SysTreeClosure.tree == tree))
+            for chunk in _chunks(rows):
+                conn.execute(insert(SysTreeClosure), chunk)
+        logger.info(f"HierarchyService: rebuilt {tree} index ({len(parents)} nodes, {len(rows)} links)")
+        return len(rows)
+
+    def ensure_all(self, db: Session) -> None:
+        """启动时检查各表的索引，与源表行数不一致时重建"""
+        if not settings.HIERARCHY_INDEX_ENABLED:
+            return
+        for model in PARENT_FIELDS:
+            tree = self._tree(model)
+            nodes = db.query(func.count(model.id)).scalar()
+            indexed = db.query(func.count()).select_from(SysTreeClosure).filter(
+                SysTreeClosure.tree == tree, SysTreeClosure.depth == 0
+            ).scalar()
+            if nodes != indexed:
+                logger.info(f"HierarchyService: {tree} index out of date ({indexed}/{nodes} nodes)")
+                self.rebuild(db, model)
+
+    def warm_up(self) -> None:
+        """使用独立会话执行 ensure_all（启动时在线程池中调用）"""
+        from app.dependencies import database
+        if database.SessionLocal is None:
+            raise database.DatabaseConnectionError("数据库不可用")
+        db = database.SessionLocal()
+        try:
+            self.ensure_all(db)
+        finally:
+            db.close()
+
+
+hierarchy_service = HierarchyService()
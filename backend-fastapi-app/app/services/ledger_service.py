@@ -0,0 +1,267 @@
+"""
+用户账本服务
+以原子 UPDATE + 日志插入的方式变更用户余额(balance)和积分(score)，
+支持幂等键以及单事务内的批量变更
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterator, List, Literal, Optional, Sequence
+
+from pydantic import BaseModel, Field
+from sqlalchemy import bindparam, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.sys_user import SysUser
+from app.models.sys_user_balance_log import SysUserBalanceLog
+from app.models.sys_user_score_log import SysUserScoreLog
+from app.models.sys_user_ledger_key import SysUserLedgerKey
+from app.utils.log_utils import logger
+
+LedgerType = Literal['balance', 'score']
+
+# 连接池在驱动层开启了 autocommit，账本必须在独立连接上显式关闭 autocommit 才能保证原子性
+LEDGER_ISOLATION_LEVEL = "READ COMMITTED"
+
+# 单条 SQL 语句处理的最大变更条数，避免 IN 列表和多行 INSERT 过大
+CHUNK_SIZE = 1000
+
+_BALANCE_QUANT = Decimal("0.01")
+
+# 并发提交同一个幂等键时唯一索引冲突后的重试次数，重试时该键已存在，会得到 duplicate 结果
+KEY_CONFLICT_RETRIES = 1
+
+
+class LedgerError(ValueError):
+    """变更请求不合法（账本类型未知、积分不是整数等）"""
+
+
+class LedgerUserNotFound(LedgerError):
+    """变更涉及的用户不存在"""
+
+    def __init__(self, user_ids: Sequence[int]):
+        self.user_ids = list(user_ids)
+        super().__init__(f"User not found: {', '.join(str(user_id) for user_id in self.user_ids)}")
+
+
+class LedgerAdjustment(BaseModel):
+    """单条余额/积分变更"""
+    user_id: int = Field(..., gt=0)
+    amount: Decimal = Field(...)
+    memo: Optional[str] = Field(None, max_length=255)
+    idempotency_key: Optional[str] = Field(None, max_length=64)
+
+
+class LedgerService:
+    """
+    用户账本服务
+
+    每次变更都以 `UPDATE sys_user SET col = col + :delta` 的形式执行，
+    行锁在事务提交前一直持有，因此在同一事务中回读到的值就是本次变更后的值，
+    before/after 可以据此精确推算，不会因并发入账而丢失更新
+    """
+
+    _LEDGERS = {
+        'balance': (SysUserBalanceLog, 'balance'),
+        'score': (SysUserScoreLog, 'score'),
+    }
+
+    def _normalize_amount(self, ledger: LedgerType, amount) -> Decimal | int:
+        """按账本类型规范化变更金额：余额保留两位小数，积分必须为整数"""
+        amount = Decimal(str(amount))
+        if ledger == 'score':
+            if amount != amount.to_integral_value():
+                raise LedgerError(f"Score adjustment must be an integer: {amount}")
+            return int(amount)
+        return amount.quantize(_BALANCE_QUANT, rounding=ROUND_HALF_UP)
+
+    @contextmanager
+    def _transaction(self, db: Session) -> Iterator[Connection]:
+        """在独立连接上开启真正的数据库事务"""
+        bind = db.get_bind()
+        with bind.connect() as conn:
+            conn = conn.execution_options(isolation_level=LEDGER_ISOLATION_LEVEL)
+            with conn.begin():
+                yield conn
+
+    def apply(
+        self,
+        db: Session,
+        ledger: LedgerType,
+        user_id: int,
+        amount,
+        memo: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+    ) -> Dict:
+        """
+        原子地变更单个用户的余额或积分，并写入对应日志
+
+        Args:
+            db: 数据库会话，仅用于获取引擎
+            ledger: 账本类型，'balance' 或 'score'
+            user_id: 用户ID
+            amount: 变更值，正数为增加，负数为扣减
+            memo: 备注
+            idempotency_key: 幂等键，相同的键只会生效一次
+
+        Returns:
+            变更结果字典，包含 before/after；重复提交时 duplicate 为 True
+        """
+        adjustment = LedgerAdjustment(
+            user_id=user_id, amount=amount, memo=memo, idempotency_key=idempotency_key
+        )
+        return self.apply_batch(db, ledger, [adjustment])[0]
+
+    def apply_batch(
+        self, db: Session, ledger: LedgerType, adjustments: Sequence[LedgerAdjustment]
+    ) -> List[Dict]:
+        """
+        在单个事务内批量变更余额或积分
+
+        同一用户的多条变更会合并为一次 UPDATE，用户按 ID 排序加锁以避免死锁；
+        任意一条失败（如用户不存在）整批回滚。
+        幂等键与并发请求冲突时整批回滚后重试，冲突的键在重试中得到 duplicate 结果
+
+        Args:
+            db: 数据库会话，仅用于获取引擎
+            ledger: 账本类型，'balance' 或 'score'
+            adjustments: 变更列表
+
+        Returns:
+            与 adjustments 顺序一致的结果列表
+
+        Raises:
+            LedgerError: 账本类型未知或金额不合法
+            LedgerUserNotFound: 用户不存在
+            IntegrityError: 重试后幂等键仍然冲突
+        """
+        if ledger not in self._LEDGERS:
+            raise LedgerError(f"Unknown ledger: {ledger}")
+        if not adjustments:
+            return []
+
+        for attempt in range(KEY_CONFLICT_RETRIES + 1):
+            try:
+                results = self._apply_all(db, ledger, adjustments)
+                break
+            except IntegrityError:
+                if attempt == KEY_CONFLICT_RETRIES:
+                    raise
+                logger.warning(f"Ledger: idempotency key conflict on {ledger} batch, retrying")
+
+        applied = sum(1 for item in results if not item["duplicate"])
+        logger.info(
+            f"Ledger: applied {applied} {ledger} adjustments "
+            f"({len(results) - applied} duplicates skipped)"
+        )
+        return results
+
+    def _apply_all(
+        self, db: Session, ledger: LedgerType, adjustments: Sequence[LedgerAdjustment]
+    ) -> List[Dict]:
+        """在一个事务内按分片处理全部变更"""
+        results: List[Dict] = []
+        with self._transaction(db) as conn:
+            for start in range(0, len(adjustments), CHUNK_SIZE):
+                chunk = adjustments[start:start + CHUNK_SIZE]
+                results.extend(self._apply_chunk(conn, ledger, chunk))
+        return results
+
+    def _apply_chunk(
+        self, conn: Connection, ledger: LedgerType, chunk: Sequence[LedgerAdjustment]
+    ) -> List[Dict]:
+        """处理一个分片：幂等过滤 -> 合并 UPDATE -> 回读 -> 批量写日志"""
+        log_model, amount_field = self._LEDGERS[ledger]
+        user_table = SysUser.__table__
+        key_table = SysUserLedgerKey.__table__
+
+        # 1. 幂等过滤：已存在的键和本批次内重复的键都跳过
+        keys = [item.idempotency_key for item in chunk if item.idempotency_key]
+        seen_keys = set()
+        if keys:
+            seen_keys.update(conn.execute(
+                select(key_table.c.idempotency_key).where(key_table.c.idempotency_key.in_(keys))
+            ).scalars())
+
+        results: List[Optional[Dict]] = []
+        pending = []
+        for item in chunk:
+            if item.idempotency_key and item.idempotency_key in seen_keys:
+                results.append({
+                    "user_id": item.user_id,
+                    "idempotency_key": item.idempotency_key,
+                    "duplicate": True,
+                })
+                continue
+            if item.idempotency_key:
+                seen_keys.add(item.idempotency_key)
+            pending.append((len(results), item, self._normalize_amount(ledger, item.amount)))
+            results.append(None)
+
+        if not pending:
+            return results
+
+        # 2. 同一用户的变更合并为一次原子 UPDATE，按用户ID排序加锁
+        deltas: Dict[int, Decimal | int] = defaultdict(int)
+        for _, item, amount in pending:
+            deltas[item.user_id] += amount
+        column = user_table.c[ledger]
+        conn.execute(
+            user_table.update()
+            .where(user_table.c.id == bindparam("b_user_id"))
+            .values({ledger: column + bindparam("b_delta")}),
+            [{"b_user_id": user_id, "b_delta": deltas[user_id]} for user_id in sorted(deltas)],
+        )
+
+        # 3. 行锁仍由本事务持有，回读到的就是变更后的值
+        after_totals = dict(conn.execute(
+            select(user_table.c.id, column).where(user_table.c.id.in_(list(deltas)))
+        ).all())
+        missing = [user_id for user_id in deltas if user_id not in after_totals]
+        if missing:
+            raise LedgerUserNotFound(missing)
+
+        running = {
+            user_id: (after_totals[user_id] or 0) - delta for user_id, delta in deltas.items()
+        }
+
+        # 4. 按提交顺序推算每条变更的 before/after，并批量写入日志
+        log_rows = []
+        key_rows = []
+        for index, item, amount in pending:
+            before = running[item.user_id]
+            after = before + amount
+            running[item.user_id] = after
+            log_rows.append({
+                "user_id": item.user_id,
+                amount_field: amount,
+                "before": before,
+                "after": after,
+                "memo": item.memo,
+            })
+            if item.idempotency_key:
+                key_rows.append({
+                    "idempotency_key": item.idempotency_key,
+                    "ledger": ledger,
+                    "user_id": item.user_id,
+                })
+            results[index] = {
+                "user_id": item.user_id,
+                "idempotency_key": item.idempotency_key,
+                "amount": amount,
+                "before": before,
+                "after": after,
+                "duplicate": False,
+            }
+
+        conn.execute(insert(log_model.__table__), log_rows)
+        if key_rows:
+            # 并发提交同一个键时唯一索引冲突，整批回滚，由 apply_batch 重试得到 duplicate 结果
+            conn.execute(insert(key_table), key_rows)
+
+        return results
+
+
+ledger_service = LedgerService()
@@ -0,0 +1,489 @@
+"""
+日志归档服务
+只追加的日志表按月分区，超出热数据窗口的月份导出为 gzip 压缩的 NDJSON 文件后从数据库中移除；
+未分区的表只有在 LOG_ARCHIVE_DELETE_UNPARTITIONED 开启时才会导出并逐行删除，否则跳过。
+归档区间只在显式请求时才会被读取，日常查询只访问近期数据
+"""
+import asyncio
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.sys_admin_log import crud_sys_admin_log
+from app.crud.sys_notification import crud_sys_notification
+from app.crud.sys_user_balance_log import crud_sys_user_balance_log
+from app.crud.sys_user_score_log import crud_sys_user_score_log
+from app.models.sys_admin_log import SysAdminLog
+from app.models.sys_notification import SysNotification
+from app.models.sys_user_balance_log import SysUserBalanceLog
+from app.models.sys_user_score_log import SysUserScoreLog
+from app.utils.log_utils import logger
+
+# 可归档的表：表名 -> (模型, CRUD 实例)
+ARCHIVE_TABLES = {
+    'sys_admin_log': (SysAdminLog, crud_sys_admin_log),
+    'sys_user_balance_log': (SysUserBalanceLog, crud_sys_user_balance_log),
+    'sys_user_score_log': (SysUserScoreLog, crud_sys_user_score_log),
+    'sys_notification': (SysNotification, crud_sys_notification),
+}
+
+EXPORT_CHUNK_SIZE = 5000  # 导出时每批读取的行数
+FUTURE_PARTITIONS = 2  # 提前创建的未来月份分区数
+ARCHIVER_INITIAL_DELAY = 60  # 应用启动后首次运行归档任务的延迟（秒）
+ARCHIVER_LOCK_NAME = "zayum_log_archiver"  # 多进程部署时用于互斥的 MySQL 命名锁
+
+_ARCHIVE_FILE_RE = re.compile(r"^(\d{4}-\d{2})\.(\d+)-(\d+)\.ndjson\.gz$")
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _parse_month(value: str) -> date:
+    """解析 YYYY-MM 格式的月份"""
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise ValueError(f"Invalid month format, expected YYYY-MM: {value}")
+
+
+def hot_cutoff(today: Optional[date] = None) -> date:
+    """
+    热数据窗口的起点，早于该日期的数据视为冷数据
+
+    Args:
+        today: 基准日期，默认为当天
+
+    Returns:
+        热数据窗口第一个月的第一天
+    """
+    today = today or date.today()
+    return _add_months(_month_start(today), -(max(settings.LOG_HOT_MONTHS, 1) - 1))
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class _MonthFileWriter:
+    """
+    按月份把行写入临时 gzip 文件，全部写完并 fsync 后再以 id 区间命名落盘
+
+    文件名由月份和 id 区间决定，归档中途失败后重跑会生成同名文件并覆盖，不会产生重复数据
+    """
+
+    def __init__(self, table_dir: str):
+        self.table_dir = table_dir
+        self._files: Dict[str, list] = {}  # month -> [file, tmp_path, min_id, max_id]
+        os.makedirs(table_dir, exist_ok=True)
+
+    def write(self, row: Dict) -> None:
+        month = row["created_at"].strftime("%Y-%m")
+        entry = self._files.get(month)
+        if entry is None:
+            tmp_path = os.path.join(self.table_dir, f".{month}.{os.getpid()}.tmp")
+            entry = [gzip.open(tmp_path, "wt", encoding="utf-8"), tmp_path, row["id"], row["id"]]
+            self._files[month] = entry
+        entry[0].write(json.dumps(row, ensure_ascii=False, default=_json_default))
+        entry[0].write("\n")
+        entry[2] = min(entry[2], row["id"])
+        entry[3] = max(entry[3], row["id"])
+
+    def commit(self) -> List[str]:
+        paths = []
+        for month, (handle, tmp_path, min_id, max_id) in self._files.items():
+            handle.close()
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+            path = os.path.join(self.table_dir, f"{month}.{min_id}-{max_id}.ndjson.gz")
+            os.replace(tmp_path, path)
+            paths.append(path)
+        if paths and hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(self.table_dir, os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._files = {}
+        return paths
+
+    def abort(self) -> None:
+        for handle, tmp_path, _, _ in self._files.values():
+            handle.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._files = {}
+
+
+class LogArchiveService:
+    """日志分区维护、冷数据归档与归档查询"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def _table_dir(self, table: str) -> str:
+        return os.path.join(settings.LOG_ARCHIVE_DIR, table)
+
+    def _resolve(self, table: str):
+        if table not in ARCHIVE_TABLES:
+            raise ValueError(f"Table is not archivable: {table}")
+        return ARCHIVE_TABLES[table]
+
+    # ----------------------------------------
+    # 分区维护（MySQL）
+    # ----------------------------------------
+    def _partitions(self, conn: Connection, table: str) -> List[Tuple[str, Optional[int]]]:
+        """返回表的 RANGE 分区列表 [(分区名, TO_DAYS 上界)]，MAXVALUE 分区上界为 None"""
+        if conn.dialect.name != "mysql":
+            return []
+        rows = conn.execute(text(
+            "SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+            "ORDER BY PARTITION_ORDINAL_POSITION"
+        ), {"table": table}).all()
+        return [(name, None if desc == "MAXVALUE" else int(desc)) for name, desc in rows]
+
+    def _ensure_future_partitions(
+        self, conn: Connection, table: str, partitions: List[Tuple[str, Optional[int]]]
+    ) -> None:
+        """从 pmax 中拆出当月及未来几个月的分区，使新数据按月落入独立分区"""
+        if not partitions or partitions[-1][1] is not None:
+            return
+        max_name = partitions[-1][0]
+        last_bound = max((bound for _, bound in partitions if bound is not None), default=0)
+
+        new_partitions = []
+        month = _month_start(date.today())
+        for _ in range(FUTURE_PARTITIONS + 1):
+            upper = _add_months(month, 1)
+            upper_days = conn.scalar(text("SELECT TO_DAYS(:upper)"), {"upper": upper})
+            if upper_days > last_bound:
+                new_partitions.append(
+                    f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+                )
+            month = upper
+        if not new_partitions:
+            return
+
+        new_partitions.append(f"PARTITION {max_name} VALUES LESS THAN MAXVALUE")
+        conn.execute(text(
+            f"ALTER TABLE `{table}` REORGANIZE PARTITION `{max_name}` INTO ({', '.join(new_partitions)})"
+        ))
+        logger.info(f"LogArchive: added {len(new_partitions) - 1} partitions to {table}")
+
+    # ----------------------------------------
+    # 归档
+    # ----------------------------------------
+    def _export(self, conn: Connection, table: str, statement) -> Tuple[int, Optional[int]]:
+        """流式导出查询结果到按月拆分的归档文件，返回 (行数, 最大ID)"""
+        writer = _MonthFileWriter(self._table_dir(table))
+        count = 0
+        max_id = None
+        try:
+            result = conn.execution_options(stream_results=True).execute(statement)
+            for rows in result.mappings().partitions(EXPORT_CHUNK_SIZE):
+                for row in rows:
+                    writer.write(dict(row))
+                    max_id = row["id"] if max_id is None else max(max_id, row["id"])
+                    count += 1
+            writer.commit()
+        except Exception:
+            writer.abort()
+            raise
+        return count, max_id
+
+    def _archive_partition(self, conn: Connection, table: str, partition: str) -> int:
+        """导出整个冷分区后直接 DROP PARTITION，无需逐行删除"""
+        count, _ = self._export(
+            conn, table, text(f"SELECT * FROM `{table}` PARTITION (`{partition}`) ORDER BY id")
+        )
+        conn.execute(text(f"ALTER TABLE `{table}` DROP PARTITION `{partition}`"))
+        logger.info(f"LogArchive: archived partition {table}.{partition} ({count} rows)")
+        return count
+
+    def _archive_month(self, conn: Connection, table: str, month: date) -> int:
+        """未分区的表：导出一个月的数据后按时间范围删除"""
+        model, _ = ARCHIVE_TABLES[table]
+        model_table = model.__table__
+        start, end = month, _add_months(month, 1)
+        in_range = (model_table.c.created_at >= start, model_table.c.created_at < end)
+
+        count, max_id = self._export(
+            conn, table, select(model_table).where(*in_range).order_by(model_table.c.id)
+        )
+        if count:
+            conn.execute(delete(model_table).where(*in_range, model_table.c.id <= max_id))
+            conn.commit()
+            logger.info(f"LogArchive: archived {table} {month:%Y-%m} ({count} rows)")
+        return count
+
+    def archive_table(self, engine: Engine, table: str) -> int:
+        """
+        归档单张表中超出热数据窗口的数据
+
+        Args:
+            engine: 数据库引擎
+            table: 表名
+
+        Returns:
+            归档的行数
+        """
+        model, _ = self._resolve(table)
+        cutoff = hot_cutoff()
+        archived = 0
+        with engine.connect() as conn:
+            partitions = self._partitions(conn, table)
+            if partitions:
+                self._ensure_future_partitions(conn, table, partitions)
+                cutoff_days = conn.scalar(text("SELECT TO_DAYS(:cutoff)"), {"cutoff": cutoff})
+                for name, bound in partitions:
+                    if bound is not None and bound <= cutoff_days:
+                        archived += self._archive_partition(conn, table, name)
+                return archived
+
+            if not settings.LOG_ARCHIVE_DELETE_UNPARTITIONED:
+                logger.warning(
+                    f"LogArchive: {table} is not partitioned, skipped "
+                    f"(apply sql/log_partitions.sql or set LOG_ARCHIVE_DELETE_UNPARTITIONED)"
+                )
+                return archived
+            oldest = conn.scalar(select(func.min(model.__table__.c.created_at)))
+            month = _month_start(oldest) if oldest else None
+            while month is not None and month < cutoff:
+                archived += self._archive_month(conn, table, month)
+                month = _add_months(month, 1)
+        return archived
+
+    def run_archiver(self, engine: Optional[Engine] = None) -> Dict[str, int]:
+        """
+        归档所有日志表，多进程部署时通过 MySQL 命名锁保证同一时间只有一个进程执行
+
+        Args:
+            engine: 数据库引擎，默认使用应用引擎
+
+        Returns:
+            每张表归档的行数，未开启 LOG_ARCHIVE_ENABLED 时不执行，返回空字典
+        """
+        if not settings.LOG_ARCHIVE_ENABLED:
+            logger.warning("LogArchive: LOG_ARCHIVE_ENABLED is off, archiver not run")
+            return {}
+        if engine is None:
+            from app.dependencies.database import engine
+        if engine is None:
+            return {}
+
+        results: Dict[str, int] = {}
+        with engine.connect() as lock_conn:
+            use_lock = lock_conn.dialect.name == "mysql"
+            if use_lock and not lock_conn.scalar(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": ARCHIVER_LOCK_NAME}
+            ):
+                logger.info("LogArchive: another worker is archiving, skipped")
+                return results
+            try:
+                for table in ARCHIVE_TABLES:
+                    try:
+                        results[table] = self.archive_table(engine, table)
+                    except Exception as e:
+                        logger.error(f"LogArchive: failed to archive {table}: {e}")
+            finally:
+                if use_lock:
+                    lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": ARCHIVER_LOCK_NAME})
+        return results
+
+    # ----------------------------------------
+    # 归档查询
+    # ----------------------------------------
+    def list_archives(self, table: str) -> List[Dict]:
+        """列出表的归档文件"""
+        self._resolve(table)
+        table_dir = self._table_dir(table)
+        if not os.path.isdir(table_dir):
+            return []
+        archives = []
+        for name in sorted(os.listdir(table_dir)):
+            match = _ARCHIVE_FILE_RE.match(name)
+            if not match:
+                continue
+            archives.append({
+                "month": match.group(1),
+                "min_id": int(match.group(2)),
+                "max_id": int(match.group(3)),
+                "size": os.path.getsize(os.path.join(table_dir, name)),
+            })
+        return archives
+
+    def _archive_paths(self, table: str, start: date, end: date) -> List[str]:
+        """[start, end] 月份范围内的归档文件，按 id 区间倒序排列"""
+        archives = [
+            archive for archive in self.list_archives(table)
+            if start <= _parse_month(archive["month"]) <= end
+        ]
+        # 归档中途失败后重跑，同一个月可能留下被新文件 id 区间完全覆盖的旧文件，跳过以免重复
+        archives = [
+            archive for archive in archives
+            if not any(
+                other is not archive
+                and other["month"] == archive["month"]
+                and other["min_id"] <= archive["min_id"]
+                and archive["max_id"] <= other["max_id"]
+                for other in archives
+            )
+        ]
+        archives.sort(key=lambda archive: archive["max_id"], reverse=True)
+        table_dir = self._table_dir(table)
+        return [
+            os.path.join(table_dir, f"{archive['month']}.{archive['min_id']}-{archive['max_id']}.ndjson.gz")
+            for archive in archives
+        ]
+
+    def _scan(self, path: str, fields, needle: Optional[str]) -> Iterator[Dict]:
+        """逐行读取一个归档文件中匹配搜索条件的行（文件内按 id 正序）"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                if needle and not any(needle in str(row.get(field) or "").lower() for field in fields):
+                    continue
+                yield row
+
+    def _read_archived(
+        self, table: str, start: date, end: date, search: Optional[str], offset: int, limit: int
+    ) -> Tuple[int, List[Dict]]:
+        """
+        流式读取 [start, end] 月份范围内的归档行
+
+        第一遍逐文件计数，第二遍只读取包含目标页的文件并截取所需的行，内存占用与页大小相当
+
+        Returns:
+            (匹配的总行数, 按 id 倒序排列的第 offset 行起最多 limit 行)
+        """
+        _, crud = ARCHIVE_TABLES[table]
+        needle = search.lower() if search else None
+        paths = self._archive_paths(table, start, end)
+        counts = [sum(1 for _ in self._scan(path, crud.SEARCHABLE_FIELDS, needle)) for path in paths]
+
+        items: List[Dict] = []
+        position = 0  # 倒序下当前文件之前的行数
+        for path, count in zip(paths, counts):
+            low = max(offset - position, 0)
+            high = min(offset + limit - position, count)
+            if low < high:
+                # 文件内按 id 正序，倒序下标 [low, high) 对应正序下标 [count - high, count - low)
+                rows = list(islice(self._scan(path, crud.SEARCHABLE_FIELDS, needle), count - high, count - low))
+                items.extend(reversed(rows))
+            position += count
+        return sum(counts), items
+
+    def query_range(
+        self,
+        db: Session,
+        table: str,
+        start_month: str,
+        end_month: str,
+        search: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 10,
+    ) -> Dict:
+        """
+        透明查询一个月份区间内的数据，数据库中的近期数据与归档文件中的历史数据合并分页
+
+        日志只追加、id 随时间递增，因此按 id 倒序时数据库中的行总排在归档行之前
+
+        Args:
+            db: 数据库会话
+            table: 表名
+            start_month: 起始月份 YYYY-MM（含）
+            end_month: 结束月份 YYYY-MM（含）
+            search: 搜索关键字
+            page: 页码
+            per_page: 每页条数
+
+        Returns:
+            包含 items/total/page/per_page 的分页结果
+        """
+        model, crud = self._resolve(table)
+        start, end = _parse_month(start_month), _parse_month(end_month)
+        if start > end:
+            raise ValueError("start_month must not be later than end_month")
+        page = max(page, 1)
+        per_page = max(1, min(per_page, 100))
+        offset = (page - 1) * per_page
+
+        # 带 created_at 范围条件，分区表上只会扫描对应分区
+        hot = crud.filter(
+            db, model.created_at >= start, model.created_at < _add_months(end, 1)
+        )
+        hot_total = hot.get_total(search=search)
+        items = []
+        if offset < hot_total:
+            items = [
+                item.to_dict()
+                for item in hot.get_multi(page=page, per_page=per_page, search=search, orderby="id_desc")
+            ]
+
+        archived_total = 0
+        if start < hot_cutoff():
+            archived_total, archived = self._read_archived(
+                table, start, end, search, max(offset - hot_total, 0), per_page - len(items)
+            )
+            items.extend(archived)
+
+        return {
+            "items": items,
+            "total": hot_total + archived_total,
+            "page": page,
+            "per_page": per_page,
+        }
+
+    # ----------------------------------------
+    # 定时任务
+    # ----------------------------------------
+    async def _scheduler(self) -> None:
+        await asyncio.sleep(ARCHIVER_INITIAL_DELAY)
+        while True:
+            try:
+                results = await asyncio.to_thread(self.run_archiver)
+                logger.info(f"LogArchive: archiver finished {results}")
+            except Exception as e:
+                logger.error(f"LogArchive: archiver run failed: {e}")
+            await asyncio.sleep(settings.LOG_ARCHIVE_INTERVAL)
+
+    def start_scheduler(self) -> None:
+        """在事件循环中启动定时归档任务"""
+        if not settings.LOG_ARCHIVE_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._scheduler())
+        logger.info("LogArchive: archiver scheduled")
+
+    async def stop_scheduler(self) -> None:
+        """停止定时归档任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+log_archive_service = LogArchiveService()
@@ -0,0 +1,223 @@
+"""
+登录活跃用户统计
+
+sys_user.login_time 只保存最后一次登录，历史月份的登录用户数和任意窗口的活跃用户数都无法从中准确得到。
+这里在每次登录成功时把用户 id 计入 HyperLogLog 草图（见 app.core.hyperloglog）：
+
+- 每个 (用户类型, 粒度, 时间段) 一个草图，粒度为 day / week（周一开始）/ month，按 TIMEZONE 本地时间划分；
+- 登录时只写入进程内草图，后台任务按 LOGIN_ACTIVITY_FLUSH_INTERVAL 与 sys_login_sketch 中的草图按寄存器
+  取最大值合并（等价于 Redis PFMERGE），多进程各自写入的结果可以直接合并；
+- 自然周 / 自然月的去重用户数读取一个草图，滚动窗口（如最近 7 天）合并窗口内的日草图，
+  耗时和内存与用户数无关。
+"""
+import asyncio
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.hyperloglog import HyperLogLog
+from app.models.sys_login_sketch import SysLoginSketch
+from app.services.timeseries import DAY, MONTH, WEEK, local_now, to_local
+from app.utils.log_utils import logger
+
+ADMIN = "admin"
+USER = "user"
+
+PRUNE_INTERVAL = 3600  # 清理过期日草图的间隔（秒）
+
+_table = SysLoginSketch.__table__
+
+Key = Tuple[str, str, date]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_of(granularity: str, day: date) -> date:
+    """日期所在时间段的起始日期"""
+    if granularity == WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+class LoginActivityService:
+    """登录用户草图的记录、合并写入与查询"""
+
+    def __init__(self):
+        self._pending: Dict[Key, HyperLogLog] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pruned_at = 0.0
+
+    # ----------------------------------------
+    # 记录
+    # ----------------------------------------
+    def record(self, kind: str, user_id: int, at: Optional[datetime] = None) -> None:
+        """
+        记录一次登录成功（只写入进程内草图，不访问数据库）
+
+        Args:
+            kind: 用户类型，ADMIN 或 USER
+            user_id: 用户 id
+            at: 登录时间（UTC），默认当前时间
+        """
+        day = to_local(at or datetime.now(timezone.utc)).date()
+        with self._lock:
+            for granularity in (DAY, WEEK, MONTH):
+                key = (kind, granularity, bucket_of(granularity, day))
+                sketch = self._pending.get(key)
+                if sketch is None:
+                    sketch = self._pending[key] = HyperLogLog()
+                sketch.add(user_id)
+
+    def flush(self, engine: Optional[Engine] = None) -> int:
+        """把进程内草图合并到 sys_login_sketch，返回写入的草图数"""
+        if engine is None:
+            from app.dependencies.database import engine
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or engine is None:
+            return 0
+        now = _utc_now()
+        try:
+            with engine.connect() as conn, conn.begin():
+                for (kind, granularity, bucket), sketch in pending.items():
+                    where = (_table.c.kind == kind, _table.c.granularity == granularity, _table.c.bucket == bucket)
+                    query = select(_table.c.registers).where(*where)
+                    if conn.dialect.name == "mysql":
+                        query = query.with_for_update()
+                    stored = conn.scalar(query)
+                    if stored is None:
+                        conn.execute(insert(_table).values(
+                            kind=kind, granularity=granularity, bucket=bucket,
+                            registers=sketch.to_bytes(), updated_at=now,
+                        ))
+                    else:
+                        merged = HyperLogLog.from_bytes(stored).merge(sketch)
+                        conn.execute(update(_table).where(*where).values(registers=merged.to_bytes(), updated_at=now))
+        except Exception:
+            # 写入失败（包括并发插入同一草图的主键冲突）时合并回缓冲，下次重试
+            with self._lock:
+                for key, sketch in pending.items():
+                    current = self._pending.get(key)
+                    self._pending[key] = sketch if current is None else current.merge(sketch)
+            raise
+        return len(pending)
+
+    def prune(self, engine: Engine) -> int:
+        """删除超出 LOGIN_ACTIVITY_DAY_RETENTION 天的日草图（周、月草图保留）"""
+        cutoff = local_now().date() - timedelta(days=settings.LOGIN_ACTIVITY_DAY_RETENTION)
+        with engine.connect() as conn, conn.begin():
+            return conn.execute(
+                delete(_table).where(_table.c.granularity == DAY, _table.c.bucket < cutoff)
+            ).rowcount
+
+    # ----------------------------------------
+    # 查询
+    # ----------------------------------------
+    def _sketches(self, db: Session, kind: str, granularity: str, buckets: Iterable[date]) -> Dict[date, HyperLogLog]:
+        """读取各时间段的草图，并合并本进程尚未写入的部分"""
+        buckets = list(buckets)
+        if not buckets:
+            return {}
+        rows = db.query(SysLoginSketch.bucket, SysLoginSketch.registers).filter(
+            SysLoginSketch.kind == kind,
+            SysLoginSketch.granularity == granularity,
+            SysLoginSketch.bucket.in_(buckets),
+        ).all()
+        sketches = {bucket: HyperLogLog.from_bytes(registers) for bucket, registers in rows}
+        with self._lock:
+            for bucket in buckets:
+                local = self._pending.get((kind, granularity, bucket))
+                if local is not None:
+                    sketch = sketches.get(bucket)
+                    sketches[bucket] = HyperLogLog().merge(local) if sketch is None else sketch.merge(local)
+        return sketches
+
+    def counts(self, db: Session, kind: str, granularity: str, buckets: Iterable[date]) -> Dict[date, int]:
+        """各时间段（起始日期）内登录过的去重用户数，没有草图的时间段不返回"""
+        return {bucket: sketch.count() for bucket, sketch in self._sketches(db, kind, granularity, buckets).items()}
+
+    def unique(self, db: Session, kind: str, start: date, end: date) -> int:
+        """[start, end] 内登录过的去重用户数（合并窗口内的日草图）"""
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        return HyperLogLog.union(self._sketches(db, kind, DAY, days).values()).count()
+
+    def active_users(self, db: Session, kind: str) -> Dict[str, int]:
+        """最近 1 / 7 / 30 天（包含当天）的活跃用户数，以及本周、本月的活跃用户数"""
+        today = local_now().date()
+        week, month = bucket_of(WEEK, today), bucket_of(MONTH, today)
+        calendar = {
+            granularity: self.counts(db, kind, granularity, [bucket]).get(bucket, 0)
+            for granularity, bucket in ((WEEK, week), (MONTH, month))
+        }
+        return {
+            "dau": self.unique(db, kind, today, today),
+            "wau": self.unique(db, kind, today - timedelta(days=6), today),
+            "mau": self.unique(db, kind, today - timedelta(days=29), today),
+            "thisWeek": calendar[WEEK],
+            "thisMonth": calendar[MONTH],
+        }
+
+    def recorded_since(self, db: Session, kind: str) -> Optional[date]:
+        """最早的月草图所在月份（开始记录的月份），之前的月份没有草图"""
+        buckets: List[date] = [
+            bucket for (bucket,) in db.query(SysLoginSketch.bucket).filter(
+                SysLoginSketch.kind == kind, SysLoginSketch.granularity == MONTH
+            ).order_by(SysLoginSketch.bucket).limit(1)
+        ]
+        with self._lock:
+            buckets += [bucket for (k, granularity, bucket) in self._pending if k == kind and granularity == MONTH]
+        return min(buckets) if buckets else None
+
+    # ----------------------------------------
+    # 定时任务
+    # ----------------------------------------
+    def _run(self) -> None:
+        self.flush()
+        if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+            from app.dependencies.database import engine
+            if engine is not None:
+                self.prune(engine)
+            self._pruned_at = time.monotonic()
+
+    async def _scheduler(self) -> None:
+        while True:
+            await asyncio.sleep(settings.LOGIN_ACTIVITY_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self._run)
+            except Exception as e:
+                logger.error(f"LoginActivity: flush failed: {e}")
+
+    def start_scheduler(self) -> None:
+        """在事件循环中启动后台写入任务"""
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._scheduler())
+
+    async def stop_scheduler(self) -> None:
+        """停止后台任务，并写入尚未合并的草图"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await asyncio.to_thread(self.flush)
+        except Exception as e:
+            logger.warning(f"LoginActivity: failed to flush pending sketches: {e}")
+
+
+login_activity_service = LoginActivityService()
@@ -0,0 +1,218 @@
+"""
+菜单（前端路由）缓存服务
+
+/auth/all_router 原来每次都读取全部规则并递归构建菜单树。这里按分组预先生成菜单并序列化为 JSON，
+连同内容摘要（ETag）一起保存在 cache_manager 中：启动时和规则/分组变化时重新生成，
+接口只需一次缓存读取，客户端携带 If-None-Match 时内容未变直接返回 304。
+
+缓存键包含规则表和分组表的版本（行数、最大 id、最大 updated_at），版本每 AUTH_CACHE_SYNC_INTERVAL 秒
+最多查询一次，其他 worker 或直接修改数据库导致的变化在该间隔内生效，不依赖 invalidate() 的广播。
+"""
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from app.core.cache import cache_manager, run_cache_coroutine
+from app.core.config import settings
+from app.models.sys_admin_group import SysAdminGroup
+from app.models.sys_admin_rule import SysAdminRule
+from app.models.sys_user_group import SysUserGroup
+from app.models.sys_user_rule import SysUserRule
+from app.utils.log_utils import logger
+from app.utils.responses import get_current_time
+
+MODELS = {
+    "admin": (SysAdminGroup, SysAdminRule),
+    "user": (SysUserGroup, SysUserRule),
+}
+
+
+def _cache_key(kind: str, group_id: int, version: str) -> str:
+    return f"menu:{kind}:{group_id}:{version}"
+
+
+def _table_version(db, kind: str) -> str:
+    """规则表与分组表的版本摘要，任一表增删改都会改变（同一秒内的修改除外，由 invalidate() 覆盖）"""
+    values = []
+    for model in MODELS[kind]:
+        values.extend(db.query(func.count(model.id), func.max(model.id), func.max(model.updated_at)).one())
+    return hashlib.sha1(repr(values).encode()).hexdigest()[:16]
+
+
+def _allowed_ids(group_rules, rows) -> Optional[Set[int]]:
+    """分组可见的规则 id（含祖先节点，避免已授权的子菜单因父菜单未勾选而丢失）；None 表示全部"""
+    if group_rules is None:
+        return set()
+    if "all" in group_rules:
+        return None
+    parents = {row.id: row.parent_id for row in rows}
+    allowed = set()
+    for value in group_rules:
+        try:
+            rule_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        while rule_id in parents and rule_id not in allowed:
+            allowed.add(rule_id)
+            rule_id = parents[rule_id]
+    return allowed
+
+
+def build_menu(rows: Iterable, allowed: Optional[Set[int]] = None) -> List[Dict]:
+    """
+    一次遍历构建菜单树，输出结构与原 transform_items 相同
+
+    Args:
+        rows: 含 id, parent_id, name, path, component, redirect, meta 的规则行
+        allowed: 可见的规则 id，None 表示全部可见
+    """
+    nodes: Dict[int, Dict] = {}
+    children: Dict[int, List[int]] = defaultdict(list)
+    roots: List[int] = []
+    for row in rows:
+        if allowed is not None and row.id not in allowed:
+            continue
+        if row.parent_id == 0:
+            nodes[row.id] = {
+                "id": row.id,
+                "meta": row.meta,
+                "name": row.name,
+                "path": f"/admin{row.path}",
+                "redirect": row.redirect if row.redirect else None,
+                "children": [],
+            }
+            roots.append(row.id)
+        else:
+            nodes[row.id] = {
+                "id": row.id,
+                "name": row.name,
+                "path": f"/admin{row.path}",
+                "component": row.component,
+                "meta": row.meta,
+            }
+            children[row.parent_id].append(row.id)
+
+    # 只输出从根节点可达的部分，父节点不存在的孤儿节点与原实现一样被丢弃
+    stack = list(roots)
+    while stack:
+        node_id = stack.pop()
+        child_ids = children.get(node_id)
+        if not child_ids:
+            continue
+        node = nodes[node_id]
+        node.setdefault("children", []).extend(nodes[child_id] for child_id in child_ids)
+        stack.extend(child_ids)
+    return [nodes[root_id] for root_id in roots]
+
+
+def _render(rows, group_rules) -> Dict:
+    data = json.dumps(build_menu(rows, _allowed_ids(group_rules, rows)), ensure_ascii=False, separators=(",", ":"))
+    etag = '"' + hashlib.sha1(data.encode()).hexdigest() + '"'
+    return {"etag": etag, "data": data}
+
+
+class MenuService:
+    """按分组预生成并缓存菜单 JSON"""
+
+    def __init__(self):
+        # kind -> (表版本, 查询时间)
+        self._versions: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def _session():
+        from app.dependencies import database
+        if database.SessionLocal is None:
+            raise database.DatabaseConnectionError("数据库不可用")
+        return database.SessionLocal()
+
+    @classmethod
+    def _load_version(cls, kind: str) -> str:
+        db = cls._session()
+        try:
+            return _table_version(db, kind)
+        finally:
+            db.close()
+
+    @classmethod
+    def _load(cls, kind: str, group_id: Optional[int] = None):
+        group_model, rule_model = MODELS[kind]
+        db = cls._session()
+        try:
+            version = _table_version(db, kind)
+            groups = db.query(group_model.id, group_model.rules)
+            if group_id is not None:
+                groups = groups.filter(group_model.id == group_id)
+            rows = db.query(
+                rule_model.id, rule_model.parent_id, rule_model.name, rule_model.path,
+                rule_model.component, rule_model.redirect, rule_model.meta,
+            ).order_by(rule_model.id).all()
+            return groups.all(), rows, version
+        finally:
+            db.close()
+
+    async def _version(self, kind: str) -> str:
+        now = time.time()
+        cached = self._versions.get(kind)
+        if cached is not None and now - cached[1] < settings.AUTH_CACHE_SYNC_INTERVAL:
+            return cached[0]
+        version = await run_in_threadpool(self._load_version, kind)
+        self._versions[kind] = (version, now)
+        return version
+
+    async def get(self, kind: str, group_id: int) -> Dict:
+        """
+        获取分组的菜单缓存
+
+        Returns:
+            {"etag": ETag, "data": 菜单 JSON 字符串}；缓存缺失或表版本变化时现场生成并写入
+        """
+        entry = await cache_manager.get(_cache_key(kind, group_id, await self._version(kind)))
+        if entry:
+            return entry
+        groups, rows, version = await run_in_threadpool(self._load, kind, group_id)
+        self._versions[kind] = (version, time.time())
+        entry = _render(rows, groups[0].rules if groups else None)
+        await cache_manager.set(_cache_key(kind, group_id, version), entry, expire=settings.MENU_CACHE_TTL)
+        return entry
+
+    async def rebuild(self, kind: str) -> None:
+        """重新生成某一端（admin / user）全部分组的菜单"""
+        groups, rows, version = await run_in_threadpool(self._load, kind)
+        self._versions[kind] = (version, time.time())
+        for group in groups:
+            await cache_manager.set(_cache_key(kind, group.id, version), _render(rows, group.rules),
+                                    expire=settings.MENU_CACHE_TTL)
+        logger.info(f"MenuService: rebuilt {kind} menus for {len(groups)} groups")
+
+    def invalidate(self, kind: str) -> None:
+        """
+        规则或分组变化后重新生成菜单（可在同步处理函数中调用）
+
+        本进程立即使用新版本；同一秒内的修改可能不改变表版本，重建会覆盖同一版本下的旧菜单
+        """
+        try:
+            run_cache_coroutine(self.rebuild(kind))
+        except Exception as e:
+            logger.warning(f"MenuService: failed to rebuild {kind} menus: {e}")
+
+    @staticmethod
+    def response(entry: Dict, if_none_match: Optional[str] = None) -> Response:
+        """
+        把缓存的菜单包装为与 success_response 相同格式的响应
+
+        If-None-Match 与 ETag 一致时返回 304；data 部分直接拼接预先序列化的 JSON，不再重新编码
+        """
+        headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+        if if_none_match and entry["etag"] in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        body = f'{{"code":0,"msg":"Success","data":{entry["data"]},"time":"{get_current_time()}"}}'
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+menu_service = MenuService()
@@ -0,0 +1,150 @@
+"""
+密码哈希服务
+
+bcrypt 的计算耗时在 100ms 量级，直接在 async 处理函数中调用会卡住整个事件循环。
+这里把 bcrypt 放到专用的有界线程池（bcrypt 计算时释放 GIL）中执行，
+排队超过上限时直接拒绝，并统计排队和计算耗时；登录成功时按配置的 cost 透明地重新哈希。
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.log_utils import logger
+
+# 与模型中 check_password 的规则保持一致
+MIN_PASSWORD_LENGTH = 8
+
+
+def _checkpw(plain: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(plain.encode('utf8'), hashed.encode('utf8'))
+    except ValueError:
+        return False
+
+
+def _hashpw(plain: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain.encode('utf8'), bcrypt.gensalt(rounds)).decode('utf8')
+
+
+class PasswordService:
+    """在有界线程池中执行 bcrypt 的密码服务"""
+
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._queue_total = 0.0
+        self._queue_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+                )
+            return self._executor
+
+    async def _run(self, func, *args):
+        """提交到线程池执行，记录排队时间和计算时间；排队已满时返回 503"""
+        with self._lock:
+            if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="登录请求过多，请稍后重试",
+                )
+            self._pending += 1
+        submitted = time.perf_counter()
+        timings = {}
+
+        def task():
+            started = time.perf_counter()
+            timings['queue'] = started - submitted
+            try:
+                return func(*args)
+            finally:
+                timings['run'] = time.perf_counter() - started
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), task)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if timings:
+                    self._completed += 1
+                    self._queue_total += timings['queue']
+                    self._queue_max = max(self._queue_max, timings['queue'])
+                    self._run_total += timings.get('run', 0.0)
+            if timings.get('queue', 0.0) > 1.0:
+                logger.warning(f"PasswordService: bcrypt task queued for {timings['queue']:.2f}s")
+
+    async def verify(self, plain: str, hashed: Optional[str]) -> bool:
+        """校验密码，规则与模型的 check_password 相同"""
+        if not plain or len(plain) < MIN_PASSWORD_LENGTH or not hashed:
+            return False
+        return await self._run(_checkpw, plain, hashed)
+
+    async def hash(self, plain: str) -> str:
+        """按配置的 cost 生成 bcrypt 哈希"""
+        return await self._run(_hashpw, plain, settings.PASSWORD_BCRYPT_ROUNDS)
+
+    @staticmethod
+    def needs_rehash(hashed: Optional[str]) -> bool:
+        """哈希的 cost 与 PASSWORD_BCRYPT_ROUNDS 不一致时需要重新哈希"""
+        try:
+            return int(hashed.split('$')[2]) != settings.PASSWORD_BCRYPT_ROUNDS
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    async def check_and_upgrade(self, account, plain: str) -> bool:
+        """
+        校验账号（SysAdmin / SysUser）的密码，成功且 cost 过期时顺便重新哈希
+
+        新哈希只写到对象上，由调用方在登录成功的同一次 commit 中保存
+        """
+        if not await self.verify(plain, account._password):
+            return False
+        if self.needs_rehash(account._password):
+            account._password = await self.hash(plain)
+            logger.info(f"PasswordService: rehashed password of {account.username} "
+                        f"to cost {settings.PASSWORD_BCRYPT_ROUNDS}")
+        return True
+
+    async def set_password(self, account, plain: str) -> None:
+        """为账号设置新密码（在线程池中哈希）"""
+        if not plain or len(plain) < MIN_PASSWORD_LENGTH:
+            raise ValueError(f"Password must be at least {MIN_PASSWORD_LENGTH} characters")
+        account._password = await self.hash(plain)
+
+    def stats(self) -> Dict:
+        """线程池排队和计算耗时统计"""
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_ms": round(self._queue_total / completed * 1000, 2),
+                "max_queue_ms": round(self._queue_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2),
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+password_service = PasswordService()
@@ -0,0 +1,152 @@
+"""
+管理员规则树服务
+
+/admin/rule/list 原来对每条规则 eval() permission、逐条 SysAdminRuleTree.from_orm、递归挂接子节点，
+最后对每个节点再 .dict() 一次。这里改为：
+
+- 只查询需要的列，直接处理行元组；
+- permission 为字符串时用带缓存的安全解析（JSON，兼容原 eval 可以解析的 Python 字面量）；
+- 一次遍历构建树并直接序列化为 JSON 字符串；
+- 结果按查询参数缓存在进程内，缓存键包含规则表版本（行数、最大 id、最大 updated_at），
+  任何 worker 或直接修改数据库导致的变化都会使旧结果失效；本进程内的修改通过 invalidate() 立即生效。
+"""
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+
+from app.core.permission import parse_permission
+from app.crud.sys_admin_rule import crud_sys_admin_rule
+from app.models.sys_admin_rule import SysAdminRule
+from app.services.hierarchy_service import hierarchy_service
+from app.utils.responses import get_current_time
+
+# 输出字段，顺序与 SysAdminRuleTree 一致
+FIELDS = (
+    "id", "rule_type", "parent_id", "name", "path", "component", "redirect", "meta", "permission",
+    "menu_display_type", "model_name", "created_at", "updated_at", "deleted_at", "weigh", "status",
+)
+COLUMNS = tuple(getattr(SysAdminRule, field) for field in FIELDS)
+PERMISSION_INDEX = FIELDS.index("permission")
+
+# 进程内缓存的查询结果数
+MAX_ENTRIES = 64
+
+
+def _json_default(value):
+    # 与 jsonable_encoder 的输出保持一致
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def build_rule_tree(rows, root_parent_id: int = 0) -> List[Dict]:
+    """
+    一次遍历把规则行构建为树，输出结构与原 build_tree 相同
+
+    Args:
+        rows: 按 FIELDS 顺序的列元组
+        root_parent_id: 顶层节点的 parent_id，取子树时传入子树根节点的 parent_id
+    """
+    nodes: Dict[int, Dict] = {}
+    children: Dict[int, List[Dict]] = defaultdict(list)
+    for row in rows:
+        node = dict(zip(FIELDS, row))
+        node["permission"] = parse_permission(row[PERMISSION_INDEX]) if row[PERMISSION_INDEX] is not None else None
+        nodes[node["id"]] = node
+        children[node["parent_id"] if node["parent_id"] is not None else 0].append(node)
+
+    # 父节点不在结果中的节点与原实现一样被丢弃；子节点顺序与输入一致。
+    # 与原实现一致：只有顶层节点在没有子节点时省略 children，下层叶子节点保留空列表
+    for node_id, node in nodes.items():
+        node["children"] = children.get(node_id, [])
+    roots = children.get(root_parent_id, [])
+    for root in roots:
+        if not root["children"]:
+            del root["children"]
+    return roots
+
+
+def dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+
+
+class RuleTreeService:
+    """规则树查询与缓存"""
+
+    def __init__(self):
+        self._cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._version: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _table_version(db: Session) -> Tuple:
+        return tuple(db.query(
+            func.count(SysAdminRule.id), func.max(SysAdminRule.id), func.max(SysAdminRule.updated_at)
+        ).one())
+
+    def _build(self, db: Session, page: int, per_page: int, search: Optional[str], orderby: Optional[str],
+               subtree_of: Optional[int]) -> Dict:
+        base_query = db.query(*COLUMNS)
+        root_parent_id = 0
+        if subtree_of:
+            base_query = base_query.filter(SysAdminRule.id.in_(hierarchy_service.descendants_select(SysAdminRule, subtree_of)))
+            root_parent_id = db.query(SysAdminRule.parent_id).filter(SysAdminRule.id == subtree_of).scalar() or 0
+        rows = crud_sys_admin_rule.get_multi(
+            db, page=page, per_page=per_page, search=search, orderby=orderby, base_query=base_query
+        )
+        total = crud_sys_admin_rule.get_total(db, search=search, base_query=base_query)
+        return {"items": dumps(build_rule_tree(rows, root_parent_id)), "total": total}
+
+    def get(self, db: Session, page: int, per_page: int, search: Optional[str] = None,
+            orderby: Optional[str] = None, subtree_of: Optional[int] = None) -> Dict:
+        """
+        获取一页规则树
+
+        Returns:
+            {"items": 规则树 JSON 字符串, "total": 总数}
+        """
+        version = self._table_version(db)
+        key = (page, per_page, search, orderby, subtree_of)
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                return entry
+
+        entry = self._build(db, page, per_page, search, orderby, subtree_of)
+        with self._lock:
+            if version == self._version:
+                self._cache[key] = entry
+                while len(self._cache) > MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def response(entry: Dict, page: int, per_page: int) -> Response:
+        """与 success_response 格式相同的响应，items 部分直接拼接预先序列化的 JSON"""
+        body = (
+            f'{{"code":0,"msg":"Success","data":{{"items":{entry["items"]},"total":{entry["total"]},'
+            f'"page":{page},"per_page":{per_page}}},"time":"{get_current_time()}"}}'
+        )
+        return Response(content=body, media_type="application/json")
+
+    def invalidate(self) -> None:
+        """规则变化后丢弃本进程的缓存（同一秒内的修改不一定改变表版本）"""
+        with self._lock:
+            self._cache.clear()
+            self._version = None
+
+
+rule_tree_service = RuleTreeService()
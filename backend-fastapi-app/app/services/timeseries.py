@@ -0,0 +1,254 @@
+"""
+时间序列聚合
+
+分析接口共用的按时间段聚合工具，支持 hour / day / week（周一开始）/ month 粒度，时间段按 settings.TIMEZONE
+的本地时间划分：
+
+- aggregate()：对原始表的时间列做一次分组查询。数据库只按 UTC 的 15 分钟时间片分组（与方言和会话时区无关，
+  所有时区的偏移都是 15 分钟的整数倍），时区换算和归入目标时间段在 numpy 中批量完成；
+- accumulate()：把已有的 (时间, 数值) 数组归入目标时间段，用于从预聚合计数换算更粗的粒度；
+- 返回的 TimeSeries 已按时间段补齐，records() 直接生成接口需要的列表；
+- 按本地时间过滤原始表时使用 local_range()（本地日期先用 day_bounds() 换算），不要对时间列使用 func.date()：
+  前者换算为 UTC 的半开区间，可以使用时间列上的索引，也不受数据库会话时区影响。
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+from sqlalchemy import BigInteger, Integer, cast, extract, func, literal, literal_column, select
+
+from app.core.config import settings
+
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+GRANULARITIES = (HOUR, DAY, WEEK, MONTH)
+
+# 各粒度的 numpy 时间单位和输出格式
+_UNITS = {HOUR: "h", DAY: "D", WEEK: "D", MONTH: "M"}
+FORMATS = {HOUR: "%Y-%m-%d %H:00", DAY: "%Y-%m-%d", WEEK: "%Y-%m-%d", MONTH: "%Y-%m"}
+
+SLICE_SECONDS = 900  # 数据库分组的时间片长度
+_DENSE_HOURS = 24 * 366 * 20  # utc_to_local 按连续小时查表的最大跨度
+
+
+def zone():
+    """settings.TIMEZONE 对应的时区，无效时使用 UTC"""
+    try:
+        return ZoneInfo(settings.TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def to_local(value: datetime) -> datetime:
+    """数据库中的 UTC 时间（可能不带时区）转换为 TIMEZONE 下不带时区的本地时间"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(zone()).replace(tzinfo=None)
+
+
+def to_utc(value: datetime) -> datetime:
+    """TIMEZONE 下不带时区的本地时间转换为不带时区的 UTC 时间"""
+    return value.replace(tzinfo=zone()).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def local_now() -> datetime:
+    """TIMEZONE 下不带时区的当前时间"""
+    return datetime.now(zone()).replace(tzinfo=None)
+
+
+def day_bounds(start: date, end: Optional[date] = None) -> Tuple[datetime, datetime]:
+    """本地日期 [start, end]（包含，end 默认与 start 相同）对应的 UTC 半开区间 [起点, 终点)"""
+    end = end or start
+    return (
+        to_utc(datetime.combine(start, datetime.min.time())),
+        to_utc(datetime.combine(end + timedelta(days=1), datetime.min.time())),
+    )
+
+
+def local_range(column, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List:
+    """
+    本地时间范围 [start, end) 转换为存储 UTC 时间的列上的过滤条件
+
+    不对列使用 DATE() 等函数，条件是 column >= 起点 AND column < 终点 的半开区间，可以使用列上的索引做范围扫描；
+    边界按 TIMEZONE 换算，夏令时切换当天的起止时间也是准确的
+    """
+    criteria = []
+    if start is not None:
+        criteria.append(column >= to_utc(start))
+    if end is not None:
+        criteria.append(column < to_utc(end))
+    return criteria
+
+
+def _check(granularity: str) -> None:
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def floor(values: np.ndarray, granularity: str) -> np.ndarray:
+    """datetime64 数组向下取整到所在时间段的起点"""
+    _check(granularity)
+    if granularity == WEEK:
+        days = values.astype("datetime64[D]")
+        # 1970-01-01 是周四，偏移 3 天后按 7 取余得到距周一的天数
+        return days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    return values.astype(f"datetime64[{_UNITS[granularity]}]")
+
+
+def bucket_range(start: datetime, end: datetime, granularity: str) -> np.ndarray:
+    """与 [start, end) 相交的所有时间段起点"""
+    first = floor(np.array([start], dtype="datetime64[s]"), granularity)[0]
+    last = floor(np.array([end], dtype="datetime64[s]") - np.timedelta64(1, "s"), granularity)[0]
+    step = np.timedelta64(7, "D") if granularity == WEEK else np.timedelta64(1, _UNITS[granularity])
+    if last < first:
+        return np.array([], dtype=first.dtype)
+    return np.arange(first, last + step, step)
+
+
+def last_buckets(granularity: str, count: int, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """包含当前时间段在内的最近 count 个时间段，返回本地时间的 [start, end)"""
+    now = now or local_now()
+    current = floor(np.array([now], dtype="datetime64[s]"), granularity)[0]
+    step = np.timedelta64(7, "D") if granularity == WEEK else np.timedelta64(1, _UNITS[granularity])
+    start = current - step * (count - 1)
+    end = current + step
+    return _to_datetime(start), _to_datetime(end)
+
+
+def _to_datetime(value: np.datetime64) -> datetime:
+    return value.astype("datetime64[s]").astype(datetime)
+
+
+class TimeSeries:
+    """补齐后的时间序列：buckets 为各时间段起点（本地时间），values 为对应数值"""
+
+    def __init__(self, granularity: str, buckets: np.ndarray, values: np.ndarray):
+        self.granularity = granularity
+        self.buckets = buckets
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    @property
+    def total(self) -> int:
+        return int(self.values.sum())
+
+    def labels(self) -> List[str]:
+        """各时间段的文字表示，格式见 FORMATS"""
+        if self.granularity == HOUR:
+            text = np.datetime_as_string(self.buckets, unit="h")
+            return [label.replace("T", " ") + ":00" for label in text.tolist()]
+        return np.datetime_as_string(self.buckets).tolist()
+
+    def items(self, skip_empty: bool = False) -> Iterator[Tuple[datetime, int]]:
+        """(时间段起点, 数值)"""
+        for bucket, value in zip(self.buckets.astype("datetime64[s]").astype(datetime).tolist(), self.values.tolist()):
+            if value or not skip_empty:
+                yield bucket, int(value)
+
+    def records(self, key: str = "date", value_key: str = "count", skip_empty: bool = False) -> List[Dict]:
+        """[{key: 时间段, value_key: 数值}]，skip_empty 为 True 时省略数值为 0 的时间段"""
+        return [
+            {key: label, value_key: int(value)}
+            for label, value in zip(self.labels(), self.values.tolist())
+            if value or not skip_empty
+        ]
+
+
+def accumulate(times: np.ndarray, weights: Optional[np.ndarray], granularity: str,
+               start: datetime, end: datetime) -> TimeSeries:
+    """
+    把本地时间的数据点归入 [start, end) 内的时间段并补齐
+
+    Args:
+        times: datetime64 数组（本地时间）
+        weights: 每个数据点的数值，为 None 时每个数据点计 1
+        granularity: 目标粒度
+        start / end: 本地时间范围，范围外的数据点被忽略
+    """
+    buckets = bucket_range(start, end, granularity)
+    values = np.zeros(len(buckets), dtype=np.int64)
+    if len(times) and len(buckets):
+        floored = floor(times, granularity)
+        index = np.searchsorted(buckets, floored)
+        valid = index < len(buckets)
+        valid[valid] = buckets[index[valid]] == floored[valid]
+        valid &= times >= np.datetime64(start, "s")
+        valid &= times < np.datetime64(end, "s")
+        counts = np.bincount(
+            index[valid], weights=None if weights is None else weights[valid], minlength=len(buckets)
+        )
+        values = counts.astype(np.int64)
+    return TimeSeries(granularity, buckets, values)
+
+
+def utc_to_local(values: np.ndarray) -> np.ndarray:
+    """UTC 的 datetime64[s] 数组转换为 TIMEZONE 本地时间，偏移量按不同的 UTC 小时各计算一次"""
+    tz = zone()
+    if tz is timezone.utc or not len(values):
+        return values
+    hours = values.astype("datetime64[h]")
+    valid = hours[~np.isnat(hours)]
+    if not len(valid):
+        return values
+    first, last = valid.min(), valid.max()
+    if (last - first).astype(np.int64) < _DENSE_HOURS:
+        # 跨度不大时按连续的小时编号查表，不需要排序去重
+        table = np.arange(first, last + np.timedelta64(1, "h"))
+        inverse = (np.where(np.isnat(hours), first, hours) - first).astype(np.int64)
+    else:
+        table, inverse = np.unique(hours, return_inverse=True)
+    offsets = np.array([
+        int(hour.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds())
+        for hour in table.astype("datetime64[s]").astype(datetime).tolist()
+    ], dtype=np.int64)
+    return values + offsets[inverse].astype("timedelta64[s]")
+
+
+def _slice_expression(column, dialect: str):
+    """时间列所在 UTC 时间片的序号（自 1970-01-01 起的 SLICE_SECONDS 秒数），不受会话时区影响"""
+    if dialect == "mysql":
+        seconds = func.timestampdiff(literal_column("SECOND"), literal("1970-01-01 00:00:00"), column)
+    elif dialect == "postgresql":
+        seconds = cast(extract("epoch", column), BigInteger)
+    else:
+        seconds = cast(func.strftime("%s", column), Integer)
+    return seconds // SLICE_SECONDS
+
+
+def aggregate(conn, column, *criteria, granularity: str = DAY,
+              start: Optional[datetime] = None, end: Optional[datetime] = None, value=None) -> TimeSeries:
+    """
+    一次分组查询统计时间列在各时间段内的行数（或 value 表达式之和）
+
+    Args:
+        conn: Session 或 Connection
+        column: 存储 UTC 时间的列
+        *criteria: 附加过滤条件
+        granularity: 粒度
+        start / end: 本地时间范围 [start, end)，为空时取数据的最早 / 最晚时间
+        value: 求和的表达式，默认统计行数
+    """
+    _check(granularity)
+    dialect = conn.get_bind().dialect.name if hasattr(conn, "get_bind") else conn.dialect.name
+    slice_index = _slice_expression(column, dialect).label("slice")
+    # 时间段边界换算为 UTC 后直接过滤原始列，可以使用索引
+    query = select(slice_index, func.count() if value is None else func.sum(value)).where(
+        column.isnot(None), *criteria, *local_range(column, start, end)
+    )
+    rows = conn.execute(query.group_by(slice_index)).all()
+
+    slices = np.array([row[0] for row in rows], dtype=np.int64)
+    weights = np.array([row[1] or 0 for row in rows], dtype=np.int64)
+    times = utc_to_local((slices * SLICE_SECONDS).astype("datetime64[s]"))
+    if start is None or end is None:
+        if not len(times):
+            return TimeSeries(granularity, np.array([], dtype=f"datetime64[{_UNITS[granularity]}]"),
+                              np.array([], dtype=np.int64))
+        start = start or _to_datetime(times.min())
+        end = end or _to_datetime(times.max()) + timedelta(seconds=1)
+    return accumulate(times, weights, granularity, start, end)
@@ -0,0 +1,241 @@
+"""
+用户注册地区服务
+
+/analytics/regions 原来在每次缓存未命中时对全部用户的 join_ip 逐个查询地区。这里把解析结果保存在
+sys_user_region 中，地区统计变为一次 GROUP BY：
+
+- 用户创建或 join_ip 变化时由 CRUD 调用 assign() 立即解析写入；
+- 存量用户、直接写库导致的过期记录由后台任务按 id 顺序分批补齐，速率受 USER_REGION_BACKFILL_RATE 限制；
+  更换地区库后可以用 full 模式重新解析全部用户；
+- 统计只计入 join_ip 与 sys_user 当前值一致的记录。
+"""
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, insert, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.geoip import geoip
+from app.models.sys_user import SysUser
+from app.models.sys_user_region import SysUserRegion
+from app.utils.log_utils import logger
+
+BACKFILL_INITIAL_DELAY = 30  # 应用启动后首次检查的延迟（秒）
+BACKFILL_LOCK_NAME = "zayum_user_region_backfill"  # 多进程部署时用于互斥的 MySQL 命名锁
+
+_table = SysUserRegion.__table__
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _current_join():
+    """与 sys_user 当前 join_ip 一致的地区记录"""
+    return and_(SysUserRegion.user_id == SysUser.id, SysUserRegion.join_ip == SysUser.join_ip)
+
+
+class UserRegionService:
+    """用户地区的解析、补齐与统计"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._progress: Dict = {
+            "running": False,
+            "full": False,
+            "processed": 0,
+            "started_at": None,
+            "finished_at": None,
+            "last_error": None,
+        }
+
+    # ----------------------------------------
+    # 写入
+    # ----------------------------------------
+    @staticmethod
+    def assign(db: Session, user: SysUser) -> None:
+        """解析并保存单个用户的地区（用户创建或 join_ip 变化后调用，失败时只记录日志）"""
+        try:
+            if not user.join_ip:
+                db.execute(delete(_table).where(_table.c.user_id == user.id))
+            else:
+                db.merge(SysUserRegion(
+                    user_id=user.id,
+                    join_ip=user.join_ip,
+                    region=geoip.resolve(user.join_ip),
+                    resolved_at=_utc_now(),
+                ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"UserRegion: failed to assign region for user {user.id}: {e}")
+
+    @staticmethod
+    def discard(db: Session, user_id: int) -> None:
+        """删除用户的地区记录（在删除用户的事务中调用，不提交）"""
+        db.execute(delete(_table).where(_table.c.user_id == user_id))
+
+    # ----------------------------------------
+    # 统计
+    # ----------------------------------------
+    @staticmethod
+    def region_counts(db: Session) -> List[Dict]:
+        """各地区用户数，按用户数降序"""
+        rows = db.query(SysUserRegion.region, func.count(SysUserRegion.user_id)).join(
+            SysUser, _current_join()
+        ).group_by(SysUserRegion.region).all()
+        data = [{"region": region, "count": int(count)} for region, count in rows]
+        data.sort(key=lambda item: item["count"], reverse=True)
+        return data
+
+    def progress(self, db: Session) -> Dict:
+        """补齐进度：有 join_ip 的用户数、已解析的用户数和本进程最近一次任务的状态"""
+        total = db.query(func.count(SysUser.id)).filter(SysUser.join_ip.isnot(None)).scalar() or 0
+        resolved = db.query(func.count(SysUserRegion.user_id)).join(SysUser, _current_join()).scalar() or 0
+        return {
+            "total": total,
+            "resolved": resolved,
+            "pending": max(total - resolved, 0),
+            "percent": round(resolved * 100 / total, 2) if total else 100.0,
+            "rate": settings.USER_REGION_BACKFILL_RATE,
+            **self._progress,
+        }
+
+    # ----------------------------------------
+    # 补齐
+    # ----------------------------------------
+    @staticmethod
+    def _pending_batch(conn, after_id: int, limit: int, full: bool):
+        query = select(SysUser.id, SysUser.join_ip).where(SysUser.id > after_id, SysUser.join_ip.isnot(None))
+        if not full:
+            query = query.outerjoin(SysUserRegion, SysUserRegion.user_id == SysUser.id).where(
+                or_(SysUserRegion.user_id.is_(None), SysUserRegion.join_ip != SysUser.join_ip)
+            )
+        return conn.execute(query.order_by(SysUser.id).limit(limit)).all()
+
+    def backfill_batch(self, engine: Engine, after_id: int, full: bool = False) -> Optional[int]:
+        """
+        解析 after_id 之后的一批用户
+
+        Returns:
+            本批最后一个用户 id，没有待处理的用户时返回 None
+        """
+        batch_size = max(settings.USER_REGION_BACKFILL_BATCH_SIZE, 1)
+        with engine.connect() as conn, conn.begin():
+            rows = self._pending_batch(conn, after_id, batch_size, full)
+            if not rows:
+                return None
+            regions = geoip.resolve_many(join_ip for _, join_ip in rows)
+            now = _utc_now()
+            ids = [user_id for user_id, _ in rows]
+            conn.execute(delete(_table).where(_table.c.user_id.in_(ids)))
+            conn.execute(insert(_table), [
+                {"user_id": user_id, "join_ip": join_ip, "region": regions[join_ip], "resolved_at": now}
+                for user_id, join_ip in rows
+            ])
+        self._progress["processed"] += len(rows)
+        return ids[-1]
+
+    def run_backfill(self, engine: Optional[Engine] = None, full: bool = False) -> int:
+        """
+        按 USER_REGION_BACKFILL_RATE 限速补齐全部待处理用户，返回处理的用户数
+
+        多进程部署时通过 MySQL 命名锁保证同一时间只有一个进程执行
+        """
+        if engine is None:
+            from app.dependencies.database import engine
+        if engine is None:
+            return 0
+
+        with engine.connect() as lock_conn:
+            use_lock = lock_conn.dialect.name == "mysql"
+            if use_lock and not lock_conn.scalar(
+                text("SELECT GET_LOCK(:name, 0)"), {"name": BACKFILL_LOCK_NAME}
+            ):
+                logger.info("UserRegion: another worker is backfilling, skipped")
+                return 0
+            self._progress.update(
+                running=True, full=full, processed=0, started_at=_utc_now(), finished_at=None, last_error=None
+            )
+            try:
+                after_id = 0
+                rate = max(settings.USER_REGION_BACKFILL_RATE, 1)
+                while not self._stop.is_set():
+                    started = time.monotonic()
+                    before = self._progress["processed"]
+                    after_id = self.backfill_batch(engine, after_id, full)
+                    if after_id is None:
+                        break
+                    # 每批至少耗时 批大小 / 速率 秒
+                    delay = (self._progress["processed"] - before) / rate - (time.monotonic() - started)
+                    if delay > 0:
+                        self._stop.wait(delay)
+            except Exception as e:
+                self._progress["last_error"] = str(e)
+                raise
+            finally:
+                self._progress.update(running=False, finished_at=_utc_now())
+                if use_lock:
+                    lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": BACKFILL_LOCK_NAME})
+        if self._progress["processed"]:
+            logger.info(f"UserRegion: backfilled {self._progress['processed']} users")
+        return self._progress["processed"]
+
+    async def _run(self, full: bool, delay: float = 0) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        try:
+            await asyncio.to_thread(self.run_backfill, None, full)
+        except Exception as e:
+            logger.error(f"UserRegion: backfill failed: {e}")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start_backfill(self, full: bool = False) -> bool:
+        """
+        在事件循环中启动补齐任务
+
+        Args:
+            full: 重新解析全部用户（更换地区库后使用），否则只处理缺失或过期的记录
+
+        Returns:
+            是否启动了新任务（已有任务在运行时返回 False）
+        """
+        if self.running:
+            return False
+        if full:
+            geoip.reload()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(full))
+        return True
+
+    def start_scheduler(self) -> None:
+        """应用启动后延迟检查一次存量用户"""
+        if not settings.USER_REGION_BACKFILL_ENABLED or self.running:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(False, BACKFILL_INITIAL_DELAY))
+
+    async def stop_scheduler(self) -> None:
+        """停止补齐任务（已写入的批次保留，下次启动时继续）"""
+        if self._task is None:
+            return
+        # 通知工作线程在当前批次后退出
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+user_region_service = UserRegionService()
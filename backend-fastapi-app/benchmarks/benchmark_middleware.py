@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+中间件单请求开销基准测试
+
+对比原 BaseHTTPMiddleware 实现与现在的纯 ASGI 实现：
+在一个只返回固定 JSON 的 Starlette 应用外分别套上两组中间件，
+直接调用 ASGI 接口（不经过网络和服务器），统计每个请求的平均耗时。
+
+用法（需要在项目目录下以模块方式运行，以读取 .env 配置；不会访问数据库）：
+    python -m benchmarks.benchmark_middleware [请求数]
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.middleware import AdminLoggingMiddleware, filter_sensitive_data
+from app.middleware.plugin_middleware import PluginMiddleware
+from app.services.audit_log_service import audit_log_service
+
+
+async def endpoint(request: Request):
+    if request.method == "POST":
+        await request.body()
+    return JSONResponse({"code": 200, "data": None})
+
+
+def build_app() -> Starlette:
+    return Starlette(routes=[Route("/api/admin/demo", endpoint, methods=["GET", "POST"])])
+
+
+class LegacyPluginMiddleware(BaseHTTPMiddleware):
+    """原 PluginMiddleware 的非插件路由分支"""
+
+    async def dispatch(self, request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/api/v1/plugins/"):
+            return await call_next(request)
+        parts = path.strip("/").split("/")
+        if len(parts) >= 2 and parts[0] == "api" and parts[1] == "v1":
+            if len(parts) >= 3 and parts[2] in settings.ARROW_ROUTES:
+                return await call_next(request)
+        return await call_next(request)
+
+
+class LegacyAdminLoggingMiddleware(BaseHTTPMiddleware):
+    """原 AdminLoggingMiddleware 在无 token 请求上的逻辑（读取并解析请求体后入队）"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method in {"POST", "PUT", "DELETE"}:
+            body_bytes = await request.body()
+            params = json.loads(body_bytes.decode()) if body_bytes else {}
+            audit_log_service.enqueue(
+                admin_id=1,
+                username="unknown",
+                url=str(request.url),
+                title=request.method,
+                content=json.dumps(filter_sensitive_data(params), ensure_ascii=False),
+                useragent=request.headers.get("user-agent", ""),
+                ip=request.client.host if request.client else "",
+            )
+        return await call_next(request)
+
+
+def legacy_app():
+    app = build_app()
+    app.add_middleware(LegacyAdminLoggingMiddleware)
+    app.add_middleware(LegacyPluginMiddleware)
+    return app
+
+
+def asgi_app():
+    app = build_app()
+    app.add_middleware(AdminLoggingMiddleware)
+    app.add_middleware(PluginMiddleware, get_db=None)
+    return app
+
+
+async def call(app, method: str, body: bytes):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/api/admin/demo",
+        "raw_path": b"/api/admin/demo",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json"),
+                    (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("localhost", 8000),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.sleep(3600)
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def measure(app, method: str, body: bytes, requests: int) -> float:
+    for _ in range(200):
+        await call(app, method, body)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app, method, body)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+async def main(requests: int):
+    body = json.dumps({"name": "demo", "password": "secret", "items": list(range(20))}).encode()
+    baseline = build_app()
+    apps = {"BaseHTTPMiddleware": legacy_app(), "pure ASGI": asgi_app()}
+
+    print(f"{requests} requests per case, microseconds per request")
+    for method in ("GET", "POST"):
+        base = await measure(baseline, method, body, requests)
+        print(f"\n{method}  no middleware: {base:8.1f}")
+        for name, app in apps.items():
+            cost = await measure(app, method, body, requests)
+            print(f"{method}  {name:<18} {cost:8.1f}  (overhead {cost - base:7.1f})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tree 工具类基准测试
+
+对比原逐项扫描 + 递归的实现（LegacyTree，只保留被测的几个方法）与现在的索引实现：
+随机生成 id/pid 树，统计 init、getChildren、getParents、getTree、getTreeArray + getTreeList 的耗时。
+原实现是 O(n²)，只在较小的节点数上运行（--legacy 时在所有规模上运行，10 万节点需要数小时）。
+
+用法：
+    python -m benchmarks.benchmark_tree [--legacy] [节点数 ...]    默认 10000 100000
+"""
+
+import copy
+import random
+import sys
+import time
+
+from app.core.utils.tree import Tree
+
+LEGACY_MAX_NODES = 2000
+TEMPLATE = "<option value={@id} {@selected} {@disabled}>{@spacer}{@name}</option>"
+
+
+class LegacyTree(Tree):
+    """原 getChild / getChildren / getParents / getTree 实现"""
+
+    def init(self, arr=None, pidname=None, nbsp=None):
+        if arr:
+            self.arr = arr
+        return self
+
+    def getChild(self, myid):
+        newarr = {}
+        for value in self.arr:
+            if 'id' not in value:
+                continue
+            if value[self.pidname] == myid:
+                newarr[value['id']] = value
+        return newarr
+
+    def getChildren(self, myid, withself=False):
+        newarr = []
+        for value in self.arr:
+            if 'id' not in value:
+                continue
+            if str(value[self.pidname]) == str(myid):
+                newarr.append(value)
+                newarr.extend(self.getChildren(value['id']))
+            elif withself and str(value['id']) == str(myid):
+                newarr.append(value)
+        return newarr
+
+    def getParents(self, myid, withself=False):
+        pid = 0
+        newarr = []
+        for value in self.arr:
+            if 'id' not in value:
+                continue
+            if value['id'] == myid:
+                if withself:
+                    newarr.append(value)
+                pid = value[self.pidname]
+                break
+        if pid:
+            newarr.extend(self.getParents(pid, True))
+        return newarr
+
+    def getTree(self, myid, itemtpl=TEMPLATE, selectedids='', disabledids='', itemprefix='', toptpl=''):
+        ret = ''
+        number = 1
+        childs = self.getChild(myid)
+        if childs:
+            total = len(childs)
+            for value in childs.values():
+                id = value['id']
+                if number == total:
+                    j = self.icon[2]
+                    k = self.nbsp if itemprefix else ''
+                else:
+                    j = self.icon[1]
+                    k = self.icon[0] if itemprefix else ''
+                spacer = itemprefix + j if itemprefix else ''
+                selected = 'selected' if str(id) in selectedids.split(',') else ''
+                disabled = 'disabled' if str(id) in disabledids.split(',') else ''
+                value.update({'selected': selected, 'disabled': disabled, 'spacer': spacer})
+                value = {f"@{key}": value[key] for key in value}
+                ret += itemtpl.format(**value)
+                ret += self.getTree(id, itemtpl, selectedids, disabledids, itemprefix + k + self.nbsp, toptpl)
+                number += 1
+        return ret
+
+
+def generate(n: int):
+    """随机树：每个节点的父节点从已生成的节点中选取（约 1% 为根节点）"""
+    rng = random.Random(n)
+    arr = []
+    for i in range(1, n + 1):
+        pid = 0 if i == 1 or rng.random() < 0.01 else rng.randint(1, i - 1)
+        arr.append({'id': i, 'pid': pid, 'name': f'node{i}'})
+    return arr
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(tree_class, arr, lookups):
+    tree = tree_class()
+    results = {"init": timed(lambda: tree.init(copy.deepcopy(arr)))}
+    results["getChildren(0)"] = timed(lambda: tree.getChildren(0))
+    results[f"getChildren x{len(lookups)}"] = timed(lambda: [tree.getChildren(i) for i in lookups])
+    results[f"getParents x{len(lookups)}"] = timed(lambda: [tree.getParents(i, True) for i in lookups])
+    results["getTree(0)"] = timed(lambda: tree.getTree(0, TEMPLATE, '1,2,3', '4', '&nbsp;'))
+    if tree_class is Tree:
+        results["getTreeArray + getTreeList"] = timed(lambda: tree.getTreeList(tree.getTreeArray(0)))
+    return results
+
+
+def main(sizes, legacy: bool):
+    print("milliseconds per operation")
+    for n in sizes:
+        arr = generate(n)
+        lookups = random.Random(0).sample(range(1, n + 1), min(1000, n))
+        indexed = run(Tree, arr, lookups)
+        compare = legacy or n <= LEGACY_MAX_NODES
+        original = run(LegacyTree, arr, lookups) if compare else {}
+        print(f"\n{n} nodes")
+        for name, cost in indexed.items():
+            before = f"{original[name]:12.1f}" if name in original else f"{'-':>12}"
+            print(f"  {name:<28} indexed {cost:10.1f}   original {before}")
+        if not compare:
+            print(f"  (original skipped above {LEGACY_MAX_NODES} nodes, use --legacy to force)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    force_legacy = "--legacy" in args
+    node_counts = [int(a) for a in args if a != "--legacy"] or [10000, 100000]
+    main([LEGACY_MAX_NODES] + node_counts if not force_legacy else node_counts, force_legacy)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+导入 IP 地区库
+
+把文本格式的 IPv4 区间表转换为 app.core.geoip 使用的地区库文件（默认写入 GEOIP_DB_PATH），
+支持两种常见格式：
+
+- CSV：起始地址,结束地址,...，地址可以是点分形式或整数（如 IP2Location LITE 的 CSV）；
+- ip2region 源数据：起始地址|结束地址|国家|区域|省份|城市|运营商。
+
+--region-column 指定作为地区名称的列（从 0 开始，默认 CSV 为 2、ip2region 为 4），
+该列为空或为 0 时依次尝试 --fallback-column 指定的列。
+运行中的应用在下次启动或调用 geoip.reload() 后使用新库。
+
+用法：
+    python geoip_build.py 输入文件 [--output 输出文件] [--delimiter ,] [--region-column N] [--fallback-column N ...]
+"""
+
+import argparse
+import csv
+import ipaddress
+import sys
+import time
+
+from app.core.config import settings
+from app.core.geoip import build_database
+
+EMPTY_VALUES = {"", "0", "-"}
+
+
+def parse_address(value: str) -> int:
+    value = value.strip().strip('"')
+    if value.isdigit():
+        return int(value)
+    return int(ipaddress.IPv4Address(value))
+
+
+def read_ranges(path: str, delimiter: str, columns):
+    with open(path, newline="", encoding="utf-8") as f:
+        for line_no, row in enumerate(csv.reader(f, delimiter=delimiter), 1):
+            if len(row) < 3 or row[0].startswith("#"):
+                continue
+            try:
+                start, end = parse_address(row[0]), parse_address(row[1])
+            except ValueError:
+                # 表头或 IPv6 区间
+                continue
+            region = next((row[c].strip() for c in columns if c < len(row) and row[c].strip() not in EMPTY_VALUES), "")
+            if region:
+                yield start, end, region
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="导入 IP 地区库")
+    parser.add_argument("source", help="CSV 或 ip2region 源数据文件")
+    parser.add_argument("--output", default=settings.GEOIP_DB_PATH, help="输出文件，默认 GEOIP_DB_PATH")
+    parser.add_argument("--delimiter", help="列分隔符，默认按首行自动识别 , 或 |")
+    parser.add_argument("--region-column", type=int, help="地区名称所在列")
+    parser.add_argument("--fallback-column", type=int, action="append", default=[], help="地区列为空时依次尝试的列")
+    args = parser.parse_args()
+
+    delimiter = args.delimiter
+    if delimiter is None:
+        with open(args.source, encoding="utf-8") as f:
+            delimiter = "|" if "|" in f.readline() else ","
+    region_column = args.region_column if args.region_column is not None else (4 if delimiter == "|" else 2)
+    fallback = args.fallback_column or ([2] if delimiter == "|" else [])
+
+    started = time.perf_counter()
+    count = build_database(read_ranges(args.source, delimiter, [region_column] + fallback), args.output)
+    if not count:
+        sys.exit(f"{args.source} 中没有可导入的区间")
+    print(f"{count} ranges written to {args.output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
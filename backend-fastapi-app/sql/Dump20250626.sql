@@ -152,7 +152,7 @@ CREATE TABLE `sys_admin_rule` (
 
 LOCK TABLES `sys_admin_rule` WRITE;
 /*!40000 ALTER TABLE `sys_admin_rule` DISABLE KEYS */;
-INSERT INTO `sys_admin_rule` VALUES (1,'menu',0,'dashboard','/admin','/_core/dashboard/dashboard','/dashboard','{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.dashboard\"}','{}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-03-04 10:59:45'),(2,'menu',1,'├ workspace','/dashboard/workspace','/_core/dashboard/workspace/index',NULL,'{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.workspace.workspace\"}','{\"view\": true}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-06-05 00:22:17'),(3,'menu',0,'generals','/generals',NULL,NULL,'{\"icon\": \"mdi:cog-outline\", \"title\": \"general.general\"}','{}','addtabs','Generals',NULL,2,'normal','2024-01-22 14:32:00','2025-02-28 18:40:34'),(4,'menu',3,'general.profile','/general/profile','/_core/general/profile',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"general.profile.profile\"}','{\"edit\": true}','addtabs','GeneralProfile',NULL,11,'normal','2024-01-22 14:32:00','2025-02-28 12:04:00'),(5,'menu',3,'general.category','/general/category','/_core/general/category','','{\"icon\": \"mdi:category-plus-outline\", \"title\": \"general.category.category\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','GeneralsCategory',NULL,0,'normal','2025-03-04 03:24:40','2025-03-07 11:12:12'),(6,'menu',3,'general.config','/general/config','/_core/general/config',NULL,'{\"icon\": \"mdi:cog-outline\", \"title\": \"general.config.config\"}','{\"add\": true, \"edit\": true, \"delete\": true}','addtabs','GeneralConfig',NULL,8,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(7,'menu',0,'attachments','/attachments',NULL,NULL,'{\"icon\": \"mdi:paperclip\", \"title\": \"attachment.attachment_manage\"}','{}','blank','Attachment',NULL,9,'normal','2024-01-22 14:32:00','2025-03-06 11:39:00'),(8,'menu',7,'attachment.attachment','/attachment/attachment','/_core/attachment/attachment',NULL,'{\"icon\": \"mdi:file-outline\", \"title\": \"attachment.attachment\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','Attachment',NULL,10,'normal','2024-01-22 14:32:00','2025-03-06 11:39:00'),(9,'menu',0,'plugins','/plugins',NULL,NULL,'{\"icon\": \"mdi:puzzle-outline\", \"title\": \"plugin.plugin\", \"childComponent\": \"/_core/general/profile\"}','{}','addtabs','Plugin',NULL,3,'normal','2024-01-22 14:32:00','2025-02-28 17:51:12'),(10,'menu',0,'admin','/admin',NULL,NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"admin.admin.field.admin\"}','{}','addtabs','Admin',NULL,4,'normal','2024-01-22 14:32:00','2025-06-04 12:15:36'),(11,'menu',10,'admin.admin','/admin/admin','/_core/admin/admin',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"admin.admin.admin_manage\"}','{\"add\": true, \"ajax\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','Admin',NULL,20,'normal','2024-01-22 14:32:00','2025-03-06 16:24:24'),(12,'menu',10,'admin.group','/admin/group','/_core/admin/group',NULL,'{\"icon\": \"mdi:account-group-outline\", \"title\": \"admin.group.group\"}','{\"add\": true, \"ajax\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','AdminGroup',NULL,21,'normal','2024-01-22 14:32:00','2025-03-06 13:03:05'),(13,'menu',10,'admin.rule','/admin/rule','/_core/admin/rule',NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"admin.rule.rule\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','AdminRule',NULL,47,'normal','2024-01-22 14:32:00','2025-03-06 13:03:05'),(14,'menu',10,'admin.log','/admin/log','/_core/admin/log',NULL,'{\"icon\": \"mdi:clipboard-text-outline\", \"title\": \"admin.log.log\"}','{\"view\": true}','addtabs','AdminLog',NULL,50,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(15,'menu',0,'users','/users',NULL,NULL,'{\"icon\": \"mdi:account-multiple-outline\", \"title\": \"user.user\"}','{}','addtabs','Users',NULL,24,'normal','2024-01-22 14:32:00','2025-02-26 17:47:48'),(16,'menu',15,'user','/user','/_core/user/user',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"user.user_manage\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','User',NULL,24,'normal','2024-01-22 14:32:00','2025-03-06 16:19:59'),(17,'menu',15,'user.rule','/user/rule','/_core/user/rule',NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"user.rule.rule\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserRule',NULL,26,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(18,'menu',15,'user.balance.log','/user/balance/log','/_core/user/balance_log',NULL,'{\"icon\": \"mdi:account-balance-wallet-outline\", \"title\": \"user.balance_log.balance_log\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserBalance',NULL,25,'normal','2024-01-22 14:32:00','2025-03-06 16:27:28'),(19,'menu',15,'user.score.log','/user/score/log','/_core/user/score_log',NULL,'{\"icon\": \"mdi:scoreboard-outline\", \"title\": \"user.score_log.score_log\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserScore',NULL,25,'normal','2024-01-22 14:32:00','2025-03-06 16:28:37'),(20,'menu',15,'user.group','/user/group','/_core/user/group',NULL,'{\"icon\": \"mdi:account-group-outline\", \"title\": \"user.group.group\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserGroup',NULL,0,'normal','2024-09-26 13:01:14','2025-03-04 07:36:31'),(22,'menu',9,'generator','/plugins/generator','/plugins/generator','','{\"icon\": \"mdi:codepen\", \"title\": \"generator.code_generator\", \"menuVisibleWithForbidden\": \"false\"}','{\"view\": true}','ajax','generator',NULL,0,'normal','2025-02-28 10:31:33','2025-03-04 07:36:31'),(24,'menu',7,'attachmentCategory','/attachment/category','/_core/attachment/category','','{\"icon\": \"mdi:attachment\", \"title\": \"attachment.category.category\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','attachmentCategory',NULL,0,'normal','2025-03-06 03:54:07','2025-03-06 12:56:31'),(25,'menu',9,'plugin','/plugin/plugin','/_core/plugin/plugin','','{\"icon\": \"mdi:shape-rectangle-add\", \"title\": \"plugin.plugin\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','plugin',NULL,0,'normal','2025-03-09 02:40:04','2025-03-09 11:05:32'),(26,'menu',9,'plugin_store','/plugin/plugin_store','/_core/plugin_store','','{\"icon\": \"mdi:all-inclusive\", \"title\": \"plugin.plugin_store\", \"menuVisibleWithForbidden\": \"false\"}','{\"enable\": true, \"disable\": true, \"install\": true, \"unstall\": true}','ajax','online_plugin',NULL,0,'normal','2025-03-10 07:15:54','2025-03-10 16:07:41'),(27,'menu',1,'analytics','/dashboard/analytics','/_core/dashboard/analytics/index',NULL,'{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.analytics\"}','{\"view\": true}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31');
+INSERT INTO `sys_admin_rule` VALUES (1,'menu',0,'dashboard','/admin','/_core/dashboard/dashboard','/dashboard','{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.dashboard\"}','{}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-03-04 10:59:45'),(2,'menu',1,'├ workspace','/dashboard/workspace','/_core/dashboard/workspace/index',NULL,'{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.workspace.workspace\"}','{\"view\": true}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-06-05 00:22:17'),(3,'menu',0,'generals','/generals',NULL,NULL,'{\"icon\": \"mdi:cog-outline\", \"title\": \"general.general\"}','{}','addtabs','Generals',NULL,2,'normal','2024-01-22 14:32:00','2025-02-28 18:40:34'),(4,'menu',3,'general.profile','/general/profile','/_core/general/profile',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"general.profile.profile\"}','{\"edit\": true}','addtabs','GeneralProfile',NULL,11,'normal','2024-01-22 14:32:00','2025-02-28 12:04:00'),(5,'menu',3,'general.category','/general/category','/_core/general/category','','{\"icon\": \"mdi:category-plus-outline\", \"title\": \"general.category.category\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','GeneralsCategory',NULL,0,'normal','2025-03-04 03:24:40','2025-03-07 11:12:12'),(6,'menu',3,'general.config','/general/config','/_core/general/config',NULL,'{\"icon\": \"mdi:cog-outline\", \"title\": \"general.config.config\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','GeneralConfig',NULL,8,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(7,'menu',0,'attachments','/attachments',NULL,NULL,'{\"icon\": \"mdi:paperclip\", \"title\": \"attachment.attachment_manage\"}','{}','blank','Attachment',NULL,9,'normal','2024-01-22 14:32:00','2025-03-06 11:39:00'),(8,'menu',7,'attachment.attachment','/attachment/attachment','/_core/attachment/attachment',NULL,'{\"icon\": \"mdi:file-outline\", \"title\": \"attachment.attachment\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','Attachment',NULL,10,'normal','2024-01-22 14:32:00','2025-03-06 11:39:00'),(9,'menu',0,'plugins','/plugins',NULL,NULL,'{\"icon\": \"mdi:puzzle-outline\", \"title\": \"plugin.plugin\", \"childComponent\": \"/_core/general/profile\"}','{}','addtabs','Plugin',NULL,3,'normal','2024-01-22 14:32:00','2025-02-28 17:51:12'),(10,'menu',0,'admin','/admin',NULL,NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"admin.admin.field.admin\"}','{}','addtabs','Admin',NULL,4,'normal','2024-01-22 14:32:00','2025-06-04 12:15:36'),(11,'menu',10,'admin.admin','/admin/admin','/_core/admin/admin',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"admin.admin.admin_manage\"}','{\"add\": true, \"ajax\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','Admin',NULL,20,'normal','2024-01-22 14:32:00','2025-03-06 16:24:24'),(12,'menu',10,'admin.group','/admin/group','/_core/admin/group',NULL,'{\"icon\": \"mdi:account-group-outline\", \"title\": \"admin.group.group\"}','{\"add\": true, \"ajax\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','AdminGroup',NULL,21,'normal','2024-01-22 14:32:00','2025-03-06 13:03:05'),(13,'menu',10,'admin.rule','/admin/rule','/_core/admin/rule',NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"admin.rule.rule\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','AdminRule',NULL,47,'normal','2024-01-22 14:32:00','2025-03-06 13:03:05'),(14,'menu',10,'admin.log','/admin/log','/_core/admin/log',NULL,'{\"icon\": \"mdi:clipboard-text-outline\", \"title\": \"admin.log.log\"}','{\"view\": true}','addtabs','AdminLog',NULL,50,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(15,'menu',0,'users','/users',NULL,NULL,'{\"icon\": \"mdi:account-multiple-outline\", \"title\": \"user.user\"}','{}','addtabs','Users',NULL,24,'normal','2024-01-22 14:32:00','2025-02-26 17:47:48'),(16,'menu',15,'user','/user','/_core/user/user',NULL,'{\"icon\": \"mdi:account-outline\", \"title\": \"user.user_manage\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','User',NULL,24,'normal','2024-01-22 14:32:00','2025-03-06 16:19:59'),(17,'menu',15,'user.rule','/user/rule','/_core/user/rule',NULL,'{\"icon\": \"mdi:shield-account-outline\", \"title\": \"user.rule.rule\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserRule',NULL,26,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31'),(18,'menu',15,'user.balance.log','/user/balance/log','/_core/user/balance_log',NULL,'{\"icon\": \"mdi:account-balance-wallet-outline\", \"title\": \"user.balance_log.balance_log\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserBalance',NULL,25,'normal','2024-01-22 14:32:00','2025-03-06 16:27:28'),(19,'menu',15,'user.score.log','/user/score/log','/_core/user/score_log',NULL,'{\"icon\": \"mdi:scoreboard-outline\", \"title\": \"user.score_log.score_log\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserScore',NULL,25,'normal','2024-01-22 14:32:00','2025-03-06 16:28:37'),(20,'menu',15,'user.group','/user/group','/_core/user/group',NULL,'{\"icon\": \"mdi:account-group-outline\", \"title\": \"user.group.group\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','addtabs','UserGroup',NULL,0,'normal','2024-09-26 13:01:14','2025-03-04 07:36:31'),(22,'menu',9,'generator','/plugins/generator','/plugins/generator','','{\"icon\": \"mdi:codepen\", \"title\": \"generator.code_generator\", \"menuVisibleWithForbidden\": \"false\"}','{\"view\": true}','ajax','generator',NULL,0,'normal','2025-02-28 10:31:33','2025-03-04 07:36:31'),(24,'menu',7,'attachmentCategory','/attachment/category','/_core/attachment/category','','{\"icon\": \"mdi:attachment\", \"title\": \"attachment.category.category\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','attachmentCategory',NULL,0,'normal','2025-03-06 03:54:07','2025-03-06 12:56:31'),(25,'menu',9,'plugin','/plugin/plugin','/_core/plugin/plugin','','{\"icon\": \"mdi:shape-rectangle-add\", \"title\": \"plugin.plugin\", \"menuVisibleWithForbidden\": \"false\"}','{\"add\": true, \"edit\": true, \"view\": true, \"delete\": true}','ajax','plugin',NULL,0,'normal','2025-03-09 02:40:04','2025-03-09 11:05:32'),(26,'menu',9,'plugin_store','/plugin/plugin_store','/_core/plugin_store','','{\"icon\": \"mdi:all-inclusive\", \"title\": \"plugin.plugin_store\", \"menuVisibleWithForbidden\": \"false\"}','{\"enable\": true, \"disable\": true, \"install\": true, \"unstall\": true}','ajax','online_plugin',NULL,0,'normal','2025-03-10 07:15:54','2025-03-10 16:07:41'),(27,'menu',1,'analytics','/dashboard/analytics','/_core/dashboard/analytics/index',NULL,'{\"icon\": \"mdi:view-dashboard-outline\", \"title\": \"dashboard.analytics\"}','{\"view\": true}','addtabs','Dashboard',NULL,1,'normal','2024-01-22 14:32:00','2025-03-04 07:36:31');
 /*!40000 ALTER TABLE `sys_admin_rule` ENABLE KEYS */;
 UNLOCK TABLES;
 
@@ -436,9 +436,9 @@ DROP TABLE IF EXISTS `sys_user_balance_log`;
 CREATE TABLE `sys_user_balance_log` (
   `id` int NOT NULL AUTO_INCREMENT,
   `user_id` int NOT NULL,
-  `balance` decimal(10,0) NOT NULL,
-  `before` decimal(10,0) NOT NULL,
-  `after` decimal(10,0) NOT NULL,
+  `balance` decimal(10,2) NOT NULL,
+  `before` decimal(10,2) NOT NULL,
+  `after` decimal(10,2) NOT NULL,
   `memo` varchar(255) DEFAULT NULL,
   `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
   `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
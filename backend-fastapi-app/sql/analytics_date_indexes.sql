@@ -0,0 +1,13 @@
+-- 删除按 DATE() 建立的函数索引
+-- 分析查询按日期过滤时已改为时间列上的半开区间（见 app.services.timeseries.local_range / day_bounds），
+-- 起止点按 TIMEZONE 换算为 UTC，由 idx_sys_user_created_at、idx_sys_user_login_time、idx_sys_admin_log_created_at 做范围扫描。
+-- DATE(created_at) 按数据库会话时区（UTC）取日期，与 TIMEZONE 不一致，不再有查询使用这些索引，只增加写入开销。
+
+DROP INDEX idx_sys_user_created_date ON sys_user;
+DROP INDEX idx_sys_user_login_date ON sys_user;
+DROP INDEX idx_sys_admin_log_created_date ON sys_admin_log;
+
+-- 使用说明：
+-- 1. 只适用于执行过旧版 analytics_indexes.sql 的数据库，索引不存在时对应语句会报错，可以忽略
+-- 2. 执行前确认 analytics_indexes.sql 中 created_at / login_time 上的普通索引已经存在
+-- 3. 可以用 EXPLAIN 确认查询的 type 为 range、key 为上述时间列索引
@@ -18,15 +18,10 @@ CREATE INDEX idx_sys_admin_log_created_at ON sys_admin_log(created_at);
 -- 为操作标题字段创建索引，用于操作类型分析
 CREATE INDEX idx_sys_admin_log_title ON sys_admin_log(title);
 
--- 3. 创建复合索引以提高特定查询性能
--- 为日期范围查询创建复合索引
-CREATE INDEX idx_sys_user_created_date ON sys_user((DATE(created_at)));
-
--- 为登录时间范围查询创建复合索引
-CREATE INDEX idx_sys_user_login_date ON sys_user((DATE(login_time)));
-
--- 为管理员日志日期范围查询创建复合索引
-CREATE INDEX idx_sys_admin_log_created_date ON sys_admin_log((DATE(created_at)));
+-- 3. 日期范围查询
+-- 按日期过滤时使用时间列上的半开区间（created_at >= 起点 AND created_at < 终点，起止点按 TIMEZONE 换算为 UTC），
+-- 由上面的 created_at / login_time 索引做范围扫描，不需要 DATE(created_at) 函数索引。
+-- 已经创建过函数索引的数据库执行 analytics_date_indexes.sql 删除
 
 -- 4. 创建统计汇总表（可选，用于进一步优化）
 -- 每日统计汇总表，用于缓存常用统计数据
@@ -78,9 +73,6 @@ SHOW INDEX FROM sys_admin_log;
 -- DROP INDEX idx_sys_user_group_id ON sys_user;
 -- DROP INDEX idx_sys_admin_log_created_at ON sys_admin_log;
 -- DROP INDEX idx_sys_admin_log_title ON sys_admin_log;
--- DROP INDEX idx_sys_user_created_date ON sys_user;
--- DROP INDEX idx_sys_user_login_date ON sys_user;
--- DROP INDEX idx_sys_admin_log_created_date ON sys_admin_log;
 
 -- 使用说明：
 -- 1. 在生产环境执行前，请在测试环境验证索引效果
@@ -50,6 +50,10 @@ CREATE TABLE IF NOT EXISTS analytics_summary (
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='Unified analytics summary table';
 
 -- 创建数据填充存储过程
+-- 日期条件都写成时间列上的半开区间（created_at >= 日期 AND created_at < 日期 + INTERVAL 1 DAY），
+-- 不对列使用 DATE() / YEAR() / MONTH()，可以使用 created_at、login_time 上的索引做范围扫描
+-- 注意：存储过程中的日期（DATE()、CURDATE() 和区间边界）按数据库会话时区划分，不是应用配置的 TIMEZONE；
+-- 两者不一致时汇总的日 / 月与分析接口（按 TIMEZONE 换算）不同，需要一致时先 SET time_zone 为 TIMEZONE 再调用
 DELIMITER //
 
 CREATE PROCEDURE IF NOT EXISTS populate_analytics_summary()
@@ -58,6 +62,7 @@ BEGIN
     DECLARE current_date_val DATE;
     DECLARE current_year_val INT;
     DECLARE current_month_val INT;
+    DECLARE month_start_val DATE;
     DECLARE region_val VARCHAR(100);
     
     -- 游标声明
@@ -97,26 +102,26 @@ BEGIN
             'daily' as summary_type,
             current_date_val as summary_date,
             -- 总用户数（截至该日期）
-            (SELECT COUNT(*) FROM sys_user WHERE DATE(created_at) <= current_date_val) as total_users,
+            (SELECT COUNT(*) FROM sys_user WHERE created_at < current_date_val + INTERVAL 1 DAY) as total_users,
             -- 新增用户数（该日期）
-            (SELECT COUNT(*) FROM sys_user WHERE DATE(created_at) = current_date_val) as new_users,
+            (SELECT COUNT(*) FROM sys_user WHERE created_at >= current_date_val AND created_at < current_date_val + INTERVAL 1 DAY) as new_users,
             -- 活跃用户数（该日期有登录）
-            (SELECT COUNT(DISTINCT id) FROM sys_user WHERE DATE(login_time) = current_date_val AND login_time IS NOT NULL) as active_users,
+            (SELECT COUNT(DISTINCT id) FROM sys_user WHERE login_time >= current_date_val AND login_time < current_date_val + INTERVAL 1 DAY) as active_users,
             -- 总登录次数（该日期）
-            (SELECT COUNT(*) FROM sys_user WHERE DATE(login_time) = current_date_val AND login_time IS NOT NULL) as total_logins,
+            (SELECT COUNT(*) FROM sys_user WHERE login_time >= current_date_val AND login_time < current_date_val + INTERVAL 1 DAY) as total_logins,
             -- 总访问次数（该日期）
-            (SELECT COUNT(*) FROM sys_admin_log WHERE DATE(created_at) = current_date_val) as total_visits,
+            (SELECT COUNT(*) FROM sys_admin_log WHERE created_at >= current_date_val AND created_at < current_date_val + INTERVAL 1 DAY) as total_visits,
             -- 用户组分布
             (SELECT JSON_OBJECTAGG(COALESCE(user_group_id, 0), user_count)
              FROM (SELECT user_group_id, COUNT(*) as user_count 
                    FROM sys_user 
-                   WHERE DATE(created_at) <= current_date_val
+                   WHERE created_at < current_date_val + INTERVAL 1 DAY
                    GROUP BY user_group_id) as user_groups) as user_group_distribution,
             -- 操作类型分布
             (SELECT JSON_OBJECTAGG(title, action_count)
              FROM (SELECT title, COUNT(*) as action_count 
                    FROM sys_admin_log 
-                   WHERE DATE(created_at) = current_date_val
+                   WHERE created_at >= current_date_val AND created_at < current_date_val + INTERVAL 1 DAY
                    GROUP BY title) as user_actions) as action_distribution
         ON DUPLICATE KEY UPDATE
             total_users = VALUES(total_users),
@@ -141,6 +146,7 @@ BEGIN
         IF done THEN
             LEAVE month_loop;
         END IF;
+        SET month_start_val = MAKEDATE(current_year_val, 1) + INTERVAL (current_month_val - 1) MONTH;
         
         -- 插入或更新月汇总数据
         INSERT INTO analytics_summary (
@@ -154,32 +160,30 @@ BEGIN
             current_month_val as summary_month,
             -- 总用户数（截至该月末）
             (SELECT COUNT(*) FROM sys_user 
-             WHERE YEAR(created_at) < current_year_val 
-                OR (YEAR(created_at) = current_year_val AND MONTH(created_at) <= current_month_val)) as total_users,
+             WHERE created_at < month_start_val + INTERVAL 1 MONTH) as total_users,
             -- 新增用户数（该月）
             (SELECT COUNT(*) FROM sys_user 
-             WHERE YEAR(created_at) = current_year_val AND MONTH(created_at) = current_month_val) as new_users,
+             WHERE created_at >= month_start_val AND created_at < month_start_val + INTERVAL 1 MONTH) as new_users,
             -- 活跃用户数（该月有登录）
             (SELECT COUNT(DISTINCT id) FROM sys_user 
-             WHERE YEAR(login_time) = current_year_val AND MONTH(login_time) = current_month_val AND login_time IS NOT NULL) as active_users,
+             WHERE login_time >= month_start_val AND login_time < month_start_val + INTERVAL 1 MONTH) as active_users,
             -- 总登录次数（该月）
             (SELECT COUNT(*) FROM sys_user 
-             WHERE YEAR(login_time) = current_year_val AND MONTH(login_time) = current_month_val AND login_time IS NOT NULL) as total_logins,
+             WHERE login_time >= month_start_val AND login_time < month_start_val + INTERVAL 1 MONTH) as total_logins,
             -- 总访问次数（该月）
             (SELECT COUNT(*) FROM sys_admin_log 
-             WHERE YEAR(created_at) = current_year_val AND MONTH(created_at) = current_month_val) as total_visits,
+             WHERE created_at >= month_start_val AND created_at < month_start_val + INTERVAL 1 MONTH) as total_visits,
             -- 用户组分布
             (SELECT JSON_OBJECTAGG(COALESCE(user_group_id, 0), user_count)
              FROM (SELECT user_group_id, COUNT(*) as user_count 
                    FROM sys_user 
-                   WHERE YEAR(created_at) < current_year_val 
-                      OR (YEAR(created_at) = current_year_val AND MONTH(created_at) <= current_month_val)
+                   WHERE created_at < month_start_val + INTERVAL 1 MONTH
                    GROUP BY user_group_id) as monthly_user_groups) as user_group_distribution,
             -- 操作类型分布
             (SELECT JSON_OBJECTAGG(title, action_count)
              FROM (SELECT title, COUNT(*) as action_count 
                    FROM sys_admin_log 
-                   WHERE YEAR(created_at) = current_year_val AND MONTH(created_at) = current_month_val
+                   WHERE created_at >= month_start_val AND created_at < month_start_val + INTERVAL 1 MONTH
                    GROUP BY title) as monthly_actions) as action_distribution
         ON DUPLICATE KEY UPDATE
             total_users = VALUES(total_users),
@@ -0,0 +1,46 @@
+-- 日志表按月分区迁移脚本
+-- 将只追加的日志表改为按 created_at 的月度 RANGE 分区，
+-- 冷分区由 app/services/log_archive_service.py 导出为压缩文件后直接 DROP PARTITION
+
+-- MySQL 要求分区键包含在所有唯一键中，因此主键改为 (id, created_at)
+-- p_history 存放迁移前的全部历史数据（执行前请把 2025-07-01 替换为执行当月的第一天），归档器会按月拆分导出
+-- 之后的月度分区由归档器在每次运行时自动从 pmax 中拆出（REORGANIZE PARTITION）
+
+-- 1. 管理员日志表
+ALTER TABLE `sys_admin_log` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`);
+ALTER TABLE `sys_admin_log` PARTITION BY RANGE (TO_DAYS(`created_at`)) (
+  PARTITION p_history VALUES LESS THAN (TO_DAYS('2025-07-01')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 2. 用户余额日志表
+ALTER TABLE `sys_user_balance_log` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`);
+ALTER TABLE `sys_user_balance_log` PARTITION BY RANGE (TO_DAYS(`created_at`)) (
+  PARTITION p_history VALUES LESS THAN (TO_DAYS('2025-07-01')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 3. 用户积分日志表
+ALTER TABLE `sys_user_score_log` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`);
+ALTER TABLE `sys_user_score_log` PARTITION BY RANGE (TO_DAYS(`created_at`)) (
+  PARTITION p_history VALUES LESS THAN (TO_DAYS('2025-07-01')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 4. 系统通知表
+ALTER TABLE `sys_notification` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `created_at`);
+ALTER TABLE `sys_notification` PARTITION BY RANGE (TO_DAYS(`created_at`)) (
+  PARTITION p_history VALUES LESS THAN (TO_DAYS('2025-07-01')),
+  PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- 5. 查看分区情况（用于诊断）
+SELECT TABLE_NAME, PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+FROM information_schema.PARTITIONS
+WHERE TABLE_SCHEMA = DATABASE()
+  AND TABLE_NAME IN ('sys_admin_log', 'sys_user_balance_log', 'sys_user_score_log', 'sys_notification');
+
+-- 使用说明：
+-- 1. 执行前请备份数据，ALTER 会重建整张表，建议在业务低峰期执行
+-- 2. 未执行本脚本的表（或非 MySQL 数据库）仍可归档，归档器会按月导出后按时间范围 DELETE
+-- 3. 分区后带 created_at 范围条件的查询只会扫描对应分区
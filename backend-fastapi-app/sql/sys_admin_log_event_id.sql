@@ -0,0 +1,12 @@
+-- 管理员日志事件ID迁移脚本
+-- 审计日志在数据库不可用时会先写入本地 spool，恢复后回放；
+-- event_id 由应用生成，配合唯一键和 INSERT IGNORE 保证重复回放不会产生重复日志
+
+-- 唯一键包含 created_at，以兼容 log_partitions.sql 的按月分区（分区键必须包含在所有唯一键中）
+ALTER TABLE `sys_admin_log`
+  ADD COLUMN `event_id` char(32) DEFAULT NULL COMMENT '审计事件ID' AFTER `useragent`,
+  ADD UNIQUE KEY `uk_event_id` (`event_id`, `created_at`);
+
+-- 使用说明：
+-- 1. 历史数据 event_id 为 NULL，不影响唯一键（NULL 不参与唯一性比较）
+-- 2. 本地 spool 目录由 AUDIT_SPOOL_DIR 配置，回放间隔由 AUDIT_SPOOL_REPLAY_INTERVAL 配置
@@ -0,0 +1,6 @@
+-- 接口按规则鉴权后，没有匹配规则的接口只允许超级管理员访问（见 app.core.route_permission）。
+-- 系统配置规则缺少 view 动作，GET /api/admin/general/config 和 /{id} 无法授权给其他管理员组，这里补上。
+
+UPDATE `sys_admin_rule`
+SET `permission` = JSON_SET(COALESCE(`permission`, JSON_OBJECT()), '$.view', true)
+WHERE `path` = '/general/config';
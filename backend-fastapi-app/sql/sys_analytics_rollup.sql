@@ -0,0 +1,22 @@
+-- 分析数据预聚合
+-- sys_analytics_rollup：注册、登录、访问等计数，按 hour / day / all 粒度和维度（平台、操作标题）分桶，
+-- bucket 为 TIMEZONE 配置下的本地时间，dimension 为空字符串表示总数。
+-- sys_analytics_watermark：各源表已汇总到的最大 id，后台任务只读取其后的新行。
+-- 两张表为空时，后台任务会从源表的第一行开始补齐历史数据。
+
+CREATE TABLE IF NOT EXISTS `sys_analytics_rollup` (
+  `metric` varchar(32) NOT NULL COMMENT '指标',
+  `granularity` varchar(8) NOT NULL COMMENT '粒度：hour / day / all',
+  `bucket` datetime NOT NULL COMMENT '时间段起点（本地时间）',
+  `dimension` varchar(100) NOT NULL DEFAULT '' COMMENT '维度值，空字符串为总数',
+  `value` bigint NOT NULL DEFAULT 0 COMMENT '计数',
+  `updated_at` datetime NOT NULL COMMENT '更新时间',
+  PRIMARY KEY (`metric`, `granularity`, `bucket`, `dimension`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='分析数据预聚合计数';
+
+CREATE TABLE IF NOT EXISTS `sys_analytics_watermark` (
+  `source` varchar(64) NOT NULL COMMENT '源表',
+  `last_id` bigint NOT NULL DEFAULT 0 COMMENT '已汇总的最大 id',
+  `updated_at` datetime NOT NULL COMMENT '更新时间',
+  PRIMARY KEY (`source`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='分析数据增量汇总进度';
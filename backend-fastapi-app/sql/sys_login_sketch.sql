@@ -0,0 +1,12 @@
+-- 登录用户 HyperLogLog 草图
+-- 每次登录成功时按 TIMEZONE 本地时间计入当天、当周（周一开始）和当月的草图，由后台任务按寄存器取最大值合并写入。
+-- registers 为 zlib 压缩后的 16384 个寄存器（未压缩 16KB），日草图保留 LOGIN_ACTIVITY_DAY_RETENTION 天。
+
+CREATE TABLE IF NOT EXISTS `sys_login_sketch` (
+  `kind` varchar(16) NOT NULL COMMENT '用户类型：admin / user',
+  `granularity` varchar(8) NOT NULL COMMENT '粒度：day / week / month',
+  `bucket` date NOT NULL COMMENT '时间段起始日期（本地时间）',
+  `registers` blob NOT NULL COMMENT 'HyperLogLog 寄存器（zlib 压缩）',
+  `updated_at` datetime NOT NULL COMMENT '更新时间',
+  PRIMARY KEY (`kind`, `granularity`, `bucket`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='登录用户 HyperLogLog 草图';
@@ -0,0 +1,13 @@
+-- 层级表闭包索引
+-- sys_admin_rule / sys_user_rule / sys_general_category / sys_attachment_category / sys_admin_group
+-- 的祖先-后代关系，每个节点包含一条 depth = 0 的自身记录。
+-- 表为空或与源表不一致时，应用启动时会自动从 parent_id / pid 重建。
+
+CREATE TABLE IF NOT EXISTS `sys_tree_closure` (
+  `tree` varchar(64) NOT NULL COMMENT '层级表名',
+  `ancestor_id` int NOT NULL COMMENT '祖先节点ID',
+  `descendant_id` int NOT NULL COMMENT '后代节点ID',
+  `depth` int NOT NULL COMMENT '相隔层数，0 为节点自身',
+  PRIMARY KEY (`tree`, `ancestor_id`, `descendant_id`),
+  KEY `idx_tree_descendant` (`tree`, `descendant_id`, `depth`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='层级表闭包索引';
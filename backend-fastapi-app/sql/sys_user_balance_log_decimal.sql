@@ -0,0 +1,12 @@
+-- 余额日志金额精度迁移脚本
+-- sys_user.balance 为 decimal(10,2)，账本服务按两位小数记账；
+-- 日志表原为 decimal(10,0)，小数金额写入时会被截断，导致 before/after 与用户余额对不上
+
+ALTER TABLE `sys_user_balance_log`
+  MODIFY COLUMN `balance` decimal(10,2) NOT NULL COMMENT '变更余额',
+  MODIFY COLUMN `before` decimal(10,2) NOT NULL COMMENT '变更前余额',
+  MODIFY COLUMN `after` decimal(10,2) NOT NULL COMMENT '变更后余额';
+
+-- 使用说明：
+-- 1. 在部署使用 /user/ledger 接口的版本之前执行
+-- 2. 已有数据为整数，扩展精度不会改变其取值
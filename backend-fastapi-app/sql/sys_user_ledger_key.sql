@@ -0,0 +1,14 @@
+-- 用户账本幂等键表
+-- 记录余额/积分变动的幂等键，重复提交同一个键的变动会被忽略
+
+CREATE TABLE IF NOT EXISTS `sys_user_ledger_key` (
+  `id` int NOT NULL AUTO_INCREMENT COMMENT '主键ID',
+  `idempotency_key` varchar(64) NOT NULL COMMENT '幂等键',
+  `ledger` enum('balance','score') NOT NULL COMMENT '账本类型: balance/score',
+  `user_id` int NOT NULL COMMENT '用户ID',
+  `created_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+  `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `uk_idempotency_key` (`idempotency_key`),
+  KEY `idx_user_id` (`user_id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户账本幂等键表';
@@ -0,0 +1,17 @@
+-- 用户注册地区
+-- 用户创建或 join_ip 变化时按离线地区库（GEOIP_DB_PATH）解析写入，存量用户由后台任务按速率限制补齐。
+-- join_ip 与 sys_user.join_ip 不一致的记录视为过期，统计时不计入。
+
+CREATE TABLE IF NOT EXISTS `sys_user_region` (
+  `user_id` int NOT NULL COMMENT '用户ID',
+  `join_ip` varchar(50) NOT NULL COMMENT '解析时的注册IP',
+  `region` varchar(64) NOT NULL COMMENT '地区',
+  `resolved_at` datetime NOT NULL COMMENT '解析时间',
+  PRIMARY KEY (`user_id`),
+  KEY `idx_user_region_region` (`region`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='用户注册地区';
+
+-- 启动补齐任务需要分析页的 edit 权限，为该规则增加 edit 动作，以便分配给管理员组
+UPDATE `sys_admin_rule`
+SET `permission` = JSON_SET(COALESCE(`permission`, JSON_OBJECT()), '$.edit', true)
+WHERE `path` = '/dashboard/analytics';
@@ -0,0 +1,91 @@
+import ipaddress
+
+import pytest
+
+from app.core import geoip as geoip_module
+from app.core.geoip import LOCAL, PRIVATE, UNKNOWN, GeoIPDatabase, GeoIPResolver, build_database
+
+
+def _ip(value: str) -> int:
+    return int(ipaddress.ip_address(value))
+
+
+RANGES = [
+    (_ip("1.0.0.0"), _ip("1.0.0.255"), "中国|广东"),
+    (_ip("1.0.1.0"), _ip("1.0.1.255"), "中国|广东"),
+    (_ip("1.0.1.128"), _ip("1.0.2.255"), "中国|福建"),
+    (_ip("8.8.8.0"), _ip("8.8.8.255"), "美国"),
+    (_ip("9.0.0.0"), _ip("9.0.0.255"), ""),
+]
+
+
+@pytest.fixture(scope="function")
+def geoip_path(tmp_path, monkeypatch) -> str:
+    """临时目录中的地区库文件，查询入口指向它"""
+    path = str(tmp_path / "geoip.dat")
+    monkeypatch.setattr(geoip_module.settings, "GEOIP_DB_PATH", path)
+    return path
+
+
+def test_build_database_merges_ranges(geoip_path: str):
+    # 相邻且地区相同的区间合并，重叠部分以先出现的为准，空地区丢弃
+    assert build_database(reversed(RANGES), geoip_path) == 3
+    database = GeoIPDatabase(geoip_path)
+    try:
+        assert database.names == ("中国|广东", "中国|福建", "美国")
+        assert database.lookup(_ip("1.0.1.200")) == "中国|广东"
+        assert database.lookup(_ip("1.0.2.1")) == "中国|福建"
+        assert database.lookup(_ip("8.8.8.8")) == "美国"
+        assert database.lookup(_ip("9.0.0.1")) is None
+        assert database.lookup(_ip("0.255.255.255")) is None
+    finally:
+        database.close()
+
+
+def test_build_database_empty(geoip_path: str):
+    assert build_database([], geoip_path) == 0
+    database = GeoIPDatabase(geoip_path)
+    try:
+        assert database.size == 0
+        assert database.lookup(_ip("8.8.8.8")) is None
+    finally:
+        database.close()
+
+
+def test_database_rejects_invalid_file(geoip_path: str):
+    with open(geoip_path, "wb") as f:
+        f.write(b"\0" * 32)
+    with pytest.raises(ValueError):
+        GeoIPDatabase(geoip_path)
+
+
+def test_resolve_many(geoip_path: str):
+    build_database(RANGES, geoip_path)
+    resolver = GeoIPResolver()
+    ips = ["8.8.8.8", "1.0.0.1", "8.8.8.8", None, "127.0.0.1", "192.168.1.1", "::1",
+           "::ffff:1.0.2.3", "2.2.2.2", "not-an-ip", "localhost"]
+    assert resolver.resolve_many(ips) == {
+        "8.8.8.8": "美国",
+        "1.0.0.1": "中国|广东",
+        "": UNKNOWN,
+        "127.0.0.1": LOCAL,
+        "192.168.1.1": PRIVATE,
+        "::1": LOCAL,
+        "::ffff:1.0.2.3": "中国|福建",
+        "2.2.2.2": UNKNOWN,
+        "not-an-ip": UNKNOWN,
+        "localhost": LOCAL,
+    }
+    # 批量查询与逐个查询结果一致
+    for ip, region in resolver.resolve_many(ips).items():
+        assert resolver.resolve(ip) == region
+
+
+def test_resolve_many_without_database(geoip_path: str):
+    resolver = GeoIPResolver()
+    assert resolver.resolve_many(["8.8.8.8", "10.0.0.1"]) == {"8.8.8.8": UNKNOWN, "10.0.0.1": PRIVATE}
+
+    # 导入地区库后 reload 生效
+    build_database(RANGES, geoip_path)
+    resolver.reload()
+    assert resolver.resolve_many(["8.8.8.8"]) == {"8.8.8.8": "美国"}
@@ -0,0 +1,60 @@
+import zlib
+
+import pytest
+
+from app.core.hyperloglog import REGISTERS, HyperLogLog
+
+
+def _sketch(items) -> HyperLogLog:
+    sketch = HyperLogLog()
+    sketch.update(items)
+    return sketch
+
+
+def test_empty():
+    sketch = HyperLogLog()
+    assert not sketch
+    assert sketch.count() == 0
+
+
+def test_add_is_idempotent():
+    sketch = HyperLogLog()
+    assert sketch.add(42) is True
+    assert sketch.add(42) is False
+    sketch.update([42] * 100)
+    assert sketch
+    assert sketch.count() == 1
+
+
+@pytest.mark.parametrize("size", [100, 10000, 200000])
+def test_count_error(size: int):
+    # 标准误差约 0.81%，按 4 倍标准误差判断
+    estimate = _sketch(range(size)).count()
+    assert abs(estimate - size) <= max(2, size * 0.0324)
+
+
+def test_merge_counts_union():
+    first = _sketch(range(0, 6000))
+    second = _sketch(range(4000, 10000))
+    union = HyperLogLog.union([first, second])
+    assert union.count() == _sketch(range(10000)).count()
+    # union 不修改参与合并的草图
+    assert first.count() == _sketch(range(0, 6000)).count()
+
+    first.merge(second)
+    assert (first.registers == union.registers).all()
+
+
+def test_bytes_round_trip():
+    sketch = _sketch(f"user-{index}" for index in range(500))
+    data = sketch.to_bytes()
+    # 用户较少时压缩后远小于寄存器大小
+    assert len(data) < REGISTERS // 4
+    restored = HyperLogLog.from_bytes(data)
+    assert (restored.registers == sketch.registers).all()
+    assert restored.count() == sketch.count()
+
+
+def test_from_bytes_rejects_wrong_size():
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(zlib.compress(b"\0" * 16))
@@ -0,0 +1,66 @@
+from typing import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.admin.log_archive import router
+from app.core.config import settings
+from app.core.permission import PermissionIndex, get_current_admin_permissions
+from app.core.security import Principal, get_current_admin_principal
+from app.services.log_archive_service import log_archive_service
+
+# Constants
+BASE_API_URL = "/api/admin/log/archive"
+ADMIN = Principal(id=2, username="editor", group_id=2, status="normal")
+
+# 路由在应用生命周期中动态加载，这里单独挂载归档路由，前缀与 router_loader 一致
+app = FastAPI()
+app.include_router(router, prefix="/api/admin")
+
+
+@pytest.fixture(scope="function")
+def archive_client(tmp_path, monkeypatch) -> Generator[TestClient, None, None]:
+    """使用固定管理员身份和临时归档目录的测试客户端"""
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_DIR", str(tmp_path))
+    index = {"is_super": False, "permissions": frozenset()}
+    app.dependency_overrides[get_current_admin_principal] = lambda: ADMIN
+    app.dependency_overrides[get_current_admin_permissions] = lambda: PermissionIndex(
+        ADMIN.group_id, index["is_super"], frozenset(), index["permissions"], ()
+    )
+    client = TestClient(app)
+    client.index = index
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_archive_files_require_view(archive_client: TestClient):
+    url = f"{BASE_API_URL}/files"
+    assert archive_client.get(url, params={"table": "sys_user_balance_log"}).status_code == 403
+    archive_client.index["permissions"] = frozenset({("/user/balance/log", "view")})
+    assert archive_client.get(url, params={"table": "sys_user_balance_log"}).status_code == 200
+    assert archive_client.get(url, params={"table": "sys_user_score_log"}).status_code == 403
+    # 通知与其自身接口一致，只需要登录
+    assert archive_client.get(url, params={"table": "sys_notification"}).status_code == 200
+
+
+def test_archive_run_requires_edit(archive_client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_ENABLED", False)
+    archive_client.index["permissions"] = frozenset({("/user/balance/log", "edit"), ("/user/score/log", "edit")})
+    assert archive_client.post(f"{BASE_API_URL}/run").status_code == 403
+
+    # 有权限但未开启归档时拒绝执行
+    archive_client.index["is_super"] = True
+    assert archive_client.post(f"{BASE_API_URL}/run").status_code == 400
+
+
+def test_run_archiver_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "LOG_ARCHIVE_ENABLED", False)
+
+    class Engine:
+        def connect(self):
+            raise AssertionError("archiver must not touch the database when disabled")
+
+    assert log_archive_service.run_archiver(Engine()) == {}
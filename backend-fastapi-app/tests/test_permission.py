@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.permission import compile_group, parse_permission, require_permission
+from app.core.security import Principal
+
+ADMIN = Principal(id=1, username="admin", group_id=1, status="normal")
+
+# (id, path, permission, status)
+RULE_ROWS = [
+    (11, "/admin/admin", '{"view": true, "edit": true, "delete": false}', "normal"),
+    (12, "/admin/group", "{'view': True}", "normal"),
+    (13, "/admin/rule", '{"view": true}', "hidden"),
+]
+
+
+def _check(index, resource: str, action: str):
+    checker = require_permission(resource, action)
+    return asyncio.run(checker(principal=ADMIN, index=index))
+
+
+def test_parse_permission_formats():
+    assert parse_permission('{"view": true}') == {"view": True}
+    assert parse_permission("{'view': True}") == {"view": True}
+    assert parse_permission("__import__('os')") == {}
+    assert parse_permission(None) == {}
+
+
+def test_compile_group_permissions():
+    index = compile_group(1, ["11", 12], [], "normal", RULE_ROWS)
+    assert index.allows("/admin/admin", "edit")
+    assert not index.allows("/admin/admin", "delete")
+    assert index.allows("/admin/group", "view")
+    # 规则未启用或不在分组中时没有权限
+    assert not index.allows("/admin/rule", "view")
+    assert index.has_rule(11) and not index.has_rule(13)
+
+
+def test_compile_group_super_and_disabled():
+    assert compile_group(1, ["all"], [], "normal", RULE_ROWS).allows("/anything", "delete")
+    assert not compile_group(1, ["all"], [], "hidden", RULE_ROWS).allows("/admin/admin", "view")
+
+
+def test_require_permission_allowed():
+    index = compile_group(1, [11], [], "normal", RULE_ROWS)
+    assert _check(index, "/admin/admin", "view") == ADMIN
+
+
+def test_require_permission_denied():
+    index = compile_group(1, [11], [], "normal", RULE_ROWS)
+    with pytest.raises(HTTPException) as exc_info:
+        _check(index, "/admin/group", "view")
+    assert exc_info.value.status_code == 403
+    with pytest.raises(HTTPException):
+        _check(index, "/admin/admin", "delete")
@@ -0,0 +1,177 @@
+import importlib
+import os
+import pkgutil
+
+from app.api import admin as admin_api
+from app.core.permission import PermissionIndex, compile_group
+from app.core.route_permission import (
+    ANY_METHOD, PathTrie, RouteTarget, authorize_admin_route, compile_routes, route_allowed,
+)
+
+PREFIX = "/api/admin"
+
+# (id, rule_type, path, permission, status)
+RULE_ROWS = [
+    (5, "menu", "/general/category", '{"view": true, "add": true, "edit": true, "delete": true}', "normal"),
+    (6, "menu", "/general/config", '{"view": true, "edit": true}', "normal"),
+    (7, "action", "/general/config/reload", "{}", "normal"),
+    (8, "menu", "/attachment", '{"view": true}', "hidden"),
+]
+
+
+def _index(*permissions, rule_ids=(), is_super=False) -> PermissionIndex:
+    return PermissionIndex(1, is_super, frozenset(rule_ids), frozenset(permissions), ())
+
+
+def test_path_trie_literal_before_param():
+    trie = PathTrie(PREFIX)
+    literal = RouteTarget(1, "/a", "view")
+    param = RouteTarget(2, "/a", "edit")
+    trie.insert("GET", "/a/list", literal)
+    trie.insert("GET", "/a/{id}", param)
+    assert trie.match("GET", "/api/admin/a/list") == (literal,)
+    assert trie.match("GET", "/api/admin/a/42") == (param,)
+    assert trie.match("POST", "/api/admin/a/42") is None
+
+
+def test_path_trie_backtracks_to_param_branch():
+    trie = PathTrie(PREFIX)
+    deep = RouteTarget(1, "/a", "view")
+    via_param = RouteTarget(2, "/a", "edit")
+    trie.insert("GET", "/a/list/all", deep)
+    trie.insert("GET", "/a/:id/history", via_param)
+    # list 先走字面量分支失败，再回溯到参数分支
+    assert trie.match("GET", "/api/admin/a/list/history") == (via_param,)
+    assert trie.match("GET", "/api/admin/a/list/all") == (deep,)
+
+
+def test_path_trie_prefix_and_any_method():
+    trie = PathTrie(PREFIX)
+    target = RouteTarget(1, "/x", None)
+    trie.insert(ANY_METHOD, "/x", target)
+    assert trie.match("DELETE", "/api/admin/x") == (target,)
+    assert trie.match("GET", "/api/adminx/x") is None
+    assert trie.match("GET", "/api/user/x") is None
+
+
+def test_compile_routes_expands_actions():
+    trie = compile_routes(RULE_ROWS, PREFIX)
+    assert trie.match("GET", "/api/admin/general/category/list")[0].action == "view"
+    assert trie.match("DELETE", "/api/admin/general/category/delete/3")[0].action == "delete"
+    assert trie.match("GET", "/api/admin/general/config")[0].resource == "/general/config"
+    assert trie.match("POST", "/api/admin/general/config/create") is None
+    assert trie.match("POST", "/api/admin/general/config/reload")[0].action is None
+    # 未启用的规则不参与编译
+    assert trie.match("GET", "/api/admin/attachment/list") is None
+
+
+def test_route_allowed_denies_unmatched_routes():
+    trie = compile_routes(RULE_ROWS, PREFIX)
+    targets = trie.match("POST", "/api/admin/general/config/create")
+    assert targets is None
+    assert not route_allowed(_index(("/general/config", "edit")), targets)
+    assert route_allowed(_index(is_super=True), targets)
+
+
+def test_route_allowed_requires_matching_permission():
+    trie = compile_routes(RULE_ROWS, PREFIX)
+    targets = trie.match("PUT", "/api/admin/general/category/update/1")
+    assert route_allowed(_index(("/general/category", "edit")), targets)
+    assert not route_allowed(_index(("/general/category", "view")), targets)
+
+    action_targets = trie.match("POST", "/api/admin/general/config/reload")
+    assert route_allowed(_index(rule_ids=(7,)), action_targets)
+    assert not route_allowed(_index(rule_ids=(6,)), action_targets)
+
+
+# 种子数据中的规则（sql/Dump20250626.sql），与接口前缀对照
+SEED_DUMP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql", "Dump20250626.sql")
+# 种子规则没有开放的接口，只有超级管理员可以访问
+SUPER_ONLY_ROUTES = {("DELETE", "/api/admin/admin/log/delete/{id}")}
+
+
+def _sql_values(text: str):
+    """解析 INSERT ... VALUES (...),(...) 中的各行，只处理转储中出现的字符串、数字和 NULL"""
+    rows, row, token, quoted, index = [], None, "", False, 0
+    while index < len(text):
+        char = text[index]
+        if quoted:
+            if char == "\\":
+                index += 1
+                token += text[index]
+            elif char == "'":
+                quoted = False
+            else:
+                token += char
+        elif char == "'":
+            quoted = True
+            token = ""
+        elif char in ",)" and row is not None:
+            value = token.strip()
+            row.append(None if value == "NULL" else value)
+            token = ""
+            if char == ")":
+                rows.append(row)
+                row = None
+        elif char == "(":
+            row, token = [], ""
+        elif row is not None:
+            token += char
+        index += 1
+    return rows
+
+
+def _seed_rules():
+    with open(SEED_DUMP, encoding="utf-8") as f:
+        line = next(line for line in f if line.startswith("INSERT INTO `sys_admin_rule` VALUES"))
+    values = line.split(" VALUES ", 1)[1].rstrip().rstrip(";")
+    # (id, rule_type, parent_id, name, path, component, redirect, meta, permission, menu_display_type, ...status)
+    return [(int(row[0]), row[1], row[4], row[8], row[13]) for row in _sql_values(values)]
+
+
+def _guarded_routes():
+    """使用 authorize_admin_route 的接口：(方法, 完整路径模板)"""
+    routes = []
+    for module_info in pkgutil.iter_modules(admin_api.__path__):
+        module = importlib.import_module(f"{admin_api.__name__}.{module_info.name}")
+        router = getattr(module, "router", None)
+        if router is None or not any(dep.dependency is authorize_admin_route for dep in router.dependencies):
+            continue
+        for route in router.routes:
+            for method in route.methods:
+                routes.append((method, PREFIX + route.path))
+    return routes
+
+
+def test_seed_rules_cover_guarded_routes():
+    rules = _seed_rules()
+    trie = compile_routes(rules, PREFIX)
+    # 拥有全部种子规则的非超级管理员组
+    index = compile_group(2, [rule_id for rule_id, *_ in rules], [], "normal",
+                          [(rule_id, path, permission, rule_status) for rule_id, _, path, permission, rule_status in rules])
+    routes = _guarded_routes()
+    assert ("GET", "/api/admin/attachment/list") in routes
+    for method, template in routes:
+        path = template.replace("{id}", "1")
+        allowed = route_allowed(index, trie.match(method, path))
+        assert allowed is ((method, template) not in SUPER_ONLY_ROUTES), (method, template)
+
+
+def test_seed_attachment_and_config_rules():
+    rules = _seed_rules()
+    trie = compile_routes(rules, PREFIX)
+    rule_rows = [(rule_id, path, permission, rule_status) for rule_id, _, path, permission, rule_status in rules]
+    attachment = compile_group(2, [8], [], "normal", rule_rows)
+    config = compile_group(3, [6], [], "normal", rule_rows)
+
+    # 附件规则的菜单路径是 /attachment/attachment，接口前缀是 /attachment
+    for method, path in (("GET", "/attachment/list"), ("GET", "/attachment/1"), ("POST", "/attachment/create"),
+                         ("PUT", "/attachment/update/1"), ("DELETE", "/attachment/delete/1")):
+        targets = trie.match(method, PREFIX + path)
+        assert route_allowed(attachment, targets), (method, path)
+        assert not route_allowed(config, targets), (method, path)
+    # 附件分类是单独的规则
+    assert not route_allowed(attachment, trie.match("GET", f"{PREFIX}/attachment/category/list"))
+
+    for method, path in (("GET", "/general/config"), ("GET", "/general/config/1"), ("PUT", "/general/config/update/1")):
+        assert route_allowed(config, trie.match(method, PREFIX + path)), (method, path)
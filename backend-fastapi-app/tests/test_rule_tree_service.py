@@ -0,0 +1,42 @@
+import json
+
+from app.services.rule_tree_service import FIELDS, build_rule_tree, dumps
+
+
+def _row(id: int, parent_id: int, permission='{"view": true}'):
+    values = {field: None for field in FIELDS}
+    values.update(id=id, parent_id=parent_id, name=f"rule{id}", path=f"/rule/{id}", permission=permission)
+    return tuple(values[field] for field in FIELDS)
+
+
+def test_build_rule_tree_nesting():
+    rows = [_row(1, 0), _row(2, 1), _row(3, 2), _row(4, 0)]
+    tree = build_rule_tree(rows)
+    assert [node["id"] for node in tree] == [1, 4]
+    assert [child["id"] for child in tree[0]["children"]] == [2]
+    assert [child["id"] for child in tree[0]["children"][0]["children"]] == [3]
+    # 只有顶层叶子节点省略 children，下层叶子节点保留空列表
+    assert "children" not in tree[1]
+    assert tree[0]["children"][0]["children"][0]["children"] == []
+
+
+def test_build_rule_tree_keeps_input_order_and_drops_orphans():
+    rows = [_row(5, 0), _row(3, 5), _row(2, 5), _row(9, 99)]
+    tree = build_rule_tree(rows)
+    assert [node["id"] for node in tree] == [5]
+    assert [child["id"] for child in tree[0]["children"]] == [3, 2]
+
+
+def test_build_rule_tree_subtree_root():
+    rows = [_row(2, 1), _row(3, 2)]
+    tree = build_rule_tree(rows, root_parent_id=1)
+    assert [node["id"] for node in tree] == [2]
+    assert [child["id"] for child in tree[0]["children"]] == [3]
+
+
+def test_build_rule_tree_parses_permission():
+    rows = [_row(1, 0, "{'edit': True}"), _row(2, 0, None)]
+    tree = build_rule_tree(rows)
+    assert tree[0]["permission"] == {"edit": True}
+    assert tree[1]["permission"] is None
+    assert json.loads(dumps(tree))[0]["permission"] == {"edit": True}
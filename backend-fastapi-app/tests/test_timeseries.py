@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.services import timeseries
+from app.services.timeseries import DAY, HOUR, MONTH, WEEK, accumulate, floor
+
+
+def _times(*values: str) -> np.ndarray:
+    return np.array(values, dtype="datetime64[s]")
+
+
+@pytest.mark.parametrize("granularity, expected", [
+    (HOUR, "2025-06-04T13"),
+    (DAY, "2025-06-04"),
+    (WEEK, "2025-06-02"),
+    (MONTH, "2025-06"),
+])
+def test_floor(granularity: str, expected: str):
+    assert str(floor(_times("2025-06-04T13:45:10"), granularity)[0]) == expected
+
+
+def test_floor_week_starts_monday():
+    # 周一本身、周日和跨年的周
+    values = _times("2025-06-02T00:00:00", "2025-06-08T23:59:59", "2025-01-01T12:00:00", "1970-01-01T00:00:00")
+    assert [str(item) for item in floor(values, WEEK)] == ["2025-06-02", "2025-06-02", "2024-12-30", "1969-12-29"]
+
+
+def test_floor_rejects_unknown_granularity():
+    with pytest.raises(ValueError):
+        floor(_times("2025-06-04T00:00:00"), "year")
+
+
+def test_accumulate_counts_and_pads():
+    times = _times("2025-06-01T08:00:00", "2025-06-01T23:59:59", "2025-06-03T00:00:00", "2025-06-04T00:00:00")
+    series = accumulate(times, None, DAY, datetime(2025, 6, 1), datetime(2025, 6, 4))
+    # 结束时间不包含，范围外的数据点被忽略，没有数据的日期补 0
+    assert series.records() == [
+        {"date": "2025-06-01", "count": 2},
+        {"date": "2025-06-02", "count": 0},
+        {"date": "2025-06-03", "count": 1},
+    ]
+    assert series.total == 3
+    assert series.records(skip_empty=True) == [{"date": "2025-06-01", "count": 2}, {"date": "2025-06-03", "count": 1}]
+
+
+def test_accumulate_weights_to_coarser_granularity():
+    times = _times("2025-05-31T23:00:00", "2025-06-01T00:00:00", "2025-06-15T10:00:00", "2025-07-01T00:00:00")
+    weights = np.array([1, 2, 3, 4], dtype=np.int64)
+    series = accumulate(times, weights, MONTH, datetime(2025, 5, 1), datetime(2025, 8, 1))
+    assert series.records(key="month") == [
+        {"month": "2025-05", "count": 1},
+        {"month": "2025-06", "count": 5},
+        {"month": "2025-07", "count": 4},
+    ]
+
+
+def test_accumulate_partial_buckets():
+    # 起止时间不在时间段边界上时，首尾时间段只统计范围内的数据点
+    times = _times("2025-06-02T09:00:00", "2025-06-02T11:00:00", "2025-06-09T11:00:00", "2025-06-09T13:00:00")
+    series = accumulate(times, None, WEEK, datetime(2025, 6, 2, 10), datetime(2025, 6, 9, 12))
+    assert series.records() == [{"date": "2025-06-02", "count": 1}, {"date": "2025-06-09", "count": 1}]
+
+
+def test_accumulate_hour_labels():
+    series = accumulate(_times("2025-06-01T01:30:00"), None, HOUR, datetime(2025, 6, 1), datetime(2025, 6, 1, 3))
+    assert series.labels() == ["2025-06-01 00:00", "2025-06-01 01:00", "2025-06-01 02:00"]
+    assert series.values.tolist() == [0, 1, 0]
+
+
+def test_accumulate_empty():
+    series = accumulate(_times(), None, DAY, datetime(2025, 6, 1), datetime(2025, 6, 3))
+    assert series.values.tolist() == [0, 0]
+    assert len(accumulate(_times("2025-06-01T00:00:00"), None, DAY, datetime(2025, 6, 1), datetime(2025, 6, 1))) == 0
+
+
+def test_utc_to_local_follows_dst(monkeypatch):
+    monkeypatch.setattr(timeseries.settings, "TIMEZONE", "Europe/Berlin")
+    values = _times("2025-03-30T00:30:00", "2025-03-30T01:30:00", "NaT")
+    local = timeseries.utc_to_local(values)
+    assert [str(item) for item in local[:2]] == ["2025-03-30T01:30:00", "2025-03-30T03:30:00"]
+    assert np.isnat(local[2])
@@ -0,0 +1,85 @@
+from typing import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.admin.auth import router
+from app.core import security
+from app.core.security import Principal, create_access_token
+from app.dependencies.database import get_db
+from app.models.sys_admin import SysAdmin
+
+# Constants
+ADMIN_USER_ID = 1
+BASE_API_URL = "/api/admin/auth"
+
+# 路由在应用生命周期中动态加载，这里单独挂载认证路由，前缀与 router_loader 一致
+app = FastAPI()
+app.include_router(router, prefix="/api/admin")
+
+
+@pytest.fixture(scope="function")
+def auth_db() -> Generator[Session, None, None]:
+    """内存 SQLite 数据库，只包含管理员表"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SysAdmin.metadata.create_all(engine, tables=[SysAdmin.__table__])
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(SysAdmin.__table__), [{
+        "id": ADMIN_USER_ID, "username": "admin", "nickname": "admin", "password": "x",
+        "email": "admin@example.com", "mobile": "13800000000", "group_id": 1, "status": "normal",
+    }])
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def auth_client(auth_db: Session, monkeypatch) -> Generator[TestClient, None, None]:
+    """使用内存数据库的测试客户端，身份快照不经过应用数据库"""
+    monkeypatch.setattr(
+        security, "_load_principal",
+        lambda kind, subject_id: Principal(int(subject_id), "admin", 1, "normal"),
+    )
+    app.dependency_overrides[get_db] = lambda: auth_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _refresh(client: TestClient, token: str):
+    return client.post(f"{BASE_API_URL}/refresh_token", params={"refresh_token": token})
+
+
+def test_refresh_token_rotates(auth_client: TestClient):
+    token = create_access_token({"sub": ADMIN_USER_ID})
+    response = _refresh(auth_client, token)
+    assert response.status_code == 200
+    new_token = response.json()["data"]["access_token"]
+    assert new_token != token
+
+    # 旧 token 已吊销，不能再次刷新；新 token 可以
+    assert _refresh(auth_client, token).status_code == 401
+    assert _refresh(auth_client, new_token).status_code == 200
+
+
+def test_refresh_token_without_jti_rejected(auth_client: TestClient):
+    token = create_access_token({"sub": ADMIN_USER_ID, "jti": ""})
+    assert _refresh(auth_client, token).status_code == 401
+
+
+def test_logout_revokes_token(auth_client: TestClient):
+    token = create_access_token({"sub": ADMIN_USER_ID})
+    headers = {"Authorization": f"Bearer {token}"}
+    assert auth_client.post(f"{BASE_API_URL}/logout", headers=headers).status_code == 200
+
+    # 登出后的 token 既不能访问接口，也不能换取新 token
+    assert auth_client.post(f"{BASE_API_URL}/logout", headers=headers).status_code == 401
+    assert _refresh(auth_client, token).status_code == 401
@@ -0,0 +1,145 @@
+from decimal import Decimal
+from typing import Generator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.admin.user_ledger import router
+from app.core.permission import PermissionIndex, get_current_admin_permissions
+from app.core.security import Principal, get_current_admin_principal
+from app.dependencies.database import get_db
+from app.models.sys_user import SysUser
+from app.models.sys_user_balance_log import SysUserBalanceLog
+from app.models.sys_user_ledger_key import SysUserLedgerKey
+from app.models.sys_user_score_log import SysUserScoreLog
+from app.services import ledger_service as ledger_module
+from app.services.ledger_service import LedgerError, LedgerUserNotFound, ledger_service
+
+# Constants
+BASE_API_URL = "/api/admin/user/ledger"
+ADMIN = Principal(id=1, username="admin", group_id=1, status="normal")
+LEDGER_PERMISSIONS = frozenset({("/user/balance/log", "add"), ("/user/score/log", "add")})
+
+# 路由在应用生命周期中动态加载，这里单独挂载账本路由，前缀与 router_loader 一致
+app = FastAPI()
+app.include_router(router, prefix="/api/admin")
+
+
+@pytest.fixture(scope="function")
+def ledger_db(monkeypatch) -> Generator[Session, None, None]:
+    """内存 SQLite 数据库，只包含账本相关的表"""
+    # SQLite 不支持 READ COMMITTED，测试中使用其默认的可串行化隔离级别
+    monkeypatch.setattr(ledger_module, "LEDGER_ISOLATION_LEVEL", "SERIALIZABLE")
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    tables = [model.__table__ for model in (SysUser, SysUserBalanceLog, SysUserScoreLog, SysUserLedgerKey)]
+    SysUser.metadata.create_all(engine, tables=tables)
+    db = sessionmaker(bind=engine)()
+    db.execute(insert(SysUser.__table__), [
+        {"id": 1, "username": "ledger1", "nickname": "ledger1", "email": "ledger1@example.com",
+         "mobile": "13800000001", "balance": Decimal("10.00"), "score": 0},
+        {"id": 2, "username": "ledger2", "nickname": "ledger2", "email": "ledger2@example.com",
+         "mobile": "13800000002", "balance": Decimal("0.00"), "score": 5},
+    ])
+    db.commit()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def ledger_client(ledger_db: Session) -> Generator[TestClient, None, None]:
+    """使用内存数据库和固定管理员身份的测试客户端"""
+    permissions = {"value": LEDGER_PERMISSIONS}
+    app.dependency_overrides[get_db] = lambda: ledger_db
+    app.dependency_overrides[get_current_admin_principal] = lambda: ADMIN
+    app.dependency_overrides[get_current_admin_permissions] = lambda: PermissionIndex(
+        ADMIN.group_id, False, frozenset(), permissions["value"], ()
+    )
+    client = TestClient(app)
+    client.permissions = permissions
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def _balance(db: Session, user_id: int) -> Decimal:
+    db.expire_all()
+    return db.execute(select(SysUser.balance).where(SysUser.id == user_id)).scalar_one()
+
+
+def test_ledger_apply_idempotent(ledger_db: Session):
+    first = ledger_service.apply(ledger_db, "balance", user_id=1, amount="5", idempotency_key="order-1")
+    second = ledger_service.apply(ledger_db, "balance", user_id=1, amount="5", idempotency_key="order-1")
+    assert first["duplicate"] is False
+    assert second["duplicate"] is True
+    assert _balance(ledger_db, 1) == Decimal("15.00")
+    assert ledger_db.query(SysUserBalanceLog).count() == 1
+
+
+def test_ledger_batch_duplicate_key_in_batch(ledger_db: Session):
+    items = [
+        {"user_id": 1, "amount": "1", "idempotency_key": "k-1"},
+        {"user_id": 1, "amount": "1", "idempotency_key": "k-1"},
+        {"user_id": 2, "amount": "2"},
+    ]
+    results = ledger_service.apply_batch(
+        ledger_db, "balance", [ledger_module.LedgerAdjustment(**item) for item in items]
+    )
+    assert [item["duplicate"] for item in results] == [False, True, False]
+    assert _balance(ledger_db, 1) == Decimal("11.00")
+    assert _balance(ledger_db, 2) == Decimal("2.00")
+
+
+def test_ledger_fractional_balance(ledger_db: Session):
+    result = ledger_service.apply(ledger_db, "balance", user_id=1, amount="0.125")
+    assert result["amount"] == Decimal("0.13")
+    assert result["before"] == Decimal("10.00")
+    assert result["after"] == Decimal("10.13")
+    log = ledger_db.query(SysUserBalanceLog).one()
+    assert Decimal(str(log.after)) == Decimal("10.13")
+
+
+def test_ledger_fractional_score_rejected(ledger_db: Session):
+    with pytest.raises(LedgerError):
+        ledger_service.apply(ledger_db, "score", user_id=2, amount="1.5")
+    assert ledger_db.query(SysUserScoreLog).count() == 0
+
+
+def test_ledger_unknown_user_rolls_back(ledger_db: Session):
+    items = [ledger_module.LedgerAdjustment(user_id=1, amount="1"), ledger_module.LedgerAdjustment(user_id=99, amount="1")]
+    with pytest.raises(LedgerUserNotFound) as exc_info:
+        ledger_service.apply_batch(ledger_db, "balance", items)
+    assert exc_info.value.user_ids == [99]
+    assert _balance(ledger_db, 1) == Decimal("10.00")
+    assert ledger_db.query(SysUserBalanceLog).count() == 0
+
+
+def test_ledger_api_apply(ledger_client: TestClient):
+    response = ledger_client.post(f"{BASE_API_URL}/score/apply", json={"user_id": 2, "amount": 3})
+    assert response.status_code == 200
+    assert response.json()["data"]["after"] == 8
+
+
+def test_ledger_api_unknown_user(ledger_client: TestClient):
+    response = ledger_client.post(f"{BASE_API_URL}/balance/apply", json={"user_id": 99, "amount": "1"})
+    assert response.status_code == 404
+
+
+def test_ledger_api_fractional_score(ledger_client: TestClient):
+    response = ledger_client.post(f"{BASE_API_URL}/score/apply", json={"user_id": 2, "amount": "0.5"})
+    assert response.status_code == 400
+
+
+def test_ledger_api_permission_denied(ledger_client: TestClient):
+    ledger_client.permissions["value"] = frozenset({("/user/balance/log", "add")})
+    response = ledger_client.post(f"{BASE_API_URL}/score/apply", json={"user_id": 2, "amount": 1})
+    assert response.status_code == 403
+    response = ledger_client.post(f"{BASE_API_URL}/balance/apply", json={"user_id": 2, "amount": 1})
+    assert response.status_code == 200